@@ -0,0 +1,200 @@
+"""
+연결별 상태 메모리 벤치마크 - 동시 연결 N개의 연결당 바이트와 프로세스 RSS
+
+websocket_endpoint와 같은 순서로 연결 상태를 만듭니다 - 세션(평활 상태, 응답 생성기,
+샘플링 주기 결정기), 하트비트와 타이머, 속도 제한기(연결·IP 토큰 버킷), 수신 대기열과
+수신 태스크. 샘플을 흘려 넣어 평활 창과 샘플링 주기 창을 채우고, 응답은
+manager.send_personal_message로 보내되 ack는 보내지 않습니다 (실제 클라이언트와 같음).
+웹소켓 객체 자체는 프레임워크 몫이므로 읽기 대기만 하는 가짜 객체로 대신합니다.
+
+연결 프로필별로 재며, 연결당 바이트가 프로필의 상한을 넘으면 종료 코드 1로 끝납니다
+(회귀 검사).
+
+사용법: python benchmarks/bench_connection_state.py [연결 수]
+    연결 수: 시뮬레이션할 동시 연결 수 (기본값: 2000, 연결당 바이트는 연결 수와 무관)
+"""
+
+import asyncio
+import gc
+import json
+import logging
+import sys
+import tracemalloc
+from pathlib import Path
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import websocket_server  # noqa: E402
+from connection_guard import Heartbeat  # noqa: E402
+from session_state import SessionState, new_session_id  # noqa: E402
+
+# 연결마다 흘려 넣는 샘플 수 (평활 창, 샘플링 주기 창, 미확인 응답 보관을 채움)
+WARMUP_SAMPLES = 40
+# 프로필별 (쿼리 파라미터, 연결당 상태 메모리 상한) - 상한은 회귀 기준
+# (측정값: 기본 약 8.6KB, ack=1 약 15.2KB - 대부분 수신 대기열·토큰 버킷·타이머·미확인 응답)
+PROFILES = {
+    # 기본 클라이언트 (ack를 보내지 않으므로 응답을 보관하지 않음)
+    "기본": ({"profile": "delta", "rate_control": "on"}, 9500),
+    # 재전송을 요청했지만 ack가 늦어 미확인 응답이 상한까지 쌓인 클라이언트
+    "ack=1": ({"profile": "delta", "rate_control": "on", "ack": "1"}, 16500),
+}
+
+
+class FakeWebSocket:
+    """읽기를 기다리기만 하는 웹소켓 (보낸 응답은 버림)"""
+
+    __slots__ = ()
+    client = None
+    client_state = None
+    # 연결이 열려 있는 동안 수신 태스크가 기다리는 퓨처 (모든 연결이 공유)
+    never = None
+
+    async def receive_text(self) -> str:
+        return await FakeWebSocket.never
+
+    async def send_text(self, text: str) -> None:
+        pass
+
+
+async def open_connections(manager, n: int, params: dict) -> list:
+    """서버 엔드포인트와 같은 순서로 연결 상태를 만들고 샘플을 처리합니다."""
+    loop = asyncio.get_running_loop()
+    probabilities = {0: 0.85, 1: 0.1, 2: 0.05}
+    connections = []
+    for i in range(n):
+        websocket = FakeWebSocket()
+        client_host = f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+        state = SessionState(
+            new_session_id(),
+            websocket_server.create_notifier(params),
+            websocket_server.unacked_limit(params),
+        )
+        state.encoder = websocket_server.create_encoder(params)
+        state.rate_controller = websocket_server.create_rate_controller(params)
+        state.device_id = state.session_id
+        heartbeat = state.heartbeat = Heartbeat(
+            websocket_server.WS_PING_INTERVAL_S,
+            websocket_server.WS_READ_TIMEOUT_S,
+            websocket_server.WS_IDLE_TIMEOUT_S,
+        )
+        state.limiter = websocket_server.create_limiter(client_host)
+        inbox = asyncio.Queue(maxsize=websocket_server.INBOX_MAX_MESSAGES)
+        reader = asyncio.create_task(
+            websocket_server.receive_loop(websocket, inbox, heartbeat)
+        )
+        heartbeat.timer = loop.call_later(
+            heartbeat.check_interval_s,
+            websocket_server.check_heartbeat,
+            websocket,
+            heartbeat,
+            inbox,
+        )
+        manager.active_connections[websocket] = state
+        connections.append((client_host, state, reader))
+
+        for t in range(WARMUP_SAMPLES):
+            timestamp = t * 200
+            pitch = -20.0 + (t % 3) * 0.1
+            text = json.dumps(
+                {"seq": t + 1, "timestamp": timestamp, "relativePitch": pitch}
+            )
+            if state.limiter is not None:
+                state.limiter.filter([text])
+            state.last_sample = (timestamp, pitch)
+            state.accept_client_seq(t + 1)
+            state.rate_controller.observe(timestamp, pitch)
+            state.notifier.observe(0, 0.85, probabilities)
+            response = state.encoder.encode(
+                {
+                    "predicted_posture": 0,
+                    "confidence": 0.85,
+                    "all_probabilities": probabilities,
+                    "timestamp": timestamp,
+                    "relative_pitch": pitch,
+                }
+            )
+            await manager.send_personal_message(response, websocket)
+
+    # 수신 태스크가 첫 읽기에서 멈출 때까지 진행
+    await asyncio.sleep(0)
+    return connections
+
+
+def close_connections(manager, connections: list) -> None:
+    for client_host, state, reader in connections:
+        reader.cancel()
+        state.heartbeat.timer.cancel()
+        websocket_server.release_limiter(client_host, state.limiter)
+    manager.active_connections.clear()
+
+
+def rss() -> int:
+    return psutil.Process().memory_info().rss if psutil is not None else 0
+
+
+async def measure(n: int, params: dict) -> float:
+    """프로필 하나의 연결당 바이트를 출력하고 반환합니다."""
+    FakeWebSocket.never = asyncio.get_running_loop().create_future()
+
+    # 1) tracemalloc으로 상태 객체가 차지하는 바이트
+    manager = websocket_server.ConnectionManager()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    connections = await open_connections(manager, n, params)
+    gc.collect()
+    traced = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    close_connections(manager, connections)
+    connections = None
+    await asyncio.sleep(0)
+    gc.collect()
+
+    # 2) 추적 없이 다시 만들어 RSS 증가량 측정
+    rss_before = rss()
+    connections = await open_connections(manager, n, params)
+    gc.collect()
+    rss_after = rss()
+    close_connections(manager, connections)
+    await asyncio.sleep(0)
+
+    per_connection = traced / n
+    print(f"연결당 상태 메모리: {per_connection:,.0f} 바이트 (tracemalloc)")
+    print(f"상태 메모리 합계: {traced / 2**20:,.1f} MiB")
+    if psutil is not None:
+        print(
+            f"프로세스 RSS: {rss_after / 2**20:,.1f} MiB "
+            f"(연결 생성으로 +{(rss_after - rss_before) / 2**20:,.1f} MiB, "
+            f"연결당 {(rss_after - rss_before) / n:,.0f} 바이트)"
+        )
+    else:
+        print("프로세스 RSS: psutil이 없어 측정하지 않음")
+    return per_connection
+
+
+def main() -> None:
+    logging.disable(logging.WARNING)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print(f"동시 연결 {n:,}개")
+    failed = False
+    for name, (params, max_bytes) in PROFILES.items():
+        print(f"\n[{name}] {params}")
+        per_connection = asyncio.run(measure(n, params))
+        if per_connection > max_bytes:
+            print(f"회귀: 연결당 {max_bytes:,} 바이트 상한 초과")
+            failed = True
+        else:
+            print(f"상한 {max_bytes:,} 바이트 이내")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+드리프트 감시 벤치마크 - 샘플 하나의 기록 비용이 기기 수·누적 샘플 수와 무관한지 확인
+
+기기 수를 바꿔 가며 같은 수의 샘플을 기록하고 샘플당 비용(µs)과 기기당 메모리를 출력합니다.
+
+사용법: python benchmarks/bench_drift_monitor.py [샘플 수]
+    샘플 수: 기기 수마다 기록할 샘플 수 (기본값: 200000)
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from drift_monitor import DriftMonitor, build_reference  # noqa: E402
+
+DEVICE_COUNTS = (1, 100, 10000)
+
+
+def make_reference():
+    rng = np.random.default_rng(0)
+    return build_reference(rng.normal(0, 10, 10000), rng.uniform(0.5, 0.9, 1000))
+
+
+def feed(monitor: DriftMonitor, n: int, devices: int) -> float:
+    """샘플 n개를 기록하고 걸린 시간(초)을 돌려줍니다."""
+    rng = np.random.default_rng(1)
+    pitches = rng.normal(0, 10, n).tolist()
+    confidences = rng.uniform(0.5, 0.9, n).tolist()
+    device_ids = [f"device-{i % devices}" for i in range(n)]
+    start = time.perf_counter()
+    for device_id, pitch, confidence in zip(device_ids, pitches, confidences):
+        monitor.observe(device_id, pitch, confidence)
+    return time.perf_counter() - start
+
+
+def run(n: int, devices: int):
+    """(샘플당 µs, 기기당 바이트)"""
+    reference = make_reference()
+    elapsed = feed(DriftMonitor(reference, max_devices=devices), n, devices)
+
+    # 메모리는 기기마다 샘플 하나씩만 기록해 따로 측정 (tracemalloc은 시간을 부풀림)
+    tracemalloc.start()
+    monitor = DriftMonitor(reference, max_devices=devices)
+    feed(monitor, devices, devices)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed / n * 1e6, memory / devices
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print(f"기기 수마다 샘플 {n:,}개")
+    print(f"{'기기 수':>8}{'µs/샘플':>12}{'바이트/기기':>14}")
+    for devices in DEVICE_COUNTS:
+        us, per_device = run(n, devices)
+        print(f"{devices:>8,}{us:>12.2f}{per_device:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+랜덤 포레스트 학습 코어 확장성 벤치마크 - n_jobs별 학습 시간과 병렬 효율
+
+사용법: python benchmarks/bench_forest_training.py [배수] [트리 수]
+    배수: 자세모음 특징 샘플을 잡음을 섞어 복제한 크기 (기본값: 2000)
+    트리 수: 학습할 트리 수 (기본값: 200)
+
+자세모음은 기록 파일 하나가 샘플 하나라 MIN_OOB_TRAINING_ROWS보다 적어 고정 트리 수로
+학습하므로, OOB 정체 조기 종료는 복제 데이터(OOB_FACTOR배)로 따로 측정합니다.
+
+코어 수별 속도 향상은 아직 검증되지 않았습니다 - 작성 환경이 단일 코어라 n_jobs=1만
+측정했습니다. 병렬 학습 효과는 멀티코어 호스트에서 이 벤치마크로 확인해야 합니다.
+"""
+
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from posture_classifier import MIN_OOB_TRAINING_ROWS, PostureClassifier  # noqa: E402
+
+REPEATS = 3
+# OOB 조기 종료 측정에 쓸 복제 배수 (학습 샘플이 MIN_OOB_TRAINING_ROWS를 넘도록)
+OOB_FACTOR = 20
+
+
+def replicate(X: np.ndarray, y: np.ndarray, factor: int, rng) -> tuple:
+    """정규화된 특징 샘플을 표준편차 0.3 잡음을 섞어 factor배로 늘림"""
+    X_big = np.vstack([X + rng.normal(0, 0.3, X.shape) for _ in range(factor)])
+    return X_big, np.tile(y, factor)
+
+
+def core_counts() -> list:
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def fit_time(X: np.ndarray, y: np.ndarray, n_estimators: int, n_jobs: int) -> float:
+    best = np.inf
+    for _ in range(REPEATS):
+        model = RandomForestClassifier(
+            n_estimators=n_estimators,
+            random_state=42,
+            max_depth=10,
+            min_samples_split=5,
+            min_samples_leaf=2,
+            n_jobs=n_jobs,
+        )
+        start = time.perf_counter()
+        model.fit(X, y)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    factor = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_estimators = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    logging.disable(logging.WARNING)
+
+    # 실제 데이터 학습의 단계별 소요 시간
+    classifier = PostureClassifier(str(ROOT / "자세모음"))
+    profile = classifier.train_model()
+    print("단계별 학습 시간 (자세모음):")
+    for stage in ("load_s", "features_s", "scale_s", "fit_s", "evaluate_s", "total_s"):
+        print(f"  {stage[:-2]:>10}: {profile[stage] * 1000:8.1f} ms")
+    print(f"  트리 수 / OOB 추이: {profile['oob_history']}")
+
+    # 복제 데이터에서 OOB 정체 조기 종료 (train_model 기본 설정과 같은 단계·기준)
+    rng = np.random.default_rng(0)
+    X_oob, y_oob = replicate(classifier.replay_X, classifier.replay_y, OOB_FACTOR, rng)
+    assert len(X_oob) >= MIN_OOB_TRAINING_ROWS
+    start = time.perf_counter()
+    model = classifier._grow_forest(
+        X_oob,
+        list(y_oob),
+        n_jobs=-1,
+        step=25,
+        max_estimators=300,
+        oob_tolerance=0.002,
+        patience=2,
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"\nOOB 조기 종료 (샘플 {len(X_oob)}개): 트리 {model.n_estimators}개, "
+        f"{elapsed:.3f}s, 추이 {classifier.training_profile['oob_history']}"
+    )
+    print(f"  고정 300개: {fit_time(X_oob, y_oob, 300, -1):.3f}s")
+
+    # 복제 데이터에서 코어 수별 학습 시간
+    X_big, y_big = replicate(classifier.replay_X, classifier.replay_y, factor, rng)
+    print(f"\n샘플 {len(X_big)}개, 트리 {n_estimators}개:")
+    print(f"{'n_jobs':>8} {'학습 (s)':>10} {'속도 향상':>10} {'효율':>8}")
+    baseline = None
+    for n_jobs in core_counts():
+        elapsed = fit_time(X_big, y_big, n_estimators, n_jobs)
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(f"{n_jobs:>8} {elapsed:>10.3f} {speedup:>9.2f}x {speedup / n_jobs:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
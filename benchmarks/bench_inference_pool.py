@@ -0,0 +1,86 @@
+"""
+추론 처리량 벤치마크 - 이벤트 루프에서 바로 예측 vs 스레드 풀 vs 워커 프로세스 풀
+
+같은 수의 요청을 동시에 최대 IN_FLIGHT개씩 보내고 초당 처리 수를 비교합니다. 스레드 풀은
+GIL 때문에 코어를 늘려도 처리량이 거의 늘지 않고, 워커 프로세스 풀은 코어 수만큼 늘어납니다
+(코어가 하나면 공유 메모리 링 왕복 비용만큼 느려짐).
+
+사용법: python benchmarks/bench_inference_pool.py [요청 수] [워커 수]
+    요청 수: 방식마다 보낼 요청 수 (기본값: 2000)
+    워커 수: 스레드·프로세스 수 (기본값: CPU 코어 수)
+"""
+
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from inference_pool import InferencePool  # noqa: E402
+from posture_classifier import PostureClassifier  # noqa: E402
+
+MODEL_PATH = str(ROOT / "posture_model.pkl")
+IN_FLIGHT = 64
+
+
+async def drive(predict, n: int) -> float:
+    """요청 n개를 IN_FLIGHT개씩 동시에 보내고 초당 처리 수를 돌려줍니다."""
+    limit = asyncio.Semaphore(IN_FLIGHT)
+
+    async def one(i):
+        async with limit:
+            result = await predict(i, float(i % 60 - 30))
+            assert "error" not in result, result
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(n)])
+    return n / (time.perf_counter() - start)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    classifier = PostureClassifier()
+    if not classifier.load_model(MODEL_PATH):
+        sys.exit(f"모델 파일이 없습니다: {MODEL_PATH}")
+
+    async def in_process(timestamp, pitch):
+        return classifier.predict_posture(timestamp, pitch)
+
+    executor = ThreadPoolExecutor(workers)
+
+    async def thread_pool(timestamp, pitch):
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, classifier.predict_posture, timestamp, pitch
+        )
+
+    pool = InferencePool(workers, MODEL_PATH, classifier.predict_posture)
+    pool.start()
+    if not pool.wait_ready(120):
+        sys.exit("추론 워커가 준비되지 않았습니다.")
+
+    print(
+        f"요청 {n:,}개, 동시 {IN_FLIGHT}개, 워커 {workers}개 (CPU {os.cpu_count()}개)"
+    )
+    print(f"{'방식':<16}{'요청/초':>10}")
+    try:
+        for name, predict in (
+            ("in-process", in_process),
+            ("thread pool", thread_pool),
+            ("process pool", pool.predict),
+        ):
+            asyncio.run(drive(predict, min(n, 100)))  # 준비 운동
+            rate = asyncio.run(drive(predict, n))
+            print(f"{name:<16}{rate:>10,.0f}")
+        print(f"\nprocess pool fallback: {pool.fallbacks}회")
+    finally:
+        pool.close()
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
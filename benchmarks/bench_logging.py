@@ -0,0 +1,101 @@
+"""
+요청당 로깅 비용 벤치마크 - 동기 FileHandler vs 비동기 큐 파이프라인 (샘플링 유무)
+
+사용법: python benchmarks/bench_logging.py [요청 수]
+    요청 수: 요청마다 서버 핫패스와 같은 INFO 로그 3줄을 남김 (기본값: 20000)
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from log_pipeline import LOG_FORMAT, sample, setup_logging  # noqa: E402
+
+logger = logging.getLogger("bench")
+REQUEST = {"timestamp": 15420, "relativePitch": -25.73}
+PREDICTION = {"predicted_posture": 3, "confidence": 0.8123}
+
+
+def eager_request() -> None:
+    """기존 방식 - f-string으로 요청 경로에서 메시지 조립"""
+    logger.info(f"수신된 데이터: {REQUEST}")
+    logger.info(
+        f"예측 완료 - 자세: {PREDICTION['predicted_posture']}, 확신도: {PREDICTION['confidence']:.4f}"
+    )
+    logger.info(
+        f"예측 완료 - 입력: {REQUEST['relativePitch']}도, 결과: {PREDICTION['predicted_posture']}번 자세"
+    )
+
+
+def lazy_request() -> None:
+    """파이프라인 방식 - 샘플링 판정 후 인자만 넘기고 포맷은 기록 스레드에서"""
+    if sample("receive"):
+        logger.info("수신된 데이터: %s", REQUEST)
+    if sample("predict"):
+        logger.info(
+            "예측 완료 - 자세: %s, 확신도: %.4f",
+            PREDICTION["predicted_posture"],
+            PREDICTION["confidence"],
+        )
+    if sample("respond"):
+        logger.info(
+            "예측 완료 - 입력: %s도, 결과: %s번 자세",
+            REQUEST["relativePitch"],
+            PREDICTION["predicted_posture"],
+        )
+
+
+def per_request_us(request, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        request()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def reset_root() -> None:
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    tmp = Path(tempfile.mkdtemp())
+    results = []
+
+    # 1) 동기 FileHandler (기존 logging.basicConfig 구성에서 콘솔 출력 제외)
+    reset_root()
+    handler = logging.FileHandler(tmp / "sync.log", encoding="utf-8")
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.INFO)
+    results.append(("동기 FileHandler + f-string", per_request_us(eager_request, n)))
+    reset_root()
+
+    # 2) 큐 파이프라인, 샘플링 없음
+    pipeline = setup_logging(str(tmp / "queue.log"), console=False, queue_size=0)
+    results.append(("큐 파이프라인", per_request_us(lazy_request, n)))
+    pipeline.stop()
+
+    # 3) 큐 파이프라인 + 1/100 샘플링 (서버 기본값)
+    pipeline = setup_logging(
+        str(tmp / "sampled.log"),
+        console=False,
+        every={"receive": 100, "predict": 100, "respond": 100},
+    )
+    results.append(("큐 파이프라인 + 1/100 샘플링", per_request_us(lazy_request, n)))
+    pipeline.stop()
+
+    print(f"요청 {n}개 (요청당 INFO 로그 3줄)")
+    print(f"{'구성':<32} {'요청당 (µs)':>12}")
+    for name, cost in results:
+        print(f"{name:<32} {cost:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+메트릭 계측 오버헤드 벤치마크 - 메시지당 계측 비용과 예측 경로 대비 비율
+
+사용법: python benchmarks/bench_metrics.py [반복 수]
+    반복 수: 측정할 메시지 수 (기본값: 500)
+"""
+
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from posture_classifier import PostureClassifier  # noqa: E402
+from server_metrics import (  # noqa: E402
+    OVERHEAD_BUDGET_US,
+    ServerMetrics,
+    measure_overhead,
+)
+
+ROUNDS = 5
+
+
+def request_path(classifier: PostureClassifier, metrics, n: int) -> float:
+    """parse → predict → serialize 경로의 메시지당 시간 (µs)"""
+    payload = json.dumps({"timestamp": 15420, "relativePitch": -25.73})
+    start = time.perf_counter()
+    for _ in range(n):
+        t = time.perf_counter()
+        request = json.loads(payload)
+        if metrics is not None:
+            t = metrics.observe("parse", t)
+            metrics.message("prediction")
+            t = metrics.observe("validate", t)
+        result = classifier.predict_posture(
+            request["timestamp"], request["relativePitch"]
+        )
+        t = time.perf_counter()
+        json.dumps(result, ensure_ascii=False)
+        if metrics is not None:
+            metrics.observe("serialize", t)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    logging.disable(logging.WARNING)
+
+    classifier = PostureClassifier(str(ROOT / "자세모음"))
+    if not classifier.load_model(str(ROOT / "posture_model.pkl")):
+        classifier.train_model()
+
+    metrics = ServerMetrics()
+    overhead = measure_overhead(metrics)
+
+    # 잡음을 줄이기 위해 두 경로를 번갈아 여러 번 재고 최솟값 사용
+    baseline = instrumented = float("inf")
+    for _ in range(ROUNDS):
+        classifier.stage_observer = None
+        baseline = min(baseline, request_path(classifier, None, n))
+        classifier.stage_observer = metrics.observe_duration
+        instrumented = min(instrumented, request_path(classifier, metrics, n))
+
+    print(f"메시지당 계측 비용 (단계 8개 + 카운터): {overhead:.2f} µs")
+    print(f"예측 경로 (계측 없음): {baseline:.1f} µs")
+    print(f"예측 경로 (계측 포함): {instrumented:.1f} µs")
+    print(f"상대 오버헤드: {(instrumented - baseline) / baseline:+.1%}")
+    status = "통과" if overhead <= OVERHEAD_BUDGET_US else "초과"
+    print(f"예산 {OVERHEAD_BUDGET_US:.0f} µs/메시지: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+압력 특징 엔진 프레임당 비용 벤치마크
+
+사용법: python benchmarks/bench_pressure_features.py [기록 CSV]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from pressure_features import (  # noqa: E402
+    OnlinePressureFeatures,
+    PressureFeatureEngine,
+)
+
+DEFAULT_RECORDING = (
+    Path(__file__).resolve().parent.parent / "pressure_data_20250827_232655.csv"
+)
+
+
+def per_row_reference(df: pd.DataFrame, engine: PressureFeatureEngine) -> None:
+    """비교 기준 - 행마다 파이썬 루프로 공간 특징 계산"""
+    for _, row in df.iterrows():
+        values = [row[c] for c in engine.columns]
+        total = sum(values) or 1e-6
+        _ = sum(v * x for v, x in zip(values, engine.x)) / total
+        _ = sum(v * y for v, y in zip(values, engine.y)) / total
+
+
+def main() -> None:
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_RECORDING
+    df = pd.read_csv(path)
+    engine = PressureFeatureEngine.for_columns(df.columns)
+    frames = engine.frames_from_dataframe(df)
+    n = len(frames)
+
+    start = time.perf_counter()
+    engine.transform(frames)
+    batch = (time.perf_counter() - start) / n
+
+    online = OnlinePressureFeatures(engine)
+    start = time.perf_counter()
+    for frame in frames:
+        online.update(frame)
+    live = (time.perf_counter() - start) / n
+
+    sample = df.head(2000)
+    start = time.perf_counter()
+    per_row_reference(sample, engine)
+    reference = (time.perf_counter() - start) / len(sample)
+
+    print(f"프레임 수: {n}, 센서 수: {len(engine.columns)}, 윈도우: {engine.window}")
+    print(f"배치 transform     : {batch * 1e6:8.2f} µs/frame")
+    print(f"실시간 update       : {live * 1e6:8.2f} µs/frame")
+    print(f"행 단위 파이썬 기준 : {reference * 1e6:8.2f} µs/frame (공간 특징만)")
+
+
+if __name__ == "__main__":
+    main()
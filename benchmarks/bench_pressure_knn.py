@@ -0,0 +1,70 @@
+"""
+압력 KNN 조회 지연 시간 벤치마크 - brute force vs KD-tree vs ball-tree
+
+사용법: python benchmarks/bench_pressure_knn.py [배수...]
+    배수: 학습 프레임을 잡음을 섞어 복제한 크기 (기본값: 1 10 100)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from pressure_classifier import PressureClassifier  # noqa: E402
+
+ALGORITHMS = ["brute", "kd_tree", "ball_tree"]
+SINGLE_QUERIES = 500
+BATCH_SIZE = 64
+
+
+def replicate(X: np.ndarray, y: np.ndarray, factor: int, rng) -> tuple:
+    """학습 프레임을 ±5 잡음을 섞어 factor배로 늘림"""
+    if factor == 1:
+        return X, y
+    X_big = np.vstack([X + rng.normal(0, 5, X.shape) for _ in range(factor)])
+    return X_big, np.tile(y, factor)
+
+
+def measure(model: KNeighborsClassifier, queries: np.ndarray) -> tuple:
+    start = time.perf_counter()
+    for frame in queries[:SINGLE_QUERIES]:
+        model.predict_proba(frame[np.newaxis, :])
+    single = (time.perf_counter() - start) / SINGLE_QUERIES
+
+    batches = queries[: (len(queries) // BATCH_SIZE) * BATCH_SIZE].reshape(
+        -1, BATCH_SIZE, queries.shape[1]
+    )
+    start = time.perf_counter()
+    for batch in batches:
+        model.predict_proba(batch)
+    batched = (time.perf_counter() - start) / (len(batches) * BATCH_SIZE)
+    return single, batched
+
+
+def main() -> None:
+    factors = [int(a) for a in sys.argv[1:]] or [1, 10, 100]
+    X, y = PressureClassifier(str(ROOT / "자세모음" / "압력")).load_training_data()
+    rng = np.random.default_rng(0)
+    queries = X[rng.integers(0, len(X), 2048)] + rng.normal(0, 3, (2048, X.shape[1]))
+
+    print(
+        f"{'학습 프레임':>10} {'알고리즘':>10} {'단일 (µs)':>12} {'배치 (µs/frame)':>16}"
+    )
+    for factor in factors:
+        X_big, y_big = replicate(X, y, factor, rng)
+        for algorithm in ALGORITHMS:
+            model = KNeighborsClassifier(
+                n_neighbors=5, weights="distance", algorithm=algorithm
+            ).fit(X_big, y_big)
+            single, batched = measure(model, queries)
+            print(
+                f"{len(X_big):>10} {algorithm:>10} {single * 1e6:>12.1f} {batched * 1e6:>16.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
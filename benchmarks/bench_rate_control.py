@@ -0,0 +1,125 @@
+"""
+적응형 샘플링 주기 부하 생성기 - 고정 주기 대비 서버 수신 메시지 감소량
+
+가상 기기마다 가만히 있는 구간과 자세 전환 구간이 섞인 피치 신호를 만들고,
+고정 주기(RATE_NORMAL_HZ)로 보낼 때와 rate_control 권장 주기를 따를 때의 메시지 수를 비교합니다.
+전환이 시작된 뒤 높은 주기로 올라가기까지의 지연도 함께 출력합니다.
+
+사용법: python benchmarks/bench_rate_control.py [기기 수] [기기당 시간(분)]
+    기기 수: 시뮬레이션할 가상 기기 수 (기본값: 20)
+    기기당 시간: 기기마다 시뮬레이션할 시간 (기본값: 10)
+"""
+
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from rate_control import DEFAULT_RATES_HZ, RateController  # noqa: E402
+
+SENSOR_HZ = 100
+FIXED_HZ = DEFAULT_RATES_HZ["normal"]
+
+
+def pitch_trace(rng: np.random.Generator, seconds: int) -> Tuple[np.ndarray, List]:
+    """
+    SENSOR_HZ 해상도의 피치 신호와 전환 구간 [(시작 초, 끝 초)] 목록
+
+    정지 20~90초 (잡음 0.05도) 와 전환 1~3초 (10~40도 이동) 를 번갈아 이어 붙입니다.
+    """
+    n = seconds * SENSOR_HZ
+    pitch = np.empty(n)
+    transitions = []
+    level, i = 0.0, 0
+    while i < n:
+        still = int(rng.uniform(20, 90) * SENSOR_HZ)
+        pitch[i : i + still] = level
+        i += still
+        if i >= n:
+            break
+        move = int(rng.uniform(1, 3) * SENSOR_HZ)
+        target = level + rng.choice([-1, 1]) * rng.uniform(10, 40)
+        seg = np.linspace(level, target, move)[: n - i]
+        pitch[i : i + len(seg)] = seg
+        transitions.append((i / SENSOR_HZ, (i + len(seg)) / SENSOR_HZ))
+        level, i = target, i + move
+    pitch += rng.normal(0, 0.05, n)
+    return pitch, transitions
+
+
+def run_device(pitch: np.ndarray, transitions: List) -> Dict:
+    """권장 주기를 따르는 기기 하나를 시뮬레이션합니다."""
+    clock = [0.0]
+    controller = RateController(clock=lambda: clock[0])
+    rate_hz = FIXED_HZ
+    messages = 0
+    level_time: Dict[str, float] = {}
+    raised_at: List[float] = []
+
+    t = 0.0
+    duration = len(pitch) / SENSOR_HZ
+    while t < duration:
+        clock[0] = t
+        messages += 1
+        previous = controller.level
+        advice = controller.observe(t * 1000, float(pitch[int(t * SENSOR_HZ)]))
+        if advice is not None:
+            rate_hz = advice["sample_rate_hz"]
+            if previous == "stable":
+                raised_at.append(t)
+        interval = 1.0 / rate_hz
+        level = controller.level or "normal"
+        level_time[level] = level_time.get(level, 0.0) + interval
+        t += interval
+
+    # 전환 시작부터 stable보다 높은 주기 권장까지의 지연 (전환마다 첫 권장 기준)
+    delays = []
+    for start, end in transitions:
+        after = [r for r in raised_at if start <= r <= end + 2.0]
+        if after:
+            delays.append(after[0] - start)
+    return {
+        "messages": messages,
+        "fixed_messages": int(duration * FIXED_HZ),
+        "level_time": level_time,
+        "delays": delays,
+        "transitions": len(transitions),
+    }
+
+
+def main() -> None:
+    devices = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    minutes = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    logging.disable(logging.WARNING)
+
+    rng = np.random.default_rng(0)
+    results = [run_device(*pitch_trace(rng, int(minutes * 60))) for _ in range(devices)]
+
+    adaptive = sum(r["messages"] for r in results)
+    fixed = sum(r["fixed_messages"] for r in results)
+    total_time = sum(sum(r["level_time"].values()) for r in results)
+    delays = [d for r in results for d in r["delays"]]
+    detected = len(delays)
+    transitions = sum(r["transitions"] for r in results)
+
+    print(f"기기 {devices}대 × {minutes:g}분, 고정 주기 {FIXED_HZ}Hz")
+    print(f"  고정 주기 메시지     : {fixed:>10,d}")
+    print(f"  적응형 주기 메시지   : {adaptive:>10,d}")
+    print(f"  감소율               : {1 - adaptive / fixed:>10.1%}")
+    for level in ("stable", "normal", "transition"):
+        share = sum(r["level_time"].get(level, 0.0) for r in results) / total_time
+        print(f"  {level:<10} 시간 비율 : {share:>10.1%}")
+    print(f"  전환 감지            : {detected}/{transitions}")
+    if delays:
+        print(
+            f"  전환 감지 지연       : 중앙값 {np.median(delays) * 1000:.0f}ms, "
+            f"최대 {max(delays) * 1000:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+메시지 속도 제한 벤치마크 - 정상 경로의 검사 비용과 폭주 시 걸러 내는 비용
+
+1) 제한에 걸리지 않는 메시지 하나의 검사 비용 (연결 버킷 + IP 버킷)을 JSON 파싱 비용과 비교
+2) 한 연결이 제한의 10배로 보내는 폭주를 흉내 내어 메시지당 걸러 내는 비용과 통과 비율
+
+사용법: python benchmarks/bench_rate_limit.py [메시지 수]
+    메시지 수: 측정할 메시지 수 (기본값: 200000)
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from flood_control import (  # noqa: E402
+    OVERHEAD_BUDGET_US,
+    POLICIES,
+    ConnectionLimiter,
+    TokenBucket,
+    measure_overhead,
+)
+
+MESSAGE = '{"timestamp": 15420, "relativePitch": -25.73}'
+LIMIT_PER_S = 100
+FLOOD_FACTOR = 10
+
+
+class SimulatedClock:
+    """폭주 시뮬레이션용 시계 - 메시지마다 1/(제한 × 배수)초씩 진행"""
+
+    def __init__(self, step: float):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        return self.now
+
+
+def parse_cost(n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        json.loads(MESSAGE)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def flood(n: int, policy: str):
+    """(메시지당 µs, 통과 비율)"""
+    clock = SimulatedClock(1.0 / (LIMIT_PER_S * FLOOD_FACTOR))
+    limiter = ConnectionLimiter(
+        TokenBucket(LIMIT_PER_S, LIMIT_PER_S, clock),
+        TokenBucket(LIMIT_PER_S * 10, LIMIT_PER_S * 10, clock),
+        policy=policy,
+        clock=clock,
+    )
+    batch = [MESSAGE]
+    passed = 0
+    start = time.perf_counter()
+    for _ in range(n):
+        clock.now += clock.step
+        passed += len(limiter.filter(batch))
+        limiter.notice()
+    return (time.perf_counter() - start) / n * 1e6, passed / n
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    overhead = min(measure_overhead(n) for _ in range(3))
+    parse_us = min(parse_cost(n) for _ in range(3))
+    print(f"메시지 {n:,}개")
+    print(
+        f"정상 경로 검사 비용: {overhead:.2f} µs/메시지 (JSON 파싱 {parse_us:.2f} µs)"
+    )
+    status = "통과" if overhead <= OVERHEAD_BUDGET_US else "초과"
+    print(f"예산 {OVERHEAD_BUDGET_US:.0f} µs/메시지: {status}")
+
+    print(f"\n폭주 (제한 {LIMIT_PER_S}/s의 {FLOOD_FACTOR}배로 전송)")
+    print(f"{'정책':<10}{'µs/메시지':>12}{'통과 비율':>12}")
+    for policy in POLICIES:
+        us, ratio = flood(n, policy)
+        print(f"{policy:<10}{us:>12.2f}{ratio:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
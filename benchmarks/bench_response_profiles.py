@@ -0,0 +1,103 @@
+"""
+응답 프로필 벤치마크 - 프로필별 메시지 크기와 응답 생성·직렬화 시간
+
+기존 방식(메시지마다 dict 생성 + datetime.now().isoformat())과 full/minimal/delta 프로필을 비교합니다.
+delta는 자세를 유지하는 동안 확률이 조금씩 흔들리는 예측 스트림을 가정합니다.
+
+사용법: python benchmarks/bench_response_profiles.py [메시지 수]
+    메시지 수: 측정할 응답 수 (기본값: 50000)
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from response_profiles import PROFILES, ResponseEncoder  # noqa: E402
+
+ROUNDS = 5
+
+
+def prediction_stream(n: int) -> List[Dict]:
+    """8개 자세 확률이 조금씩 흔들리다 가끔 자세가 바뀌는 예측 결과"""
+    rng = np.random.default_rng(0)
+    results = []
+    posture = 0
+    for i in range(n):
+        if i % 500 == 0:
+            posture = int(rng.integers(8))
+        raw = rng.uniform(0.0, 0.04, 8)
+        raw[posture] += 0.8
+        probs = raw / raw.sum()
+        results.append(
+            {
+                "predicted_posture": posture,
+                "confidence": float(probs[posture]),
+                "all_probabilities": {c: float(p) for c, p in enumerate(probs)},
+                "timestamp": 15420 + i * 50,
+                "relative_pitch": float(rng.normal(-20, 1)),
+            }
+        )
+    return results
+
+
+def legacy(result: Dict) -> str:
+    response = {
+        "type": "prediction",
+        "predicted_posture": result["predicted_posture"],
+        "confidence": result["confidence"],
+        "all_probabilities": result["all_probabilities"],
+        "input_timestamp": result["timestamp"],
+        "input_relative_pitch": result["relative_pitch"],
+        "server_timestamp": datetime.now().isoformat(),
+    }
+    return json.dumps(response, ensure_ascii=False)
+
+
+def measure(make_encode, stream: List[Dict]):
+    """
+    (메시지당 µs, 메시지당 평균 바이트)
+
+    delta는 이전에 보낸 확률에 따라 결과가 달라지므로 라운드마다 인코더를 새로 만듭니다.
+    """
+    best = float("inf")
+    total_bytes = 0
+    for _ in range(ROUNDS):
+        encode = make_encode()
+        total_bytes = 0
+        start = time.perf_counter()
+        for result in stream:
+            total_bytes += len(encode(result))
+        best = min(best, time.perf_counter() - start)
+    return best / len(stream) * 1e6, total_bytes / len(stream)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    stream = prediction_stream(n)
+
+    rows = [("legacy", *measure(lambda: legacy, stream))]
+    for profile in PROFILES:
+
+        def make_encode(profile=profile):
+            encoder = ResponseEncoder(profile)
+            return lambda result: json.dumps(encoder.encode(result), ensure_ascii=False)
+
+        rows.append((profile, *measure(make_encode, stream)))
+
+    base_us, base_bytes = rows[0][1], rows[0][2]
+    print(f"메시지 {n:,}개 (최솟값 / {ROUNDS}회)")
+    print(f"{'프로필':<10}{'µs/메시지':>12}{'바이트/메시지':>16}{'크기 비율':>12}")
+    for name, us, size in rows:
+        print(f"{name:<10}{us:>12.2f}{size:>16.1f}{size / base_bytes:>12.1%}")
+    print(f"(legacy 대비 full 시간: {rows[1][1] / base_us:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,13 @@ public class PostureWebSocketClient {
     private WebSocketClient webSocketClient;
     private boolean isConnected = false;
 
+    // 서버가 권장한 전송 주기 (rate_control 메시지) - 0이면 제한 없이 모두 전송
+    private volatile long minSendIntervalMs = 0;
+    private long lastSentTimestamp = 0;
+
     public void connect(String serverUrl) {
         try {
-            URI serverUri = URI.create(serverUrl); // "ws://your-server:8000/ws"
+            URI serverUri = URI.create(serverUrl); // "ws://your-server:8000/ws?rate_control=on"
 
             webSocketClient = new WebSocketClient(serverUri) {
                 @Override
@@ -36,6 +40,42 @@ public class PostureWebSocketClient {
                             // UI 업데이트
                             onPosturePredicted(predictedPosture, confidence);
 
+                        } else if ("rate_control".equals(type)) {
+                            // 자세가 안정적이면 낮은 주기, 전환 중이면 높은 주기로 전송
+                            // 값이 없거나 0 이하이면 0으로 나누지 않도록 무시하고 현재 주기 유지
+                            int sampleRateHz = response.optInt("sample_rate_hz", 0);
+                            if (sampleRateHz > 0) {
+                                minSendIntervalMs = 1000L / sampleRateHz;
+                                System.out.println("권장 샘플링 주기: " + sampleRateHz + "Hz ("
+                                        + response.optString("level") + ")");
+                                onSampleRateChanged(sampleRateHz);
+                            } else {
+                                System.err.println("잘못된 권장 샘플링 주기 무시: " + sampleRateHz);
+                            }
+
+                        } else if ("slow_down".equals(type)) {
+                            // 서버 속도 제한에 걸림 - 제한보다 느리게 보내도록 전송 간격을 늘림
+                            double limitPerS = response.optDouble("limit_per_s", 0);
+                            if (limitPerS > 0) {
+                                minSendIntervalMs = Math.max(minSendIntervalMs,
+                                        (long) Math.ceil(1000.0 / limitPerS));
+                            }
+                            System.err.println("전송 속도 제한: 초당 " + limitPerS + "개 ("
+                                    + response.getString("scope") + ")");
+
+                        } else if ("ping".equals(type)) {
+                            // 서버 하트비트 - 응답하지 않으면 끊긴 연결로 보고 정리됨
+                            JSONObject pong = new JSONObject();
+                            pong.put("type", "pong");
+                            webSocketClient.send(pong.toString());
+
+                        } else if ("rejected".equals(type)) {
+                            // 동시 연결 수 상한 - retry_after_s 초 뒤에 다시 연결
+                            double retryAfterS = response.getDouble("retry_after_s");
+                            System.err.println("연결 거부됨 (" + response.getString("reason")
+                                    + "), " + retryAfterS + "초 후 재시도");
+                            onConnectionRejected(retryAfterS);
+
                         } else if ("error".equals(type)) {
                             String error = response.getString("error");
                             System.err.println("서버 오류: " + error);
@@ -73,6 +113,12 @@ public class PostureWebSocketClient {
             return;
         }
 
+        // 권장 주기보다 빨리 들어온 센서 값은 보내지 않음 (배터리/전송량 절약)
+        if (timestamp - lastSentTimestamp < minSendIntervalMs) {
+            return;
+        }
+        lastSentTimestamp = timestamp;
+
         try {
             JSONObject data = new JSONObject();
             data.put("timestamp", timestamp);
@@ -102,6 +148,16 @@ public class PostureWebSocketClient {
         // 오류 처리
         // 예: 토스트 메시지 표시
     }
+
+    private void onSampleRateChanged(int sampleRateHz) {
+        // 센서 자체의 주기도 낮추면 배터리를 더 아낄 수 있음
+        // 예: sensorManager.registerListener(listener, sensor, 1_000_000 / sampleRateHz)
+    }
+
+    private void onConnectionRejected(double retryAfterS) {
+        // 서버가 권장한 시간 뒤에 재연결 예약
+        // 예: handler.postDelayed(() -> connect(serverUrl), (long) (retryAfterS * 1000))
+    }
 }
 
 // 사용 예시
@@ -0,0 +1,172 @@
+"""
+연결 수명 관리 - 서버 주도 하트비트(ping/pong), 유휴·읽기 타임아웃, 동시 연결 수 제한
+
+반쯤 열린(half-open) 모바일 연결은 수신 대기만 하며 메모리와 파일 디스크립터를 붙잡으므로,
+아무 프레임도 오지 않으면 ping을 보내고 read_timeout_s 안에 응답이 없으면 연결을 정리합니다.
+"""
+
+import logging
+import random
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 하트비트 메시지 종류 - 유휴 판정(활동)에는 세지 않음
+HEARTBEAT_TYPES = ("ping", "pong")
+
+# 연결 정리 사유
+REAP_REASONS = ("idle", "read_timeout")
+# 연결 거부 사유
+REJECT_REASONS = ("capacity", "per_ip", "session_in_use")
+
+# 거부 응답 닫기 코드 (RFC 6455 1013: Try Again Later)
+CLOSE_TRY_AGAIN_LATER = 1013
+# 정리 시 닫기 코드 (1001: Going Away)
+CLOSE_GOING_AWAY = 1001
+# 서버 오류로 닫을 때 (1011: Internal Error)
+CLOSE_INTERNAL_ERROR = 1011
+
+
+class Heartbeat:
+    """
+    연결별 하트비트 상태
+
+    수신 루프가 프레임마다 frame()을, 처리 루프가 하트비트가 아닌 메시지마다 activity()를
+    호출하고, 이벤트 루프 타이머가 check_interval_s마다 poll()로 할 일을 정합니다.
+    """
+
+    __slots__ = (
+        "ping_interval_s",
+        "read_timeout_s",
+        "idle_timeout_s",
+        "clock",
+        "last_frame",
+        "last_activity",
+        "last_ping",
+        "expired",
+        "timer",
+    )
+
+    def __init__(
+        self,
+        ping_interval_s: float = 20.0,
+        read_timeout_s: float = 60.0,
+        idle_timeout_s: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            ping_interval_s: 이 시간 동안 받은 프레임이 없으면 ping 전송 (초)
+            read_timeout_s: 이 시간 동안 pong을 포함해 아무 프레임도 없으면 정리 (초)
+            idle_timeout_s: 이 시간 동안 하트비트 외 메시지가 없으면 정리 (초, 0이면 사용 안 함)
+            clock: 초 단위 단조 시계
+        """
+        if ping_interval_s <= 0 or read_timeout_s <= 0:
+            raise ValueError("ping_interval_s와 read_timeout_s는 0보다 커야 합니다.")
+        self.ping_interval_s = ping_interval_s
+        self.read_timeout_s = read_timeout_s
+        self.idle_timeout_s = idle_timeout_s
+        self.clock = clock
+        now = clock()
+        self.last_frame = now
+        self.last_activity = now
+        self.last_ping = now
+        # 정리 사유 (정리되지 않았으면 None)
+        self.expired: Optional[str] = None
+        # 이벤트 루프 타이머 핸들 (연결 종료 시 취소)
+        self.timer = None
+
+    @property
+    def check_interval_s(self) -> float:
+        return min(self.ping_interval_s, self.read_timeout_s) / 2
+
+    def frame(self) -> None:
+        """프레임 하나를 받았습니다 (pong 포함)."""
+        self.last_frame = self.clock()
+
+    def activity(self) -> None:
+        """하트비트가 아닌 메시지를 받았습니다."""
+        self.last_activity = self.clock()
+
+    def poll(self) -> Optional[str]:
+        """
+        지금 할 일을 정합니다.
+
+        Returns:
+            "ping" (ping 전송), "idle" / "read_timeout" (연결 정리), None (할 일 없음)
+        """
+        now = self.clock()
+        if self.idle_timeout_s and now - self.last_activity >= self.idle_timeout_s:
+            self.expired = "idle"
+        elif now - self.last_frame >= self.read_timeout_s:
+            self.expired = "read_timeout"
+        if self.expired is not None:
+            return self.expired
+        if (
+            now - self.last_frame >= self.ping_interval_s
+            and now - self.last_ping >= self.ping_interval_s
+        ):
+            self.last_ping = now
+            return "ping"
+        return None
+
+
+class AdmissionControl:
+    """전체 및 클라이언트 IP별 동시 연결 수 제한"""
+
+    def __init__(
+        self,
+        max_connections: int = 10000,
+        max_per_ip: int = 100,
+        retry_after_s: float = 5.0,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Args:
+            max_connections: 전체 동시 연결 수 상한 (0이면 제한 없음)
+            max_per_ip: 클라이언트 IP 하나의 동시 연결 수 상한 (0이면 제한 없음)
+            retry_after_s: 거부한 클라이언트에게 권장하는 재시도 대기 시간의 기준값 (초)
+            rng: 0~1 난수 함수 (재시도 시각을 흩뜨리는 데 사용)
+        """
+        self.max_connections = max_connections
+        self.max_per_ip = max_per_ip
+        self.retry_after_s = retry_after_s
+        self.rng = rng
+        self.active = 0
+        self.per_ip: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {reason: 0 for reason in REJECT_REASONS}
+
+    def admit(self, ip: str) -> Optional[str]:
+        """
+        연결을 받을 수 있으면 수를 세고 None을 반환합니다.
+
+        Returns:
+            거부 사유 ("capacity", "per_ip") 또는 None (수락)
+        """
+        if self.max_connections and self.active >= self.max_connections:
+            reason = "capacity"
+        elif self.max_per_ip and self.per_ip.get(ip, 0) >= self.max_per_ip:
+            reason = "per_ip"
+        else:
+            self.active += 1
+            self.per_ip[ip] = self.per_ip.get(ip, 0) + 1
+            return None
+        self.rejected[reason] += 1
+        return reason
+
+    def release(self, ip: str) -> None:
+        """수락했던 연결이 끝났습니다."""
+        self.active -= 1
+        count = self.per_ip.get(ip, 0) - 1
+        if count > 0:
+            self.per_ip[ip] = count
+        else:
+            self.per_ip.pop(ip, None)
+
+    def retry_after(self) -> float:
+        """
+        재시도 권장 대기 시간 - 거부된 기기들이 한꺼번에 다시 붙지 않도록
+        기준값의 1~2배 사이에서 무작위로 고릅니다.
+        """
+        return round(self.retry_after_s * (1.0 + self.rng()), 1)
@@ -0,0 +1,280 @@
+"""
+입력 분포·예측 확신도 드리프트 감시 - 고정 크기 히스토그램을 학습 시 기준 분포와 계속 비교
+
+기기를 다르게 장착하면 relativePitch 분포가 옮겨 가고 확신도가 떨어집니다. 기기별·전체
+히스토그램(지수 감쇠 가중치, 크기 고정)에 샘플을 하나씩 더하고(O(1)), check_every개마다
+모델 파일에 저장된 기준 분포와의 PSI(population stability index)를 계산해 threshold를 넘으면
+알림을 만듭니다.
+"""
+
+import logging
+import math
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 히스토그램 구간 (범위 밖 값은 양 끝 구간에 넣음)
+PITCH_EDGES = tuple(np.linspace(-90.0, 90.0, 37).tolist())
+CONFIDENCE_EDGES = tuple(np.linspace(0.0, 1.0, 21).tolist())
+
+# 감시하는 신호
+SIGNALS = ("pitch", "confidence")
+
+# PSI 관례적 기준 - 0.1 미만 안정, 0.25 이상 유의미한 변화
+DEFAULT_THRESHOLD = 0.25
+
+# 빈 구간의 log(0)을 피하기 위한 최소 비율
+PSI_EPSILON = 1e-4
+
+# 감쇠 가중치가 이만큼 커지면 전체를 다시 정규화
+RESCALE_AT = 1e12
+
+
+def histogram(values: Iterable[float], edges=PITCH_EDGES) -> List[float]:
+    """값들의 구간별 비율 (기준 분포 생성용)"""
+    values = np.clip(np.asarray(list(values), dtype=float), edges[0], edges[-1])
+    counts = np.histogram(values, bins=np.asarray(edges))[0].astype(float)
+    total = counts.sum()
+    return (counts / total).tolist() if total else counts.tolist()
+
+
+def build_reference(
+    pitches: Iterable[float], confidences: Iterable[float]
+) -> Dict[str, object]:
+    """
+    모델 파일에 저장할 기준 분포를 만듭니다.
+
+    Args:
+        pitches: 학습 데이터의 relativePitch 값
+        confidences: 학습 데이터 표본을 예측했을 때의 확신도
+
+    Returns:
+        구간 경계와 구간별 비율
+    """
+    pitches = list(pitches)
+    confidences = list(confidences)
+    return {
+        "pitch_edges": list(PITCH_EDGES),
+        "pitch": histogram(pitches, PITCH_EDGES),
+        "confidence_edges": list(CONFIDENCE_EDGES),
+        "confidence": histogram(confidences, CONFIDENCE_EDGES),
+        "samples": {"pitch": len(pitches), "confidence": len(confidences)},
+    }
+
+
+def psi(reference: List[float], current: List[float]) -> float:
+    """두 구간별 비율 사이의 PSI"""
+    total = 0.0
+    for p, q in zip(reference, current):
+        p = max(p, PSI_EPSILON)
+        q = max(q, PSI_EPSILON)
+        total += (q - p) * math.log(q / p)
+    return total
+
+
+class DecayingHistogram:
+    """
+    지수 감쇠 히스토그램 - 최근 half_life개 샘플의 가중치가 절반이 되도록 오래된 샘플을 잊음
+
+    전체 구간에 감쇠를 곱하는 대신 새 샘플의 가중치를 키우므로 샘플 하나에 O(1)입니다.
+    """
+
+    __slots__ = ("lo", "width", "last", "growth", "weight", "counts", "total")
+
+    def __init__(self, edges, half_life: float):
+        self.lo = edges[0]
+        self.width = (edges[-1] - edges[0]) / (len(edges) - 1)
+        self.last = len(edges) - 2
+        self.growth = 2.0 ** (1.0 / half_life)
+        self.weight = 1.0
+        self.counts = [0.0] * (len(edges) - 1)
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        index = int((value - self.lo) / self.width)
+        if index < 0:
+            index = 0
+        elif index > self.last:
+            index = self.last
+        weight = self.weight = self.weight * self.growth
+        self.counts[index] += weight
+        self.total += weight
+        if weight > RESCALE_AT:
+            self.counts = [c / weight for c in self.counts]
+            self.total /= weight
+            self.weight = 1.0
+
+    def distribution(self) -> List[float]:
+        total = self.total
+        return [c / total for c in self.counts] if total else list(self.counts)
+
+
+class DriftSketch:
+    """한 범위(기기 하나 또는 전체)의 신호별 히스토그램과 드리프트 상태"""
+
+    __slots__ = ("pitch", "confidence", "seen", "psi", "drifting")
+
+    def __init__(self, half_life: float):
+        self.pitch = DecayingHistogram(PITCH_EDGES, half_life)
+        self.confidence = DecayingHistogram(CONFIDENCE_EDGES, half_life)
+        self.seen = 0
+        self.psi = {signal: None for signal in SIGNALS}
+        self.drifting = {signal: False for signal in SIGNALS}
+
+
+class DriftMonitor:
+    """
+    기기별·전체 드리프트 감시기
+
+    기준 분포가 없으면 (기준 분포가 저장되지 않은 예전 모델) 아무것도 하지 않습니다.
+    알림은 threshold를 넘을 때 한 번 만들고, threshold의 절반 아래로 내려오면 해제합니다.
+    """
+
+    def __init__(
+        self,
+        reference: Optional[Dict] = None,
+        half_life: float = 500,
+        check_every: int = 50,
+        min_samples: int = 200,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_devices: int = 10000,
+    ):
+        """
+        Args:
+            reference: build_reference로 만든 기준 분포
+            half_life: 가중치가 절반이 되는 샘플 수 (기기별·전체 공통)
+            check_every: 범위마다 이만큼 샘플이 쌓일 때마다 PSI 계산
+            min_samples: 이보다 적게 본 범위는 판정하지 않음
+            threshold: 드리프트로 판정할 PSI
+            max_devices: 추적할 최대 기기 수 (넘으면 가장 오래 조용했던 기기부터 잊음)
+        """
+        self.half_life = half_life
+        self.check_every = check_every
+        self.min_samples = min_samples
+        self.threshold = threshold
+        self.max_devices = max_devices
+        self.reference: Optional[Dict] = None
+        self.overall = DriftSketch(half_life)
+        self.devices: "OrderedDict[str, DriftSketch]" = OrderedDict()
+        self.alerts = {signal: 0 for signal in SIGNALS}
+        self.set_reference(reference)
+
+    def set_reference(self, reference: Optional[Dict]) -> None:
+        """기준 분포를 바꾸고 지금까지의 상태를 지웁니다 (모델 교체 시)."""
+        if reference is not None and (
+            list(reference.get("pitch_edges", ())) != list(PITCH_EDGES)
+            or list(reference.get("confidence_edges", ())) != list(CONFIDENCE_EDGES)
+        ):
+            logger.warning("기준 분포의 구간이 달라 드리프트 감시를 끕니다.")
+            reference = None
+        self.reference = reference
+        self.overall = DriftSketch(self.half_life)
+        self.devices.clear()
+
+    def observe(
+        self,
+        device_id: Optional[str],
+        pitch: float,
+        confidence: Optional[float] = None,
+    ) -> List[Dict]:
+        """
+        샘플 하나를 기록합니다.
+
+        Args:
+            device_id: 기기 ID (None이면 전체에만 반영)
+            pitch: relativePitch
+            confidence: 예측 확신도 (없으면 피치만 반영)
+
+        Returns:
+            새로 발생하거나 해제된 알림 (대부분 빈 리스트)
+        """
+        if self.reference is None:
+            return []
+        events = self._add(self.overall, None, pitch, confidence)
+        if device_id is not None:
+            sketch = self.devices.get(device_id)
+            if sketch is None:
+                sketch = self.devices[device_id] = DriftSketch(self.half_life)
+                if len(self.devices) > self.max_devices:
+                    self.devices.popitem(last=False)
+            else:
+                self.devices.move_to_end(device_id)
+            events += self._add(sketch, device_id, pitch, confidence)
+        return events
+
+    def _add(
+        self,
+        sketch: DriftSketch,
+        device_id: Optional[str],
+        pitch: float,
+        confidence: Optional[float],
+    ) -> List[Dict]:
+        sketch.pitch.add(pitch)
+        if confidence is not None:
+            sketch.confidence.add(confidence)
+        sketch.seen += 1
+        if sketch.seen % self.check_every or sketch.seen < self.min_samples:
+            return []
+        return self._check(sketch, device_id)
+
+    def _check(self, sketch: DriftSketch, device_id: Optional[str]) -> List[Dict]:
+        events = []
+        for signal in SIGNALS:
+            current = getattr(sketch, signal)
+            if not current.total:
+                continue
+            value = sketch.psi[signal] = psi(
+                self.reference[signal], current.distribution()
+            )
+            if not sketch.drifting[signal] and value >= self.threshold:
+                sketch.drifting[signal] = True
+                self.alerts[signal] += 1
+                events.append(self._event("drift", signal, device_id, value))
+            elif sketch.drifting[signal] and value < self.threshold / 2:
+                sketch.drifting[signal] = False
+                events.append(self._event("recovered", signal, device_id, value))
+        return events
+
+    @staticmethod
+    def _event(kind: str, signal: str, device_id: Optional[str], value: float) -> Dict:
+        return {
+            "type": kind,
+            "signal": signal,
+            "scope": "device" if device_id is not None else "global",
+            "device_id": device_id,
+            "psi": round(value, 4),
+        }
+
+    def global_psi(self, signal: str) -> float:
+        """전체 범위의 최근 PSI (아직 계산 전이면 NaN) - 메트릭 게이지용"""
+        value = self.overall.psi[signal]
+        return float("nan") if value is None else value
+
+    def report(self, limit: int = 20) -> Dict:
+        """전체 상태와 PSI가 큰 기기 순 목록"""
+
+        def describe(sketch: DriftSketch) -> Dict:
+            return {
+                "samples": sketch.seen,
+                "psi": {
+                    s: None if v is None else round(v, 4) for s, v in sketch.psi.items()
+                },
+                "drifting": dict(sketch.drifting),
+            }
+
+        devices = sorted(
+            self.devices.items(),
+            key=lambda item: max((v or 0.0) for v in item[1].psi.values()),
+            reverse=True,
+        )
+        return {
+            "enabled": self.reference is not None,
+            "threshold": self.threshold,
+            "alerts": dict(self.alerts),
+            "global": describe(self.overall),
+            "tracked_devices": len(self.devices),
+            "devices": {device: describe(s) for device, s in devices[:limit]},
+        }
@@ -0,0 +1,263 @@
+"""
+연결별·클라이언트 IP별 토큰 버킷 속도 제한 - JSON 파싱 전에 초과 메시지를 걸러 냄
+
+한 기기가 빠른 루프로 메시지를 쏟아내도 공유 이벤트 루프와 분류기를 독점하지 못하도록,
+수신한 원문 텍스트 단계에서 토큰이 없는 메시지를 버리거나(drop) 가장 최근 것 하나만
+남겨 다음 토큰으로 처리(coalesce)하고, 클라이언트에는 slow_down 메시지로 알립니다.
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 초과 메시지 처리 방식
+POLICIES = ("drop", "coalesce")
+
+# 제한 검사 비용 예산 - 제한에 걸리지 않은 메시지 하나의 추가 시간 (benchmarks/bench_rate_limit.py)
+OVERHEAD_BUDGET_US = 2.0
+
+# coalesce 정책에서 보류할 수 있는 제어 메시지(교정, ack, config 등) 수 - 넘으면 오래된 것부터 버림
+MAX_HELD = 64
+
+
+def is_sample_text(data: str) -> bool:
+    """
+    원문이 합쳐도 되는 샘플 메시지인지 여부 (JSON 파싱 없이)
+
+    "type"이 없는 {timestamp, relativePitch} 샘플과 게이트웨이의 샘플 배열만 해당하고,
+    type이 있는 메시지(교정, ack, config, 압력 프레임 등)는 하나하나 처리해야 합니다.
+    """
+    return '"type"' not in data
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷"""
+
+    __slots__ = ("rate", "burst", "clock", "tokens", "last")
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            rate: 초당 채워지는 토큰 수 (허용 메시지 수/초)
+            burst: 최대 토큰 수 (순간적으로 허용하는 메시지 수)
+            clock: 초 단위 단조 시계
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate는 0보다 크고 burst는 1 이상이어야 합니다.")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.last = clock()
+
+    def take(self) -> bool:
+        """토큰 하나를 씁니다 (없으면 False)."""
+        now = self.clock()
+        tokens = self.tokens + (now - self.last) * self.rate
+        self.last = now
+        if tokens > self.burst:
+            tokens = self.burst
+        if tokens < 1.0:
+            self.tokens = tokens
+            return False
+        self.tokens = tokens - 1.0
+        return True
+
+    def refund(self) -> None:
+        """다른 버킷에서 거부되어 쓰지 않은 토큰을 돌려줍니다."""
+        self.tokens = min(self.tokens + 1.0, self.burst)
+
+    def wait_s(self) -> float:
+        """다음 토큰까지 남은 시간 (초)"""
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+
+class BucketRegistry:
+    """클라이언트 IP별 공유 버킷 - 그 IP의 마지막 연결이 끝나면 버킷을 지움"""
+
+    def __init__(
+        self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._users: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, self.clock)
+        self._users[key] = self._users.get(key, 0) + 1
+        return bucket
+
+    def release(self, key: str) -> None:
+        users = self._users.get(key, 0) - 1
+        if users > 0:
+            self._users[key] = users
+        else:
+            self._users.pop(key, None)
+            self._buckets.pop(key, None)
+
+
+class ConnectionLimiter:
+    """
+    연결 하나의 속도 제한기 - 연결 버킷과 IP 버킷 모두에서 토큰을 얻은 메시지만 통과
+
+    coalesce 정책에서는 초과 샘플 중 가장 최근 것 하나만 보류하고 (샘플은 최신 값만 의미가
+    있으므로), 제어 메시지는 MAX_HELD개까지 순서대로 보류했다가 토큰이 생기면 먼저 처리합니다.
+    보류 중인 메시지가 있으면 (backlog) 호출하는 쪽이 wait_s() 뒤에 filter([])로 다시 넘겨야
+    마지막 메시지가 다음 프레임을 기다리지 않습니다.
+    """
+
+    __slots__ = (
+        "bucket",
+        "ip_bucket",
+        "policy",
+        "notice_interval_s",
+        "clock",
+        "pending",
+        "held",
+        "limited",
+        "dropped",
+        "scope",
+        "_unnoticed",
+        "_last_notice",
+    )
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        ip_bucket: Optional[TokenBucket] = None,
+        policy: str = "coalesce",
+        notice_interval_s: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            bucket: 연결 버킷
+            ip_bucket: 같은 클라이언트 IP의 연결들이 공유하는 버킷
+            policy: "drop" 또는 "coalesce"
+            notice_interval_s: slow_down 메시지 최소 간격 (초)
+            clock: 초 단위 단조 시계
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"지원하지 않는 속도 제한 정책: {policy}")
+        self.bucket = bucket
+        self.ip_bucket = ip_bucket
+        self.policy = policy
+        self.notice_interval_s = notice_interval_s
+        self.clock = clock
+        # coalesce 정책에서 보류 중인 초과 샘플과 제어 메시지
+        self.pending: Optional[str] = None
+        self.held: deque = deque()
+        # 제한에 걸린 메시지 수, 그중 처리하지 않고 버린 수
+        self.limited = 0
+        self.dropped = 0
+        # 마지막으로 제한한 버킷 ("connection" 또는 "ip")
+        self.scope = "connection"
+        self._unnoticed = 0
+        self._last_notice = float("-inf")
+
+    def _take(self) -> bool:
+        if not self.bucket.take():
+            self.scope = "connection"
+            return False
+        if self.ip_bucket is not None and not self.ip_bucket.take():
+            self.bucket.refund()
+            self.scope = "ip"
+            return False
+        return True
+
+    @property
+    def backlog(self) -> bool:
+        """보류 중인 메시지가 있는지 여부"""
+        return self.pending is not None or bool(self.held)
+
+    def wait_s(self) -> float:
+        """보류 메시지를 처리할 토큰이 생길 때까지 남은 시간 (초)"""
+        wait = self.bucket.wait_s()
+        if self.ip_bucket is not None:
+            wait = max(wait, self.ip_bucket.wait_s())
+        return wait
+
+    def filter(self, batch: List[str]) -> List[str]:
+        """
+        배치에서 처리할 메시지만 남깁니다.
+
+        Returns:
+            통과한 메시지 (보류했던 메시지가 토큰을 얻으면 맨 앞에 붙음)
+        """
+        allowed = []
+        held = self.held
+        while held and self._take():
+            allowed.append(held.popleft())
+        if self.pending is not None and not held and self._take():
+            allowed.append(self.pending)
+            self.pending = None
+        for data in batch:
+            # 보류한 제어 메시지가 남아 있으면 순서를 지키기 위해 뒤에 줄 세움
+            if not held and self._take():
+                allowed.append(data)
+                continue
+            self.limited += 1
+            self._unnoticed += 1
+            if self.policy == "drop":
+                self.dropped += 1
+            elif is_sample_text(data):
+                if self.pending is not None:
+                    self.dropped += 1
+                self.pending = data
+            else:
+                if len(held) >= MAX_HELD:
+                    held.popleft()
+                    self.dropped += 1
+                held.append(data)
+        return allowed
+
+    def notice(self) -> Optional[Dict]:
+        """
+        제한에 걸린 메시지가 있었으면 slow_down 메시지를 만듭니다 (notice_interval_s마다 최대 한 번).
+        """
+        if not self._unnoticed:
+            return None
+        now = self.clock()
+        if now - self._last_notice < self.notice_interval_s:
+            return None
+        self._last_notice = now
+        limited, self._unnoticed = self._unnoticed, 0
+        bucket = self.bucket if self.scope == "connection" else self.ip_bucket
+        return {
+            "type": "slow_down",
+            "scope": self.scope,
+            "limit_per_s": bucket.rate,
+            "limited": limited,
+            "policy": self.policy,
+            "retry_after_ms": round(bucket.wait_s() * 1000),
+        }
+
+
+def measure_overhead(iterations: int = 100000) -> float:
+    """
+    제한에 걸리지 않는 메시지 하나의 검사 비용(µs) - 연결 버킷 + IP 버킷, 배치 크기 1
+    """
+    limiter = ConnectionLimiter(
+        TokenBucket(1e9, 1e9), TokenBucket(1e9, 1e9), policy="coalesce"
+    )
+    batch = ['{"timestamp": 1, "relativePitch": -5.0}']
+    start = time.perf_counter()
+    for _ in range(iterations):
+        limiter.filter(batch)
+        limiter.notice()
+    return (time.perf_counter() - start) / iterations * 1e6
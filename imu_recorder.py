@@ -0,0 +1,388 @@
+"""
+IMU 고속 수집기 - 링 버퍼 기반 원본 속도 수집과 스트리밍 데시메이션
+"""
+
+import logging
+import math
+import time
+from typing import Callable, Iterable, List, Optional, TextIO, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# 아두이노 IMU 스케치는 20ms 간격(50Hz)으로 측정하므로
+# 50배 데시메이션 시 기존 학습 데이터와 같은 1Hz 시계열이 된다.
+DEFAULT_DECIMATION = 50
+CSV_HEADER = "timestamp_ms,relative_pitch_deg"
+
+
+def parse_imu_line(raw) -> Optional[float]:
+    """
+    아두이노 시리얼 한 줄("timestamp,pitch")에서 pitch 값을 파싱합니다.
+
+    Args:
+        raw: 시리얼에서 읽은 bytes 또는 str
+
+    Returns:
+        pitch 값 (형식이 맞지 않으면 None)
+    """
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", errors="replace")
+    line = raw.strip()
+    if not line or "," not in line:
+        return None
+
+    parts = line.split(",")
+    if len(parts) != 2:
+        return None
+
+    try:
+        int(parts[0])  # 아두이노 타임스탬프는 무시
+        return float(parts[1])
+    except ValueError:
+        return None
+
+
+def design_lowpass_fir(decimation: int, num_taps: Optional[int] = None) -> np.ndarray:
+    """
+    데시메이션용 안티앨리어싱 저역통과 FIR 계수를 설계합니다 (Hamming 윈도우 sinc).
+
+    Args:
+        decimation: 데시메이션 배수
+        num_taps: 탭 수 (기본값: 4 * decimation + 1)
+
+    Returns:
+        DC 이득이 1로 정규화된 FIR 계수
+    """
+    if decimation < 1:
+        raise ValueError("decimation은 1 이상이어야 합니다.")
+    if decimation == 1:
+        return np.ones(1)
+
+    if num_taps is None:
+        num_taps = 4 * decimation + 1
+
+    # 새 나이퀴스트 주파수의 80% 지점을 차단 주파수로 사용 (원본 샘플링 주파수 대비 비율)
+    cutoff = 0.8 * 0.5 / decimation
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(num_taps)
+    return taps / taps.sum()
+
+
+class PitchRingBuffer:
+    """미리 할당된 NumPy 배열 기반 (timestamp, pitch) 링 버퍼"""
+
+    def __init__(self, capacity: int):
+        """
+        링 버퍼 초기화
+
+        Args:
+            capacity: 저장 가능한 최대 샘플 수
+        """
+        if capacity < 1:
+            raise ValueError("capacity는 1 이상이어야 합니다.")
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.total_written = 0
+
+    def __len__(self) -> int:
+        return min(self.total_written, self.capacity)
+
+    def append(self, timestamp_ms: int, value: float) -> None:
+        """샘플 하나를 추가합니다 (가득 차면 가장 오래된 샘플을 덮어씀)."""
+        idx = self.total_written % self.capacity
+        self.timestamps[idx] = timestamp_ms
+        self.values[idx] = value
+        self.total_written += 1
+
+    def since(self, start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        전역 인덱스 start 이후에 기록된 샘플을 시간 순서대로 반환합니다.
+
+        Args:
+            start: 누적 기록 개수 기준 시작 인덱스
+
+        Returns:
+            (timestamps, values) 배열 쌍
+        """
+        oldest = self.total_written - len(self)
+        if start < oldest:
+            raise OverflowError(
+                f"링 버퍼 오버런: {oldest - start}개 샘플이 플러시 전에 덮어써졌습니다."
+            )
+
+        count = self.total_written - start
+        if count <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        head = start % self.capacity
+        tail = head + count
+        if tail <= self.capacity:
+            return self.timestamps[head:tail], self.values[head:tail]
+
+        # 버퍼 끝을 넘어가면 두 구간을 이어 붙임
+        wrap = tail - self.capacity
+        return (
+            np.concatenate([self.timestamps[head:], self.timestamps[:wrap]]),
+            np.concatenate([self.values[head:], self.values[:wrap]]),
+        )
+
+    def latest(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """가장 최근 n개 샘플을 반환합니다."""
+        n = min(n, len(self))
+        return self.since(self.total_written - n)
+
+
+class StreamingDecimator:
+    """블록 단위로 상태를 이어가며 FIR 필터링 후 데시메이션하는 스트리밍 필터"""
+
+    def __init__(self, decimation: int, taps: Optional[np.ndarray] = None):
+        """
+        스트리밍 데시메이터 초기화
+
+        Args:
+            decimation: 데시메이션 배수
+            taps: FIR 계수 (기본값: design_lowpass_fir 결과)
+        """
+        self.decimation = decimation
+        self.taps = design_lowpass_fir(decimation) if taps is None else taps
+        self._reversed_taps = self.taps[::-1].copy()
+        self._delay = (len(self.taps) - 1) // 2
+        self._history_values: Optional[np.ndarray] = None
+        self._history_timestamps: Optional[np.ndarray] = None
+        self._consumed = 0
+
+    def process(
+        self, timestamps: np.ndarray, values: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        새 샘플 블록을 필터링하고 데시메이션된 샘플을 반환합니다.
+
+        Args:
+            timestamps: 원본 속도 타임스탬프 (ms)
+            values: 원본 속도 값
+
+        Returns:
+            (timestamps, values) 데시메이션된 배열 쌍
+        """
+        if len(values) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        history = len(self.taps) - 1
+        if self._history_values is None:
+            # 시작 과도응답을 줄이기 위해 첫 샘플로 필터 이력을 채움
+            self._history_values = np.full(history, values[0], dtype=np.float64)
+            self._history_timestamps = np.full(history, timestamps[0], dtype=np.int64)
+
+        x = np.concatenate([self._history_values, values])
+        ts = np.concatenate([self._history_timestamps, timestamps])
+
+        # 전역 인덱스가 decimation의 배수인 샘플에서만 출력을 계산
+        first = (-self._consumed) % self.decimation
+        positions = np.arange(first, len(values), self.decimation)
+        self._consumed += len(values)
+        if history:
+            self._history_values = x[-history:]
+            self._history_timestamps = ts[-history:]
+
+        if len(positions) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        windows = sliding_window_view(x, len(self.taps))[positions]
+        filtered = windows @ self._reversed_taps
+
+        # 선형 위상 FIR의 군지연만큼 앞선 샘플의 타임스탬프를 사용
+        out_timestamps = ts[positions + history - self._delay]
+        return out_timestamps, filtered
+
+
+class SimulatedSerial:
+    """테스트 및 오프라인 재생용 가상 시리얼 포트 (pyserial readline 인터페이스 호환)"""
+
+    def __init__(
+        self,
+        pitches: Iterable[float],
+        sample_interval_ms: int = 20,
+        start_ms: int = 0,
+    ):
+        """
+        가상 시리얼 포트 초기화
+
+        Args:
+            pitches: 순서대로 송신할 pitch 값
+            sample_interval_ms: 아두이노 타임스탬프 간격 (ms)
+            start_ms: 첫 아두이노 타임스탬프 (ms)
+        """
+        self._lines: List[bytes] = [
+            f"{start_ms + i * sample_interval_ms},{pitch:.4f}\r\n".encode("utf-8")
+            for i, pitch in enumerate(pitches)
+        ]
+        self._position = 0
+        self.is_open = True
+
+    @classmethod
+    def sine(
+        cls,
+        num_samples: int,
+        rate_hz: float = 50.0,
+        components: Iterable[Tuple[float, float]] = ((0.05, 10.0),),
+        offset: float = 0.0,
+    ) -> "SimulatedSerial":
+        """
+        (주파수 Hz, 진폭) 성분의 합으로 구성된 pitch 신호를 송신하는 포트를 만듭니다.
+        """
+        t = np.arange(num_samples) / rate_hz
+        signal = np.full(num_samples, offset, dtype=np.float64)
+        for freq, amplitude in components:
+            signal += amplitude * np.sin(2 * math.pi * freq * t)
+        return cls(signal, sample_interval_ms=int(round(1000 / rate_hz)))
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._lines) - self._position
+
+    def readline(self) -> bytes:
+        """다음 줄을 반환합니다 (모두 송신하면 타임아웃처럼 빈 bytes 반환)."""
+        if self._position >= len(self._lines):
+            return b""
+        line = self._lines[self._position]
+        self._position += 1
+        return line
+
+    def close(self) -> None:
+        self.is_open = False
+
+
+class ImuRecorder:
+    """IMU pitch를 원본 속도로 수집하고 원본/데시메이션 시계열을 일괄 기록하는 수집기"""
+
+    def __init__(
+        self,
+        full_rate_file: TextIO,
+        decimated_file: Optional[TextIO] = None,
+        decimation: int = DEFAULT_DECIMATION,
+        buffer_size: int = 4096,
+        flush_size: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        수집기 초기화
+
+        Args:
+            full_rate_file: 원본 속도 시계열을 기록할 텍스트 파일 객체
+            decimated_file: 데시메이션 시계열을 기록할 텍스트 파일 객체 (없으면 생략)
+            decimation: 데시메이션 배수
+            buffer_size: 링 버퍼 용량 (샘플 수)
+            flush_size: 이 개수만큼 쌓이면 일괄 기록
+            clock: 초 단위 단조 시계 (테스트에서 교체 가능)
+        """
+        if flush_size > buffer_size:
+            raise ValueError("flush_size는 buffer_size보다 클 수 없습니다.")
+
+        self.full_rate_file = full_rate_file
+        self.decimated_file = decimated_file
+        self.buffer = PitchRingBuffer(buffer_size)
+        self.decimator = StreamingDecimator(decimation)
+        self.flush_size = flush_size
+        self.clock = clock
+
+        self.pitch_offset: Optional[float] = None  # 최초 pitch 저장용
+        self.start_time: Optional[float] = None
+        self.decimated_count = 0
+        self._flushed = 0
+
+        self.full_rate_file.write(CSV_HEADER + "\n")
+        if self.decimated_file is not None:
+            self.decimated_file.write(CSV_HEADER + "\n")
+
+    @property
+    def sample_count(self) -> int:
+        """지금까지 수집한 원본 샘플 수"""
+        return self.buffer.total_written
+
+    def handle_line(self, raw) -> bool:
+        """
+        시리얼 한 줄을 처리합니다.
+
+        Returns:
+            유효한 샘플로 기록되었는지 여부
+        """
+        pitch = parse_imu_line(raw)
+        if pitch is None:
+            return False
+
+        now = self.clock()
+        if self.pitch_offset is None:
+            self.pitch_offset = pitch  # 최초 pitch를 기준으로 상대 각도 계산
+            self.start_time = now
+
+        timestamp_ms = int((now - self.start_time) * 1000)
+        self.buffer.append(timestamp_ms, pitch - self.pitch_offset)
+
+        if self.buffer.total_written - self._flushed >= self.flush_size:
+            self.flush()
+        return True
+
+    def flush(self) -> int:
+        """
+        아직 기록되지 않은 샘플을 필터링하고 두 파일에 일괄 기록합니다.
+
+        Returns:
+            기록한 원본 샘플 수
+        """
+        timestamps, values = self.buffer.since(self._flushed)
+        if len(values) == 0:
+            return 0
+
+        self._write(self.full_rate_file, timestamps, values)
+
+        dec_timestamps, dec_values = self.decimator.process(timestamps, values)
+        if self.decimated_file is not None and len(dec_values):
+            self._write(self.decimated_file, dec_timestamps, dec_values)
+        self.decimated_count += len(dec_values)
+
+        self._flushed = self.buffer.total_written
+        logger.debug(
+            f"IMU 일괄 기록 - 원본 {len(values)}개, 데시메이션 {len(dec_values)}개"
+        )
+        return len(values)
+
+    @staticmethod
+    def _write(file: TextIO, timestamps: np.ndarray, values: np.ndarray) -> None:
+        np.savetxt(
+            file,
+            np.column_stack([timestamps, values]),
+            fmt=["%d", "%.4f"],
+            delimiter=",",
+        )
+
+    def run(
+        self, ser, max_samples: Optional[int] = None, stop_on_empty: bool = False
+    ) -> int:
+        """
+        시리얼 포트에서 샘플을 수집합니다 (종료 시 남은 샘플을 기록).
+
+        Args:
+            ser: readline()을 제공하는 시리얼 포트 (pyserial 또는 SimulatedSerial)
+            max_samples: 수집할 최대 유효 샘플 수 (None이면 무제한)
+            stop_on_empty: 빈 줄(타임아웃) 수신 시 종료할지 여부
+
+        Returns:
+            수집한 유효 샘플 수
+        """
+        collected = 0
+        try:
+            while max_samples is None or collected < max_samples:
+                raw = ser.readline()
+                if not raw:
+                    if stop_on_empty:
+                        break
+                    continue
+                if self.handle_line(raw):
+                    collected += 1
+        finally:
+            self.flush()
+        return collected
@@ -0,0 +1,505 @@
+"""
+멀티프로세스 추론 풀 - 워커 프로세스마다 모델을 한 번 로드하고 공유 메모리 링으로 요청/결과 교환
+
+스레드로 넘겨도 sklearn 예측은 한 프로세스의 GIL 아래에서 돕니다. 워커마다 공유 메모리 구간
+하나에 고정 크기 레코드의 요청 링과 결과 링을 두고, 레코드를 쓴 뒤 파이프에 1바이트를 써서
+알리므로 요청마다 pickle 하지 않습니다. 각 링은 쓰는 쪽과 읽는 쪽이 하나씩(SPSC)이라 잠금이
+필요 없습니다.
+
+워커는 대기 중에도 heartbeat를 갱신하고, 감독 스레드가 종료되었거나 heartbeat가 멈춘 워커를
+다시 시작합니다. 준비된 워커가 없거나 링이 가득 차거나 응답이 늦으면 같은 프로세스에서 예측합니다.
+
+워커 실행: python inference_pool.py <공유 메모리 이름> <링 크기> <모델 경로> <요청 fd> <결과 fd>
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import select
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 결과 레코드에 담을 수 있는 최대 클래스 수
+MAX_CLASSES = 32
+
+REQUEST = np.dtype(
+    [
+        ("id", np.uint64),
+        ("kind", np.uint8),
+        ("timestamp", np.int64),
+        ("pitch", np.float64),
+    ]
+)
+RESPONSE = np.dtype(
+    [
+        ("id", np.uint64),
+        ("ok", np.uint8),
+        ("posture", np.int64),
+        ("confidence", np.float64),
+        ("n", np.uint8),
+        ("classes", np.int64, (MAX_CLASSES,)),
+        ("probs", np.float64, (MAX_CLASSES,)),
+    ]
+)
+
+# 요청 종류
+KIND_PREDICT = 0
+KIND_RELOAD = 1
+
+# 헤더(int64) 칸 - BEAT·PROCESSED·STATE·REQUEST_TAIL은 워커가, RESPONSE_TAIL은 서버가 씀
+BEAT, PROCESSED, STATE, REQUEST_TAIL, RESPONSE_TAIL = range(5)
+HEADER_SLOTS = 8
+
+# 워커 상태
+STARTING, READY, FAILED = 0, 1, 2
+STATE_NAMES = {STARTING: "starting", READY: "ready", FAILED: "failed"}
+
+# 워커가 요청을 기다리다 heartbeat를 갱신하는 간격 (초)
+WORKER_POLL_S = 0.2
+
+DOORBELL = b"\x01"
+
+
+class WorkerLost(Exception):
+    """응답을 받기 전에 워커가 종료되거나 교체됨"""
+
+
+def segment_size(capacity: int) -> int:
+    return HEADER_SLOTS * 8 + capacity * (REQUEST.itemsize + RESPONSE.itemsize)
+
+
+def ring_views(buf, capacity: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """공유 메모리 구간 위의 (헤더, 요청 링, 결과 링) 배열"""
+    header = np.ndarray(HEADER_SLOTS, np.int64, buf, 0)
+    offset = header.nbytes
+    requests = np.ndarray(capacity, REQUEST, buf, offset)
+    offset += requests.nbytes
+    responses = np.ndarray(capacity, RESPONSE, buf, offset)
+    return header, requests, responses
+
+
+def write_response(responses: np.ndarray, slot: int, request_id: int, result: Dict):
+    responses["id"][slot] = request_id
+    probabilities = result.get("all_probabilities")
+    if "error" in result or len(probabilities) > MAX_CLASSES:
+        responses["ok"][slot] = 0
+        return
+    n = len(probabilities)
+    responses["ok"][slot] = 1
+    responses["posture"][slot] = result["predicted_posture"]
+    responses["confidence"][slot] = result["confidence"]
+    responses["n"][slot] = n
+    responses["classes"][slot, :n] = list(probabilities)
+    responses["probs"][slot, :n] = list(probabilities.values())
+
+
+def read_response(responses: np.ndarray, slot: int) -> Tuple[int, Optional[Tuple]]:
+    """(요청 ID, (자세, 확신도, 클래스별 확률) 또는 실패 시 None)"""
+    record = responses[slot].copy()
+    if not record["ok"]:
+        return int(record["id"]), None
+    n = int(record["n"])
+    probabilities = dict(
+        zip(record["classes"][:n].tolist(), record["probs"][:n].tolist())
+    )
+    return int(record["id"]), (
+        int(record["posture"]),
+        float(record["confidence"]),
+        probabilities,
+    )
+
+
+def worker_main(
+    name: str, capacity: int, model_path: str, request_fd: int, response_fd: int
+) -> int:
+    """워커 프로세스 - 모델을 한 번 로드하고 요청 링을 비울 때까지 예측"""
+    shm = shared_memory.SharedMemory(name=name)
+    # 구간은 서버가 만들고 지움 - 워커의 resource_tracker가 종료 시 지우지 않도록 등록 해제
+    resource_tracker.unregister(shm._name, "shared_memory")
+    header, requests, responses = ring_views(shm.buf, capacity)
+
+    from posture_classifier import PostureClassifier
+
+    classifier = PostureClassifier()
+    if not classifier.load_model(model_path):
+        header[STATE] = FAILED
+        return 1
+    header[STATE] = READY
+
+    tail = head = 0
+    while True:
+        header[BEAT] = time.monotonic_ns()
+        ready, _, _ = select.select([request_fd], [], [], WORKER_POLL_S)
+        if not ready:
+            continue
+        doorbells = os.read(request_fd, capacity)
+        if not doorbells:
+            # 서버가 파이프를 닫음 (풀 종료 또는 서버 프로세스 종료)
+            break
+        for _ in range(len(doorbells)):
+            slot = tail % capacity
+            request_id = int(requests["id"][slot])
+            kind = int(requests["kind"][slot])
+            timestamp = int(requests["timestamp"][slot])
+            pitch = float(requests["pitch"][slot])
+            tail += 1
+            header[REQUEST_TAIL] = tail
+
+            if kind == KIND_RELOAD:
+                classifier.load_model(model_path)
+                continue
+            result = classifier.predict_posture(timestamp, pitch)
+            write_response(responses, head % capacity, request_id, result)
+            head += 1
+            header[PROCESSED] += 1
+            os.write(response_fd, DOORBELL)
+            header[BEAT] = time.monotonic_ns()
+
+    del header, requests, responses
+    shm.close()
+    return 0
+
+
+def _resolve(future: asyncio.Future, outcome) -> None:
+    if not future.done():
+        if isinstance(outcome, Exception):
+            future.set_exception(outcome)
+        else:
+            future.set_result(outcome)
+
+
+def _notify(future: asyncio.Future, outcome) -> None:
+    """다른 스레드에서 future의 이벤트 루프로 결과를 넘깁니다."""
+    try:
+        future.get_loop().call_soon_threadsafe(_resolve, future, outcome)
+    except RuntimeError:
+        # 이벤트 루프가 이미 닫힘
+        pass
+
+
+class WorkerChannel:
+    """워커 하나와의 연결 - 공유 메모리 구간, 알림 파이프, 워커 프로세스, 대기 중인 요청"""
+
+    def __init__(self, capacity: int, model_path: str):
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(create=True, size=segment_size(capacity))
+        self.header, self.requests, self.responses = ring_views(self.shm.buf, capacity)
+        self.header[:] = 0
+        self.header[BEAT] = time.monotonic_ns()
+
+        request_r, self.request_w = os.pipe()
+        self.response_r, response_w = os.pipe()
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                self.shm.name,
+                str(capacity),
+                model_path,
+                str(request_r),
+                str(response_w),
+            ],
+            pass_fds=(request_r, response_w),
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        os.close(request_r)
+        os.close(response_w)
+
+        self.started = time.monotonic()
+        self.closed = False
+        # 서버가 쓴 요청 수, 읽은 결과 수
+        self.head = 0
+        self.response_tail = 0
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.reader = threading.Thread(
+            target=self._read, name=f"inference-reader-{self.process.pid}", daemon=True
+        )
+        self.reader.start()
+
+    @property
+    def state(self) -> int:
+        return int(self.header[STATE])
+
+    @property
+    def ready(self) -> bool:
+        return not self.closed and self.header[STATE] == READY
+
+    def beat_age_s(self) -> float:
+        return (time.monotonic_ns() - int(self.header[BEAT])) / 1e9
+
+    def submit(
+        self, request_id: int, kind: int, timestamp: int = 0, pitch: float = 0.0
+    ) -> bool:
+        """요청 레코드를 씁니다 (링이 가득 찼거나 닫혔으면 False)."""
+        if (
+            self.closed
+            or self.head - self.header[REQUEST_TAIL] >= self.capacity
+            or len(self.pending) >= self.capacity
+        ):
+            return False
+        slot = self.head % self.capacity
+        requests = self.requests
+        requests["id"][slot] = request_id
+        requests["kind"][slot] = kind
+        requests["timestamp"][slot] = timestamp
+        requests["pitch"][slot] = pitch
+        try:
+            os.write(self.request_w, DOORBELL)
+        except OSError:
+            return False
+        self.head += 1
+        return True
+
+    def _read(self) -> None:
+        """결과 링을 읽어 대기 중인 요청을 완료합니다 (워커가 끝나면 파이프 EOF로 종료)."""
+        while True:
+            try:
+                doorbells = os.read(self.response_r, self.capacity)
+            except OSError:
+                break
+            if not doorbells:
+                break
+            for _ in range(len(doorbells)):
+                request_id, outcome = read_response(
+                    self.responses, self.response_tail % self.capacity
+                )
+                self.response_tail += 1
+                self.header[RESPONSE_TAIL] = self.response_tail
+                future = self.pending.pop(request_id, None)
+                if future is not None:
+                    _notify(future, outcome)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """워커를 멈추고 (요청 파이프를 닫으면 스스로 종료) 대기 중인 요청을 실패 처리합니다."""
+        if self.closed:
+            return
+        self.closed = True
+        os.close(self.request_w)
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.reader.join(timeout)
+        os.close(self.response_r)
+        for request_id in list(self.pending):
+            future = self.pending.pop(request_id, None)
+            if future is not None:
+                _notify(future, WorkerLost())
+
+        # 다른 스레드가 아직 상태를 읽을 수 있으므로 구간 대신 빈 배열을 남김
+        header = np.zeros(HEADER_SLOTS, np.int64)
+        header[STATE] = int(self.header[STATE])
+        self.header = header
+        self.requests = self.responses = None
+        self.shm.unlink()
+        try:
+            self.shm.close()
+        except BufferError:
+            # 배열을 잡고 있던 쪽이 놓으면 가비지 컬렉션 때 해제됨
+            pass
+
+
+class InferencePool:
+    """
+    워커 프로세스 추론 풀
+
+    predict는 워커를 돌아가며 고르고, 준비된 워커가 없거나 응답이 request_timeout_s보다
+    늦으면 fallback(같은 프로세스의 분류기)으로 예측합니다.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        model_path: str,
+        fallback: Callable[[int, float], Dict],
+        capacity: int = 1024,
+        request_timeout_s: float = 2.0,
+        heartbeat_timeout_s: float = 5.0,
+        startup_timeout_s: float = 60.0,
+        check_interval_s: float = 1.0,
+    ):
+        """
+        Args:
+            workers: 워커 프로세스 수
+            model_path: 워커가 로드할 모델 파일
+            fallback: 워커를 쓸 수 없을 때 호출할 예측 함수 (timestamp, relative_pitch)
+            capacity: 워커별 요청·결과 링의 레코드 수 (대기 중인 요청 수 상한)
+            request_timeout_s: 응답을 기다릴 최대 시간 (초)
+            heartbeat_timeout_s: heartbeat가 이보다 오래 멈춘 워커는 다시 시작
+            startup_timeout_s: 모델 로드가 이보다 오래 걸리는 워커는 다시 시작
+            check_interval_s: 워커 상태 확인 간격 (초)
+        """
+        if workers < 1 or not 1 <= capacity <= 65536:
+            raise ValueError("workers는 1 이상, capacity는 1~65536이어야 합니다.")
+        self.workers = workers
+        self.model_path = model_path
+        self.fallback = fallback
+        self.capacity = capacity
+        self.request_timeout_s = request_timeout_s
+        self.heartbeat_timeout_s = heartbeat_timeout_s
+        self.startup_timeout_s = startup_timeout_s
+        self.check_interval_s = check_interval_s
+        self.channels: List[WorkerChannel] = []
+        self.restarts = 0
+        self.fallbacks = 0
+        self._ids = itertools.count(1)
+        self._next = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.channels:
+            return
+        self._stop.clear()
+        self.channels = [
+            WorkerChannel(self.capacity, self.model_path) for _ in range(self.workers)
+        ]
+        self._supervisor = threading.Thread(
+            target=self._supervise, name="inference-supervisor", daemon=True
+        )
+        self._supervisor.start()
+        logger.info(f"추론 워커 {self.workers}개 시작 (모델: {self.model_path})")
+
+    def wait_ready(self, timeout: float = 60.0) -> bool:
+        """모든 워커가 모델을 로드할 때까지 기다립니다."""
+        deadline = time.monotonic() + timeout
+        while not all(channel.ready for channel in self.channels):
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    async def predict(self, timestamp: int, relative_pitch: float) -> Dict:
+        """
+        자세를 예측합니다 (PostureClassifier.predict_posture와 같은 형식).
+        """
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        channels = self.channels
+        for _ in range(len(channels)):
+            channel = channels[self._next % len(channels)]
+            self._next += 1
+            if not channel.ready:
+                continue
+            channel.pending[request_id] = future
+            if channel.submit(request_id, KIND_PREDICT, timestamp, relative_pitch):
+                break
+            channel.pending.pop(request_id, None)
+        else:
+            self.fallbacks += 1
+            return self.fallback(timestamp, relative_pitch)
+
+        try:
+            outcome = await asyncio.wait_for(future, self.request_timeout_s)
+        except (asyncio.TimeoutError, WorkerLost):
+            self.fallbacks += 1
+            return self.fallback(timestamp, relative_pitch)
+        if outcome is None:
+            return {"error": "Worker prediction failed"}
+
+        posture, confidence, probabilities = outcome
+        return {
+            "predicted_posture": posture,
+            "confidence": confidence,
+            "all_probabilities": probabilities,
+            "timestamp": timestamp,
+            "relative_pitch": relative_pitch,
+        }
+
+    def reload(self) -> None:
+        """모델 파일이 바뀌었을 때 워커들이 다시 로드하도록 합니다."""
+        for channel in self.channels:
+            if channel.ready and not channel.submit(next(self._ids), KIND_RELOAD):
+                logger.warning(
+                    f"추론 워커 {channel.process.pid}의 요청 링이 가득 차 다시 시작합니다."
+                )
+                self._restart(channel)
+
+    def check(self) -> None:
+        """종료되었거나 heartbeat가 멈춘 워커를 다시 시작합니다."""
+        for channel in list(self.channels):
+            if channel.closed:
+                continue
+            state = channel.state
+            if state == FAILED:
+                # 모델 로드 실패는 다시 시작해도 반복되므로 그대로 둠 (fallback 사용)
+                continue
+            if channel.process.poll() is not None:
+                reason = f"종료 코드 {channel.process.returncode}"
+            elif state == READY and channel.beat_age_s() > self.heartbeat_timeout_s:
+                reason = f"heartbeat {channel.beat_age_s():.1f}초 멈춤"
+            elif (
+                state == STARTING
+                and time.monotonic() - channel.started > self.startup_timeout_s
+            ):
+                reason = "모델 로드 시간 초과"
+            else:
+                continue
+            logger.warning(f"추론 워커 {channel.process.pid} 다시 시작 ({reason})")
+            self._restart(channel)
+
+    def _restart(self, channel: WorkerChannel) -> None:
+        with self._lock:
+            try:
+                index = self.channels.index(channel)
+            except ValueError:
+                return
+            replacement = WorkerChannel(self.capacity, self.model_path)
+            self.channels = (
+                self.channels[:index] + [replacement] + self.channels[index + 1 :]
+            )
+            self.restarts += 1
+        channel.close(timeout=1.0)
+
+    def _supervise(self) -> None:
+        while not self._stop.wait(self.check_interval_s):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"추론 워커 상태 확인 실패: {e}")
+
+    def status(self) -> Dict:
+        """워커별 상태와 재시작·fallback 횟수"""
+        return {
+            "workers": [
+                {
+                    "pid": channel.process.pid,
+                    "state": STATE_NAMES.get(channel.state, "unknown"),
+                    "processed": int(channel.header[PROCESSED]),
+                    "pending": len(channel.pending),
+                    "heartbeat_age_s": round(channel.beat_age_s(), 3),
+                }
+                for channel in self.channels
+                if not channel.closed
+            ],
+            "restarts": self.restarts,
+            "fallbacks": self.fallbacks,
+        }
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._supervisor is not None:
+            self._supervisor.join()
+            self._supervisor = None
+        with self._lock:
+            channels, self.channels = self.channels, []
+        for channel in channels:
+            channel.close()
+
+
+if __name__ == "__main__":
+    name, capacity, model_path, request_fd, response_fd = sys.argv[1:6]
+    sys.exit(
+        worker_main(name, int(capacity), model_path, int(request_fd), int(response_fd))
+    )
@@ -0,0 +1,239 @@
+"""
+비동기 로깅 파이프라인 - 요청 경로에서는 큐에 넣기만 하고, 포맷·디스크 쓰기·압축 회전은 별도 스레드에서 처리
+"""
+
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+DEFAULT_QUEUE_SIZE = 10000
+
+_active_pipeline: Optional["LogPipeline"] = None
+
+
+def parse_rules(text: str) -> Dict[str, float]:
+    """
+    "receive:100,predict:100" 형식의 환경 변수 값을 {키: 값} 으로 변환합니다.
+    """
+    rules: Dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        key, _, value = item.partition(":")
+        rules[key.strip()] = float(value)
+    return rules
+
+
+class LogSampler:
+    """
+    메시지 종류별 샘플링/초당 상한 판정기
+
+    로그 레코드를 만들기 전에 호출해 버릴 로그의 비용(레코드 생성, 호출 위치 탐색)을 없앱니다.
+    규칙이 없는 종류는 항상 통과합니다.
+    """
+
+    def __init__(
+        self,
+        every: Optional[Dict[str, int]] = None,
+        per_second: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            every: 종류별 N개 중 1개만 남김 (예: {"receive": 100})
+            per_second: 종류별 초당 최대 로그 수 (예: {"predict": 5})
+        """
+        self.every = dict(every or {})
+        self.per_second = dict(per_second or {})
+        self.suppressed: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+        self._windows: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> bool:
+        """이번 로그를 남길지 여부"""
+        if key not in self.every and key not in self.per_second:
+            return True
+        with self._lock:
+            keep = self._keep(key)
+            if not keep:
+                self.suppressed[key] = self.suppressed.get(key, 0) + 1
+        return keep
+
+    def _keep(self, key: str) -> bool:
+        n = self.every.get(key)
+        if n is not None:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+            if n <= 0 or count % n:
+                return False
+
+        limit = self.per_second.get(key)
+        if limit is not None:
+            # [윈도우 시작 시각, 윈도우 내 로그 수]
+            window = self._windows.setdefault(key, [0.0, 0])
+            now = time.monotonic()
+            if now - window[0] >= 1.0:
+                window[0], window[1] = now, 0
+            if window[1] >= limit:
+                return False
+            window[1] += 1
+        return True
+
+
+def sample(key: str) -> bool:
+    """
+    현재 파이프라인의 샘플링 규칙으로 이번 로그를 남길지 판정합니다.
+
+    예) if sample("receive"): logger.info("수신된 데이터: %s", request_data)
+    """
+    pipeline = _active_pipeline
+    return pipeline is None or pipeline.sampler.allow(key)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    레코드를 포맷하지 않고 큐에 넣는 핸들러 (메시지 조립은 기록 스레드에서)
+
+    큐가 가득 차면 요청 경로를 막지 않고 레코드를 버리고 개수만 셉니다.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class CompressedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """크기 기준으로 회전하고 지난 파일은 gzip으로 압축하는 파일 핸들러"""
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        compress: bool = True,
+    ):
+        super().__init__(
+            filename,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = _gzip_rotator
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class LogPipeline:
+    """큐 핸들러와 기록 스레드(QueueListener)를 묶은 로깅 파이프라인"""
+
+    def __init__(
+        self,
+        queue_handler: LazyQueueHandler,
+        listener: logging.handlers.QueueListener,
+        sampler: LogSampler,
+    ):
+        self.queue_handler = queue_handler
+        self.listener = listener
+        self.sampler = sampler
+
+    @property
+    def dropped(self) -> int:
+        return self.queue_handler.dropped
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue_handler.queue.qsize()
+
+    def stop(self) -> None:
+        """남은 레코드를 모두 기록하고 기록 스레드를 종료합니다."""
+        if self.listener._thread is None:
+            return
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        root = logging.getLogger()
+        if self.queue_handler in root.handlers:
+            root.removeHandler(self.queue_handler)
+
+
+def setup_logging(
+    log_file: Optional[str],
+    level: str = "INFO",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+    compress: bool = True,
+    every: Optional[Dict[str, int]] = None,
+    per_second: Optional[Dict[str, float]] = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    console: bool = True,
+) -> LogPipeline:
+    """
+    루트 로거를 비동기 파이프라인으로 구성합니다 (logging.basicConfig 대체).
+
+    Args:
+        log_file: 로그 파일 경로 (None이면 파일에 쓰지 않음)
+        level: 로그 레벨 이름
+        max_bytes: 회전 기준 파일 크기
+        backup_count: 보관할 회전 파일 수
+        compress: 회전한 파일을 gzip으로 압축할지 여부
+        every: 메시지 종류별 1/N 샘플링 (LogSampler 참고)
+        per_second: 메시지 종류별 초당 상한
+        queue_size: 기록 대기 큐 크기 (가득 차면 레코드를 버림)
+        console: 콘솔에도 출력할지 여부
+
+    Returns:
+        중지/통계 조회용 LogPipeline
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = []
+    if log_file:
+        handlers.append(
+            CompressedRotatingFileHandler(log_file, max_bytes, backup_count, compress)
+        )
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = LazyQueueHandler(log_queue)
+    sampler = LogSampler(every, per_second)
+
+    # 다시 설정하면 이전 파이프라인의 남은 레코드를 기록하고 교체
+    global _active_pipeline
+    if _active_pipeline is not None:
+        _active_pipeline.stop()
+
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, level.upper()))
+
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    _active_pipeline = LogPipeline(queue_handler, listener, sampler)
+    return _active_pipeline
@@ -0,0 +1,218 @@
+"""
+온라인 점진적 모델 갱신 - 클라이언트가 보낸 라벨 교정 샘플로 랜덤 포레스트에 트리를 추가
+"""
+
+import copy
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from posture_classifier import PostureClassifier
+
+logger = logging.getLogger(__name__)
+
+
+class OnlineForestUpdater:
+    """교정 샘플을 모아 warm_start로 트리를 추가하고 새 모델을 원자적으로 교체하는 갱신기"""
+
+    def __init__(
+        self,
+        classifier: PostureClassifier,
+        batch_size: int = 32,
+        trees_per_update: int = 10,
+        max_estimators: int = 200,
+        max_replay: int = 5000,
+        max_pending: int = 1000,
+        model_path: Optional[str] = None,
+    ):
+        """
+        갱신기 초기화
+
+        Args:
+            classifier: 갱신할 자세 분류기 (model 속성을 교체)
+            batch_size: 갱신을 시작할 교정 샘플 수
+            trees_per_update: 갱신마다 추가할 트리 수
+            max_estimators: 트리 수 상한 (넘으면 가장 오래된 추가 트리부터 제거)
+            max_replay: 함께 학습할 기존/교정 샘플 보관 상한 (자세별로 나눠 모든 자세가 남도록 함)
+            max_pending: 갱신을 기다리는 교정 샘플 상한 (넘으면 오래된 것부터 버림)
+            model_path: 갱신 후 모델을 저장할 경로 (None이면 저장하지 않음)
+        """
+        self.classifier = classifier
+        self.batch_size = batch_size
+        self.trees_per_update = trees_per_update
+        self.max_estimators = max_estimators
+        self.max_replay = max_replay
+        self.max_pending = max_pending
+        self.model_path = model_path
+
+        self._pending: List[Tuple[np.ndarray, int]] = []
+        self._pending_lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        # 처음 갱신할 때의 트리 수 - 이 트리들은 상한 정리 대상에서 제외
+        self._base_estimators: Optional[int] = None
+        # 재학습 샘플과 교정 샘플에 없는 자세 - 비어 있지 않으면 그 자세가 들어올 때까지 갱신을 미룸
+        self._missing: set = set()
+        self.stats = {
+            "received": 0,
+            "rejected": 0,
+            "discarded": 0,
+            "applied": 0,
+            "updates": 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def ready(self) -> bool:
+        """갱신을 시작할 만큼 교정 샘플이 모였는지 여부 (갱신을 미룬 동안은 False)"""
+        return (
+            self.pending >= self.batch_size
+            and not self._missing
+            and not self._update_lock.locked()
+        )
+
+    def add_correction(
+        self, timestamp: int, relative_pitch: float, posture: int
+    ) -> bool:
+        """
+        라벨 교정 샘플을 버퍼에 추가합니다.
+
+        Args:
+            timestamp: 샘플 타임스탬프 (ms)
+            relative_pitch: 상대 피치 각도
+            posture: 사용자가 알려준 실제 자세 번호
+
+        Returns:
+            버퍼에 추가되었는지 여부 (모델이 모르는 자세는 전체 재학습이 필요하므로 거부)
+        """
+        self.stats["received"] += 1
+        model = self.classifier.model
+        if model is None or posture not in model.classes_:
+            self.stats["rejected"] += 1
+            logger.warning(f"모델에 없는 자세의 교정 샘플 거부: {posture}")
+            return False
+
+        features = self.classifier.sample_features(timestamp, relative_pitch)
+        if features is None:
+            self.stats["rejected"] += 1
+            return False
+
+        with self._pending_lock:
+            self._pending.append((features[0], int(posture)))
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                del self._pending[:overflow]
+                self.stats["discarded"] += overflow
+            self._missing.discard(int(posture))
+        return True
+
+    def update(self) -> Optional[Dict]:
+        """
+        모인 교정 샘플로 트리를 추가한 새 모델을 만들고 교체합니다.
+
+        예측 중인 요청은 기존 모델을 계속 사용하고, 교체는 속성 대입 한 번으로 끝납니다.
+
+        Returns:
+            갱신 결과 (교정 샘플이 없거나 다른 갱신이 진행 중이면 None)
+        """
+        if not self._update_lock.acquire(blocking=False):
+            return None
+        try:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return None
+
+            X_new = np.vstack([x for x, _ in batch])
+            y_new = np.array([y for _, y in batch])
+            X, y = self._training_set(X_new, y_new)
+
+            current = self.classifier.model
+            missing = set(current.classes_.tolist()) - set(np.unique(y).tolist())
+            if missing:
+                # 새 트리의 클래스 구성이 기존 트리와 다르면 확률을 합칠 수 없음 -
+                # 빠진 자세의 교정 샘플이 올 때까지 다시 시도하지 않음
+                logger.warning(f"자세 {sorted(missing)}의 샘플이 없어 갱신을 미룹니다.")
+                with self._pending_lock:
+                    self._pending = (batch + self._pending)[-self.max_pending :]
+                    # 그사이 들어온 교정 샘플도 반영
+                    self._missing = missing - {label for _, label in self._pending}
+                return None
+
+            if self._base_estimators is None:
+                self._base_estimators = len(current.estimators_)
+            model = copy.deepcopy(current)
+            self._trim(model)
+            model.set_params(
+                warm_start=True,
+                oob_score=False,
+                n_estimators=len(model.estimators_) + self.trees_per_update,
+            )
+            model.fit(X, y)
+
+            # 원자적 교체
+            self.classifier.model = model
+            self.classifier.replay_X, self.classifier.replay_y = self._bounded(X, y)
+            self.classifier.model_version += 1
+            if self.model_path:
+                self.classifier.save_model(self.model_path)
+
+            self.stats["applied"] += len(batch)
+            self.stats["updates"] += 1
+            result = {
+                "model_version": self.classifier.model_version,
+                "corrections": len(batch),
+                "estimators": len(model.estimators_),
+            }
+            logger.info(f"모델 점진적 갱신 완료: {result}")
+            return result
+        finally:
+            self._update_lock.release()
+
+    def _training_set(
+        self, X_new: np.ndarray, y_new: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """교정 샘플에 기존 샘플을 더해 새 트리도 모든 자세 클래스를 보게 함"""
+        if self.classifier.replay_X is None:
+            # 재학습 샘플 없이 저장된 모델 - 학습 데이터에서 한 번 만듦
+            self.classifier.build_replay_set()
+        replay_X = self.classifier.replay_X
+        replay_y = self.classifier.replay_y
+        if replay_X is None or len(replay_X) == 0:
+            return X_new, y_new
+        return np.vstack([replay_X, X_new]), np.concatenate([replay_y, y_new])
+
+    def _bounded(self, X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        자세마다 max_replay / 자세 수 개까지 남깁니다.
+
+        교정이 몰린 자세가 다른 자세의 샘플을 밀어내지 않도록 자세별로 나누고, 자세마다 절반은
+        가장 오래된 (학습 데이터의) 샘플, 나머지는 최근 교정 샘플로 채웁니다.
+        """
+        if len(X) <= self.max_replay:
+            return X, y
+        classes = np.unique(y)
+        per_class = max(2, self.max_replay // len(classes))
+        keep = np.zeros(len(y), dtype=bool)
+        for cls in classes:
+            rows = np.flatnonzero(y == cls)
+            if len(rows) <= per_class:
+                keep[rows] = True
+                continue
+            base = per_class // 2
+            keep[rows[:base]] = True
+            keep[rows[base - per_class :]] = True
+        return X[keep], y[keep]
+
+    def _trim(self, model) -> None:
+        """트리 수 상한을 넘지 않도록 가장 오래된 추가 트리를 제거"""
+        excess = len(model.estimators_) + self.trees_per_update - self.max_estimators
+        removable = len(model.estimators_) - self._base_estimators
+        drop = max(0, min(excess, removable))
+        if drop:
+            start = self._base_estimators
+            del model.estimators_[start : start + drop]
+            model.n_estimators = len(model.estimators_)
@@ -0,0 +1,392 @@
+"""
+자세 구간 인덱스 - 라벨이 붙은 압력 기록에서 같은 자세가 이어지는 구간을 색인
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from session_store import SESSION_EXT, TIMESTAMP_COLUMN, SessionReader
+
+logger = logging.getLogger(__name__)
+
+POSE_COLUMN = "pose"
+INDEX_SUFFIX = ".segments.json"
+DEFAULT_CHUNK_ROWS = 4096
+OFFSET_BLOCK_BYTES = 1 << 20
+
+
+@dataclass
+class PoseSegment:
+    """
+    같은 pose 라벨이 연속된 구간 (행 범위는 [start_row, end_row))
+
+    CSV 기록은 구간 행의 바이트 범위 [start_offset, end_offset)도 저장해
+    읽을 때 앞부분을 파싱하지 않고 바로 이동합니다.
+    """
+
+    pose: int
+    start_row: int
+    end_row: int
+    start_ms: int
+    end_ms: int
+    mean: Dict[str, float] = field(default_factory=dict)
+    std: Dict[str, float] = field(default_factory=dict)
+    min: Dict[str, float] = field(default_factory=dict)
+    max: Dict[str, float] = field(default_factory=dict)
+    start_offset: Optional[int] = None
+    end_offset: Optional[int] = None
+
+    @property
+    def rows(self) -> int:
+        return self.end_row - self.start_row
+
+    @property
+    def duration_ms(self) -> int:
+        return self.end_ms - self.start_ms
+
+    @property
+    def duration_s(self) -> float:
+        return self.duration_ms / 1000.0
+
+
+class _OpenSegment:
+    """청크 경계를 넘어 이어지는 구간의 누적 통계"""
+
+    def __init__(self, pose: int, start_row: int, start_ms: int, channels: int):
+        self.pose = pose
+        self.start_row = start_row
+        self.start_ms = start_ms
+        self.end_ms = start_ms
+        self.rows = 0
+        self.total = np.zeros(channels)
+        self.total_sq = np.zeros(channels)
+        self.min = np.full(channels, np.inf)
+        self.max = np.full(channels, -np.inf)
+
+
+class PoseSegmentIndexBuilder:
+    """청크를 순서대로 받아 한 번의 스트리밍 패스로 구간 인덱스를 만드는 빌더"""
+
+    def __init__(self, sensor_columns: List[str]):
+        """
+        빌더 초기화
+
+        Args:
+            sensor_columns: 구간 요약 통계를 계산할 센서 컬럼 목록
+        """
+        self.sensor_columns = list(sensor_columns)
+        self.segments: List[PoseSegment] = []
+        self._open: Optional[_OpenSegment] = None
+        self._rows_seen = 0
+
+    def update(self, chunk: Dict[str, np.ndarray]) -> None:
+        """
+        다음 청크를 반영합니다.
+
+        Args:
+            chunk: pose, timestamp_ms 및 센서 컬럼 배열 딕셔너리
+        """
+        poses = np.asarray(chunk[POSE_COLUMN], dtype=np.float64)
+        n = len(poses)
+        if n == 0:
+            return
+
+        timestamps = np.asarray(chunk[TIMESTAMP_COLUMN], dtype=np.float64)
+        # pose나 timestamp_ms가 비었거나 숫자가 아닌 행(NaN)은 어느 구간에도 넣지 않음
+        labels = np.where(np.isnan(timestamps), np.nan, poses)
+        missing = np.isnan(labels)
+        values = (
+            np.column_stack(
+                [np.asarray(chunk[c], dtype=np.float64) for c in self.sensor_columns]
+            )
+            if self.sensor_columns
+            else np.zeros((n, 0))
+        )
+
+        # 청크 내 라벨 변경 지점으로 구간 경계를 계산 (이어지는 NaN 행은 한 묶음)
+        changed = (labels[1:] != labels[:-1]) & ~(missing[1:] & missing[:-1])
+        starts = np.concatenate([[0], np.flatnonzero(changed) + 1])
+        counts = np.diff(np.concatenate([starts, [n]]))
+        sums = np.add.reduceat(values, starts, axis=0)
+        sq_sums = np.add.reduceat(values * values, starts, axis=0)
+        mins = np.minimum.reduceat(values, starts, axis=0)
+        maxs = np.maximum.reduceat(values, starts, axis=0)
+        last_rows = starts + counts - 1
+
+        for k, start in enumerate(starts):
+            if missing[start]:
+                self._close_open()
+                continue
+            pose = int(labels[start])
+            if self._open is None or self._open.pose != pose:
+                self._close_open()
+                self._open = _OpenSegment(
+                    pose,
+                    self._rows_seen + int(start),
+                    int(timestamps[start]),
+                    len(self.sensor_columns),
+                )
+            seg = self._open
+            seg.rows += int(counts[k])
+            seg.end_ms = int(timestamps[last_rows[k]])
+            seg.total += sums[k]
+            seg.total_sq += sq_sums[k]
+            np.minimum(seg.min, mins[k], out=seg.min)
+            np.maximum(seg.max, maxs[k], out=seg.max)
+
+        self._rows_seen += n
+
+    def _close_open(self) -> None:
+        seg = self._open
+        if seg is None:
+            return
+        mean = seg.total / seg.rows
+        std = np.sqrt(np.maximum(seg.total_sq / seg.rows - mean * mean, 0.0))
+        names = self.sensor_columns
+        self.segments.append(
+            PoseSegment(
+                pose=seg.pose,
+                start_row=seg.start_row,
+                end_row=seg.start_row + seg.rows,
+                start_ms=seg.start_ms,
+                end_ms=seg.end_ms,
+                mean=dict(zip(names, mean.round(3).tolist())),
+                std=dict(zip(names, std.round(3).tolist())),
+                min=dict(zip(names, seg.min.tolist())),
+                max=dict(zip(names, seg.max.tolist())),
+            )
+        )
+        self._open = None
+
+    def finish(self) -> List[PoseSegment]:
+        """마지막 구간을 닫고 전체 구간 목록을 반환합니다."""
+        self._close_open()
+        return self.segments
+
+
+class PoseSegmentIndex:
+    """기록 하나의 자세 구간 인덱스와 조회 API"""
+
+    def __init__(
+        self,
+        recording_path: str,
+        segments: List[PoseSegment],
+        sensor_columns: List[str],
+    ):
+        self.recording_path = recording_path
+        self.segments = segments
+        self.sensor_columns = sensor_columns
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def query(
+        self,
+        pose: Optional[int] = None,
+        min_duration_s: Optional[float] = None,
+        max_duration_s: Optional[float] = None,
+    ) -> List[PoseSegment]:
+        """
+        조건에 맞는 구간을 반환합니다.
+
+        예) index.query(pose=3, min_duration_s=10)  → 10초보다 긴 3번 자세 구간
+
+        Args:
+            pose: 자세 번호 (None이면 전체)
+            min_duration_s: 최소 지속 시간 (초, 초과 조건)
+            max_duration_s: 최대 지속 시간 (초, 이하 조건)
+        """
+        result = []
+        for seg in self.segments:
+            if pose is not None and seg.pose != pose:
+                continue
+            if min_duration_s is not None and seg.duration_s <= min_duration_s:
+                continue
+            if max_duration_s is not None and seg.duration_s > max_duration_s:
+                continue
+            result.append(seg)
+        return result
+
+    def total_duration_s(self) -> Dict[int, float]:
+        """자세별 누적 지속 시간(초)"""
+        totals: Dict[int, float] = {}
+        for seg in self.segments:
+            totals[seg.pose] = totals.get(seg.pose, 0.0) + seg.duration_s
+        return totals
+
+    def read_segment(self, segment: PoseSegment) -> pd.DataFrame:
+        """
+        구간의 원본 행을 읽습니다 (세션 파일은 메모리 맵 슬라이스, CSV는 해당 바이트 범위만 파싱).
+        """
+        path = self.recording_path
+        if path.endswith(SESSION_EXT):
+            reader = SessionReader(path)
+            return pd.DataFrame(reader.read(segment.start_row, segment.end_row))
+
+        if segment.start_offset is not None and segment.end_offset is not None:
+            with open(path, "rb") as f:
+                header = f.readline()
+                f.seek(segment.start_offset)
+                body = f.read(segment.end_offset - segment.start_offset)
+            return pd.read_csv(io.BytesIO(header + body), encoding="utf-8-sig")
+
+        # 바이트 오프셋이 없는 예전 인덱스
+        return pd.read_csv(
+            path,
+            skiprows=range(1, segment.start_row + 1),
+            nrows=segment.rows,
+            encoding="utf-8-sig",
+            skip_blank_lines=False,
+        )
+
+    def iter_frames(self, **query) -> Iterator[pd.DataFrame]:
+        """query 조건에 맞는 구간의 행을 차례로 반환합니다."""
+        for segment in self.query(**query):
+            yield self.read_segment(segment)
+
+    def save(self, index_path: Optional[str] = None) -> str:
+        """인덱스를 기록 파일 옆에 JSON으로 저장합니다."""
+        index_path = index_path or index_path_for(self.recording_path)
+        payload = {
+            "recording": os.path.basename(self.recording_path),
+            "sensor_columns": self.sensor_columns,
+            "segments": [asdict(seg) for seg in self.segments],
+        }
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+        return index_path
+
+    @classmethod
+    def load(cls, recording_path: str) -> "PoseSegmentIndex":
+        """저장된 인덱스를 읽습니다."""
+        with open(index_path_for(recording_path), encoding="utf-8") as f:
+            payload = json.load(f)
+        segments = [PoseSegment(**seg) for seg in payload["segments"]]
+        return cls(recording_path, segments, payload["sensor_columns"])
+
+
+def index_path_for(recording_path: str) -> str:
+    """기록 파일에 대응하는 인덱스 파일 경로"""
+    return recording_path + INDEX_SUFFIX
+
+
+def _iter_recording_chunks(
+    path: str, chunk_rows: int
+) -> Iterator[Dict[str, np.ndarray]]:
+    if path.endswith(SESSION_EXT):
+        yield from SessionReader(path).iter_chunks()
+        return
+
+    # 행 번호가 원본 CSV 줄 번호(바이트 오프셋)와 일치하도록 빈 줄도 NaN 행으로 남김
+    reader = pd.read_csv(
+        path, chunksize=chunk_rows, encoding="utf-8-sig", skip_blank_lines=False
+    )
+    for frame in reader:
+        frame = frame.apply(pd.to_numeric, errors="coerce")
+        yield {c: frame[c].to_numpy() for c in frame.columns}
+
+
+def _csv_row_offsets(path: str, rows: List[int]) -> Dict[int, int]:
+    """
+    CSV 데이터 행 번호(헤더 제외, 0부터)의 시작 바이트 오프셋을 구합니다.
+
+    줄바꿈만 세며 한 번 훑고, 파일 끝 행 번호는 파일 크기로 대응합니다.
+    """
+    wanted = sorted(set(rows))
+    offsets: Dict[int, int] = {}
+    position = 0
+    newlines = 0  # 지금까지 센 줄바꿈 수 (행 r은 r + 1번째 줄바꿈 뒤에서 시작)
+    k = 0
+    with open(path, "rb") as f:
+        while k < len(wanted):
+            block = f.read(OFFSET_BLOCK_BYTES)
+            if not block:
+                break
+            ends = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 0x0A)
+            while k < len(wanted) and wanted[k] + 1 <= newlines + len(ends):
+                offsets[wanted[k]] = position + int(ends[wanted[k] - newlines]) + 1
+                k += 1
+            newlines += len(ends)
+            position += len(block)
+    for row in wanted[k:]:
+        offsets[row] = position
+    return offsets
+
+
+def _sensor_columns(path: str) -> List[str]:
+    if path.endswith(SESSION_EXT):
+        columns = SessionReader(path).columns
+    else:
+        columns = pd.read_csv(path, nrows=0, encoding="utf-8-sig").columns.tolist()
+    if POSE_COLUMN not in columns or TIMESTAMP_COLUMN not in columns:
+        raise ValueError(f"pose/timestamp_ms 컬럼이 없는 기록입니다: {path}")
+    return [c for c in columns if c not in (POSE_COLUMN, TIMESTAMP_COLUMN)]
+
+
+def build_index(
+    recording_path: str, save: bool = True, chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> PoseSegmentIndex:
+    """
+    기록 파일(CSV 또는 세션 파일)을 한 번 읽으며 자세 구간 인덱스를 만듭니다.
+
+    Args:
+        recording_path: pose, timestamp_ms, 센서 컬럼을 가진 기록 파일
+        save: 기록 파일 옆에 인덱스를 저장할지 여부
+        chunk_rows: CSV를 읽을 때의 청크 크기
+
+    Returns:
+        자세 구간 인덱스
+    """
+    sensor_columns = _sensor_columns(recording_path)
+    builder = PoseSegmentIndexBuilder(sensor_columns)
+    for chunk in _iter_recording_chunks(recording_path, chunk_rows):
+        builder.update(chunk)
+
+    segments = builder.finish()
+    if not recording_path.endswith(SESSION_EXT):
+        boundaries = [s.start_row for s in segments] + [s.end_row for s in segments]
+        offsets = _csv_row_offsets(recording_path, boundaries)
+        for seg in segments:
+            seg.start_offset = offsets[seg.start_row]
+            seg.end_offset = offsets[seg.end_row]
+
+    index = PoseSegmentIndex(recording_path, segments, sensor_columns)
+    if save:
+        index.save()
+    logger.info(f"자세 구간 인덱스 생성: {recording_path} ({len(index)}개 구간)")
+    return index
+
+
+def load_index(recording_path: str) -> PoseSegmentIndex:
+    """
+    인덱스를 읽습니다. 없거나 기록 파일보다 오래되었으면 다시 만듭니다.
+    """
+    index_path = index_path_for(recording_path)
+    if os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(
+        recording_path
+    ):
+        return PoseSegmentIndex.load(recording_path)
+    return build_index(recording_path)
+
+
+if __name__ == "__main__":
+    # 사용법: python pose_segments.py <기록 파일> [자세 번호] [최소 지속 시간(초)]
+    logging.basicConfig(level=logging.INFO)
+    index = build_index(sys.argv[1])
+    pose = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    min_duration = float(sys.argv[3]) if len(sys.argv) > 3 else None
+    for seg in index.query(pose=pose, min_duration_s=min_duration):
+        print(
+            f"pose={seg.pose} rows=[{seg.start_row}, {seg.end_row}) "
+            f"{seg.start_ms}~{seg.end_ms}ms ({seg.duration_s:.1f}s)"
+        )
@@ -5,7 +5,9 @@
 import glob
 import logging
 import os
-from typing import Dict, List, Optional, Tuple
+import time
+import warnings
+from typing import Callable, Dict, List, Optional, Tuple
 
 import joblib
 import numpy as np
@@ -15,14 +17,50 @@ from sklearn.metrics import accuracy_score, classification_report
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("posture_classifier.log"), logging.StreamHandler()],
-)
+from drift_monitor import build_reference
+from log_pipeline import sample, setup_logging
+from session_store import SESSION_EXT, read_table
+
 logger = logging.getLogger(__name__)
 
+# 1도 이하 변화를 안정적으로 간주
+STABILITY_THRESHOLD_DEG = 1.0
+
+# 학습에 사용하는 사람 디렉토리
+TRAINING_PERSONS = ["다혜", "도엽", "준형"]
+
+# 드리프트 기준 확신도 분포를 만들 때 예측해 볼 학습 샘플 수
+REFERENCE_CONFIDENCE_SAMPLES = 256
+
+# OOB 정체 조기 종료를 쓸 최소 학습 샘플 수 - 이보다 적으면 OOB 정확도가 몇 샘플로
+# 계산되어 단계마다 크게 흔들리므로 고정 트리 수로 학습
+MIN_OOB_TRAINING_ROWS = 200
+FIXED_N_ESTIMATORS = 100
+
+
+def motion_features(pitch_values: np.ndarray) -> Dict:
+    """
+    연속된 피치 값의 변화율과 안정성 특징을 계산합니다.
+
+    Args:
+        pitch_values: 시간 순서의 피치 값 배열
+
+    Returns:
+        mean_diff, std_diff, max_diff, stability_ratio (변화가 작은 구간의 비율)
+    """
+    if len(pitch_values) < 2:
+        return {"mean_diff": 0, "std_diff": 0, "max_diff": 0, "stability_ratio": 1.0}
+
+    diff_values = np.diff(pitch_values)
+    abs_diff = np.abs(diff_values)
+    return {
+        "mean_diff": np.mean(diff_values),
+        "std_diff": np.std(diff_values),
+        "max_diff": np.max(abs_diff),
+        "stability_ratio": np.sum(abs_diff < STABILITY_THRESHOLD_DEG)
+        / len(diff_values),
+    }
+
 
 class PostureClassifier:
     def __init__(self, data_dir: str = "자세모음"):
@@ -37,6 +75,17 @@ class PostureClassifier:
         self.scaler = StandardScaler()
         self.feature_columns = None
         self.posture_labels = {}
+        # 점진적 갱신 시 기존 분포를 함께 학습하기 위한 정규화된 학습 샘플
+        self.replay_X: Optional[np.ndarray] = None
+        self.replay_y: Optional[np.ndarray] = None
+        self.model_version = 0
+        # 학습 데이터의 relativePitch·확신도 분포 (drift_monitor 기준, 모델 파일에 함께 저장)
+        self.drift_reference: Optional[Dict] = None
+        self._training_pitches: Optional[np.ndarray] = None
+        # 마지막 학습의 단계별 소요 시간(초)과 OOB 정확도 추이
+        self.training_profile: Dict = {}
+        # 예측 단계(features, scale, inference)별 소요 시간(초)을 받을 콜백
+        self.stage_observer: Optional[Callable[[str, float], None]] = None
 
     def extract_features(self, df: pd.DataFrame) -> Dict:
         """
@@ -67,35 +116,30 @@ class PostureClassifier:
             "kurtosis_pitch": pd.Series(pitch_values).kurtosis(),
         }
 
-        # 변화율 특징
-        if len(pitch_values) > 1:
-            diff_values = np.diff(pitch_values)
-            features.update(
-                {
-                    "mean_diff": np.mean(diff_values),
-                    "std_diff": np.std(diff_values),
-                    "max_diff": np.max(np.abs(diff_values)),
-                }
-            )
-        else:
-            features.update(
-                {
-                    "mean_diff": 0,
-                    "std_diff": 0,
-                    "max_diff": 0,
-                }
-            )
-
-        # 안정성 측정 (연속된 값들의 변화가 작은 구간의 비율)
-        if len(pitch_values) > 1:
-            stability_threshold = 1.0  # 1도 이하 변화를 안정적으로 간주
-            stable_points = np.sum(np.abs(diff_values) < stability_threshold)
-            features["stability_ratio"] = stable_points / len(diff_values)
-        else:
-            features["stability_ratio"] = 1.0
+        # 변화율/안정성 특징
+        features.update(motion_features(pitch_values))
 
         return features
 
+    def _person_dirs(self) -> List[str]:
+        return [
+            d
+            for d in os.listdir(self.data_dir)
+            if os.path.isdir(os.path.join(self.data_dir, d)) and d in TRAINING_PERSONS
+        ]
+
+    @staticmethod
+    def _find_recordings(directory: str) -> List[str]:
+        """
+        디렉토리의 CSV와 세션 파일(.pses)을 찾습니다.
+        같은 이름의 파일이 둘 다 있으면 세션 파일을 사용합니다.
+        """
+        recordings = {}
+        for pattern in ("*.csv", f"*{SESSION_EXT}"):
+            for path in sorted(glob.glob(os.path.join(directory, pattern))):
+                recordings[os.path.splitext(path)[0]] = path
+        return list(recordings.values())
+
     def load_training_data(self) -> Tuple[pd.DataFrame, List[int]]:
         """
         자세모음 디렉토리에서 모든 자세 데이터를 로드합니다.
@@ -108,20 +152,18 @@ class PostureClassifier:
 
         all_features = []
         all_labels = []
+        all_pitches = []
+        load_time = 0.0
+        feature_time = 0.0
 
         # 각 사람별 디렉토리 탐색 (다혜, 도엽, 준형만 사용)
-        allowed_persons = ["다혜", "도엽", "준형"]
-        person_dirs = [
-            d
-            for d in os.listdir(self.data_dir)
-            if os.path.isdir(os.path.join(self.data_dir, d)) and d in allowed_persons
-        ]
+        person_dirs = self._person_dirs()
 
         logger.info(f"사용할 사람 디렉토리: {person_dirs}")
 
         for person in person_dirs:
             person_path = os.path.join(self.data_dir, person)
-            csv_files = glob.glob(os.path.join(person_path, "*.csv"))
+            csv_files = self._find_recordings(person_path)
 
             logger.info(f"{person} - {len(csv_files)}개 파일 발견")
 
@@ -131,8 +173,10 @@ class PostureClassifier:
                     filename = os.path.basename(csv_file)
                     posture_num = int(filename.split("번자세")[0])
 
-                    # 데이터 로드
-                    df = pd.read_csv(csv_file)
+                    # 데이터 로드 (CSV 또는 세션 파일)
+                    start = time.perf_counter()
+                    df = read_table(csv_file)
+                    load_time += time.perf_counter() - start
 
                     # 컬럼명 확인 및 정규화
                     if "relative_pitch_deg" not in df.columns:
@@ -145,11 +189,14 @@ class PostureClassifier:
                         continue
 
                     # 특징 추출
+                    start = time.perf_counter()
                     features = self.extract_features(df)
+                    feature_time += time.perf_counter() - start
 
                     if features:
                         all_features.append(features)
                         all_labels.append(posture_num)
+                        all_pitches.append(df["relative_pitch_deg"].values)
 
                         # 자세 라벨 기록
                         if posture_num not in self.posture_labels:
@@ -160,6 +207,12 @@ class PostureClassifier:
                     logger.error(f"파일 {csv_file} 처리 중 오류: {e}")
                     continue
 
+        self.training_profile["load_s"] = load_time
+        self.training_profile["features_s"] = feature_time
+        self._training_pitches = (
+            np.concatenate(all_pitches).astype(float) if all_pitches else None
+        )
+
         if not all_features:
             logger.error("학습 데이터를 찾을 수 없습니다!")
             return pd.DataFrame(), []
@@ -176,24 +229,55 @@ class PostureClassifier:
 
         return features_df, all_labels
 
-    def train_model(self) -> None:
+    def train_model(
+        self,
+        n_jobs: int = -1,
+        step: int = 25,
+        max_estimators: int = 300,
+        oob_tolerance: float = 0.002,
+        patience: int = 2,
+        report: bool = False,
+        min_oob_rows: int = MIN_OOB_TRAINING_ROWS,
+    ) -> Dict:
         """
         머신러닝 모델을 학습합니다.
+
+        트리를 n_jobs개 스레드로 병렬 학습하고 (scikit-learn 포레스트는 스레드 백엔드), warm_start로 step개씩 트리를 늘리다가
+        OOB 정확도 향상이 oob_tolerance 미만인 단계가 patience번 이어지면 멈춥니다.
+        학습 샘플이 min_oob_rows보다 적으면 조기 종료 없이 FIXED_N_ESTIMATORS개
+        (max_estimators 이하)를 학습합니다. 코어 수에 따른 속도 향상은 단일 코어
+        환경에서만 측정되어 검증되지 않았습니다 (benchmarks/bench_forest_training.py).
+
+        Args:
+            n_jobs: 트리 학습에 사용할 스레드 수 (-1이면 모든 코어)
+            step: 단계마다 추가할 트리 수
+            max_estimators: 트리 수 상한
+            oob_tolerance: 향상으로 인정할 최소 OOB 정확도 증가량
+            patience: 정체 단계가 몇 번 이어지면 멈출지
+            report: 분류 리포트와 특징 중요도를 계산해 로그로 남길지 여부
+            min_oob_rows: OOB 조기 종료를 쓸 최소 학습 샘플 수
+
+        Returns:
+            단계별 소요 시간(초)과 OOB 정확도 추이를 담은 학습 프로파일
         """
         logger.info("모델 학습 시작")
+        total_start = time.perf_counter()
+        self.training_profile = {}
 
-        # 데이터 로드
+        # 데이터 로드 (load_s, features_s 기록)
         features_df, labels = self.load_training_data()
 
         if len(features_df) == 0:
             logger.error("학습할 데이터가 없습니다!")
-            return
+            return self.training_profile
 
         # 특징 컬럼 저장
         self.feature_columns = features_df.columns.tolist()
 
         # 데이터 정규화
+        start = time.perf_counter()
         X_scaled = self.scaler.fit_transform(features_df)
+        self.training_profile["scale_s"] = time.perf_counter() - start
 
         # 학습/테스트 분할 (데이터가 적을 경우 stratify 비활성화)
         unique_labels = np.unique(labels)
@@ -216,33 +300,236 @@ class PostureClassifier:
                     X_scaled, labels, test_size=0.2, random_state=42
                 )
 
-        # 모델 학습
-        self.model = RandomForestClassifier(
-            n_estimators=100,
+        # 모델 학습 (warm_start로 트리를 늘리며 OOB 정확도 정체 시 중단)
+        start = time.perf_counter()
+        if len(X_train) < min_oob_rows:
+            logger.info(
+                f"학습 샘플 {len(X_train)}개 < {min_oob_rows}개, OOB 조기 종료 없이 학습합니다."
+            )
+            step = max_estimators = min(FIXED_N_ESTIMATORS, max_estimators)
+        self.model = self._grow_forest(
+            X_train, y_train, n_jobs, step, max_estimators, oob_tolerance, patience
+        )
+        self.training_profile["fit_s"] = time.perf_counter() - start
+        self.replay_X = np.asarray(X_scaled)
+        self.replay_y = np.asarray(labels)
+        self.model_version += 1
+
+        # 모델 평가
+        start = time.perf_counter()
+        y_pred = self.model.predict(X_test)
+        accuracy = accuracy_score(y_test, y_pred)
+        self.training_profile["accuracy"] = accuracy
+        logger.info(f"모델 정확도: {accuracy:.4f}")
+
+        if report:
+            logger.info(f"분류 리포트:\n{classification_report(y_test, y_pred)}")
+
+            # 특징 중요도
+            feature_importance = pd.DataFrame(
+                {
+                    "feature": self.feature_columns,
+                    "importance": self.model.feature_importances_,
+                }
+            ).sort_values("importance", ascending=False)
+
+            logger.info(f"특징 중요도:\n{feature_importance}")
+        self.training_profile["evaluate_s"] = time.perf_counter() - start
+
+        # 단일 샘플 예측에서는 병렬 스레드 생성 비용이 더 크므로 예측은 단일 코어로
+        self.model.set_params(n_jobs=None)
+
+        # 드리프트 감시 기준 분포 (save_model 때 함께 저장)
+        start = time.perf_counter()
+        self.drift_reference = self.build_drift_reference(self._training_pitches)
+        self._training_pitches = None
+        self.training_profile["reference_s"] = time.perf_counter() - start
+
+        self.training_profile["total_s"] = time.perf_counter() - total_start
+        stages = ", ".join(
+            f"{name[:-2]} {self.training_profile[name]:.3f}s"
+            for name in ("load_s", "features_s", "scale_s", "fit_s", "evaluate_s")
+        )
+        logger.info(f"학습 단계별 소요 시간: {stages}")
+        return self.training_profile
+
+    def _grow_forest(
+        self,
+        X_train: np.ndarray,
+        y_train: List[int],
+        n_jobs: int,
+        step: int,
+        max_estimators: int,
+        oob_tolerance: float,
+        patience: int,
+    ) -> RandomForestClassifier:
+        """트리를 step개씩 추가하며 OOB 정확도가 정체될 때까지 포레스트를 키웁니다."""
+        model = RandomForestClassifier(
+            n_estimators=min(step, max_estimators),
             random_state=42,
             max_depth=10,
             min_samples_split=5,
             min_samples_leaf=2,
+            n_jobs=n_jobs,
+            warm_start=True,
+            oob_score=True,
         )
 
-        self.model.fit(X_train, y_train)
+        oob_history = []
+        best_oob = -np.inf
+        stalled = 0
+        while True:
+            with warnings.catch_warnings():
+                # 트리가 적을 때 일부 샘플의 OOB 예측이 없다는 경고는 무시
+                warnings.simplefilter("ignore", UserWarning)
+                model.fit(X_train, y_train)
+            oob = float(model.oob_score_)
+            oob_history.append((model.n_estimators, oob))
+
+            if oob - best_oob < oob_tolerance:
+                stalled += 1
+            else:
+                stalled = 0
+            best_oob = max(best_oob, oob)
+
+            if stalled >= patience or model.n_estimators >= max_estimators:
+                break
+            model.set_params(
+                n_estimators=min(model.n_estimators + step, max_estimators)
+            )
 
-        # 모델 평가
-        y_pred = self.model.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
+        self.training_profile["oob_history"] = oob_history
+        logger.info(
+            f"트리 {model.n_estimators}개에서 학습 종료 (OOB 정확도 {oob_history[-1][1]:.4f})"
+        )
+        return model
 
-        logger.info(f"모델 정확도: {accuracy:.4f}")
-        logger.info(f"분류 리포트:\n{classification_report(y_test, y_pred)}")
+    def sample_features(
+        self, timestamp: int, relative_pitch: float
+    ) -> Optional[np.ndarray]:
+        """
+        단일 데이터 포인트의 정규화된 특징 벡터를 만듭니다.
 
-        # 특징 중요도
-        feature_importance = pd.DataFrame(
-            {
-                "feature": self.feature_columns,
-                "importance": self.model.feature_importances_,
-            }
-        ).sort_values("importance", ascending=False)
+        Returns:
+            (1, 특징 수) 배열 (특징 추출 실패 시 None)
+        """
+        # 단일 포인트로 DataFrame 생성
+        df = pd.DataFrame(
+            {"timestamp_ms": [timestamp], "relative_pitch_deg": [relative_pitch]}
+        )
+
+        observer = self.stage_observer
+        start = time.perf_counter()
+
+        # 특징 추출
+        features = self.extract_features(df)
+        if not features:
+            return None
+
+        # 특징 DataFrame 생성
+        feature_df = pd.DataFrame([features])
+
+        # 누락된 특징 처리
+        for col in self.feature_columns:
+            if col not in feature_df.columns:
+                feature_df[col] = 0
+        feature_df = feature_df[self.feature_columns]
+
+        if observer is not None:
+            now = time.perf_counter()
+            observer("features", now - start)
+            start = now
+
+        # 정규화
+        X_scaled = self.scaler.transform(feature_df)
+        if observer is not None:
+            observer("scale", time.perf_counter() - start)
+        return X_scaled
+
+    def training_pitches(self) -> np.ndarray:
+        """학습 데이터의 relativePitch 값을 모두 읽습니다 (특징 추출 없이)."""
+        pitches = []
+        for person in self._person_dirs():
+            for path in self._find_recordings(os.path.join(self.data_dir, person)):
+                try:
+                    df = read_table(path)
+                except Exception as e:
+                    logger.error(f"파일 {path} 처리 중 오류: {e}")
+                    continue
+                if "relative_pitch_deg" in df.columns:
+                    pitches.append(df["relative_pitch_deg"].values)
+        return np.concatenate(pitches).astype(float) if pitches else np.empty(0)
+
+    def build_replay_set(self) -> bool:
+        """
+        점진적 갱신용 재학습 샘플을 학습 데이터에서 다시 만듭니다 (재학습 샘플 없이 저장된 예전 모델용).
+
+        현재 정규화기와 특징 컬럼을 그대로 쓰므로 모델은 바뀌지 않습니다.
+
+        Returns:
+            만들었는지 여부 (모델이나 학습 데이터가 없으면 False)
+        """
+        if (
+            self.model is None
+            or self.feature_columns is None
+            or not os.path.isdir(self.data_dir)
+        ):
+            return False
+        posture_labels = self.posture_labels
+        self.posture_labels = {}
+        try:
+            features_df, labels = self.load_training_data()
+        finally:
+            self.posture_labels = posture_labels
+            self._training_pitches = None
+        if len(features_df) == 0:
+            return False
+
+        labels = np.asarray(labels)
+        known = np.isin(labels, self.model.classes_)
+        features_df = features_df.reindex(columns=self.feature_columns, fill_value=0)
+        self.replay_X = np.asarray(self.scaler.transform(features_df))[known]
+        self.replay_y = labels[known]
+        logger.info(
+            f"재학습 샘플 {len(self.replay_y)}개를 학습 데이터에서 만들었습니다."
+        )
+        return True
+
+    def build_drift_reference(
+        self, pitches: Optional[np.ndarray] = None
+    ) -> Optional[Dict]:
+        """
+        드리프트 감시 기준 분포를 만듭니다.
 
-        logger.info(f"특징 중요도:\n{feature_importance}")
+        피치 분포는 학습 데이터 전체, 확신도 분포는 그중 REFERENCE_CONFIDENCE_SAMPLES개를
+        실시간 요청과 같은 경로(단일 샘플 특징)로 예측한 결과입니다.
+
+        Args:
+            pitches: 학습 데이터의 relativePitch 값 (None이면 data_dir에서 읽음)
+
+        Returns:
+            기준 분포 (모델이나 데이터가 없으면 None)
+        """
+        if self.model is None:
+            return None
+        if pitches is None:
+            pitches = self.training_pitches()
+        if len(pitches) == 0:
+            logger.warning("드리프트 기준 분포를 만들 학습 데이터가 없습니다.")
+            return None
+
+        rng = np.random.default_rng(42)
+        picked = rng.choice(
+            pitches, min(len(pitches), REFERENCE_CONFIDENCE_SAMPLES), replace=False
+        )
+        # 학습 중 예측은 요청 단계 지연으로 기록하지 않음
+        observer, self.stage_observer = self.stage_observer, None
+        try:
+            X = np.vstack([self.sample_features(0, float(p)) for p in picked])
+        finally:
+            self.stage_observer = observer
+        confidences = self.model.predict_proba(X).max(axis=1)
+        return build_reference(pitches, confidences)
 
     def predict_posture(self, timestamp: int, relative_pitch: float) -> Dict:
         """
@@ -260,38 +547,21 @@ class PostureClassifier:
             return {"error": "Model not trained"}
 
         try:
-            # 단일 포인트로 DataFrame 생성
-            df = pd.DataFrame(
-                {"timestamp_ms": [timestamp], "relative_pitch_deg": [relative_pitch]}
-            )
-
-            # 특징 추출
-            features = self.extract_features(df)
-
-            if not features:
+            X_scaled = self.sample_features(timestamp, relative_pitch)
+            if X_scaled is None:
                 logger.error("특징 추출 실패")
                 return {"error": "Feature extraction failed"}
 
-            # 특징 DataFrame 생성
-            feature_df = pd.DataFrame([features])
-
-            # 누락된 특징 처리
-            for col in self.feature_columns:
-                if col not in feature_df.columns:
-                    feature_df[col] = 0
-
-            # 컬럼 순서 맞추기
-            feature_df = feature_df[self.feature_columns]
-
-            # 정규화
-            X_scaled = self.scaler.transform(feature_df)
-
-            # 예측
-            predicted_posture = self.model.predict(X_scaled)[0]
-            prediction_proba = self.model.predict_proba(X_scaled)[0]
+            # 예측 (갱신 중 모델이 교체되어도 한 번의 예측에는 같은 모델 사용)
+            model = self.model
+            start = time.perf_counter()
+            prediction_proba = model.predict_proba(X_scaled)[0]
+            predicted_posture = model.classes_[np.argmax(prediction_proba)]
+            if self.stage_observer is not None:
+                self.stage_observer("inference", time.perf_counter() - start)
 
             # 확률 정보
-            classes = self.model.classes_
+            classes = model.classes_
             proba_dict = {
                 int(cls): float(prob) for cls, prob in zip(classes, prediction_proba)
             }
@@ -305,9 +575,12 @@ class PostureClassifier:
                 "relative_pitch": relative_pitch,
             }
 
-            logger.info(
-                f"예측 완료 - 자세: {predicted_posture}, 확신도: {max_probability:.4f}"
-            )
+            if sample("predict"):
+                logger.info(
+                    "예측 완료 - 자세: %s, 확신도: %.4f",
+                    predicted_posture,
+                    max_probability,
+                )
 
             return result
 
@@ -328,9 +601,16 @@ class PostureClassifier:
             "scaler": self.scaler,
             "feature_columns": self.feature_columns,
             "posture_labels": self.posture_labels,
+            "replay_X": self.replay_X,
+            "replay_y": self.replay_y,
+            "model_version": self.model_version,
+            "drift_reference": self.drift_reference,
         }
 
-        joblib.dump(model_data, model_path)
+        # 임시 파일에 쓴 뒤 교체 (저장 중에도 다른 프로세스는 온전한 파일을 읽음)
+        tmp_path = model_path + ".tmp"
+        joblib.dump(model_data, tmp_path)
+        os.replace(tmp_path, model_path)
         logger.info(f"모델이 {model_path}에 저장되었습니다.")
 
     def load_model(self, model_path: str = "posture_model.pkl") -> bool:
@@ -350,6 +630,10 @@ class PostureClassifier:
             self.scaler = model_data["scaler"]
             self.feature_columns = model_data["feature_columns"]
             self.posture_labels = model_data["posture_labels"]
+            self.replay_X = model_data.get("replay_X")
+            self.replay_y = model_data.get("replay_y")
+            self.model_version = model_data.get("model_version", 0)
+            self.drift_reference = model_data.get("drift_reference")
 
             logger.info(f"모델이 {model_path}에서 로드되었습니다.")
             return True
@@ -360,6 +644,9 @@ class PostureClassifier:
 
 
 if __name__ == "__main__":
+    # 로깅 설정 (서버로 import될 때는 서버의 로깅 설정을 따름)
+    setup_logging("posture_classifier.log")
+
     # 모델 학습 및 저장
     classifier = PostureClassifier()
     classifier.train_model()
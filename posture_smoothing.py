@@ -0,0 +1,296 @@
+"""
+자세 예측 시간 평활화 및 히스테리시스 - 자세가 실제로 바뀔 때만 알리기 위한 연결별 상태
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("majority", "ema")
+
+# 응답 모드: every - 샘플마다 예측 전송 (기존 동작), on_change - 평활화된 자세가 바뀔 때만 전송
+RESPONSE_MODES = ("every", "on_change")
+
+# 클라이언트가 정하는 값의 상한 - 평활 이력은 window 크기로 미리 할당되므로 제한이 필요
+MAX_WINDOW = 100
+MAX_HEARTBEAT_S = 3600.0
+
+
+class PostureSmoother:
+    """
+    최근 K개 예측의 다수결 또는 확률 지수평활로 자세를 안정화하는 평활기
+
+    연결마다 하나씩 만들어지므로 __slots__와 미리 할당한 고정 크기 배열(다수결 이력)로
+    연결당 메모리를 줄입니다.
+    """
+
+    __slots__ = (
+        "window",
+        "min_confidence",
+        "method",
+        "alpha",
+        "min_votes",
+        "posture",
+        "confidence",
+        "_postures",
+        "_confidences",
+        "_ema",
+    )
+
+    def __init__(
+        self,
+        window: int = 5,
+        min_confidence: float = 0.6,
+        method: str = "majority",
+        alpha: float = 0.3,
+        min_votes: Optional[int] = None,
+    ):
+        """
+        평활기 초기화
+
+        Args:
+            window: 다수결에 사용할 최근 예측 수 (K)
+            min_confidence: 자세 전환에 필요한 최소 (평균/평활) 확신도
+            method: "majority" (다수결) 또는 "ema" (확률 지수평활)
+            alpha: ema 방식의 평활 계수 (클수록 최근 값 반영이 빠름)
+            min_votes: majority 방식에서 전환에 필요한 최소 득표 수 (기본값: 과반)
+        """
+        if method not in METHODS:
+            raise ValueError(f"지원하지 않는 평활 방식: {method}")
+        if not 1 <= window <= MAX_WINDOW:
+            raise ValueError(f"window는 1~{MAX_WINDOW} 사이여야 합니다: {window}")
+        self.window = window
+        self.min_confidence = min_confidence
+        self.method = method
+        self.alpha = alpha
+        self.min_votes = window // 2 + 1 if min_votes is None else min_votes
+
+        self.posture: Optional[int] = None
+        self.confidence = 0.0
+        # 다수결 이력 (자세, 확신도) - ema 방식은 확률 dict만 사용
+        self._postures = RingBuffer(window, np.int32)
+        self._confidences = RingBuffer(window)
+        self._ema: Dict[int, float] = {}
+
+    def reset(self) -> None:
+        self.posture = None
+        self.confidence = 0.0
+        self._postures.clear()
+        self._confidences.clear()
+        self._ema.clear()
+
+    def to_dict(self) -> Dict:
+        """세션 저장용 상태 (JSON 직렬화 가능)"""
+        return {
+            "window": self.window,
+            "min_confidence": self.min_confidence,
+            "method": self.method,
+            "alpha": self.alpha,
+            "min_votes": self.min_votes,
+            "posture": self.posture,
+            "confidence": self.confidence,
+            "history": [
+                [posture, confidence]
+                for posture, confidence in zip(
+                    self._postures.tolist(), self._confidences.tolist()
+                )
+            ],
+            "ema": [[cls, value] for cls, value in self._ema.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PostureSmoother":
+        smoother = cls(
+            window=data["window"],
+            min_confidence=data["min_confidence"],
+            method=data["method"],
+            alpha=data["alpha"],
+            min_votes=data["min_votes"],
+        )
+        smoother.posture = data["posture"]
+        smoother.confidence = data["confidence"]
+        for posture, confidence in data["history"]:
+            smoother._postures.append(posture)
+            smoother._confidences.append(confidence)
+        smoother._ema = {cls_: value for cls_, value in data["ema"]}
+        return smoother
+
+    def update(
+        self,
+        posture: int,
+        confidence: float,
+        probabilities: Optional[Dict[int, float]] = None,
+    ) -> bool:
+        """
+        새 예측을 반영합니다.
+
+        Args:
+            posture: 예측된 자세 번호
+            confidence: 예측 확신도
+            probabilities: 자세별 확률 (ema 방식에서 사용, 없으면 예측 자세에 확신도 부여)
+
+        Returns:
+            평활화된 자세가 바뀌었는지 여부
+        """
+        if self.method == "majority":
+            candidate, score = self._update_majority(posture, confidence)
+        else:
+            candidate, score = self._update_ema(posture, confidence, probabilities)
+
+        if candidate is None:
+            return False
+        if candidate == self.posture:
+            self.confidence = score
+            return False
+        if score < self.min_confidence:
+            return False
+
+        self.posture = candidate
+        self.confidence = score
+        return True
+
+    def _update_majority(self, posture: int, confidence: float):
+        self._postures.append(posture)
+        self._confidences.append(confidence)
+        # 창이 작으므로 NumPy 연산보다 리스트로 세는 편이 빠름
+        history = self._postures.tolist()
+
+        candidate = max(history, key=history.count)
+        votes = history.count(candidate)
+        if candidate != self.posture and history.count(self.posture) >= votes:
+            candidate = self.posture  # 동률이면 현재 자세 유지
+        if candidate != self.posture and votes < self.min_votes:
+            return None, 0.0
+
+        scores = [
+            c for p, c in zip(history, self._confidences.tolist()) if p == candidate
+        ]
+        return candidate, sum(scores) / len(scores)
+
+    def _update_ema(
+        self,
+        posture: int,
+        confidence: float,
+        probabilities: Optional[Dict[int, float]],
+    ):
+        if probabilities is None:
+            probabilities = {posture: confidence}
+
+        keep = 1.0 - self.alpha
+        for cls in self._ema:
+            self._ema[cls] *= keep
+        for cls, prob in probabilities.items():
+            self._ema[cls] = self._ema.get(cls, 0.0) + self.alpha * prob
+
+        candidate = max(self._ema, key=self._ema.get)
+        return candidate, self._ema[candidate]
+
+
+class ChangeNotifier:
+    """연결별 응답 결정기 - on_change 모드에서는 자세 변경과 주기적 하트비트만 전송"""
+
+    __slots__ = (
+        "smoother",
+        "mode",
+        "heartbeat_interval",
+        "clock",
+        "suppressed",
+        "previous_posture",
+        "_last_sent",
+    )
+
+    def __init__(
+        self,
+        smoother: Optional[PostureSmoother] = None,
+        mode: str = "every",
+        heartbeat_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            smoother: 자세 평활기 (기본값: PostureSmoother())
+            mode: "every" 또는 "on_change"
+            heartbeat_interval: on_change 모드에서 변화가 없을 때 하트비트 간격 (초)
+            clock: 초 단위 단조 시계
+        """
+        if mode not in RESPONSE_MODES:
+            raise ValueError(f"지원하지 않는 응답 모드: {mode}")
+        if not 0 < heartbeat_interval <= MAX_HEARTBEAT_S:
+            raise ValueError(
+                f"heartbeat는 0초 초과 {MAX_HEARTBEAT_S:g}초 이하여야 합니다: {heartbeat_interval}"
+            )
+        self.smoother = smoother or PostureSmoother()
+        self.mode = mode
+        self.heartbeat_interval = heartbeat_interval
+        self.clock = clock
+        self.suppressed = 0
+        self.previous_posture: Optional[int] = None
+        self._last_sent = clock()
+
+    def observe(
+        self,
+        posture: int,
+        confidence: float,
+        probabilities: Optional[Dict[int, float]] = None,
+    ) -> Optional[str]:
+        """
+        예측 하나를 반영하고 보낼 메시지 종류를 결정합니다.
+
+        Returns:
+            "prediction" (every 모드), "posture_change", "heartbeat", 또는 None (전송 안 함)
+        """
+        previous = self.smoother.posture
+        changed = self.smoother.update(posture, confidence, probabilities)
+
+        if self.mode == "every":
+            return "prediction"
+
+        now = self.clock()
+        if changed:
+            self.previous_posture = previous
+            action = "posture_change"
+        elif now - self._last_sent >= self.heartbeat_interval:
+            action = "heartbeat"
+        else:
+            self.suppressed += 1
+            return None
+
+        self._last_sent = now
+        return action
+
+    def to_dict(self) -> Dict:
+        """세션 저장용 상태 - 마지막 전송 시각은 경과 시간으로 저장"""
+        return {
+            "smoother": self.smoother.to_dict(),
+            "mode": self.mode,
+            "heartbeat_interval": self.heartbeat_interval,
+            "suppressed": self.suppressed,
+            "previous_posture": self.previous_posture,
+            "since_last_sent": self.clock() - self._last_sent,
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: Dict, clock: Callable[[], float] = time.monotonic
+    ) -> "ChangeNotifier":
+        notifier = cls(
+            PostureSmoother.from_dict(data["smoother"]),
+            mode=data["mode"],
+            heartbeat_interval=data["heartbeat_interval"],
+            clock=clock,
+        )
+        notifier.suppressed = data["suppressed"]
+        notifier.previous_posture = data["previous_posture"]
+        notifier._last_sent = clock() - data["since_last_sent"]
+        return notifier
+
+    def sent(self) -> int:
+        """전송 후 호출 - 그동안 생략한 메시지 수를 반환하고 초기화합니다."""
+        suppressed, self.suppressed = self.suppressed, 0
+        return suppressed
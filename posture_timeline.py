@@ -0,0 +1,345 @@
+"""
+자세 타임라인 저장소 - 예측 스트림을 기기별 자세 구간(run-length)으로 묶어 저장하고 구간 인덱스로 조회
+
+샘플마다 한 행을 남기는 대신 같은 자세가 이어지는 동안은 열린 구간 하나만 늘리고,
+자세가 바뀌거나 데이터가 끊기거나 날짜가 바뀔 때 구간을 닫습니다. 닫힌 구간은 메모리에 모았다가
+기록 스레드가 한 번의 트랜잭션으로 SQLite에 기록하므로 요청 경로(이벤트 루프)는 DB를 기다리지 않습니다.
+구간은 날짜 경계에서 나누어 저장하므로 하루 길이를 넘지 않고, 일별 집계는 (기기, 날짜) 인덱스로,
+기간 조회는 (기기, 시작 시각) 인덱스로 처리합니다.
+"""
+
+import logging
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 24 * 60 * 60 * 1000
+DEFAULT_MAX_GAP_MS = 5000
+DEFAULT_FLUSH_INTERVAL_S = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posture_intervals (
+    device_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    posture INTEGER NOT NULL,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    mean_confidence REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posture_intervals_device_start
+    ON posture_intervals (device_id, start_ms);
+CREATE INDEX IF NOT EXISTS idx_posture_intervals_device_day
+    ON posture_intervals (device_id, day);
+"""
+
+
+@dataclass
+class PostureInterval:
+    """같은 자세가 이어진 구간 ([start_ms, end_ms), 서버 시각 기준 epoch ms)"""
+
+    device_id: str
+    posture: int
+    start_ms: int
+    end_ms: int
+    samples: int
+    mean_confidence: float
+
+    @property
+    def duration_ms(self) -> int:
+        return self.end_ms - self.start_ms
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        result["duration_s"] = self.duration_ms / 1000.0
+        return result
+
+
+class TimelineStore:
+    """기기별 자세 구간 저장소 - 열린 구간은 메모리, 닫힌 구간은 SQLite"""
+
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        max_gap_ms: int = DEFAULT_MAX_GAP_MS,
+        utc_offset_min: int = 0,
+        poor_postures: Iterable[int] = (1, 2, 3, 4, 5, 6, 7),
+        flush_interval_s: float = DEFAULT_FLUSH_INTERVAL_S,
+    ):
+        """
+        Args:
+            db_path: SQLite 파일 경로 (":memory:" 이면 프로세스 메모리)
+            max_gap_ms: 이보다 오래 샘플이 없으면 구간을 끊음
+            utc_offset_min: 날짜 경계를 정할 시간대 (UTC 기준 분, 예: 한국 540)
+            poor_postures: 나쁜 자세로 볼 자세 번호
+            flush_interval_s: 기록 스레드가 닫힌 구간을 DB에 기록하는 간격
+        """
+        self.max_gap_ms = max_gap_ms
+        self.tz = timezone(timedelta(minutes=utc_offset_min))
+        self.poor_postures = frozenset(poor_postures)
+        self._offset_ms = utc_offset_min * 60 * 1000
+        self.flush_interval_s = flush_interval_s
+        self._open: Dict[str, PostureInterval] = {}
+        # 닫혔지만 아직 DB에 기록하지 않은 구간 (조회에 포함)
+        self._closed: List[PostureInterval] = []
+        # _lock: 메모리 구간 (이벤트 루프와 공유, 짧게만 잡음)
+        # _db_lock: DB 접근 - 잡은 채로 _lock을 잡을 수 있고 그 반대는 안 됨
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        """아직 DB에 기록하지 않은 닫힌 구간 수"""
+        return len(self._closed)
+
+    def start(self) -> None:
+        """닫힌 구간을 주기적으로 기록하는 스레드를 시작합니다."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="posture-timeline", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """기록 스레드를 멈추고 남은 구간을 기록합니다."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+        self.flush()
+
+    def close(self) -> None:
+        """열린 구간을 모두 기록하고 DB를 닫습니다."""
+        for device_id in list(self._open):
+            self.end(device_id)
+        self.stop()
+        self._db.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval_s):
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        닫힌 구간을 한 트랜잭션으로 기록합니다 (기록 스레드나 종료 시 호출).
+
+        Returns:
+            기록한 구간 수
+        """
+        with self._db_lock:
+            with self._lock:
+                runs, self._closed = self._closed, []
+            if not runs:
+                return 0
+            try:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT INTO posture_intervals VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                run.device_id,
+                                self.day_of(run.start_ms),
+                                run.posture,
+                                run.start_ms,
+                                run.end_ms,
+                                run.samples,
+                                run.mean_confidence,
+                            )
+                            for run in runs
+                        ],
+                    )
+            except sqlite3.Error as e:
+                logger.error(f"자세 구간 기록 실패: {e}")
+                with self._lock:
+                    self._closed[:0] = runs
+                return 0
+        return len(runs)
+
+    def day_of(self, timestamp_ms: int) -> str:
+        return datetime.fromtimestamp(timestamp_ms / 1000, self.tz).date().isoformat()
+
+    def day_start_ms(self, day: date) -> int:
+        midnight = datetime(day.year, day.month, day.day, tzinfo=self.tz)
+        return int(midnight.timestamp() * 1000)
+
+    def _next_midnight_ms(self, timestamp_ms: int) -> int:
+        local = timestamp_ms + self._offset_ms
+        return local - local % DAY_MS + DAY_MS - self._offset_ms
+
+    def observe(
+        self, device_id: str, timestamp_ms: int, posture: int, confidence: float
+    ) -> None:
+        """
+        예측 하나를 반영합니다.
+
+        Args:
+            device_id: 기기 ID
+            timestamp_ms: 예측 시각 (epoch ms)
+            posture: 자세 번호
+            confidence: 예측 확신도
+        """
+        with self._lock:
+            run = self._open.get(device_id)
+            if run is not None:
+                gap = timestamp_ms - run.end_ms
+                if gap < 0 or gap > self.max_gap_ms:
+                    # 데이터가 끊김 - 마지막 샘플 시각에서 구간 종료
+                    self._write(self._open.pop(device_id))
+                    run = None
+                else:
+                    midnight = self._next_midnight_ms(run.start_ms)
+                    if timestamp_ms >= midnight:
+                        # 날짜가 바뀜 - 자정에서 나누어 이어감
+                        run.end_ms = midnight
+                        self._write(run)
+                        run = PostureInterval(
+                            device_id, run.posture, midnight, midnight, 0, 0.0
+                        )
+                        self._open[device_id] = run
+                    if run.posture != posture:
+                        # 자세 변경 - 바뀐 것을 확인한 시각까지 이전 자세로 봄
+                        run.end_ms = timestamp_ms
+                        self._write(run)
+                        run = None
+
+            if run is None:
+                self._open[device_id] = PostureInterval(
+                    device_id, int(posture), timestamp_ms, timestamp_ms, 1, confidence
+                )
+                return
+            run.end_ms = timestamp_ms
+            run.samples += 1
+            run.mean_confidence += (confidence - run.mean_confidence) / run.samples
+
+    def end(self, device_id: str) -> None:
+        """기기의 열린 구간을 닫습니다 (연결 종료 시)."""
+        with self._lock:
+            run = self._open.pop(device_id, None)
+            if run is not None:
+                self._write(run)
+
+    def _write(self, run: PostureInterval) -> None:
+        # _lock 안에서 호출 - DB 기록은 기록 스레드가 flush()로
+        if run.end_ms > run.start_ms:
+            self._closed.append(run)
+
+    def intervals(
+        self, device_id: str, start_ms: int, end_ms: int
+    ) -> List[PostureInterval]:
+        """[start_ms, end_ms) 와 겹치는 구간 (시작 시각 순, 기록 전·열린 구간 포함)"""
+        with self._db_lock:
+            # 구간은 하루를 넘지 않으므로 시작 시각 인덱스 범위만 보면 됨
+            rows = self._db.execute(
+                "SELECT device_id, posture, start_ms, end_ms, samples, mean_confidence"
+                " FROM posture_intervals"
+                " WHERE device_id = ? AND start_ms >= ? AND start_ms < ? AND end_ms > ?"
+                " ORDER BY start_ms",
+                (device_id, start_ms - DAY_MS, end_ms, start_ms),
+            ).fetchall()
+            result = [PostureInterval(*row) for row in rows]
+            with self._lock:
+                runs = [r for r in self._closed if r.device_id == device_id]
+                run = self._open.get(device_id)
+                if run is not None and run.end_ms > run.start_ms:
+                    runs.append(run)
+                result += [
+                    PostureInterval(**asdict(r))
+                    for r in runs
+                    if r.start_ms < end_ms and r.end_ms > start_ms
+                ]
+        result.sort(key=lambda interval: interval.start_ms)
+        return result
+
+    def daily_totals(
+        self, device_id: str, start_day: date, end_day: date
+    ) -> Dict[str, Dict[int, float]]:
+        """
+        날짜별 자세 유지 시간을 집계합니다.
+
+        Args:
+            device_id: 기기 ID
+            start_day: 시작 날짜 (포함)
+            end_day: 끝 날짜 (포함)
+
+        Returns:
+            {"2025-08-27": {자세 번호: 초}} - 기록이 없는 날짜는 빈 딕셔너리
+        """
+        totals: Dict[str, Dict[int, float]] = {}
+        day = start_day
+        while day <= end_day:
+            totals[day.isoformat()] = {}
+            day += timedelta(days=1)
+
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT day, posture, SUM(end_ms - start_ms) FROM posture_intervals"
+                " WHERE device_id = ? AND day >= ? AND day <= ?"
+                " GROUP BY day, posture",
+                (device_id, start_day.isoformat(), end_day.isoformat()),
+            ).fetchall()
+            with self._lock:
+                runs = [r for r in self._closed if r.device_id == device_id]
+                run = self._open.get(device_id)
+                if run is not None:
+                    runs.append(run)
+                rows += [
+                    (self.day_of(r.start_ms), r.posture, r.duration_ms) for r in runs
+                ]
+
+        for day_key, posture, total_ms in rows:
+            if day_key in totals and total_ms > 0:
+                postures = totals[day_key]
+                postures[posture] = postures.get(posture, 0.0) + total_ms / 1000.0
+        return totals
+
+    def longest_poor_stretch(
+        self, device_id: str, start_ms: int, end_ms: int
+    ) -> Optional[Dict]:
+        """
+        기간 안에서 나쁜 자세가 끊기지 않고 이어진 가장 긴 구간을 찾습니다.
+
+        서로 다른 나쁜 자세가 이어진 경우도 한 구간으로 보며, 구간 사이의 빈 시간이
+        max_gap_ms 이하이면 이어진 것으로 봅니다.
+
+        Returns:
+            {"start_ms", "end_ms", "duration_s", "postures"} 또는 None (나쁜 자세 없음)
+        """
+        best = None
+        current = None
+        for interval in self.intervals(device_id, start_ms, end_ms):
+            if interval.posture not in self.poor_postures:
+                current = None
+                continue
+            begin = max(interval.start_ms, start_ms)
+            finish = min(interval.end_ms, end_ms)
+            if current is not None and begin - current["end_ms"] <= self.max_gap_ms:
+                current["end_ms"] = max(current["end_ms"], finish)
+                if interval.posture not in current["postures"]:
+                    current["postures"].append(interval.posture)
+            else:
+                current = {
+                    "start_ms": begin,
+                    "end_ms": finish,
+                    "postures": [interval.posture],
+                }
+            if best is None or (
+                current["end_ms"] - current["start_ms"]
+                > best["end_ms"] - best["start_ms"]
+            ):
+                best = current
+
+        if best is None:
+            return None
+        result = dict(best, postures=list(best["postures"]))
+        result["duration_s"] = (result["end_ms"] - result["start_ms"]) / 1000.0
+        return result
@@ -0,0 +1,233 @@
+"""
+압력 프레임 기반 자세 분류기 - 미리 구축한 KD-tree 이웃 인덱스로 실시간 예측
+"""
+
+import glob
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.neighbors import KNeighborsClassifier
+
+from session_store import SESSION_EXT, read_table
+from stream_fusion import fuse_frames
+
+logger = logging.getLogger(__name__)
+
+PRESSURE_COLUMNS = [f"pv{i}" for i in range(1, 9)]
+# IMU 결합 모델 입력 (시각화/temp.py 와 같은 순서)
+FUSED_COLUMNS = PRESSURE_COLUMNS + ["pitch"]
+
+# 시각화/temp.py 의 그리드 탐색 범위
+PARAM_GRID = {
+    "n_neighbors": [3, 5, 7, 9],
+    "weights": ["uniform", "distance"],
+    "p": [1, 2],
+}
+
+
+class PressureClassifier:
+    def __init__(
+        self,
+        data_dir: str = os.path.join("자세모음", "압력"),
+        imu_dir: Optional[str] = None,
+    ):
+        """
+        압력 분류기 초기화
+
+        Args:
+            data_dir: N번자세.csv 형식의 압력 프레임 파일이 있는 디렉토리
+            imu_dir: 같은 이름의 IMU 기록 디렉토리 - 주면 압력 + pitch 결합 모델
+        """
+        self.data_dir = data_dir
+        self.imu_dir = imu_dir
+        self.model: Optional[KNeighborsClassifier] = None
+        self.feature_columns = FUSED_COLUMNS if imu_dir else PRESSURE_COLUMNS
+        self.best_params: Dict = {}
+
+    def load_training_data(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        압력 프레임과 자세 라벨을 로드합니다.
+
+        Returns:
+            X: (N, 센서 수) 압력 프레임
+            y: 자세 번호
+        """
+        frames = []
+        labels = []
+        paths = {}
+        for pattern in ("*.csv", f"*{SESSION_EXT}"):
+            for path in sorted(glob.glob(os.path.join(self.data_dir, pattern))):
+                paths[os.path.splitext(path)[0]] = path
+
+        for path in paths.values():
+            try:
+                posture_num = int(os.path.basename(path).split("번자세")[0])
+                df = read_table(path)
+                if self.imu_dir:
+                    df = self._attach_pitch(df, os.path.basename(path))
+                if not all(c in df.columns for c in self.feature_columns):
+                    logger.warning(f"잘못된 형식의 파일 건너뜀: {path}")
+                    continue
+                values = df[self.feature_columns].dropna().to_numpy(dtype=np.float64)
+                frames.append(values)
+                labels.append(np.full(len(values), posture_num))
+            except Exception as e:
+                logger.error(f"파일 {path} 처리 중 오류: {e}")
+
+        if not frames:
+            return np.empty((0, len(self.feature_columns))), np.empty(0, dtype=int)
+
+        X = np.vstack(frames)
+        y = np.concatenate(labels)
+        logger.info(
+            f"압력 프레임 {len(X)}개 로드 완료 (자세 {sorted(set(y.tolist()))})"
+        )
+        return X, y
+
+    def _attach_pitch(self, df: pd.DataFrame, filename: str) -> pd.DataFrame:
+        """
+        압력 기록에 같은 이름의 IMU 기록 pitch를 붙입니다 (시각화/temp.py 와 같은 규칙).
+
+        타임스탬프가 있으면 실시간 서버와 같은 규칙으로 시간 정렬하고,
+        타임스탬프가 없는 기존 pv 기록은 행 순서로 결합합니다.
+        """
+        stem = os.path.splitext(filename)[0]
+        imu_df = read_table(os.path.join(self.imu_dir, stem + ".csv"))
+        if "timestamp_ms" in df.columns:
+            return fuse_frames(df, imu_df)
+        df = df.copy()
+        df["pitch"] = imu_df["relative_pitch_deg"]
+        return df
+
+    def train_model(self, tune: bool = True) -> None:
+        """
+        KNN 분류기를 학습하고 KD-tree 인덱스를 구축합니다.
+
+        Args:
+            tune: temp.py와 같은 그리드 탐색으로 하이퍼파라미터를 고를지 여부
+        """
+        X, y = self.load_training_data()
+        if len(X) == 0:
+            logger.error("학습할 압력 데이터가 없습니다!")
+            return
+
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
+
+        params = {"n_neighbors": 5, "weights": "distance", "p": 2}
+        if tune:
+            search = GridSearchCV(
+                KNeighborsClassifier(algorithm="kd_tree"),
+                PARAM_GRID,
+                cv=5,
+                n_jobs=-1,
+                scoring="accuracy",
+            )
+            search.fit(X_train, y_train)
+            params = search.best_params_
+            logger.info(
+                f"최적 하이퍼파라미터: {params} (교차검증 정확도 {search.best_score_:.4f})"
+            )
+
+        self.best_params = dict(params)
+        self.model = KNeighborsClassifier(algorithm="kd_tree", **params)
+        self.model.fit(X_train, y_train)
+        accuracy = accuracy_score(y_test, self.model.predict(X_test))
+        logger.info(f"압력 모델 정확도: {accuracy:.4f}")
+
+        # 평가 후 전체 데이터로 인덱스 재구축
+        self.model.fit(X, y)
+
+    def predict_frames(self, frames: Sequence[Sequence[float]]) -> List[Dict]:
+        """
+        압력 프레임 여러 개를 한 번의 인덱스 조회로 예측합니다.
+
+        Args:
+            frames: (N, 센서 수) 압력 값
+
+        Returns:
+            프레임별 예측 결과 딕셔너리 목록
+        """
+        if self.model is None:
+            logger.error("압력 모델이 학습되지 않았습니다!")
+            return [{"error": "Model not trained"}]
+
+        X = np.asarray(frames, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_columns):
+            return [
+                {
+                    "error": f"압력 프레임은 {len(self.feature_columns)}개 센서 값이어야 합니다."
+                }
+            ]
+
+        proba = self.model.predict_proba(X)
+        classes = self.model.classes_
+        best = proba.argmax(axis=1)
+        return [
+            {
+                "predicted_posture": int(classes[i]),
+                "confidence": float(row[i]),
+                "all_probabilities": {
+                    int(cls): float(p) for cls, p in zip(classes, row)
+                },
+            }
+            for row, i in zip(proba, best)
+        ]
+
+    def predict_frame(self, frame: Sequence[float]) -> Dict:
+        """압력 프레임 하나를 예측합니다."""
+        return self.predict_frames([frame])[0]
+
+    def save_model(self, model_path: str = "pressure_model.pkl") -> None:
+        """
+        학습된 모델을 KD-tree 인덱스와 함께 저장합니다.
+        """
+        if self.model is None:
+            logger.error("저장할 압력 모델이 없습니다!")
+            return
+
+        model_data = {
+            "model": self.model,
+            "feature_columns": self.feature_columns,
+            "best_params": self.best_params,
+        }
+        joblib.dump(model_data, model_path)
+        logger.info(f"압력 모델이 {model_path}에 저장되었습니다.")
+
+    def load_model(self, model_path: str = "pressure_model.pkl") -> bool:
+        """
+        저장된 모델을 로드합니다 (인덱스를 다시 만들지 않음).
+
+        Returns:
+            로드 성공 여부
+        """
+        try:
+            if not os.path.exists(model_path):
+                logger.warning(f"압력 모델 파일이 존재하지 않습니다: {model_path}")
+                return False
+
+            model_data = joblib.load(model_path)
+            self.model = model_data["model"]
+            self.feature_columns = model_data["feature_columns"]
+            self.best_params = model_data.get("best_params", {})
+
+            logger.info(f"압력 모델이 {model_path}에서 로드되었습니다.")
+            return True
+
+        except Exception as e:
+            logger.error(f"압력 모델 로드 중 오류: {e}")
+            return False
+
+
+if __name__ == "__main__":
+    # 압력 모델 학습 및 저장
+    pressure_classifier = PressureClassifier()
+    pressure_classifier.train_model()
+    pressure_classifier.save_model()
@@ -0,0 +1,213 @@
+"""
+압력 매트 특징 추출 엔진 - 압력 프레임 배열 전체를 한 번에 처리하는 벡터화 특징 계산
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+EPS = 1e-6
+
+# 센서 좌표 (x: 왼쪽 -1 ~ 오른쪽 +1, y: 뒤 -1 ~ 앞 +1)
+# 매트 배치 도면이 없으므로 FSR.py 채널 순서 기준의 가정값이며, 실제 배치에 맞게 교체해서 사용
+FSR_11_LAYOUT: Dict[str, Tuple[float, float]] = {
+    "s1": (-1.0, 1.0),
+    "s2": (-0.33, 1.0),
+    "s3": (0.33, 1.0),
+    "s4": (1.0, 1.0),
+    "s5": (-1.0, 0.0),
+    "s6": (-0.33, 0.0),
+    "s7": (0.33, 0.0),
+    "s8": (1.0, 0.0),
+    "s9": (-0.5, -1.0),
+    "s10": (0.5, -1.0),
+    "s11": (0.0, -1.0),
+}
+
+# 자세모음/압력 의 pv1..pv8 (2행 × 4열 가정)
+PV_8_LAYOUT: Dict[str, Tuple[float, float]] = {
+    "pv1": (-1.0, 1.0),
+    "pv2": (-0.33, 1.0),
+    "pv3": (0.33, 1.0),
+    "pv4": (1.0, 1.0),
+    "pv5": (-1.0, -1.0),
+    "pv6": (-0.33, -1.0),
+    "pv7": (0.33, -1.0),
+    "pv8": (1.0, -1.0),
+}
+
+SPATIAL_FEATURES = [
+    "total_load",
+    "cop_x",
+    "cop_y",
+    "lr_balance",
+    "fb_balance",
+]
+
+
+class PressureFeatureEngine:
+    """압력 프레임 (N, 센서 수) 배열에서 공간/시간 특징을 계산하는 엔진"""
+
+    def __init__(
+        self,
+        layout: Optional[Dict[str, Tuple[float, float]]] = None,
+        window: int = 5,
+    ):
+        """
+        특징 엔진 초기화
+
+        Args:
+            layout: 센서 컬럼 이름 → (x, y) 좌표 (기본값: FSR 11채널 배치)
+            window: 센서별 정규화 변화량을 계산할 슬라이딩 윈도우 크기 (프레임 수)
+        """
+        layout = FSR_11_LAYOUT if layout is None else layout
+        if window < 2:
+            raise ValueError("window는 2 이상이어야 합니다.")
+
+        self.columns: List[str] = list(layout.keys())
+        self.window = window
+        positions = np.array([layout[c] for c in self.columns], dtype=np.float64)
+        self.x = positions[:, 0]
+        self.y = positions[:, 1]
+
+        # 좌/우, 앞/뒤 그룹 가중치 (중앙선 위 센서는 어느 쪽에도 포함하지 않음)
+        self._lr_weights = np.sign(self.x)
+        self._fb_weights = np.sign(self.y)
+
+        self.feature_names = SPATIAL_FEATURES + [f"{c}_delta" for c in self.columns]
+
+    @classmethod
+    def for_columns(
+        cls, columns: Sequence[str], window: int = 5
+    ) -> "PressureFeatureEngine":
+        """컬럼 이름(s1.. 또는 pv1..)에 맞는 기본 배치로 엔진을 만듭니다."""
+        for layout in (FSR_11_LAYOUT, PV_8_LAYOUT):
+            if all(c in columns for c in layout):
+                return cls(layout, window)
+        raise ValueError(f"알 수 없는 압력 센서 컬럼: {list(columns)}")
+
+    def frames_from_dataframe(self, df: pd.DataFrame) -> np.ndarray:
+        """DataFrame에서 센서 컬럼만 (N, 센서 수) float 배열로 꺼냅니다."""
+        return df[self.columns].to_numpy(dtype=np.float64)
+
+    def spatial_features(self, frames: np.ndarray) -> np.ndarray:
+        """
+        프레임별 공간 특징을 계산합니다.
+
+        Args:
+            frames: (N, 센서 수) 압력 배열
+
+        Returns:
+            (N, 5) 배열 - total_load, cop_x, cop_y, lr_balance, fb_balance
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        total = frames.sum(axis=1)
+        safe_total = np.maximum(total, EPS)
+
+        out = np.empty((len(frames), len(SPATIAL_FEATURES)))
+        out[:, 0] = total
+        out[:, 1] = frames @ self.x / safe_total
+        out[:, 2] = frames @ self.y / safe_total
+        # (오른쪽 - 왼쪽) / 전체, (앞 - 뒤) / 전체
+        out[:, 3] = frames @ self._lr_weights / safe_total
+        out[:, 4] = frames @ self._fb_weights / safe_total
+        return out
+
+    def window_deltas(self, frames: np.ndarray) -> np.ndarray:
+        """
+        센서별 정규화 변화량 (윈도우 마지막 - 처음) / 윈도우 평균 을 계산합니다.
+
+        Args:
+            frames: (N, 센서 수) 압력 배열
+
+        Returns:
+            (N - window + 1, 센서 수) 배열 - i번째 행은 프레임 i + window - 1 에서 끝나는 윈도우
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        if len(frames) < self.window:
+            return np.empty((0, frames.shape[1]))
+
+        # (N - W + 1, 센서 수, W) 스트라이드 뷰 - 복사 없이 윈도우 구성
+        windows = sliding_window_view(frames, self.window, axis=0)
+        window_mean = windows.mean(axis=2)
+        return (windows[:, :, -1] - windows[:, :, 0]) / np.maximum(window_mean, EPS)
+
+    def transform(self, frames: np.ndarray) -> np.ndarray:
+        """
+        공간 특징과 윈도우 변화량을 합친 특징 행렬을 계산합니다.
+
+        Returns:
+            (N - window + 1, 특징 수) 배열 - 각 행은 윈도우 마지막 프레임 기준
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        deltas = self.window_deltas(frames)
+        spatial = self.spatial_features(frames[self.window - 1 :])
+        return np.hstack([spatial, deltas])
+
+    def transform_dataframe(
+        self, df: pd.DataFrame, label_column: Optional[str] = "pose"
+    ) -> pd.DataFrame:
+        """
+        기록 DataFrame에서 특징 DataFrame을 만듭니다 (배치 학습용).
+
+        라벨 컬럼이 있으면 윈도우가 같은 라벨 안에 있는 행만 남기고 라벨을 붙입니다.
+        """
+        frames = self.frames_from_dataframe(df)
+        features = pd.DataFrame(self.transform(frames), columns=self.feature_names)
+
+        if label_column and label_column in df.columns:
+            labels = df[label_column].to_numpy()
+            label_windows = sliding_window_view(labels, self.window)
+            same_label = (label_windows == label_windows[:, :1]).all(axis=1)
+            features[label_column] = labels[self.window - 1 :]
+            features = features[same_label].reset_index(drop=True)
+        return features
+
+
+class OnlinePressureFeatures:
+    """실시간 경로용 - 프레임 하나씩 받아 배치 transform과 같은 특징 벡터를 계산"""
+
+    def __init__(self, engine: PressureFeatureEngine):
+        """
+        Args:
+            engine: 특징 정의를 공유할 PressureFeatureEngine
+        """
+        self.engine = engine
+        self._buffer = np.zeros((engine.window, len(engine.columns)))
+        self._sum = np.zeros(len(engine.columns))
+        self._count = 0
+
+    def reset(self) -> None:
+        self._buffer.fill(0.0)
+        self._sum.fill(0.0)
+        self._count = 0
+
+    def update(self, frame: Sequence[float]) -> Optional[np.ndarray]:
+        """
+        프레임 하나를 반영합니다.
+
+        Args:
+            frame: 센서 수 길이의 압력 값
+
+        Returns:
+            특징 벡터 (윈도우가 채워지기 전에는 None)
+        """
+        frame = np.asarray(frame, dtype=np.float64)
+        window = self.engine.window
+        slot = self._count % window
+
+        self._sum += frame - self._buffer[slot]
+        self._buffer[slot] = frame
+        self._count += 1
+        if self._count < window:
+            return None
+
+        oldest = self._buffer[self._count % window]
+        deltas = (frame - oldest) / np.maximum(self._sum / window, EPS)
+        spatial = self.engine.spatial_features(frame[np.newaxis, :])[0]
+        return np.concatenate([spatial, deltas])
@@ -0,0 +1,256 @@
+"""
+실행 중 서버의 온디맨드 프로파일링 - 다음 N개 메시지 또는 T초 동안만 켜는 프로파일러
+
+모드:
+    cpu    : cProfile 결정적 프로파일 (이벤트 루프 스레드, 함수별 누적 시간)
+    sample : 이벤트 루프 스레드의 스택을 주기적으로 표본 추출 (오버헤드가 작음)
+    memory : tracemalloc 시작/종료 스냅샷 차이 (코드 위치별 메모리 증가량)
+
+비활성 상태에서는 요청 경로가 ServerProfiler.active 가 None 인지만 확인합니다.
+"""
+
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MODES = ("cpu", "sample", "memory")
+# 모드별 결과 형식 (첫 번째가 기본값)
+FORMATS = {
+    "cpu": ("text", "pstats"),
+    "sample": ("text", "collapsed"),
+    "memory": ("text",),
+}
+DEFAULT_SECONDS = 30.0
+MAX_SECONDS = 600.0
+# sample 모드 표본 추출 간격 하한 - 더 짧으면 표본 추출 스레드가 GIL을 독점해 이벤트 루프가 멈춤
+MIN_INTERVAL_MS = 1.0
+
+
+class ProfileSession:
+    """프로파일링 한 번의 상태와 결과"""
+
+    def __init__(
+        self,
+        mode: str = "cpu",
+        max_messages: Optional[int] = None,
+        max_seconds: float = DEFAULT_SECONDS,
+        interval_ms: float = 5.0,
+        top: int = 50,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            mode: "cpu", "sample", "memory"
+            max_messages: 이만큼 메시지를 처리하면 종료 (None이면 시간으로만 종료)
+            max_seconds: 최대 실행 시간 (초)
+            interval_ms: sample 모드의 표본 추출 간격 (MIN_INTERVAL_MS 이상)
+            top: 텍스트 결과에 남길 항목 수 (1 이상)
+            clock: 초 단위 단조 시계
+
+        Raises:
+            ValueError: 인자가 범위를 벗어난 경우
+        """
+        if mode not in MODES:
+            raise ValueError(f"지원하지 않는 프로파일 모드: {mode}")
+        if not 0 < max_seconds <= MAX_SECONDS:
+            raise ValueError(
+                f"max_seconds는 0보다 크고 {MAX_SECONDS:g} 이하여야 합니다."
+            )
+        if max_messages is not None and max_messages < 1:
+            raise ValueError("messages는 1 이상이어야 합니다.")
+        if not interval_ms >= MIN_INTERVAL_MS:
+            raise ValueError(f"interval_ms는 {MIN_INTERVAL_MS:g} 이상이어야 합니다.")
+        if top < 1:
+            raise ValueError("top은 1 이상이어야 합니다.")
+        self.mode = mode
+        self.max_messages = max_messages
+        self.max_seconds = max_seconds
+        self.interval_ms = interval_ms
+        self.top = top
+        self.clock = clock
+
+        self.messages = 0
+        self.started_at: Optional[float] = None
+        self.duration_s: Optional[float] = None
+        self.results: Dict[str, bytes] = {}
+        self._profile: Optional[cProfile.Profile] = None
+        self._snapshot = None
+        self._owns_tracemalloc = False
+        self._sampler: Optional[threading.Thread] = None
+        self._sampling = threading.Event()
+        self._samples: Counter = Counter()
+
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None and self.duration_s is None
+
+    def start(self) -> None:
+        """프로파일링을 시작합니다 (프로파일할 스레드, 즉 이벤트 루프에서 호출)."""
+        self.started_at = self.clock()
+        if self.mode == "cpu":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.mode == "sample":
+            target = threading.get_ident()
+            self._sampler = threading.Thread(
+                target=self._sample_loop, args=(target,), name="profiler", daemon=True
+            )
+            self._sampler.start()
+        else:
+            # 이미 추적 중이면(PYTHONTRACEMALLOC 등) 끝날 때 끄지 않음
+            self._owns_tracemalloc = not tracemalloc.is_tracing()
+            if self._owns_tracemalloc:
+                tracemalloc.start(10)
+            self._snapshot = tracemalloc.take_snapshot()
+
+    def message_done(self) -> bool:
+        """
+        처리한 메시지 하나를 셉니다.
+
+        Returns:
+            종료 조건(메시지 수 또는 시간)에 도달했는지 여부
+        """
+        self.messages += 1
+        if self.max_messages is not None and self.messages >= self.max_messages:
+            return True
+        return self.clock() - self.started_at >= self.max_seconds
+
+    def stop(self) -> None:
+        """프로파일링을 끝내고 결과를 만듭니다."""
+        if not self.running:
+            return
+        self.duration_s = self.clock() - self.started_at
+        if self.mode == "cpu":
+            self._profile.disable()
+            self._cpu_results()
+        elif self.mode == "sample":
+            self._sampling.set()
+            self._sampler.join()
+            self._sample_results()
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+            self._memory_results(snapshot)
+        logger.info(
+            f"프로파일링 종료: {self.mode} ({self.messages}개 메시지, {self.duration_s:.1f}초)"
+        )
+
+    def _cpu_results(self) -> None:
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        self.results["text"] = stream.getvalue().encode()
+        # pstats.Stats(파일)로 다시 읽을 수 있는 형식 (snakeviz 등)
+        self._profile.create_stats()
+        self.results["pstats"] = marshal.dumps(self._profile.stats)
+        self._profile = None
+
+    def _sample_loop(self, target: int) -> None:
+        interval = self.interval_ms / 1000
+        while not self._sampling.wait(interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self._samples[";".join(reversed(stack))] += 1
+
+    def _sample_results(self) -> None:
+        total = sum(self._samples.values())
+        own: Counter = Counter()
+        cumulative: Counter = Counter()
+        for stack, count in self._samples.items():
+            functions = stack.split(";")
+            own[functions[-1]] += count
+            # 재귀 호출은 한 번만 셈
+            for function in set(functions):
+                cumulative[function] += count
+
+        lines = [
+            f"표본 {total}개 (간격 {self.interval_ms:g}ms, {self.duration_s:.1f}초)",
+            "",
+            f"{'누적%':>7} {'자체%':>7} {'누적(ms)':>10}  함수",
+        ]
+        for function, count in cumulative.most_common(self.top):
+            lines.append(
+                f"{count / total:>7.1%} {own[function] / max(total, 1):>7.1%} "
+                f"{count * self.interval_ms:>10.0f}  {function}"
+            )
+        self.results["text"] = "\n".join(lines).encode() if total else b"no samples\n"
+        # flamegraph.pl / speedscope 에서 읽는 collapsed stack 형식
+        self.results["collapsed"] = "".join(
+            f"{stack} {count}\n" for stack, count in self._samples.items()
+        ).encode()
+        self._samples.clear()
+
+    def _memory_results(self, snapshot) -> None:
+        stats = snapshot.compare_to(self._snapshot, "lineno")
+        lines = [f"메모리 증가량 상위 {self.top}개 ({self.duration_s:.1f}초)", ""]
+        lines.extend(str(stat) for stat in stats[: self.top])
+        self.results["text"] = "\n".join(lines).encode()
+        self._snapshot = None
+
+    def status(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "running": self.running,
+            "messages": self.messages,
+            "max_messages": self.max_messages,
+            "max_seconds": self.max_seconds,
+            "duration_s": self.duration_s,
+            "formats": sorted(self.results),
+        }
+
+
+class ServerProfiler:
+    """서버 전체에서 한 번에 하나의 프로파일링만 허용하는 관리자"""
+
+    def __init__(self):
+        self.active: Optional[ProfileSession] = None
+        self.last: Optional[ProfileSession] = None
+
+    def start(self, session: ProfileSession) -> ProfileSession:
+        if self.active is not None:
+            raise RuntimeError("이미 프로파일링 중입니다.")
+        session.start()
+        self.active = session
+        logger.info(f"프로파일링 시작: {session.status()}")
+        return session
+
+    def message_done(self) -> None:
+        """요청 경로에서 active 가 있을 때만 호출"""
+        session = self.active
+        if session is not None and session.message_done():
+            self.stop(session)
+
+    def stop(
+        self, session: Optional[ProfileSession] = None
+    ) -> Optional[ProfileSession]:
+        """
+        실행 중인 프로파일링을 끝냅니다.
+
+        Args:
+            session: 이 세션이 실행 중일 때만 종료 (None이면 실행 중인 세션)
+        """
+        active = self.active
+        if active is None or (session is not None and session is not active):
+            return self.last
+        self.active = None
+        active.stop()
+        self.last = active
+        return active
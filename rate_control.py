@@ -0,0 +1,147 @@
+"""
+적응형 샘플링 주기 제어 - 최근 자세 안정성으로 기기의 전송 주기를 권장 (서버 → 기기 rate_control 메시지)
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from posture_classifier import motion_features
+from ring_buffer import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+# 안정 단계 순서 (뒤로 갈수록 높은 주기)
+LEVELS = ("stable", "normal", "transition")
+
+DEFAULT_RATES_HZ = {"stable": 5, "normal": 20, "transition": 50}
+
+
+class RateController:
+    """
+    연결별 샘플링 주기 결정기
+
+    최근 window개 샘플의 std_diff와 stability_ratio(분류기와 같은 정의)로 단계를 정합니다.
+    기기의 전송 주기가 바뀌어도 판정이 같도록 샘플은 reference_hz 간격으로 골라 씁니다
+    (더 촘촘히 들어온 샘플은 판정에 쓰지 않음).
+    주기를 올리는 변경은 즉시, 내리는 변경은 같은 판정이 hold_s 동안 유지되어야 적용해
+    자세 전환을 놓치지 않으면서 주기가 흔들리지 않게 합니다.
+    """
+
+    __slots__ = (
+        "rates_hz",
+        "window",
+        "_min_interval_ms",
+        "stable_ratio",
+        "stable_std",
+        "transition_ratio",
+        "transition_std",
+        "hold_s",
+        "clock",
+        "level",
+        "_pitches",
+        "_last_timestamp",
+        "_candidate",
+        "_candidate_since",
+    )
+
+    def __init__(
+        self,
+        rates_hz: Optional[Dict[str, int]] = None,
+        window: int = 20,
+        reference_hz: float = 5.0,
+        stable_ratio: float = 0.95,
+        stable_std: float = 0.3,
+        transition_ratio: float = 0.6,
+        transition_std: float = 2.0,
+        hold_s: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            rates_hz: 단계별 권장 주기 (stable/normal/transition)
+            window: 안정성을 판단할 최근 샘플 수
+            reference_hz: 판정에 쓰는 샘플 간격 (기본 5Hz → 200ms마다 한 샘플)
+            stable_ratio: stable 판정에 필요한 최소 stability_ratio
+            stable_std: stable 판정에 허용하는 최대 std_diff (도)
+            transition_ratio: stability_ratio가 이보다 낮으면 transition
+            transition_std: std_diff가 이 이상이면 transition (도)
+            hold_s: 주기를 내리기 전에 판정이 유지되어야 하는 시간 (초)
+            clock: 초 단위 단조 시계
+        """
+        # 모든 단계가 지정된 dict는 복사하지 않고 연결 간에 공유 (수정하지 않음)
+        if rates_hz is None:
+            self.rates_hz = DEFAULT_RATES_HZ
+        elif rates_hz.keys() >= set(LEVELS):
+            self.rates_hz = rates_hz
+        else:
+            self.rates_hz = dict(DEFAULT_RATES_HZ, **rates_hz)
+        self.window = window
+        self._min_interval_ms = 0.9 * 1000.0 / reference_hz
+        self.stable_ratio = stable_ratio
+        self.stable_std = stable_std
+        self.transition_ratio = transition_ratio
+        self.transition_std = transition_std
+        self.hold_s = hold_s
+        self.clock = clock
+
+        # 아직 권장하지 않음 - 첫 판정은 기기의 기본 주기와 무관하게 전송
+        self.level: Optional[str] = None
+        self._pitches = RingBuffer(window)
+        self._last_timestamp: Optional[float] = None
+        self._candidate: Optional[str] = None
+        self._candidate_since = 0.0
+
+    def classify(self, std_diff: float, stability_ratio: float) -> str:
+        if stability_ratio < self.transition_ratio or std_diff >= self.transition_std:
+            return "transition"
+        if stability_ratio >= self.stable_ratio and std_diff <= self.stable_std:
+            return "stable"
+        return "normal"
+
+    def observe(self, timestamp: float, relative_pitch: float) -> Optional[Dict]:
+        """
+        샘플 하나를 반영합니다.
+
+        Args:
+            timestamp: 샘플 타임스탬프 (ms)
+            relative_pitch: 상대 피치 각도
+
+        Returns:
+            권장 주기가 바뀌면 rate_control 메시지 내용, 아니면 None
+        """
+        last = self._last_timestamp
+        # 간격 오차를 감안해 기준 간격의 90% 이상 지난 샘플만 사용
+        if last is not None and 0 <= timestamp - last < self._min_interval_ms:
+            return None
+        self._last_timestamp = timestamp
+        self._pitches.append(relative_pitch)
+        if not self._pitches.full:
+            return None
+
+        features = motion_features(self._pitches.view())
+        std_diff = float(features["std_diff"])
+        stability_ratio = float(features["stability_ratio"])
+        level = self.classify(std_diff, stability_ratio)
+
+        now = self.clock()
+        if level == self.level:
+            self._candidate = None
+            return None
+        if self.level is not None and LEVELS.index(level) < LEVELS.index(self.level):
+            # 주기 낮추기는 판정이 hold_s 동안 유지될 때만
+            if level != self._candidate:
+                self._candidate, self._candidate_since = level, now
+                return None
+            if now - self._candidate_since < self.hold_s:
+                return None
+
+        self.level = level
+        self._candidate = None
+        return {
+            "type": "rate_control",
+            "level": level,
+            "sample_rate_hz": self.rates_hz[level],
+            "std_diff": std_diff,
+            "stability_ratio": stability_ratio,
+        }
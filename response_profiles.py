@@ -0,0 +1,122 @@
+"""
+예측 응답 프로필 - 연결 시 정한 프로필에 맞춰 재사용 템플릿으로 응답을 만듦
+
+full    : 기존 응답 전체 (모든 자세 확률, 입력 값, 서버 시각)
+minimal : 자세와 확신도만
+delta   : 자세와 확신도, 그리고 확률이 epsilon 넘게 바뀌었을 때만 all_probabilities
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILES = ("full", "minimal", "delta")
+DEFAULT_EPSILON = 0.05
+
+
+class TimestampCache:
+    """ISO 형식 서버 시각 - 같은 밀리초 안에서는 포맷한 문자열을 재사용"""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._ms = -1
+        self._text = ""
+
+    def now(self) -> str:
+        ms = int(self.clock() * 1000)
+        if ms != self._ms:
+            self._ms = ms
+            self._text = datetime.fromtimestamp(ms / 1000).isoformat(
+                timespec="milliseconds"
+            )
+        return self._text
+
+
+# 서버 전체에서 공유 (이벤트 루프 스레드에서만 사용)
+timestamps = TimestampCache()
+
+
+class ResponseEncoder:
+    """
+    연결별 예측 응답 생성기
+
+    응답 dict 하나를 템플릿으로 두고 필드 값만 바꿔 반환합니다. 반환한 dict는 다음
+    encode 호출에서 덮어쓰므로 바로 직렬화해야 합니다.
+    """
+
+    __slots__ = ("profile", "epsilon", "clock", "_sent_probabilities", "_template")
+
+    def __init__(
+        self,
+        profile: str = "full",
+        epsilon: float = DEFAULT_EPSILON,
+        clock: Optional[TimestampCache] = None,
+    ):
+        """
+        Args:
+            profile: "full", "minimal", "delta"
+            epsilon: delta 프로필에서 확률을 다시 보낼 최소 변화량
+            clock: 서버 시각 캐시 (기본값: 모듈 공용 캐시)
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"지원하지 않는 응답 프로필: {profile}")
+        self.profile = profile
+        self.epsilon = epsilon
+        self.clock = clock or timestamps
+        self._sent_probabilities: Optional[Dict[int, float]] = None
+        self._template: Dict = {
+            "type": "prediction",
+            "predicted_posture": None,
+            "confidence": None,
+        }
+        if profile == "full":
+            self._template.update(
+                {
+                    "all_probabilities": None,
+                    "input_timestamp": None,
+                    "input_relative_pitch": None,
+                    "server_timestamp": None,
+                }
+            )
+
+    def encode(self, prediction_result: Dict) -> Dict:
+        """
+        예측 결과로 응답을 만듭니다.
+
+        Args:
+            prediction_result: PostureClassifier.predict_posture 결과
+
+        Returns:
+            응답 dict (재사용 템플릿)
+        """
+        response = self._template
+        response["predicted_posture"] = prediction_result["predicted_posture"]
+        response["confidence"] = prediction_result["confidence"]
+
+        if self.profile == "full":
+            response["all_probabilities"] = prediction_result["all_probabilities"]
+            response["input_timestamp"] = prediction_result["timestamp"]
+            response["input_relative_pitch"] = prediction_result["relative_pitch"]
+            response["server_timestamp"] = self.clock.now()
+        elif self.profile == "delta":
+            probabilities = prediction_result["all_probabilities"]
+            if self._moved(probabilities):
+                self._sent_probabilities = probabilities
+                response["all_probabilities"] = probabilities
+            else:
+                response.pop("all_probabilities", None)
+        return response
+
+    def _moved(self, probabilities: Dict[int, float]) -> bool:
+        """마지막으로 보낸 확률에서 epsilon 넘게 바뀐 클래스가 있는지 여부"""
+        sent = self._sent_probabilities
+        if sent is None or sent.keys() != probabilities.keys():
+            return True
+        epsilon = self.epsilon
+        for cls, prob in probabilities.items():
+            if abs(prob - sent[cls]) > epsilon:
+                return True
+        return False
@@ -0,0 +1,64 @@
+"""
+고정 크기 NumPy 링 버퍼 - 연결별 최근 샘플 창을 미리 할당한 배열 하나에 보관
+
+저장 공간을 두 배로 잡고 값을 두 위치에 함께 써 두므로, 가득 찬 뒤에도 시간순 창을
+복사 없이 연속된 슬라이스(view)로 꺼낼 수 있습니다.
+"""
+
+from typing import List
+
+import numpy as np
+
+
+class RingBuffer:
+    """최근 capacity개 값을 보관하는 링 버퍼 (추가 시 메모리 할당 없음)"""
+
+    __slots__ = ("capacity", "_data", "_head", "_size")
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        """
+        Args:
+            capacity: 보관할 값 수
+            dtype: 값의 NumPy 자료형
+        """
+        if capacity < 1:
+            raise ValueError("capacity는 1 이상이어야 합니다.")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        # 다음에 쓸 위치 (가득 찬 뒤에는 가장 오래된 값의 위치)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        return self._size == self.capacity
+
+    def append(self, value) -> None:
+        """값을 추가합니다 (가득 찼으면 가장 오래된 값을 덮어씀)."""
+        head = self._head
+        self._data[head] = value
+        self._data[head + self.capacity] = value
+        self._head = (head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def view(self) -> np.ndarray:
+        """
+        시간순 창 (오래된 값 → 최근 값)
+
+        Returns:
+            내부 배열의 view - 다음 append 전까지만 유효하므로 보관하려면 복사해야 합니다.
+        """
+        if self._size < self.capacity:
+            return self._data[: self._size]
+        return self._data[self._head : self._head + self.capacity]
+
+    def tolist(self) -> List:
+        return self.view().tolist()
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
@@ -0,0 +1,523 @@
+"""
+시리얼/블루투스(RFCOMM) 게이트웨이 - 여러 센서 기기의 스트림을 한 프로세스에서 읽어 서버 /ws로 묶어 전송
+
+기기마다 노트북에서 COM 포트를 고정한 스크립트를 돌리는 대신, 하나의 asyncio 루프가 모든 기기를
+읽고 기기별 피치 오프셋을 적용한 샘플을 기기당 웹소켓 연결 하나로 묶어(JSON 배열 프레임) 보냅니다.
+서버나 기기 연결이 끊기면 지수 백오프로 다시 연결하고, 보내지 못한 샘플은 max_buffer개까지 보관합니다.
+
+지원하는 기기 스트림 (한 줄에 샘플 하나)
+    - 블루투스 스케치 (블루투스/arduino/arduino.ino): {"timestamp": ms, "relativePitch": 각도}
+    - IMU 스케치 (아두이노 코드/IMU.ino): "timestamp,pitch" (절대 각도 - 오프셋으로 상대 각도 계산)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from imu_recorder import parse_imu_line
+
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = None
+
+try:
+    import websockets
+    from websockets.exceptions import ConnectionClosed, InvalidHandshake
+except ImportError:
+    websockets = None
+
+logger = logging.getLogger(__name__)
+
+# 아두이노 스케치의 기본 시리얼 속도
+DEFAULT_BAUD = 9600
+
+# 블루투스 스케치는 start 명령을 받으면 5초간 기준 자세를 잡은 뒤 측정을 시작
+START_COMMAND = b'{"command": "start"}\n'
+
+RFCOMM_SCHEME = "rfcomm://"
+
+# 서버가 한 프레임에 받는 최대 샘플 수 (서버와 같은 MAX_FRAME_SAMPLES 환경 변수)
+MAX_FRAME_SAMPLES = int(os.getenv("MAX_FRAME_SAMPLES", "100"))
+
+
+@dataclass
+class DeviceSpec:
+    """
+    기기 하나의 연결 설정
+
+    offset이 None이면 절대 각도 스트림은 첫 샘플을 기준 자세로 삼고, 상대 각도 스트림은 그대로
+    보냅니다. 숫자면 두 스트림 모두 그 값을 빼서 장착 각도를 보정합니다.
+    """
+
+    name: str
+    path: str
+    baud: int = DEFAULT_BAUD
+    offset: Optional[float] = None
+    start: bool = True
+
+
+def parse_device_spec(text: str) -> DeviceSpec:
+    """
+    "이름=경로[,baud=9600][,offset=auto|각도][,start=1|0]" 형식의 기기 설정을 읽습니다.
+
+    경로는 시리얼 장치(/dev/ttyUSB0, /dev/rfcomm0, pty) 또는 rfcomm://MAC[/채널]입니다.
+    """
+    name, sep, rest = text.partition("=")
+    if not sep or not name or not rest:
+        raise ValueError(f"기기 설정 형식이 올바르지 않습니다: {text}")
+    path, *options = rest.split(",")
+    spec = DeviceSpec(name=name, path=path)
+    for option in options:
+        key, _, value = option.partition("=")
+        if key == "baud":
+            spec.baud = int(value)
+        elif key == "offset":
+            spec.offset = None if value == "auto" else float(value)
+        elif key == "start":
+            spec.start = value.lower() in ("1", "true", "yes")
+        else:
+            raise ValueError(f"알 수 없는 기기 설정: {key}")
+    return spec
+
+
+def parse_sample(raw: bytes) -> Optional[Tuple[Optional[int], float, bool]]:
+    """
+    기기 한 줄에서 샘플을 읽습니다.
+
+    Returns:
+        (기기 타임스탬프 ms, 각도, 상대 각도 여부) - 샘플이 아닌 줄(상태 메시지 등)이면 None
+    """
+    line = raw.decode("utf-8", errors="replace").strip()
+    if line.startswith("{"):
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        pitch = data.get("relativePitch")
+        if not isinstance(pitch, (int, float)):
+            if "status" in data:
+                logger.info(f"기기 상태: {data['status']}")
+            return None
+        timestamp = data.get("timestamp")
+        return (
+            int(timestamp) if isinstance(timestamp, (int, float)) else None,
+            float(pitch),
+            True,
+        )
+
+    pitch = parse_imu_line(line)
+    if pitch is None:
+        return None
+    return int(line.split(",")[0]), pitch, False
+
+
+class PitchOffset:
+    """기기별 피치 오프셋 (DeviceSpec.offset 참고)"""
+
+    __slots__ = ("fixed", "baseline")
+
+    def __init__(self, fixed: Optional[float] = None):
+        self.fixed = fixed
+        self.baseline = fixed
+
+    def apply(self, pitch: float, relative: bool) -> float:
+        if relative:
+            return pitch - self.fixed if self.fixed is not None else pitch
+        if self.baseline is None:
+            # 첫 샘플을 기준 자세로 (ImuRecorder와 같은 방식)
+            self.baseline = pitch
+        return pitch - self.baseline
+
+
+class Backoff:
+    """지터를 섞은 지수 백오프 - 재연결할 때마다 base × 2^n (최대 max_s), 연결되면 초기화"""
+
+    def __init__(
+        self,
+        base_s: float = 0.5,
+        max_s: float = 30.0,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.base_s = base_s
+        self.max_s = max_s
+        self.rng = rng
+        self.attempts = 0
+
+    def next(self) -> float:
+        delay = min(self.max_s, self.base_s * 2**self.attempts)
+        self.attempts += 1
+        # 기기들이 동시에 다시 연결하지 않도록 50~100% 사이로 흩뜨림
+        return delay * (0.5 + 0.5 * self.rng())
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+
+class SerialStream:
+    """시리얼 장치 또는 RFCOMM 소켓의 줄 단위 읽기와 명령 쓰기"""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        write: Callable[[bytes], None],
+        close: Callable[[], None],
+    ):
+        self.reader = reader
+        self.write = write
+        self.close = close
+
+
+async def open_stream(spec: DeviceSpec) -> SerialStream:
+    """기기 스트림을 엽니다 (시리얼 장치는 raw 모드와 통신 속도를 설정)."""
+    loop = asyncio.get_running_loop()
+    if spec.path.startswith(RFCOMM_SCHEME):
+        address, _, channel = spec.path[len(RFCOMM_SCHEME) :].partition("/")
+        sock = socket.socket(
+            socket.AF_BLUETOOTH, socket.SOCK_STREAM, socket.BTPROTO_RFCOMM
+        )
+        sock.setblocking(False)
+        await loop.sock_connect(sock, (address, int(channel or 1)))
+        reader, writer = await asyncio.open_connection(sock=sock)
+        return SerialStream(reader, writer.write, writer.close)
+
+    fd = os.open(spec.path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    if termios is not None and os.isatty(fd):
+        tty.setraw(fd)
+        attributes = termios.tcgetattr(fd)
+        speed = getattr(termios, f"B{spec.baud}", None)
+        if speed is not None:
+            attributes[4] = attributes[5] = speed
+        termios.tcsetattr(fd, termios.TCSANOW, attributes)
+
+    write_fd = os.dup(fd)
+    reader = asyncio.StreamReader()
+    transport, _ = await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, "rb", buffering=0)
+    )
+
+    def close():
+        transport.close()
+        os.close(write_fd)
+
+    return SerialStream(reader, lambda data: os.write(write_fd, data), close)
+
+
+class DeviceStats:
+    """기기 하나의 누적 처리량"""
+
+    __slots__ = (
+        "read",
+        "sent",
+        "frames",
+        "dropped",
+        "predictions",
+        "reconnects",
+        "device_errors",
+        "connected",
+    )
+
+    def __init__(self):
+        self.read = 0
+        self.sent = 0
+        self.frames = 0
+        self.dropped = 0
+        self.predictions = 0
+        self.reconnects = 0
+        self.device_errors = 0
+        self.connected = False
+
+
+class DeviceLink:
+    """기기 하나의 읽기 → 오프셋 적용 → 묶음 전송"""
+
+    def __init__(
+        self,
+        spec: DeviceSpec,
+        server_url: str,
+        batch_size: int = 50,
+        batch_interval_s: float = 0.2,
+        max_batch_interval_s: float = 2.0,
+        recover_after_s: float = 5.0,
+        max_frame_samples: int = MAX_FRAME_SAMPLES,
+        max_buffer: int = 5000,
+        backoff: Optional[Callable[[], Backoff]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            spec: 기기 설정
+            server_url: 서버 웹소켓 주소 (예: ws://localhost:8000/ws)
+            batch_size: 한 프레임의 최대 샘플 수 (서버 MAX_FRAME_SAMPLES 이하)
+            batch_interval_s: 샘플이 batch_size만큼 모이지 않아도 보내는 간격
+            max_batch_interval_s: 서버가 slow_down을 보낼 때 늘릴 전송 간격 상한
+            recover_after_s: slow_down이 이만큼 없을 때마다 늘린 간격을 절반으로 되돌림
+            max_frame_samples: 서버의 MAX_FRAME_SAMPLES (batch_size가 넘으면 ValueError)
+            max_buffer: 보내지 못한 샘플 보관 상한 (넘으면 오래된 것부터 버림)
+            backoff: 재연결 백오프 생성 함수 (기기 스트림과 서버 연결에 각각 사용)
+            clock: 초 단위 단조 시계 (기기 타임스탬프가 없을 때 사용)
+        """
+        if not 1 <= batch_size <= max_frame_samples:
+            raise ValueError(
+                f"batch_size는 1 이상 서버 MAX_FRAME_SAMPLES({max_frame_samples}) 이하여야 합니다."
+            )
+        self.spec = spec
+        self.url = f"{server_url}?device_id={spec.name}"
+        self.batch_size = batch_size
+        self.batch_interval_s = batch_interval_s
+        self.base_batch_interval_s = batch_interval_s
+        self.max_batch_interval_s = max_batch_interval_s
+        self.recover_after_s = recover_after_s
+        self.max_buffer = max_buffer
+        self.clock = clock
+        backoff = backoff or Backoff
+        self.device_backoff = backoff()
+        self.server_backoff = backoff()
+        self.offset = PitchOffset(spec.offset)
+        self.stats = DeviceStats()
+        self.buffer: List[Dict] = []
+        self.last_prediction: Optional[Dict] = None
+        self._started = clock()
+        self._filled = asyncio.Event()
+        self._retry_after_s: Optional[float] = None
+        self._slowed_at = clock()
+
+    async def run(self) -> None:
+        await asyncio.gather(self._read_device(), self._uplink())
+
+    def handle_line(self, raw: bytes) -> bool:
+        """기기 한 줄을 샘플로 바꿔 전송 대기열에 넣습니다."""
+        sample = parse_sample(raw)
+        if sample is None:
+            return False
+        timestamp, pitch, relative = sample
+        if timestamp is None:
+            timestamp = int((self.clock() - self._started) * 1000)
+        self.buffer.append(
+            {
+                "timestamp": timestamp,
+                "relativePitch": round(self.offset.apply(pitch, relative), 4),
+            }
+        )
+        self.stats.read += 1
+        if len(self.buffer) > self.max_buffer:
+            overflow = len(self.buffer) - self.max_buffer
+            del self.buffer[:overflow]
+            self.stats.dropped += overflow
+        if len(self.buffer) >= self.batch_size:
+            self._filled.set()
+        return True
+
+    def slow_down(self) -> None:
+        """서버 속도 제한 알림 - 전송 간격을 두 배로 (max_batch_interval_s까지)."""
+        self.batch_interval_s = min(
+            self.max_batch_interval_s, self.batch_interval_s * 2
+        )
+        self._slowed_at = self.clock()
+        logger.warning(
+            f"기기 {self.spec.name} 전송 간격 {self.batch_interval_s:.2f}초로 늘림 (서버 속도 제한)"
+        )
+
+    def relax(self) -> None:
+        """slow_down이 recover_after_s 동안 없으면 전송 간격을 절반씩 원래 값으로 되돌립니다."""
+        if self.batch_interval_s <= self.base_batch_interval_s:
+            return
+        now = self.clock()
+        if now - self._slowed_at >= self.recover_after_s:
+            self.batch_interval_s = max(
+                self.base_batch_interval_s, self.batch_interval_s / 2
+            )
+            self._slowed_at = now
+
+    async def _read_device(self) -> None:
+        while True:
+            try:
+                stream = await open_stream(self.spec)
+            except OSError as e:
+                self.stats.device_errors += 1
+                delay = self.device_backoff.next()
+                logger.warning(
+                    f"기기 {self.spec.name} 열기 실패 ({e}), {delay:.1f}초 후 재시도"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            logger.info(f"기기 {self.spec.name} 연결: {self.spec.path}")
+            try:
+                if self.spec.start:
+                    stream.write(START_COMMAND)
+                while True:
+                    line = await stream.reader.readline()
+                    if not line:
+                        break
+                    self.device_backoff.reset()
+                    self.handle_line(line)
+            except OSError as e:
+                logger.warning(f"기기 {self.spec.name} 읽기 오류: {e}")
+            finally:
+                stream.close()
+            self.stats.device_errors += 1
+            await asyncio.sleep(self.device_backoff.next())
+
+    async def _uplink(self) -> None:
+        if websockets is None:
+            raise RuntimeError("websockets 패키지가 없습니다.")
+        while True:
+            try:
+                async with websockets.connect(self.url) as ws:
+                    self.stats.connected = True
+                    self.server_backoff.reset()
+                    logger.info(f"기기 {self.spec.name} 서버 연결: {self.url}")
+                    receiver = asyncio.create_task(self._receive(ws))
+                    try:
+                        await self._send_batches(ws, receiver)
+                    finally:
+                        receiver.cancel()
+            except (OSError, ConnectionClosed, InvalidHandshake) as e:
+                logger.warning(f"기기 {self.spec.name} 서버 연결 끊김: {e}")
+            self.stats.connected = False
+            self.stats.reconnects += 1
+            delay = self.server_backoff.next()
+            if self._retry_after_s is not None:
+                # 서버가 거부하며 알려 준 대기 시간을 우선
+                delay, self._retry_after_s = max(delay, self._retry_after_s), None
+            await asyncio.sleep(delay)
+
+    async def _send_batches(self, ws, receiver: asyncio.Task) -> None:
+        while not receiver.done():
+            try:
+                await asyncio.wait_for(self._filled.wait(), self.batch_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._filled.clear()
+            self.relax()
+            while self.buffer:
+                batch = self.buffer[: self.batch_size]
+                # 보낸 뒤에 지워야 끊겼을 때 다시 보낼 수 있음
+                await ws.send(json.dumps(batch))
+                del self.buffer[: len(batch)]
+                self.stats.sent += len(batch)
+                self.stats.frames += 1
+        # 서버가 연결을 닫음 - 원인(ConnectionClosed 등)을 다시 올림
+        receiver.result()
+
+    async def _receive(self, ws) -> None:
+        async for message in ws:
+            try:
+                data = json.loads(message)
+            except json.JSONDecodeError:
+                continue
+            kind = data.get("type")
+            if kind == "prediction":
+                self.stats.predictions += 1
+                self.last_prediction = data
+            elif kind == "ping":
+                await ws.send(json.dumps({"type": "pong"}))
+            elif kind == "slow_down":
+                self.slow_down()
+            elif kind == "rejected":
+                self._retry_after_s = data.get("retry_after_s")
+
+
+class SerialGateway:
+    """여러 기기 링크를 함께 돌리고 기기별·전체 처리량을 보고"""
+
+    def __init__(
+        self,
+        specs: List[DeviceSpec],
+        server_url: str,
+        report_interval_s: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        **link_options,
+    ):
+        """
+        Args:
+            specs: 기기 설정 목록 (이름이 겹치면 안 됨)
+            server_url: 서버 웹소켓 주소
+            report_interval_s: 처리량 로그 간격 (0이면 기록하지 않음)
+            clock: 초 단위 단조 시계
+            link_options: DeviceLink 옵션 (batch_size, batch_interval_s 등)
+        """
+        names = [spec.name for spec in specs]
+        if len(set(names)) != len(names):
+            raise ValueError("기기 이름이 겹칩니다.")
+        self.links = {
+            spec.name: DeviceLink(spec, server_url, clock=clock, **link_options)
+            for spec in specs
+        }
+        self.report_interval_s = report_interval_s
+        self.clock = clock
+        self._last_report = (clock(), {name: (0, 0) for name in self.links})
+
+    async def run(self, duration_s: Optional[float] = None) -> None:
+        """모든 기기를 돌립니다 (duration_s가 지나면 멈춤)."""
+        tasks = [asyncio.create_task(link.run()) for link in self.links.values()]
+        if self.report_interval_s > 0:
+            tasks.append(asyncio.create_task(self._log_reports()))
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks), duration_s)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _log_reports(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval_s)
+            report = self.report()
+            total = report["aggregate"]
+            logger.info(
+                f"게이트웨이 처리량: 수신 {total['read_per_s']:.1f}/s, 전송 {total['sent_per_s']:.1f}/s "
+                f"({total['connected']}/{len(self.links)}개 기기 연결)"
+            )
+            for name, device in report["devices"].items():
+                logger.info(
+                    f"  {name}: 수신 {device['read_per_s']:.1f}/s, 전송 {device['sent_per_s']:.1f}/s, "
+                    f"대기 {device['buffered']}개, 버림 {device['dropped']}개, 재연결 {device['reconnects']}회"
+                )
+
+    def report(self) -> Dict:
+        """
+        지난 report 호출 이후의 기기별·전체 처리량 (샘플/초)과 누적 카운터
+        """
+        now = self.clock()
+        last_time, last_counts = self._last_report
+        elapsed = max(now - last_time, 1e-9)
+        devices = {}
+        for name, link in self.links.items():
+            stats = link.stats
+            read_before, sent_before = last_counts[name]
+            devices[name] = {
+                "read_per_s": (stats.read - read_before) / elapsed,
+                "sent_per_s": (stats.sent - sent_before) / elapsed,
+                "read": stats.read,
+                "sent": stats.sent,
+                "frames": stats.frames,
+                "buffered": len(link.buffer),
+                "dropped": stats.dropped,
+                "predictions": stats.predictions,
+                "reconnects": stats.reconnects,
+                "device_errors": stats.device_errors,
+                "connected": stats.connected,
+            }
+        self._last_report = (
+            now,
+            {name: (d["read"], d["sent"]) for name, d in devices.items()},
+        )
+        aggregate = {
+            key: sum(d[key] for d in devices.values())
+            for key in ("read_per_s", "sent_per_s", "read", "sent", "frames", "dropped")
+        }
+        aggregate["connected"] = sum(d["connected"] for d in devices.values())
+        return {"devices": devices, "aggregate": aggregate}
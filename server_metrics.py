@@ -0,0 +1,250 @@
+"""
+Prometheus 메트릭 - 요청 처리 단계별 지연 히스토그램, 메시지/오류/연결 카운터, 큐 깊이 게이지
+
+prometheus-client가 없으면 모든 기록 함수가 아무 일도 하지 않고 경고를 남깁니다 (requirements.txt).
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+    )
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 요청 경로 단계 (receive는 프레임 도착부터 처리 루프가 꺼낼 때까지 대기열에서 기다린 시간)
+STAGES = (
+    "receive",
+    "parse",
+    "validate",
+    "features",
+    "scale",
+    "inference",
+    "serialize",
+    "send",
+)
+
+# 메시지 종류 라벨 (그 밖의 값은 "other" 로 묶어 시계열 수를 제한)
+MESSAGE_TYPES = (
+    "prediction",
+    "pressure",
+    "fusion",
+    "correction",
+    "config",
+    "ack",
+    "ping",
+    "pong",
+)
+
+# 단계 대부분이 수십 µs ~ 수 ms 이므로 10µs부터 시작하는 버킷
+LATENCY_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+
+# 계측 오버헤드 예산 - 메시지 하나를 계측하는 데 드는 추가 시간 (benchmarks/bench_metrics.py)
+OVERHEAD_BUDGET_US = 20.0
+
+
+class ServerMetrics:
+    """서버 메트릭 모음 - 전용 레지스트리를 써서 여러 번 만들어도 충돌하지 않음"""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled: False이거나 prometheus-client가 없으면 기록하지 않음
+        """
+        self.enabled = enabled and PROMETHEUS_AVAILABLE
+        # 켜 두었지만 패키지가 없어 수집하지 못하는 상태 (/metrics는 503)
+        self.unavailable = enabled and not PROMETHEUS_AVAILABLE
+        if self.unavailable:
+            logger.warning(
+                "prometheus-client가 설치되지 않아 메트릭을 수집하지 않습니다 "
+                "(pip install prometheus-client)"
+            )
+        self._stages: Dict[str, object] = {}
+        self._messages: Dict[str, object] = {}
+        self._errors: Dict[str, object] = {}
+        # 누적 오류 수 - prometheus-client 없이도 시스템 상태 샘플러가 읽음
+        self.error_total = 0
+        if not self.enabled:
+            return
+
+        self.registry = CollectorRegistry()
+        self.stage_latency = Histogram(
+            "posture_stage_latency_seconds",
+            "요청 처리 단계별 소요 시간",
+            ["stage"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.messages = Counter(
+            "posture_messages_total",
+            "수신한 웹소켓 메시지 수",
+            ["type"],
+            registry=self.registry,
+        )
+        self.errors = Counter(
+            "posture_errors_total",
+            "오류 응답 수",
+            ["kind"],
+            registry=self.registry,
+        )
+        self.connections = Counter(
+            "posture_connections_total",
+            "누적 웹소켓 연결 수",
+            registry=self.registry,
+        )
+        self.skipped_samples = Counter(
+            "posture_skipped_samples_total",
+            "추론하지 않은 메시지 수 (stale: 나이 예산 초과, coalesced: 최신 샘플에 병합, duplicate: 재전송, rate_limited: 속도 제한으로 버림)",
+            ["reason"],
+            registry=self.registry,
+        )
+        self.reaped_connections = Counter(
+            "posture_connections_reaped_total",
+            "서버가 정리한 연결 수 (idle: 유휴 타임아웃, read_timeout: ping 무응답)",
+            ["reason"],
+            registry=self.registry,
+        )
+        self.rejected_connections = Counter(
+            "posture_connections_rejected_total",
+            "동시 연결 수 상한으로 거부한 연결 수 (capacity: 전체, per_ip: IP별)",
+            ["reason"],
+            registry=self.registry,
+        )
+        self.drift_events = Counter(
+            "posture_drift_events_total",
+            "드리프트 알림 수 (type: drift 발생/recovered 해제, signal: pitch/confidence, scope: device/global)",
+            ["type", "signal", "scope"],
+            registry=self.registry,
+        )
+        self.active_connections = Gauge(
+            "posture_active_connections",
+            "현재 웹소켓 연결 수",
+            registry=self.registry,
+        )
+        # 자식 시계열을 미리 만들어 두어 기록 시 라벨 조회 비용을 없앰
+        self._stages = {s: self.stage_latency.labels(stage=s) for s in STAGES}
+        self._skipped = {
+            r: self.skipped_samples.labels(reason=r)
+            for r in ("stale", "coalesced", "duplicate", "rate_limited")
+        }
+
+    def observe(self, stage: str, start: float) -> float:
+        """
+        start부터 지금까지를 stage 소요 시간으로 기록합니다.
+
+        Returns:
+            현재 시각 (다음 단계의 start로 사용)
+        """
+        now = time.perf_counter()
+        child = self._stages.get(stage)
+        if child is not None:
+            child.observe(now - start)
+        return now
+
+    def observe_duration(self, stage: str, seconds: float) -> None:
+        child = self._stages.get(stage)
+        if child is not None:
+            child.observe(seconds)
+
+    def message(self, message_type: str) -> None:
+        if not self.enabled:
+            return
+        if message_type not in MESSAGE_TYPES:
+            message_type = "other"
+        child = self._messages.get(message_type)
+        if child is None:
+            child = self._messages[message_type] = self.messages.labels(
+                type=message_type
+            )
+        child.inc()
+
+    def sample_skipped(self, reason: str, count: int = 1) -> None:
+        child = self._skipped.get(reason) if self.enabled else None
+        if child is not None:
+            child.inc(count)
+
+    def error(self, kind: str) -> None:
+        self.error_total += 1
+        if not self.enabled:
+            return
+        child = self._errors.get(kind)
+        if child is None:
+            child = self._errors[kind] = self.errors.labels(kind=kind)
+        child.inc()
+
+    def connection_opened(self) -> None:
+        if self.enabled:
+            self.connections.inc()
+            self.active_connections.inc()
+
+    def connection_closed(self) -> None:
+        if self.enabled:
+            self.active_connections.dec()
+
+    def connection_reaped(self, reason: str) -> None:
+        if self.enabled:
+            self.reaped_connections.labels(reason=reason).inc()
+
+    def connection_rejected(self, reason: str) -> None:
+        if self.enabled:
+            self.rejected_connections.labels(reason=reason).inc()
+
+    def drift_event(self, kind: str, signal: str, scope: str) -> None:
+        if self.enabled:
+            self.drift_events.labels(type=kind, signal=signal, scope=scope).inc()
+
+    def gauge(self, name: str, description: str, read: Callable[[], float]) -> None:
+        """스크레이프 시점에 read()로 값을 읽는 게이지 (요청 경로 비용 없음)"""
+        if self.enabled:
+            Gauge(name, description, registry=self.registry).set_function(read)
+
+    def render(self) -> Tuple[bytes, str]:
+        """/metrics 응답 본문과 Content-Type"""
+        if not self.enabled:
+            return b"# metrics disabled\n", "text/plain; charset=utf-8"
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+
+def measure_overhead(
+    metrics: Optional[ServerMetrics] = None, iterations: int = 20000
+) -> float:
+    """
+    메시지 하나의 계측 비용(µs)을 측정합니다 - 단계 8개 기록 + 메시지 카운터 1회.
+    """
+    metrics = metrics or ServerMetrics()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        for stage in STAGES:
+            t = metrics.observe(stage, t)
+        metrics.message("prediction")
+    return (time.perf_counter() - start) / iterations * 1e6
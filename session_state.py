@@ -0,0 +1,289 @@
+"""
+재연결에도 유지되는 세션 상태 - 메시지 순번, 미확인 응답, 평활화 상태를 TTL 저장소에 보관
+"""
+
+import hmac
+import json
+import logging
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set
+
+from posture_smoothing import ChangeNotifier
+from response_profiles import ResponseEncoder
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_S = 300.0
+DEFAULT_MAX_UNACKED = 32
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+class SessionState:
+    """
+    세션 하나의 상태 - 연결이 바뀌어도 이어지는 부분
+
+    실시간 예측은 샘플 하나로 특징을 만들므로(PostureClassifier.sample_features)
+    이어받을 특징 창은 없고, 창 형태의 상태는 평활화 창(notifier)만 저장합니다.
+    샘플링 주기 창(rate_controller)은 기기가 재연결하면 기본 주기로 돌아가므로 저장하지 않습니다.
+
+    동시 연결마다 하나씩 있으므로 __slots__로 인스턴스 dict를 없앱니다.
+    """
+
+    __slots__ = (
+        "session_id",
+        "resume_token",
+        "notifier",
+        "max_unacked",
+        "last_sample",
+        "last_client_seq",
+        "next_seq",
+        "unacked",
+        "encoder",
+        "rate_controller",
+        "heartbeat",
+        "limiter",
+        "device_id",
+        "fusion_devices",
+        "coalesced",
+        "dropped",
+    )
+
+    def __init__(
+        self,
+        session_id: str,
+        notifier: ChangeNotifier,
+        max_unacked: int = DEFAULT_MAX_UNACKED,
+        resume_token: Optional[str] = None,
+    ):
+        """
+        Args:
+            session_id: 세션 ID
+            notifier: 자세 평활화/응답 결정 상태
+            max_unacked: 보관할 미확인 응답 수 상한 (넘으면 가장 오래된 응답부터 버림,
+                0이면 보관하지 않음)
+            resume_token: 세션을 이어받을 때 함께 보내야 하는 비밀 값 (없으면 새로 발급)
+        """
+        self.session_id = session_id
+        self.resume_token = resume_token or secrets.token_urlsafe(24)
+        self.notifier = notifier
+        self.max_unacked = max_unacked
+        self.last_sample: Optional[tuple] = None
+        # 클라이언트가 보낸 마지막 메시지 순번 (재전송 중복 제거용)
+        self.last_client_seq = 0
+        # 서버 응답 순번
+        self.next_seq = 1
+        # 순번 → 전송한 JSON 텍스트 (재전송 시 같은 바이트를 그대로 보냄)
+        self.unacked: "OrderedDict[int, str]" = OrderedDict()
+        # 연결별 응답 생성기, 샘플링 주기 결정기, 하트비트, 속도 제한기, 타임라인 기기 ID
+        # (저장하지 않음)
+        self.encoder = ResponseEncoder()
+        self.rate_controller = None
+        self.heartbeat = None
+        self.limiter = None
+        self.device_id = session_id
+        # 이번 연결이 만든 결합 버퍼 키 "세션 ID:장치 ID" (연결이 끊기면 정리, 저장하지 않음)
+        self.fusion_devices: Set[str] = set()
+        # 이번 연결에서 건너뛴 샘플 수 (저장하지 않음)
+        self.coalesced = 0
+        self.dropped = 0
+
+    def stamp(self, message: Dict) -> int:
+        """응답에 다음 순번을 붙이고 그 순번을 반환합니다."""
+        seq = self.next_seq
+        self.next_seq += 1
+        message["seq"] = seq
+        return seq
+
+    def retain(self, seq: int, text: str) -> None:
+        """전송한 응답을 확인될 때까지 보관합니다."""
+        if self.max_unacked <= 0:
+            return
+        self.unacked[seq] = text
+        if len(self.unacked) > self.max_unacked:
+            self.unacked.popitem(last=False)
+
+    def limit_unacked(self, max_unacked: int) -> None:
+        """미확인 응답 보관 상한을 바꾸고 넘치는 오래된 응답을 버립니다."""
+        self.max_unacked = max_unacked
+        while len(self.unacked) > max(max_unacked, 0):
+            self.unacked.popitem(last=False)
+
+    def ack(self, seq: int) -> None:
+        """seq 이하의 응답을 받았다고 확인합니다 (누적 확인)."""
+        while self.unacked:
+            first = next(iter(self.unacked))
+            if first > seq:
+                break
+            del self.unacked[first]
+
+    def pending_since(self, seq: int) -> List[str]:
+        """클라이언트가 마지막으로 받은 seq 이후의 미확인 응답 (재연결 시 재전송)"""
+        self.ack(seq)
+        return list(self.unacked.values())
+
+    def accept_client_seq(self, seq) -> bool:
+        """
+        클라이언트 메시지 순번을 확인합니다.
+
+        Returns:
+            처음 받은 메시지면 True, 이미 처리한 순번(재전송)이면 False
+        """
+        if not isinstance(seq, int):
+            return True
+        if seq <= self.last_client_seq:
+            return False
+        self.last_client_seq = seq
+        return True
+
+    def can_resume(self, token) -> bool:
+        """서버가 발급한 resume_token을 제시했는지 확인합니다 (세션 ID만으로는 이어받지 못함)."""
+        if not isinstance(token, str):
+            return False
+        return hmac.compare_digest(token.encode(), self.resume_token.encode())
+
+    def to_dict(self) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "resume_token": self.resume_token,
+            "notifier": self.notifier.to_dict(),
+            "max_unacked": self.max_unacked,
+            "last_sample": self.last_sample,
+            "last_client_seq": self.last_client_seq,
+            "next_seq": self.next_seq,
+            "unacked": list(self.unacked.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SessionState":
+        state = cls(
+            data["session_id"],
+            ChangeNotifier.from_dict(data["notifier"]),
+            data["max_unacked"],
+            data["resume_token"],
+        )
+        last_sample = data["last_sample"]
+        state.last_sample = tuple(last_sample) if last_sample else None
+        state.last_client_seq = data["last_client_seq"]
+        state.next_seq = data["next_seq"]
+        state.unacked = OrderedDict((int(seq), text) for seq, text in data["unacked"])
+        return state
+
+
+class MemorySessionStore:
+    """프로세스 메모리 세션 저장소 - 마지막 저장 후 ttl_s가 지나면 만료, 개수 상한 초과 시 오래된 것부터 제거"""
+
+    # 이벤트 루프에서 바로 호출해도 되는 저장소
+    blocking = False
+
+    def __init__(
+        self,
+        ttl_s: float = DEFAULT_TTL_S,
+        max_sessions: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_s = ttl_s
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        self._expire()
+        entry = self._sessions.get(session_id)
+        return entry[1] if entry is not None else None
+
+    def put(self, state: SessionState) -> None:
+        self._sessions[state.session_id] = (self.clock() + self.ttl_s, state)
+        self._sessions.move_to_end(state.session_id)
+        while len(self._sessions) > self.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            logger.info(f"세션 제거 (세션 수 상한): {evicted}")
+
+    def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    def _expire(self) -> None:
+        # 저장 순서 = 만료 순서이므로 앞쪽만 확인
+        now = self.clock()
+        while self._sessions:
+            session_id, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            del self._sessions[session_id]
+
+
+class RedisSessionStore:
+    """
+    Redis 호환 세션 저장소 - JSON 직렬화, 만료는 Redis TTL(SETEX)로 처리
+
+    호출마다 네트워크 왕복이 있으므로 서버는 이벤트 루프 밖(스레드)에서 get/save를 호출합니다.
+    """
+
+    blocking = True
+
+    def __init__(self, client, ttl_s: float = DEFAULT_TTL_S, prefix: str = "session:"):
+        """
+        Args:
+            client: get/setex/delete를 지원하는 Redis 호환 클라이언트
+            ttl_s: 세션 만료 시간 (초)
+            prefix: 키 접두사
+        """
+        self.client = client
+        self.ttl_s = ttl_s
+        self.prefix = prefix
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        raw = self.client.get(self.prefix + session_id)
+        if raw is None:
+            return None
+        try:
+            return SessionState.from_dict(json.loads(raw))
+        except (ValueError, KeyError) as e:
+            logger.warning(f"손상된 세션 상태 무시: {session_id} ({e})")
+            return None
+
+    def put(self, state: SessionState) -> None:
+        self.save(state.session_id, state.to_dict())
+
+    def save(self, session_id: str, data: Dict) -> None:
+        """to_dict()로 떠 둔 상태를 저장합니다 (상태 객체를 건드리지 않으므로 다른 스레드에서 호출 가능)."""
+        self.client.setex(
+            self.prefix + session_id,
+            max(1, int(self.ttl_s)),
+            json.dumps(data, ensure_ascii=False),
+        )
+
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self.prefix + session_id)
+
+
+def create_session_store(backend: str, ttl_s: float, redis_url: Optional[str] = None):
+    """
+    설정에 맞는 세션 저장소를 만듭니다. Redis를 쓸 수 없으면 메모리 저장소를 사용합니다.
+
+    Args:
+        backend: "memory" 또는 "redis"
+        ttl_s: 세션 만료 시간 (초)
+        redis_url: Redis 접속 URL
+    """
+    if backend == "redis":
+        if redis is None:
+            logger.warning("redis 패키지가 없어 메모리 세션 저장소를 사용합니다.")
+        else:
+            client = redis.Redis.from_url(redis_url or "redis://localhost:6379/0")
+            return RedisSessionStore(client, ttl_s)
+    return MemorySessionStore(ttl_s)
@@ -0,0 +1,469 @@
+"""
+세션 저장 포맷 - 청크 단위 컬럼형 바이너리 파일과 메모리 맵 리더
+
+파일 구조 (모든 정수는 little-endian):
+
+    [헤더]   MAGIC(4) | VERSION(u2) | 컬럼 수(u2) | 컬럼 정의 × N | 8바이트 정렬 패딩
+             컬럼 정의 = 이름(32바이트, utf-8) | dtype 문자열(8바이트, 예: "<i8")
+    [청크]   CHUNK_MAGIC(4) | 패딩(4) | 행 수(i8) | 컬럼별 연속 배열 (각각 8바이트 정렬)
+    [인덱스] (청크 오프셋, 행 수, 최소 timestamp, 최대 timestamp) i8 × 4 × 청크 수
+    [꼬리]   청크 수(i8) | 인덱스 오프셋(i8) | INDEX_MAGIC(4) | 패딩(4)
+
+추가 기록 시 기존 인덱스와 꼬리를 잘라낸 뒤 새 청크를 쓰고 인덱스를 다시 기록합니다.
+꼬리가 손상된 경우(기록 중 중단) 리더는 청크 헤더를 순차 탐색해 인덱스를 복구합니다.
+"""
+
+import glob
+import logging
+import os
+import struct
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SESSION_EXT = ".pses"
+MAGIC = b"PSES"
+CHUNK_MAGIC = b"CHNK"
+INDEX_MAGIC = b"PSIX"
+VERSION = 1
+
+NAME_SIZE = 32
+DTYPE_SIZE = 8
+ALIGN = 8
+DEFAULT_CHUNK_ROWS = 4096
+
+_HEADER_PREFIX = struct.Struct("<4sHH")
+_COLUMN_DEF = struct.Struct(f"<{NAME_SIZE}s{DTYPE_SIZE}s")
+_CHUNK_HEADER = struct.Struct("<4s4xq")
+_INDEX_ENTRY = np.dtype(
+    [("offset", "<i8"), ("rows", "<i8"), ("ts_min", "<i8"), ("ts_max", "<i8")]
+)
+_FOOTER = struct.Struct("<qq4s4x")
+
+TIMESTAMP_COLUMN = "timestamp_ms"
+
+Schema = List[Tuple[str, np.dtype]]
+
+
+def _aligned(size: int) -> int:
+    return (size + ALIGN - 1) // ALIGN * ALIGN
+
+
+def infer_column_dtype(name: str) -> np.dtype:
+    """
+    컬럼 이름으로 저장 dtype을 결정합니다.
+
+    timestamp → int64, 압력 센서(s1.., pv1..)와 자세 라벨 → int16, 그 외(pitch 등) → float32
+    """
+    lowered = name.lower()
+    if lowered.startswith("timestamp"):
+        return np.dtype("<i8")
+    if lowered in ("pose", "label", "posture"):
+        return np.dtype("<i2")
+    if lowered[:1] == "s" and lowered[1:].isdigit():
+        return np.dtype("<i2")
+    if lowered[:2] == "pv" and lowered[2:].isdigit():
+        return np.dtype("<i2")
+    return np.dtype("<f4")
+
+
+def schema_for_columns(columns: Sequence[str]) -> Schema:
+    """컬럼 이름 목록으로 스키마를 만듭니다."""
+    return [(name, infer_column_dtype(name)) for name in columns]
+
+
+class SessionWriter:
+    """세션 파일에 청크를 추가하는 기록기 (append-only)"""
+
+    def __init__(self, path: str, schema: Optional[Schema] = None):
+        """
+        기록기 초기화
+
+        Args:
+            path: 세션 파일 경로 (존재하면 이어서 기록)
+            schema: (컬럼 이름, dtype) 목록 - 새 파일 생성 시 필수
+        """
+        self.path = path
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with SessionReader(path) as reader:
+                existing = reader.schema
+                self._index = reader.index.copy()
+                data_end = reader.data_end
+            del reader  # 잘라내기 전에 메모리 맵 참조 해제
+            if schema is not None and [(n, np.dtype(d)) for n, d in schema] != existing:
+                raise ValueError(f"기존 세션 파일과 스키마가 다릅니다: {path}")
+            self.schema = existing
+            self._file = open(path, "r+b")
+            self._file.truncate(data_end)
+            self._file.seek(data_end)
+        else:
+            if not schema:
+                raise ValueError("새 세션 파일에는 스키마가 필요합니다.")
+            self.schema = [(name, np.dtype(dtype)) for name, dtype in schema]
+            self._index = np.empty(0, dtype=_INDEX_ENTRY)
+            self._file = open(path, "wb")
+            self._write_header()
+
+        self._has_timestamp = any(n == TIMESTAMP_COLUMN for n, _ in self.schema)
+
+    def _write_header(self) -> None:
+        header = bytearray(_HEADER_PREFIX.pack(MAGIC, VERSION, len(self.schema)))
+        for name, dtype in self.schema:
+            header += _COLUMN_DEF.pack(name.encode("utf-8"), dtype.str.encode("ascii"))
+        header += b"\x00" * (_aligned(len(header)) - len(header))
+        self._file.write(header)
+
+    def append(self, data: Union[pd.DataFrame, Dict[str, np.ndarray]]) -> int:
+        """
+        행 묶음을 하나의 청크로 기록합니다.
+
+        Args:
+            data: 스키마의 모든 컬럼을 포함한 DataFrame 또는 컬럼 배열 딕셔너리
+
+        Returns:
+            기록한 행 수
+        """
+        arrays = []
+        for name, dtype in self.schema:
+            if name not in data:
+                raise KeyError(f"컬럼 누락: {name}")
+            arrays.append(np.ascontiguousarray(np.asarray(data[name]), dtype=dtype))
+
+        rows = len(arrays[0]) if arrays else 0
+        if any(len(a) != rows for a in arrays):
+            raise ValueError("컬럼 길이가 서로 다릅니다.")
+        if rows == 0:
+            return 0
+
+        offset = self._file.tell()
+        self._file.write(_CHUNK_HEADER.pack(CHUNK_MAGIC, rows))
+        for array in arrays:
+            raw = array.tobytes()
+            self._file.write(raw)
+            self._file.write(b"\x00" * (_aligned(len(raw)) - len(raw)))
+
+        if self._has_timestamp:
+            ts = np.asarray(data[TIMESTAMP_COLUMN], dtype=np.int64)
+            ts_min, ts_max = int(ts.min()), int(ts.max())
+        else:
+            ts_min, ts_max = 0, 0
+
+        entry = np.array([(offset, rows, ts_min, ts_max)], dtype=_INDEX_ENTRY)
+        self._index = np.concatenate([self._index, entry])
+        return rows
+
+    def close(self) -> None:
+        """청크 인덱스와 꼬리를 기록하고 파일을 닫습니다."""
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        self._file.write(self._index.tobytes())
+        self._file.write(_FOOTER.pack(len(self._index), index_offset, INDEX_MAGIC))
+        self._file.close()
+
+    def __enter__(self) -> "SessionWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SessionReader:
+    """메모리 맵 기반 세션 파일 리더 - 청크 내 슬라이스는 복사 없이 뷰로 반환"""
+
+    def __init__(self, path: str):
+        """
+        리더 초기화
+
+        Args:
+            path: 세션 파일 경로
+        """
+        self.path = path
+        self._raw = np.memmap(path, dtype=np.uint8, mode="r")
+
+        magic, version, ncols = _HEADER_PREFIX.unpack_from(self._raw, 0)
+        if magic != MAGIC:
+            raise ValueError(f"세션 파일 형식이 아닙니다: {path}")
+        if version != VERSION:
+            raise ValueError(f"지원하지 않는 세션 파일 버전: {version}")
+
+        self.schema: Schema = []
+        pos = _HEADER_PREFIX.size
+        for _ in range(ncols):
+            name, dtype = _COLUMN_DEF.unpack_from(self._raw, pos)
+            self.schema.append(
+                (
+                    name.rstrip(b"\x00").decode("utf-8"),
+                    np.dtype(dtype.rstrip(b"\x00").decode("ascii")),
+                )
+            )
+            pos += _COLUMN_DEF.size
+        self.header_size = _aligned(pos)
+        self.columns = [name for name, _ in self.schema]
+
+        self.index, self.data_end = self._read_index()
+        self._starts = np.concatenate([[0], np.cumsum(self.index["rows"])])
+
+    def _chunk_size(self, rows: int) -> int:
+        return _CHUNK_HEADER.size + sum(
+            _aligned(rows * dtype.itemsize) for _, dtype in self.schema
+        )
+
+    def _read_index(self) -> Tuple[np.ndarray, int]:
+        size = len(self._raw)
+        if size >= self.header_size + _FOOTER.size:
+            count, index_offset, magic = _FOOTER.unpack_from(
+                self._raw, size - _FOOTER.size
+            )
+            if (
+                magic == INDEX_MAGIC
+                and index_offset + count * _INDEX_ENTRY.itemsize == size - _FOOTER.size
+            ):
+                index = np.frombuffer(
+                    self._raw, dtype=_INDEX_ENTRY, count=count, offset=index_offset
+                )
+                return index, index_offset
+
+        logger.warning(f"세션 인덱스가 손상되어 청크를 탐색합니다: {self.path}")
+        return self._scan_chunks()
+
+    def _scan_chunks(self) -> Tuple[np.ndarray, int]:
+        """꼬리가 없을 때 청크 헤더를 따라가며 인덱스를 복구합니다."""
+        entries = []
+        pos = self.header_size
+        ts_col = (
+            self.columns.index(TIMESTAMP_COLUMN)
+            if TIMESTAMP_COLUMN in self.columns
+            else None
+        )
+        while pos + _CHUNK_HEADER.size <= len(self._raw):
+            magic, rows = _CHUNK_HEADER.unpack_from(self._raw, pos)
+            end = pos + self._chunk_size(rows)
+            if magic != CHUNK_MAGIC or rows <= 0 or end > len(self._raw):
+                break
+            ts_min = ts_max = 0
+            if ts_col is not None:
+                ts = self._column_view(pos, rows, ts_col)
+                ts_min, ts_max = int(ts.min()), int(ts.max())
+            entries.append((pos, rows, ts_min, ts_max))
+            pos = end
+        return np.array(entries, dtype=_INDEX_ENTRY), pos
+
+    def _column_view(self, chunk_offset: int, rows: int, col: int) -> np.ndarray:
+        pos = chunk_offset + _CHUNK_HEADER.size
+        for _, dtype in self.schema[:col]:
+            pos += _aligned(rows * dtype.itemsize)
+        dtype = self.schema[col][1]
+        return self._raw[pos : pos + rows * dtype.itemsize].view(dtype)
+
+    @property
+    def num_rows(self) -> int:
+        return int(self._starts[-1])
+
+    @property
+    def num_chunks(self) -> int:
+        return len(self.index)
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def chunk(
+        self, i: int, columns: Optional[Sequence[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        i번째 청크의 컬럼 뷰를 반환합니다 (복사 없음, 읽기 전용).
+        """
+        entry = self.index[i]
+        names = self.columns if columns is None else columns
+        return {
+            name: self._column_view(
+                int(entry["offset"]), int(entry["rows"]), self.columns.index(name)
+            )
+            for name in names
+        }
+
+    def iter_chunks(
+        self, columns: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """청크 단위로 컬럼 뷰를 순회합니다."""
+        for i in range(self.num_chunks):
+            yield self.chunk(i, columns)
+
+    def column(
+        self, name: str, start: int = 0, stop: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        행 범위 [start, stop)의 컬럼 배열을 반환합니다.
+
+        범위가 한 청크 안에 있으면 메모리 맵 뷰를, 여러 청크에 걸치면 연결한 복사본을 반환합니다.
+        """
+        col = self.columns.index(name)
+        dtype = self.schema[col][1]
+        stop = self.num_rows if stop is None else min(stop, self.num_rows)
+        if start >= stop:
+            return np.empty(0, dtype=dtype)
+
+        first = int(np.searchsorted(self._starts, start, side="right")) - 1
+        last = int(np.searchsorted(self._starts, stop, side="left")) - 1
+
+        parts = []
+        for i in range(first, last + 1):
+            entry = self.index[i]
+            view = self._column_view(int(entry["offset"]), int(entry["rows"]), col)
+            base = int(self._starts[i])
+            parts.append(view[max(start - base, 0) : stop - base])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def read(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """행 범위 [start, stop)의 여러 컬럼을 딕셔너리로 반환합니다."""
+        names = self.columns if columns is None else columns
+        return {name: self.column(name, start, stop) for name in names}
+
+    def time_range(
+        self,
+        start_ms: int,
+        end_ms: int,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        timestamp가 [start_ms, end_ms]인 행을 반환합니다.
+
+        청크 인덱스의 최소/최대 timestamp로 겹치지 않는 청크는 읽지 않습니다.
+        """
+        if TIMESTAMP_COLUMN not in self.columns:
+            raise KeyError(f"{TIMESTAMP_COLUMN} 컬럼이 없는 세션입니다.")
+
+        names = self.columns if columns is None else columns
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+        overlapping = np.nonzero(
+            (self.index["ts_max"] >= start_ms) & (self.index["ts_min"] <= end_ms)
+        )[0]
+        for i in overlapping:
+            views = self.chunk(int(i), list(dict.fromkeys([TIMESTAMP_COLUMN, *names])))
+            ts = views[TIMESTAMP_COLUMN]
+            mask = (ts >= start_ms) & (ts <= end_ms)
+            for name in names:
+                parts[name].append(views[name][mask])
+
+        return {
+            name: (
+                np.concatenate(arrays)
+                if arrays
+                else np.empty(0, dtype=dict(self.schema)[name])
+            )
+            for name, arrays in parts.items()
+        }
+
+    def to_dataframe(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """세션 전체를 DataFrame으로 읽습니다."""
+        return pd.DataFrame(self.read(columns=columns))
+
+    def close(self) -> None:
+        # memmap은 모든 뷰가 해제될 때 닫히므로 참조만 끊음
+        self._raw = None
+
+    def __enter__(self) -> "SessionReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_session(path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """세션 파일을 DataFrame으로 읽습니다."""
+    return SessionReader(path).to_dataframe(columns)
+
+
+def read_table(path: str) -> pd.DataFrame:
+    """
+    CSV 경로를 받아 같은 이름의 세션 파일이 있으면 그것을, 없으면 CSV를 읽습니다.
+
+    Args:
+        path: .csv 또는 .pses 경로
+
+    Returns:
+        DataFrame
+    """
+    stem, ext = os.path.splitext(path)
+    if ext == SESSION_EXT:
+        return read_session(path)
+
+    session_path = stem + SESSION_EXT
+    if os.path.exists(session_path):
+        return read_session(session_path)
+    return pd.read_csv(path, encoding="utf-8-sig")
+
+
+def convert_csv(
+    csv_path: str,
+    output_path: Optional[str] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> str:
+    """
+    기존 CSV 기록(IMU, 압력 pv, FSR pose+s1..s11)을 세션 파일로 변환합니다.
+
+    Args:
+        csv_path: 원본 CSV 경로
+        output_path: 출력 경로 (기본값: 같은 이름의 .pses)
+        chunk_rows: 청크당 행 수
+
+    Returns:
+        생성된 세션 파일 경로
+    """
+    if output_path is None:
+        output_path = os.path.splitext(csv_path)[0] + SESSION_EXT
+
+    header = pd.read_csv(csv_path, nrows=0, encoding="utf-8-sig")
+    columns = [c.strip() for c in header.columns]
+    schema = schema_for_columns(columns)
+    known = {"timestamp_ms", "relative_pitch_deg", "pitch_deg", "pose"}
+    if not any(name in known or dtype == np.int16 for name, dtype in schema):
+        raise ValueError(f"알 수 없는 CSV 형식입니다: {csv_path}")
+
+    tmp_path = output_path + ".tmp"
+    with SessionWriter(tmp_path, schema) as writer:
+        for frame in pd.read_csv(csv_path, chunksize=chunk_rows, encoding="utf-8-sig"):
+            frame.columns = columns
+            frame = frame.apply(pd.to_numeric, errors="coerce").dropna()
+            writer.append(frame)
+    os.replace(tmp_path, output_path)
+
+    logger.info(f"세션 변환 완료: {csv_path} → {output_path}")
+    return output_path
+
+
+def convert_directory(root: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> List[str]:
+    """
+    디렉토리 아래 모든 CSV를 세션 파일로 변환합니다 (형식이 맞지 않는 파일은 건너뜀).
+
+    Returns:
+        생성된 세션 파일 경로 목록
+    """
+    converted = []
+    pattern = os.path.join(root, "**", "*.csv")
+    for csv_path in sorted(glob.glob(pattern, recursive=True)):
+        try:
+            converted.append(convert_csv(csv_path, chunk_rows=chunk_rows))
+        except (ValueError, pd.errors.ParserError) as e:
+            logger.warning(f"변환 건너뜀: {csv_path} ({e})")
+    return converted
+
+
+if __name__ == "__main__":
+    # 사용법: python session_store.py <CSV 파일 또는 디렉토리> ...
+    logging.basicConfig(level=logging.INFO)
+    for target in sys.argv[1:] or ["자세모음"]:
+        if os.path.isdir(target):
+            convert_directory(target)
+        else:
+            convert_csv(target)
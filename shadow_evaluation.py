@@ -0,0 +1,189 @@
+"""
+후보 모델 섀도 평가 - 실시간 요청 일부를 백그라운드 스레드의 후보 모델로 복제해 기존 모델과 비교
+
+요청 경로에서는 표본 추출 판정과 큐 삽입만 하고(큐가 가득 차면 버림), 후보 모델 추론과
+통계 집계는 별도 스레드에서 처리하므로 클라이언트 응답을 기다리게 하지 않습니다.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from posture_classifier import PostureClassifier
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 1000
+# 지연 백분위 계산에 쓰는 최근 측정값 수
+LATENCY_WINDOW = 10000
+
+
+class ShadowEvaluator:
+    """후보 모델 섀도 평가기 - 일치율, 자세별 혼동 행렬, 후보 모델 지연 분포를 집계"""
+
+    def __init__(
+        self,
+        candidate: PostureClassifier,
+        fraction: float = 0.05,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        model_path: Optional[str] = None,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Args:
+            candidate: 평가할 후보 분류기 (기존 분류기와 별도 인스턴스)
+            fraction: 복제할 요청 비율 (0~1)
+            queue_size: 평가 대기 큐 크기 (가득 차면 요청을 버림)
+            model_path: 후보 모델 경로 (보고용)
+            rng: 0~1 난수 함수
+        """
+        self.candidate = candidate
+        self.fraction = fraction
+        self.model_path = model_path
+        self.rng = rng
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """집계를 초기화합니다."""
+        with self._lock:
+            self.offered = 0
+            self.dropped = 0
+            self.evaluated = 0
+            self.agreed = 0
+            self.errors = 0
+            self.confusion: Dict[int, Dict[int, int]] = {}
+            self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+            self._latency_total = 0.0
+            self._latency_max = 0.0
+            self.started_at = time.time()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="shadow-evaluator", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"섀도 평가 시작: {self.model_path} (비율 {self.fraction:.1%})")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """대기 중인 요청을 마저 평가한 뒤 작업 스레드를 종료합니다."""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def offer(
+        self, timestamp: int, relative_pitch: float, primary_posture: int
+    ) -> bool:
+        """
+        기존 모델의 예측 하나를 표본 추출해 평가 대기열에 넣습니다 (요청 경로에서 호출).
+
+        Returns:
+            대기열에 넣었는지 여부
+        """
+        if self._thread is None or self.rng() >= self.fraction:
+            return False
+        self.offered += 1
+        try:
+            self._queue.put_nowait((timestamp, relative_pitch, primary_posture))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            self.evaluate(*item)
+
+    def evaluate(self, timestamp: int, relative_pitch: float, primary: int) -> None:
+        """후보 모델로 예측해 기존 모델 결과와 비교합니다."""
+        start = time.perf_counter()
+        result = self.candidate.predict_posture(timestamp, relative_pitch)
+        latency = time.perf_counter() - start
+
+        with self._lock:
+            if "error" in result:
+                self.errors += 1
+                return
+            candidate = result["predicted_posture"]
+            self.evaluated += 1
+            if candidate == primary:
+                self.agreed += 1
+            row = self.confusion.setdefault(primary, {})
+            row[candidate] = row.get(candidate, 0) + 1
+            self._latencies.append(latency)
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+
+    @property
+    def agreement_rate(self) -> Optional[float]:
+        return self.agreed / self.evaluated if self.evaluated else None
+
+    def report(self) -> Dict:
+        """평가 결과 요약 (관리자 API 응답)"""
+        with self._lock:
+            per_class = {
+                primary: row.get(primary, 0) / sum(row.values())
+                for primary, row in self.confusion.items()
+            }
+            latencies = np.array(self._latencies)
+            latency = {"count": self.evaluated}
+            if len(latencies):
+                p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+                latency.update(
+                    {
+                        "mean_ms": self._latency_total / self.evaluated * 1000,
+                        "p50_ms": p50,
+                        "p95_ms": p95,
+                        "p99_ms": p99,
+                        "max_ms": self._latency_max * 1000,
+                    }
+                )
+            return {
+                "model_path": self.model_path,
+                "fraction": self.fraction,
+                "running": self._thread is not None,
+                "since": self.started_at,
+                "offered": self.offered,
+                "dropped": self.dropped,
+                "queued": self._queue.qsize(),
+                "evaluated": self.evaluated,
+                "errors": self.errors,
+                "agreement_rate": self.agreement_rate,
+                "per_class_agreement": per_class,
+                # {기존 모델 자세: {후보 모델 자세: 횟수}}
+                "confusion": {p: dict(row) for p, row in self.confusion.items()},
+                "latency": latency,
+            }
+
+
+def load_shadow_evaluator(
+    model_path: str, fraction: float, data_dir: str = "자세모음"
+) -> Optional[ShadowEvaluator]:
+    """
+    후보 모델을 불러와 섀도 평가기를 시작합니다.
+
+    Returns:
+        시작한 평가기 (모델을 불러오지 못하면 None)
+    """
+    candidate = PostureClassifier(data_dir)
+    if not candidate.load_model(model_path):
+        logger.error(f"섀도 평가용 후보 모델을 불러오지 못했습니다: {model_path}")
+        return None
+    evaluator = ShadowEvaluator(candidate, fraction, model_path=model_path)
+    evaluator.start()
+    return evaluator
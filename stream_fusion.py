@@ -0,0 +1,299 @@
+"""
+IMU·압력 스트림 시간 정렬 결합 - 장치별 제한 버퍼 기반 실시간 결합과 같은 규칙의 오프라인 결합
+"""
+
+import logging
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MODES = ("nearest", "interpolate")
+DEFAULT_TOLERANCE_MS = 500
+
+
+def align_pitch(
+    target_ts: np.ndarray,
+    imu_ts: np.ndarray,
+    imu_pitch: np.ndarray,
+    tolerance_ms: float,
+    mode: str = "nearest",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    압력 프레임 시각마다 IMU pitch를 정렬합니다 (실시간/오프라인 공통 규칙).
+
+    - nearest: 허용 오차 안에서 가장 가까운 IMU 샘플
+    - interpolate: 앞뒤 샘플이 모두 허용 오차 안이면 선형 보간, 아니면 nearest 규칙
+
+    Args:
+        target_ts: 압력 프레임 타임스탬프 (ms, 오름차순)
+        imu_ts: IMU 타임스탬프 (ms, 오름차순)
+        imu_pitch: IMU pitch 값
+        tolerance_ms: 허용 오차 (ms)
+        mode: "nearest" 또는 "interpolate"
+
+    Returns:
+        (pitch, matched) - 정렬된 pitch 값과 결합 성공 여부 마스크
+    """
+    if mode not in MODES:
+        raise ValueError(f"지원하지 않는 결합 방식: {mode}")
+
+    target_ts = np.asarray(target_ts, dtype=np.float64)
+    pitch = np.full(len(target_ts), np.nan)
+    matched = np.zeros(len(target_ts), dtype=bool)
+    if len(imu_ts) == 0 or len(target_ts) == 0:
+        return pitch, matched
+
+    imu_ts = np.asarray(imu_ts, dtype=np.float64)
+    imu_pitch = np.asarray(imu_pitch, dtype=np.float64)
+
+    hi = np.searchsorted(imu_ts, target_ts, side="left")
+    lo = np.clip(hi - 1, 0, len(imu_ts) - 1)
+    hi_c = np.clip(hi, 0, len(imu_ts) - 1)
+
+    d_lo = np.where(hi > 0, target_ts - imu_ts[lo], np.inf)
+    d_hi = np.where(hi < len(imu_ts), imu_ts[hi_c] - target_ts, np.inf)
+
+    # 같은 거리면 이전 샘플 우선
+    use_hi = d_hi < d_lo
+    nearest_idx = np.where(use_hi, hi_c, lo)
+    nearest_dist = np.minimum(d_lo, d_hi)
+    matched = nearest_dist <= tolerance_ms
+    pitch[matched] = imu_pitch[nearest_idx[matched]]
+
+    if mode == "interpolate":
+        both = (d_lo <= tolerance_ms) & (d_hi <= tolerance_ms) & (d_hi > 0)
+        span = imu_ts[hi_c] - imu_ts[lo]
+        weight = np.divide(d_lo, span, out=np.zeros_like(d_lo), where=both & (span > 0))
+        interpolated = imu_pitch[lo] + weight * (imu_pitch[hi_c] - imu_pitch[lo])
+        pitch[both] = interpolated[both]
+
+    return pitch, matched
+
+
+def fuse_frames(
+    pressure_df: pd.DataFrame,
+    imu_df: pd.DataFrame,
+    tolerance_ms: float = DEFAULT_TOLERANCE_MS,
+    mode: str = "nearest",
+    timestamp_column: str = "timestamp_ms",
+    pitch_column: str = "relative_pitch_deg",
+) -> pd.DataFrame:
+    """
+    오프라인 배치 결합 - 학습용으로 실시간 결합과 같은 규칙을 사용합니다.
+
+    Args:
+        pressure_df: timestamp_ms와 센서 컬럼을 가진 압력 기록
+        imu_df: timestamp_ms와 relative_pitch_deg를 가진 IMU 기록
+
+    Returns:
+        결합된 압력 행에 pitch 컬럼을 붙인 DataFrame (허용 오차 밖의 행은 제외)
+    """
+    if timestamp_column not in pressure_df.columns:
+        raise KeyError(f"압력 기록에 {timestamp_column} 컬럼이 없습니다.")
+
+    pressure_df = pressure_df.sort_values(timestamp_column, kind="stable")
+    imu_df = imu_df.sort_values(timestamp_column, kind="stable")
+    pitch, matched = align_pitch(
+        pressure_df[timestamp_column].to_numpy(),
+        imu_df[timestamp_column].to_numpy(),
+        imu_df[pitch_column].to_numpy(),
+        tolerance_ms,
+        mode,
+    )
+
+    fused = pressure_df.copy()
+    fused["pitch"] = pitch
+    dropped = int((~matched).sum())
+    if dropped:
+        logger.info(f"허용 오차({tolerance_ms}ms) 밖의 압력 프레임 {dropped}개 제외")
+    return fused[matched].reset_index(drop=True)
+
+
+class FusedFrame:
+    """시간 정렬된 압력 프레임 + pitch"""
+
+    __slots__ = ("timestamp", "pressure", "pitch")
+
+    def __init__(self, timestamp: int, pressure: Sequence[float], pitch: float):
+        self.timestamp = timestamp
+        self.pressure = pressure
+        self.pitch = pitch
+
+    def to_dict(self) -> Dict:
+        return {
+            "timestamp": self.timestamp,
+            "pressure": list(self.pressure),
+            "relative_pitch": self.pitch,
+        }
+
+
+class StreamFusion:
+    """장치 하나의 IMU·압력 스트림을 타임스탬프로 결합하는 스트리밍 결합기 (메모리 상한 고정)"""
+
+    def __init__(
+        self,
+        tolerance_ms: float = DEFAULT_TOLERANCE_MS,
+        mode: str = "nearest",
+        max_wait_ms: float = 3000,
+        imu_buffer_size: int = 256,
+        pressure_buffer_size: int = 256,
+    ):
+        """
+        스트리밍 결합기 초기화
+
+        Args:
+            tolerance_ms: 결합 허용 오차 (ms)
+            mode: "nearest" 또는 "interpolate"
+            max_wait_ms: IMU가 따라오지 않을 때 압력 프레임을 최대로 보류할 시간 (ms)
+            imu_buffer_size: IMU 버퍼 상한 (샘플 수)
+            pressure_buffer_size: 보류 중인 압력 프레임 상한
+        """
+        if mode not in MODES:
+            raise ValueError(f"지원하지 않는 결합 방식: {mode}")
+        self.tolerance_ms = tolerance_ms
+        self.mode = mode
+        self.max_wait_ms = max_wait_ms
+        self._imu: deque = deque(maxlen=imu_buffer_size)
+        self._pending: deque = deque(maxlen=pressure_buffer_size)
+        self.stats = {"fused": 0, "unmatched": 0, "overflow": 0, "out_of_order": 0}
+
+    def push_imu(self, timestamp: int, pitch: float) -> List[FusedFrame]:
+        """IMU 샘플을 추가하고 결합이 확정된 프레임을 반환합니다."""
+        if self._imu and timestamp < self._imu[-1][0]:
+            self.stats["out_of_order"] += 1
+            return []
+        self._imu.append((timestamp, pitch))
+        return self._drain()
+
+    def push_pressure(self, timestamp: int, frame: Sequence[float]) -> List[FusedFrame]:
+        """압력 프레임을 추가하고 결합이 확정된 프레임을 반환합니다."""
+        if self._pending and timestamp < self._pending[-1][0]:
+            self.stats["out_of_order"] += 1
+            return []
+        if len(self._pending) == self._pending.maxlen:
+            self.stats["overflow"] += 1  # 가장 오래된 보류 프레임이 밀려남
+        self._pending.append((timestamp, frame))
+        return self._drain()
+
+    def flush(self) -> List[FusedFrame]:
+        """보류 중인 모든 압력 프레임을 현재 IMU 버퍼로 확정합니다 (스트림 종료 시)."""
+        return self._resolve(len(self._pending))
+
+    def _drain(self) -> List[FusedFrame]:
+        if not self._pending:
+            return []
+
+        imu_watermark = self._imu[-1][0] if self._imu else -np.inf
+        newest_pressure = self._pending[-1][0]
+
+        # 허용 오차 범위의 IMU가 모두 도착했거나(배치와 같은 결과), 너무 오래 기다린 프레임만 확정
+        ready = 0
+        for ts, _ in self._pending:
+            if (
+                ts + self.tolerance_ms <= imu_watermark
+                or newest_pressure - ts > self.max_wait_ms
+            ):
+                ready += 1
+            else:
+                break
+        return self._resolve(ready)
+
+    def _resolve(self, count: int) -> List[FusedFrame]:
+        if count == 0:
+            return []
+
+        frames = [self._pending.popleft() for _ in range(count)]
+        target_ts = np.fromiter((ts for ts, _ in frames), dtype=np.float64, count=count)
+        if self._imu:
+            imu = np.asarray(self._imu, dtype=np.float64)
+            pitch, matched = align_pitch(
+                target_ts, imu[:, 0], imu[:, 1], self.tolerance_ms, self.mode
+            )
+        else:
+            pitch = np.full(count, np.nan)
+            matched = np.zeros(count, dtype=bool)
+
+        fused = [
+            FusedFrame(ts, frame, float(p))
+            for (ts, frame), p, ok in zip(frames, pitch, matched)
+            if ok
+        ]
+        self.stats["fused"] += len(fused)
+        self.stats["unmatched"] += count - len(fused)
+        self._prune_imu()
+        return fused
+
+    def _prune_imu(self) -> None:
+        """다음 보류 프레임에 더 이상 쓰이지 않는 IMU 샘플 제거 (직전 샘플 하나는 유지)"""
+        if not self._pending:
+            horizon = self._imu[-1][0] - self.tolerance_ms if self._imu else None
+        else:
+            horizon = self._pending[0][0] - self.tolerance_ms
+        if horizon is None:
+            return
+        while len(self._imu) > 1 and self._imu[1][0] <= horizon:
+            self._imu.popleft()
+
+
+class FusionHub:
+    """장치 ID별 StreamFusion 관리자 - 장치 수 상한을 넘으면 가장 오래 쓰지 않은 장치를 제거"""
+
+    def __init__(
+        self,
+        max_devices: int = 1024,
+        on_fused: Optional[Callable[[str, List[FusedFrame]], None]] = None,
+        **fusion_kwargs,
+    ):
+        """
+        Args:
+            max_devices: 동시에 유지할 장치 수 상한
+            on_fused: 결합 프레임이 확정될 때 호출할 콜백 (device_id, frames)
+            fusion_kwargs: StreamFusion 생성 인자
+        """
+        self.max_devices = max_devices
+        self.on_fused = on_fused
+        self.fusion_kwargs = fusion_kwargs
+        self._devices: "OrderedDict[str, StreamFusion]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def device(self, device_id: str) -> StreamFusion:
+        fusion = self._devices.get(device_id)
+        if fusion is None:
+            if len(self._devices) >= self.max_devices:
+                evicted, _ = self._devices.popitem(last=False)
+                logger.info(f"결합 상태 제거 (장치 수 상한): {evicted}")
+            fusion = StreamFusion(**self.fusion_kwargs)
+            self._devices[device_id] = fusion
+        else:
+            self._devices.move_to_end(device_id)
+        return fusion
+
+    def push_imu(
+        self, device_id: str, timestamp: int, pitch: float
+    ) -> List[FusedFrame]:
+        return self._emit(device_id, self.device(device_id).push_imu(timestamp, pitch))
+
+    def push_pressure(
+        self, device_id: str, timestamp: int, frame: Sequence[float]
+    ) -> List[FusedFrame]:
+        return self._emit(
+            device_id, self.device(device_id).push_pressure(timestamp, frame)
+        )
+
+    def remove(self, device_id: str) -> List[FusedFrame]:
+        """장치 상태를 정리하고 남은 프레임을 확정합니다."""
+        fusion = self._devices.pop(device_id, None)
+        if fusion is None:
+            return []
+        return self._emit(device_id, fusion.flush())
+
+    def _emit(self, device_id: str, frames: List[FusedFrame]) -> List[FusedFrame]:
+        if frames and self.on_fused is not None:
+            self.on_fused(device_id, frames)
+        return frames
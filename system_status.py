@@ -0,0 +1,297 @@
+"""
+시스템 상태 샘플러 - 프로세스/호스트 자원 사용량과 요청 지연 백분위를 주기적으로 수집
+
+백그라운드 스레드가 interval_s마다 상태를 하나 만들어 메모리 링 버퍼에 쌓고, /health 응답 본문을
+미리 직렬화해 둡니다. persist_every개마다 한 행으로 줄여(다운샘플링) system_status 테이블에
+batch_size행씩 모아 기록합니다.
+
+psutil이 없으면 자원 사용량은 None, SQLAlchemy가 없거나 DB에 연결할 수 없으면 기록하지 않습니다.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from sqlalchemy import create_engine, text
+except ImportError:
+    create_engine = None
+
+logger = logging.getLogger(__name__)
+
+# 상태 판정 기준 - 하나라도 넘으면 warning
+WARN_USAGE_PERCENT = 90.0
+WARN_LATENCY_MS = 500.0
+
+INSERT_STATUS = """
+INSERT INTO system_status (
+    server_status, active_connections, cpu_usage, memory_usage,
+    disk_usage, response_time_ms, error_count, timestamp
+) VALUES (
+    :server_status, :active_connections, :cpu_usage, :memory_usage,
+    :disk_usage, :response_time_ms, :error_count, :timestamp
+)
+"""
+
+# 다운샘플링할 때 가장 나쁜 상태를 남기기 위한 순위
+STATUS_RANK = {"healthy": 0, "warning": 1, "error": 2}
+
+
+class SystemStatusWriter:
+    """system_status 테이블 일괄 기록기 (SQLAlchemy)"""
+
+    def __init__(self, url: str):
+        if create_engine is None:
+            raise RuntimeError("sqlalchemy 패키지가 없습니다.")
+        self.engine = create_engine(url, pool_pre_ping=True)
+
+    def write(self, rows: List[Dict]) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(text(INSERT_STATUS), rows)
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+
+def create_status_writer(url: str) -> Optional[SystemStatusWriter]:
+    """DB URL로 기록기를 만듭니다 (URL이 없거나 드라이버가 없으면 None)."""
+    if not url:
+        return None
+    try:
+        return SystemStatusWriter(url)
+    except Exception as e:
+        logger.warning(f"system_status 기록을 사용하지 않습니다: {e}")
+        return None
+
+
+class SystemStatusSampler:
+    """주기적 시스템 상태 수집기 - 최근 상태는 캐시해 두고 요청마다 다시 계산하지 않음"""
+
+    def __init__(
+        self,
+        interval_s: float = 5.0,
+        history: int = 720,
+        latency_window: int = 10000,
+        persist_every: int = 12,
+        batch_size: int = 5,
+        writer: Optional[SystemStatusWriter] = None,
+        extra: Optional[Callable[[], Dict]] = None,
+        error_count: Optional[Callable[[], int]] = None,
+        disk_path: str = "/",
+        max_pending_rows: int = 1000,
+    ):
+        """
+        Args:
+            interval_s: 샘플링 간격 (초)
+            history: 메모리에 보관할 상태 수
+            latency_window: 지연 백분위를 계산할 최근 요청 수
+            persist_every: 이만큼의 상태를 한 행으로 줄여 기록 (기본 5초 × 12 = 1분)
+            batch_size: 이만큼 행이 모이면 한 번에 기록
+            writer: system_status 기록기 (None이면 기록하지 않음)
+            extra: 상태에 덧붙일 서버 정보 (연결 수, 모델 로드 여부 등) - 샘플러 스레드에서 호출
+            error_count: 누적 오류 수 - 샘플 사이 증가량을 기록
+            disk_path: 디스크 사용량을 잴 경로
+            max_pending_rows: DB 장애 시 보관할 최대 행 수 (넘으면 오래된 행부터 버림)
+        """
+        self.interval_s = interval_s
+        self.persist_every = persist_every
+        self.batch_size = batch_size
+        self.writer = writer
+        self.extra = extra
+        self.error_count = error_count
+        self.disk_path = disk_path
+        self.history: deque = deque(maxlen=history)
+        self.started_at = time.time()
+
+        # 요청 처리 시간 (초) - 이벤트 루프 스레드가 쓰고 샘플러 스레드가 읽음
+        self._latencies = RingBuffer(latency_window)
+        self._last_errors = error_count() if error_count is not None else 0
+        self._window: List[Dict] = []
+        self._pending: deque = deque(maxlen=max_pending_rows)
+        self._body: Optional[bytes] = None
+        self._process = psutil.Process() if psutil is not None else None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def record_latency(self, seconds: float) -> None:
+        """요청 하나의 처리 시간을 기록합니다 (요청 경로에서 호출)."""
+        self._latencies.append(seconds)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        if psutil is not None:
+            # cpu_percent는 직전 호출 이후의 사용률이므로 기준점을 만들어 둠
+            psutil.cpu_percent(None)
+            self._process.cpu_percent(None)
+        self._thread = threading.Thread(
+            target=self._run, name="system-status", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"시스템 상태 샘플링 시작 ({self.interval_s:g}초 간격)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """샘플링을 멈추고 아직 기록하지 않은 행을 기록합니다."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+        if self._window:
+            self._pending.append(self._downsample(self._window))
+            self._window = []
+        self._flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"시스템 상태 샘플링 실패: {e}")
+
+    def sample(self) -> Dict:
+        """상태를 하나 수집해 캐시와 이력에 반영합니다."""
+        snapshot = self._collect()
+        self.history.append(snapshot)
+        self._body = json.dumps(snapshot, ensure_ascii=False).encode()
+
+        self._window.append(snapshot)
+        if len(self._window) >= self.persist_every:
+            self._pending.append(self._downsample(self._window))
+            self._window = []
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+        return snapshot
+
+    def health_body(self) -> bytes:
+        """
+        /health 응답 본문 (JSON) - 캐시된 최근 상태
+
+        샘플러 스레드가 돌지 않으면 (lifespan 없이 실행한 경우 등) 캐시가 interval_s보다
+        오래됐을 때만 이 자리에서 다시 수집합니다.
+        """
+        if self._body is None or (
+            not self.running
+            and time.time() - self.history[-1]["sampled_at"] >= self.interval_s
+        ):
+            self.sample()
+        return self._body
+
+    def _collect(self) -> Dict:
+        now = time.time()
+        latencies = np.array(self._latencies.view())
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+            response_time = {
+                "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3),
+                "p99": round(float(p99), 3),
+                "count": len(latencies),
+            }
+        else:
+            response_time = {"p50": None, "p95": None, "p99": None, "count": 0}
+
+        errors = 0
+        if self.error_count is not None:
+            total = self.error_count()
+            errors, self._last_errors = total - self._last_errors, total
+
+        snapshot = {
+            "status": "healthy",
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "sampled_at": now,
+            "uptime_s": round(now - self.started_at, 1),
+            "cpu_usage": None,
+            "memory_usage": None,
+            "disk_usage": None,
+            "process_cpu": None,
+            "process_rss_mb": None,
+            "response_time_ms": response_time,
+            "error_count": errors,
+        }
+        if psutil is not None:
+            snapshot.update(
+                {
+                    "cpu_usage": psutil.cpu_percent(None),
+                    "memory_usage": psutil.virtual_memory().percent,
+                    "disk_usage": psutil.disk_usage(self.disk_path).percent,
+                    "process_cpu": self._process.cpu_percent(None),
+                    "process_rss_mb": round(self._process.memory_info().rss / 2**20, 1),
+                }
+            )
+        if self.extra is not None:
+            snapshot.update(self.extra())
+        snapshot["status"] = self._judge(snapshot)
+        return snapshot
+
+    @staticmethod
+    def _judge(snapshot: Dict) -> str:
+        if snapshot.get("model_loaded") is False:
+            return "error"
+        usage = [
+            snapshot[key]
+            for key in ("cpu_usage", "memory_usage", "disk_usage")
+            if snapshot[key] is not None
+        ]
+        p95 = snapshot["response_time_ms"]["p95"]
+        if any(value >= WARN_USAGE_PERCENT for value in usage) or (
+            p95 is not None and p95 >= WARN_LATENCY_MS
+        ):
+            return "warning"
+        return "healthy"
+
+    @staticmethod
+    def _downsample(window: List[Dict]) -> Dict:
+        """상태 여러 개를 system_status 한 행으로 줄입니다 (평균, 최악 상태, 최대 p95, 오류 합계)."""
+
+        def mean(key):
+            values = [s[key] for s in window if s[key] is not None]
+            return sum(values) / len(values) if values else None
+
+        p95 = [
+            s["response_time_ms"]["p95"]
+            for s in window
+            if s["response_time_ms"]["p95"] is not None
+        ]
+        return {
+            "server_status": max(
+                (s["status"] for s in window), key=STATUS_RANK.__getitem__
+            ),
+            "active_connections": max(s.get("active_connections", 0) for s in window),
+            "cpu_usage": mean("cpu_usage"),
+            "memory_usage": mean("memory_usage"),
+            "disk_usage": window[-1]["disk_usage"],
+            "response_time_ms": max(p95) if p95 else None,
+            "error_count": sum(s["error_count"] for s in window),
+            "timestamp": datetime.fromtimestamp(window[-1]["sampled_at"], timezone.utc),
+        }
+
+    def _flush(self) -> None:
+        if self.writer is None or not self._pending:
+            self._pending.clear()
+            return
+        rows = list(self._pending)
+        try:
+            self.writer.write(rows)
+        except Exception as e:
+            # 다음 기록 때 다시 시도 (max_pending_rows까지 보관)
+            logger.warning(f"system_status 기록 실패 ({len(rows)}행 보관): {e}")
+            return
+        self._pending.clear()
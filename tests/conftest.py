@@ -2,6 +2,8 @@
 pytest 설정 및 fixture 정의
 """
 
+import asyncio
+import json
 import sys
 from pathlib import Path
 
@@ -11,6 +13,9 @@ import pytest
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+# 관리자 API 테스트용 토큰
+ADMIN_TOKEN = "test-admin-token"
+
 # 데이터베이스 가용성 확인
 try:
     import psycopg2
@@ -33,6 +38,126 @@ def pytest_collection_modifyitems(config, items):
             item.add_marker(skip_db)
 
 
+@pytest.fixture
+def admin_client(monkeypatch):
+    """관리자 토큰을 설정하고 그 토큰을 헤더로 보내는 서버 TestClient"""
+    from fastapi.testclient import TestClient
+
+    import websocket_server
+
+    monkeypatch.setattr(websocket_server, "ADMIN_TOKEN", ADMIN_TOKEN)
+    return TestClient(websocket_server.app, headers={"X-Admin-Token": ADMIN_TOKEN})
+
+
+class FakeClock:
+    """now를 직접 바꾸는 초 단위 시계"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """0초에서 시작하는 FakeClock (clock.now = ... 로 시간을 진행)"""
+    return FakeClock()
+
+
+class FakeWebSocket:
+    """보낸 메시지를 모으는 웹소켓"""
+
+    client = None
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text: str):
+        self.sent.append(json.loads(text))
+
+
+class StubClassifier:
+    """추론한 샘플의 타임스탬프를 기록하는 분류기"""
+
+    model = object()
+
+    def __init__(self):
+        self.calls = []
+
+    def predict_posture(self, timestamp, relative_pitch):
+        self.calls.append(timestamp)
+        return {
+            "predicted_posture": 1,
+            "confidence": 0.9,
+            "all_probabilities": {1: 0.9},
+            "timestamp": timestamp,
+            "relative_pitch": relative_pitch,
+        }
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """서버 분류기를 StubClassifier로 바꾸고 샘플 병합 설정을 기본값으로 고정"""
+    import websocket_server
+
+    stub = StubClassifier()
+    monkeypatch.setattr(websocket_server, "classifier", stub)
+    monkeypatch.setattr(websocket_server, "COALESCE_SAMPLES", True)
+    monkeypatch.setattr(websocket_server, "SAMPLE_AGE_BUDGET_MS", 1000)
+    return stub
+
+
+@pytest.fixture
+def run_batch():
+    """메시지 목록을 한 번에 process_batch로 처리하고 보낸 응답을 반환하는 함수"""
+    from websocket_server import process_batch
+
+    def run(messages, state):
+        websocket = FakeWebSocket()
+        batch = [m if isinstance(m, str) else json.dumps(m) for m in messages]
+        asyncio.run(process_batch(batch, websocket, state))
+        return websocket.sent
+
+    return run
+
+
+# make_classifier 분류기의 자세별 피치 분포 중심
+POSTURE_PITCH = {1: -20.0, 2: 0.0, 3: 20.0}
+
+
+def build_classifier(n_estimators: int = 20):
+    """자세별 피치 분포로 학습한 작은 분류기"""
+    import numpy as np
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+
+    from posture_classifier import PostureClassifier
+
+    clf = PostureClassifier("unused")
+    rng = np.random.default_rng(0)
+    rows, labels = [], []
+    for posture, pitch in POSTURE_PITCH.items():
+        for value in pitch + rng.normal(0, 2, 30):
+            df = pd.DataFrame({"timestamp_ms": [0], "relative_pitch_deg": [value]})
+            rows.append(clf.extract_features(df))
+            labels.append(posture)
+
+    features_df = pd.DataFrame(rows).fillna(0)
+    clf.feature_columns = features_df.columns.tolist()
+    X = clf.scaler.fit_transform(features_df)
+    clf.model = RandomForestClassifier(n_estimators=n_estimators, random_state=42)
+    clf.model.fit(X, labels)
+    clf.replay_X, clf.replay_y = X, np.array(labels)
+    return clf
+
+
+@pytest.fixture(scope="session")
+def make_classifier():
+    """작은 학습 분류기를 새로 만드는 함수 (make_classifier(n_estimators=20))"""
+    return build_classifier
+
+
 @pytest.fixture(scope="session")
 def test_data_dir():
     """테스트 데이터 디렉토리 경로"""
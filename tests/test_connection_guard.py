@@ -0,0 +1,215 @@
+"""
+연결 수명 관리 테스트 - 하트비트 판정, 동시 연결 수 제한, 반쯤 열린 연결 정리
+"""
+
+import time
+from contextlib import ExitStack
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import websocket_server
+from connection_guard import (
+    CLOSE_GOING_AWAY,
+    CLOSE_TRY_AGAIN_LATER,
+    AdmissionControl,
+    Heartbeat,
+)
+from websocket_server import app
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestHeartbeat:
+    """하트비트 판정 테스트"""
+
+    def test_ping_then_read_timeout(self, clock):
+        heartbeat = Heartbeat(ping_interval_s=10, read_timeout_s=30, clock=clock)
+        clock.now = 5
+        assert heartbeat.poll() is None
+        clock.now = 10
+        assert heartbeat.poll() == "ping"
+        # 같은 주기 안에서는 다시 보내지 않음
+        clock.now = 15
+        assert heartbeat.poll() is None
+        clock.now = 20
+        assert heartbeat.poll() == "ping"
+        clock.now = 30
+        assert heartbeat.poll() == "read_timeout"
+        assert heartbeat.expired == "read_timeout"
+
+    def test_frames_keep_connection_alive(self, clock):
+        heartbeat = Heartbeat(ping_interval_s=10, read_timeout_s=30, clock=clock)
+        for now in range(5, 100, 5):
+            clock.now = now
+            heartbeat.frame()
+            assert heartbeat.poll() is None
+
+    def test_idle_timeout_ignores_pongs(self, clock):
+        heartbeat = Heartbeat(10, 30, idle_timeout_s=60, clock=clock)
+        clock.now = 40
+        heartbeat.activity()
+        for now in range(45, 110, 5):
+            clock.now = now
+            heartbeat.frame()
+            if heartbeat.poll() is not None:
+                break
+        assert heartbeat.expired == "idle"
+        assert clock.now == 100
+
+    def test_invalid_intervals(self):
+        with pytest.raises(ValueError):
+            Heartbeat(ping_interval_s=0)
+
+
+class TestAdmissionControl:
+    """동시 연결 수 제한 테스트"""
+
+    def test_per_ip_and_global_limits(self):
+        admission = AdmissionControl(max_connections=3, max_per_ip=2)
+        assert admission.admit("a") is None
+        assert admission.admit("a") is None
+        assert admission.admit("a") == "per_ip"
+        assert admission.admit("b") is None
+        assert admission.admit("c") == "capacity"
+        assert admission.rejected == {"capacity": 1, "per_ip": 1, "session_in_use": 0}
+
+        admission.release("a")
+        assert admission.admit("c") is None
+        admission.release("b")
+        assert "b" not in admission.per_ip
+
+    def test_zero_means_unlimited(self):
+        admission = AdmissionControl(0, 0)
+        for _ in range(1000):
+            assert admission.admit("a") is None
+
+    def test_retry_after_is_jittered(self):
+        values = iter([0.0, 0.5, 1.0])
+        admission = AdmissionControl(retry_after_s=4.0, rng=lambda: next(values))
+        assert [admission.retry_after() for _ in range(3)] == [4.0, 6.0, 8.0]
+
+
+@pytest.fixture
+def fast_heartbeat(monkeypatch):
+    monkeypatch.setattr(websocket_server, "WS_PING_INTERVAL_S", 0.05)
+    monkeypatch.setattr(websocket_server, "WS_READ_TIMEOUT_S", 0.3)
+    monkeypatch.setattr(websocket_server, "WS_IDLE_TIMEOUT_S", 0.0)
+
+
+class TestConnectionLifetime:
+    """웹소켓 연결 정리/거부 테스트"""
+
+    def test_half_open_fleet_is_reaped(self, fast_heartbeat):
+        """ping에 응답하지 않는 기기들 (반쯤 열린 연결) 이 모두 정리됨"""
+        manager = websocket_server.manager
+        before = manager.reaped["read_timeout"]
+        client = TestClient(app)
+        fleet = 8
+
+        with ExitStack() as stack:
+            sockets = [
+                stack.enter_context(client.websocket_connect(f"/ws?device_id=d{i}"))
+                for i in range(fleet)
+            ]
+            for websocket in sockets:
+                assert websocket.receive_json()["type"] == "welcome"
+            assert len(manager.active_connections) == fleet
+
+            # 기기들은 아무것도 보내지 않음
+            assert wait_until(lambda: len(manager.active_connections) == 0)
+            assert manager.reaped["read_timeout"] - before == fleet
+            assert manager.admission.active == 0
+
+            # 정리 전에 ping을 받았고, 그 뒤 1001로 닫힘
+            assert sockets[0].receive_json()["type"] == "ping"
+            with pytest.raises(WebSocketDisconnect) as closed:
+                while True:
+                    sockets[0].receive_json()
+            assert closed.value.code == CLOSE_GOING_AWAY
+
+    def test_pong_keeps_connection_alive(self, fast_heartbeat):
+        manager = websocket_server.manager
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            deadline = time.monotonic() + 1.0
+            pings = 0
+            while time.monotonic() < deadline:
+                message = websocket.receive_json()
+                assert message["type"] == "ping"
+                pings += 1
+                websocket.send_json({"type": "pong"})
+            # 읽기 타임아웃(0.3초)보다 오래 유지됨
+            assert pings >= 3
+            assert len(manager.active_connections) == 1
+
+    def test_idle_connection_is_reaped(self, fast_heartbeat, monkeypatch):
+        monkeypatch.setattr(websocket_server, "WS_IDLE_TIMEOUT_S", 0.3)
+        manager = websocket_server.manager
+        before = manager.reaped["idle"]
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            with pytest.raises(WebSocketDisconnect):
+                while True:
+                    # pong만 보내는 연결은 유휴 연결
+                    if websocket.receive_json()["type"] == "ping":
+                        websocket.send_json({"type": "pong"})
+        assert manager.reaped["idle"] - before == 1
+
+    def test_rejects_over_per_ip_limit_with_retry_hint(self, monkeypatch):
+        admission = websocket_server.manager.admission
+        monkeypatch.setattr(admission, "max_per_ip", 2)
+        before = admission.rejected["per_ip"]
+        client = TestClient(app)
+
+        with ExitStack() as stack:
+            for _ in range(2):
+                websocket = stack.enter_context(client.websocket_connect("/ws"))
+                assert websocket.receive_json()["type"] == "welcome"
+
+            with client.websocket_connect("/ws") as websocket:
+                rejected = websocket.receive_json()
+                assert rejected["type"] == "rejected"
+                assert rejected["reason"] == "per_ip"
+                assert rejected["retry_after_s"] >= admission.retry_after_s
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    websocket.receive_json()
+                assert closed.value.code == CLOSE_TRY_AGAIN_LATER
+
+        assert admission.rejected["per_ip"] - before == 1
+        # /health는 캐시된 상태를 반환하므로 새로 수집한 뒤 확인
+        websocket_server.status_sampler.sample()
+        health = client.get("/health").json()
+        assert health["rejected_connections"]["per_ip"] >= 1
+
+    @pytest.mark.parametrize("failing", ["open_session", "receive_loop"])
+    def test_failed_setup_releases_admission(self, monkeypatch, failing):
+        """연결 준비 중 예외가 나도 입장 슬롯과 IP 버킷을 돌려줌"""
+
+        def fail(*args, **kwargs):
+            raise MemoryError("setup failed")
+
+        monkeypatch.setattr(websocket_server, failing, fail)
+        manager = websocket_server.manager
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as websocket:
+            with pytest.raises(WebSocketDisconnect):
+                websocket.receive_json()
+
+        assert wait_until(lambda: manager.admission.active == 0)
+        assert manager.admission.per_ip == {}
+        assert len(manager.active_connections) == 0
+        assert len(websocket_server.ip_buckets) == 0
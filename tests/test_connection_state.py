@@ -0,0 +1,199 @@
+"""
+연결별 상태 메모리 구조 테스트 - 링 버퍼, __slots__, 연결 관리자
+"""
+
+import asyncio
+import gc
+import json
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import websocket_server
+from connection_guard import Heartbeat
+from posture_smoothing import ChangeNotifier, PostureSmoother
+from rate_control import RateController
+from response_profiles import ResponseEncoder
+from ring_buffer import RingBuffer
+from session_state import SessionState, new_session_id
+
+# benchmarks/bench_connection_state.py 의 ack=1 프로필과 같은 회귀 기준
+MAX_BYTES_PER_CONNECTION = 16500
+
+
+class TestRingBuffer:
+    """링 버퍼 테스트"""
+
+    def test_view_is_chronological_before_and_after_wrap(self):
+        ring = RingBuffer(3)
+        ring.append(1.0)
+        ring.append(2.0)
+        assert ring.view().tolist() == [1.0, 2.0]
+        assert not ring.full
+
+        for value in (3.0, 4.0, 5.0):
+            ring.append(value)
+        assert ring.full
+        assert len(ring) == 3
+        assert ring.view().tolist() == [3.0, 4.0, 5.0]
+
+    def test_view_does_not_copy(self):
+        ring = RingBuffer(4)
+        for value in range(6):
+            ring.append(value)
+        assert np.shares_memory(ring.view(), ring._data)
+
+    def test_clear(self):
+        ring = RingBuffer(2, np.int32)
+        ring.append(7)
+        ring.clear()
+        assert len(ring) == 0
+        assert ring.tolist() == []
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            RingBuffer(0)
+
+
+class TestCompactState:
+    """연결별 상태 객체 테스트"""
+
+    @pytest.mark.parametrize(
+        "obj",
+        [
+            SessionState("s1", ChangeNotifier()),
+            ChangeNotifier(),
+            PostureSmoother(),
+            RateController(),
+            ResponseEncoder(),
+            RingBuffer(4),
+        ],
+    )
+    def test_no_instance_dict(self, obj):
+        assert not hasattr(obj, "__dict__")
+
+    def test_smoother_history_round_trip_after_wrap(self):
+        smoother = PostureSmoother(window=3)
+        for posture, confidence in [(1, 0.7), (1, 0.8), (2, 0.9), (2, 0.6)]:
+            smoother.update(posture, confidence)
+        data = json.loads(json.dumps(smoother.to_dict()))
+        assert data["history"] == [[1, 0.8], [2, 0.9], [2, 0.6]]
+
+        restored = PostureSmoother.from_dict(data)
+        assert restored.to_dict() == smoother.to_dict()
+
+    def test_rate_controller_shares_complete_rates(self):
+        rates = {"stable": 1, "normal": 10, "transition": 40}
+        assert RateController(rates).rates_hz is rates
+        assert RateController({"stable": 2}).rates_hz["normal"] == 20
+
+    def test_bytes_per_connection(self):
+        """연결 상태 메모리 회귀 검사 (벤치마크 ack=1 프로필의 축소판)"""
+        params = {"profile": "delta", "rate_control": "on", "ack": "1"}
+        probabilities = {0: 0.85, 1: 0.15}
+        n = 100
+
+        class FakeWebSocket:
+            __slots__ = ()
+            client = None
+            client_state = None
+
+            async def receive_text(self):
+                return await never
+
+            async def send_text(self, text):
+                pass
+
+        async def open_connections(manager):
+            loop = asyncio.get_running_loop()
+            connections = []
+            for i in range(n):
+                # websocket_endpoint와 같은 순서로 연결 상태 구성, ack는 보내지 않음
+                websocket = FakeWebSocket()
+                client_host = f"10.0.{i >> 8}.{i & 255}"
+                state = SessionState(
+                    new_session_id(),
+                    websocket_server.create_notifier(params),
+                    websocket_server.unacked_limit(params),
+                )
+                state.encoder = websocket_server.create_encoder(params)
+                state.rate_controller = websocket_server.create_rate_controller(params)
+                heartbeat = state.heartbeat = Heartbeat(
+                    websocket_server.WS_PING_INTERVAL_S,
+                    websocket_server.WS_READ_TIMEOUT_S,
+                    websocket_server.WS_IDLE_TIMEOUT_S,
+                )
+                state.limiter = websocket_server.create_limiter(client_host)
+                inbox = asyncio.Queue(maxsize=websocket_server.INBOX_MAX_MESSAGES)
+                reader = asyncio.create_task(
+                    websocket_server.receive_loop(websocket, inbox, heartbeat)
+                )
+                heartbeat.timer = loop.call_later(
+                    heartbeat.check_interval_s,
+                    websocket_server.check_heartbeat,
+                    websocket,
+                    heartbeat,
+                    inbox,
+                )
+                manager.active_connections[websocket] = state
+                connections.append((client_host, state, reader))
+                for t in range(40):
+                    state.last_sample = (t * 200, -20.0)
+                    state.rate_controller.observe(t * 200, -20.0)
+                    state.notifier.observe(0, 0.85, probabilities)
+                    response = state.encoder.encode(
+                        {
+                            "predicted_posture": 0,
+                            "confidence": 0.85,
+                            "all_probabilities": probabilities,
+                            "timestamp": t * 200,
+                            "relative_pitch": -20.0,
+                        }
+                    )
+                    await manager.send_personal_message(response, websocket)
+            await asyncio.sleep(0)
+            return connections
+
+        async def measure():
+            nonlocal never
+            never = asyncio.get_running_loop().create_future()
+            manager = websocket_server.ConnectionManager()
+            gc.collect()
+            tracemalloc.start()
+            try:
+                before = tracemalloc.get_traced_memory()[0]
+                connections = await open_connections(manager)
+                gc.collect()
+                used = tracemalloc.get_traced_memory()[0] - before
+            finally:
+                tracemalloc.stop()
+            for client_host, state, reader in connections:
+                reader.cancel()
+                state.heartbeat.timer.cancel()
+                websocket_server.release_limiter(client_host, state.limiter)
+            limit = websocket_server.SESSION_MAX_UNACKED
+            assert all(len(state.unacked) == limit for _, state, _ in connections)
+            return used
+
+        never = None
+        used = asyncio.run(measure())
+        assert used / n < MAX_BYTES_PER_CONNECTION
+
+
+class TestConnectionManager:
+    """연결 관리자 테스트"""
+
+    def test_disconnect_removes_connection_and_session(self, monkeypatch):
+        monkeypatch.setattr(websocket_server.metrics, "connection_closed", lambda: None)
+
+        class FakeWebSocket:
+            client = None
+
+        manager = websocket_server.ConnectionManager()
+        websocket = FakeWebSocket()
+        manager.active_connections[websocket] = SessionState("s1", ChangeNotifier())
+        manager.disconnect(websocket)
+        assert len(manager.active_connections) == 0
+        # 이미 해제된 연결은 무시
+        manager.disconnect(websocket)
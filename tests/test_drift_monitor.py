@@ -0,0 +1,156 @@
+"""
+드리프트 감시 테스트 - 감쇠 히스토그램, PSI 판정·해제, 기기 수 상한, 모델 파일의 기준 분포
+"""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import websocket_server
+from drift_monitor import (
+    PITCH_EDGES,
+    DecayingHistogram,
+    DriftMonitor,
+    build_reference,
+    psi,
+)
+from posture_classifier import PostureClassifier
+from websocket_server import app
+
+
+def reference(pitch_mean=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return build_reference(rng.normal(pitch_mean, 5, 5000), rng.uniform(0.6, 0.9, 1000))
+
+
+class TestDecayingHistogram:
+    """지수 감쇠 히스토그램 테스트"""
+
+    def test_recent_samples_dominate(self):
+        histogram = DecayingHistogram(PITCH_EDGES, half_life=100)
+        for _ in range(1000):
+            histogram.add(-40.0)
+        for _ in range(1000):
+            histogram.add(40.0)
+        distribution = histogram.distribution()
+        assert sum(distribution) == pytest.approx(1.0)
+        # 1000개 전 샘플의 가중치는 2^-10
+        assert max(distribution) == distribution[26] > 0.99
+
+    def test_out_of_range_values_go_to_edge_bins(self):
+        histogram = DecayingHistogram(PITCH_EDGES, half_life=100)
+        histogram.add(-500.0)
+        histogram.add(500.0)
+        assert histogram.counts[0] > 0 and histogram.counts[-1] > 0
+
+    def test_rescale_keeps_distribution(self):
+        histogram = DecayingHistogram(PITCH_EDGES, half_life=1)
+        for i in range(100):
+            histogram.add(float(i % 3))
+        assert histogram.weight < 1e12
+        assert sum(histogram.distribution()) == pytest.approx(1.0)
+
+
+class TestDriftMonitor:
+    """드리프트 판정 테스트"""
+
+    def test_psi_of_identical_distributions_is_zero(self):
+        ref = reference()
+        assert psi(ref["pitch"], ref["pitch"]) == pytest.approx(0.0)
+
+    def test_shifted_device_raises_then_recovers(self):
+        monitor = DriftMonitor(reference(), half_life=100, check_every=10)
+        rng = np.random.default_rng(1)
+        events = []
+        for value in rng.normal(0, 5, 500):
+            events += monitor.observe("steady", float(value), rng.uniform(0.6, 0.9))
+        assert events == []
+
+        # 다르게 장착한 기기 - 피치가 30도 옮겨 가고 확신도가 떨어짐
+        for value in rng.normal(30, 5, 300):
+            events += monitor.observe("remounted", float(value), 0.3)
+        device = [e for e in events if e["device_id"] == "remounted"]
+        assert {(e["type"], e["signal"]) for e in device} == {
+            ("drift", "pitch"),
+            ("drift", "confidence"),
+        }
+        assert monitor.alerts["pitch"] >= 1
+        report = monitor.report()
+        assert list(report["devices"])[0] == "remounted"
+        assert report["devices"]["steady"]["drifting"]["pitch"] is False
+
+        # 다시 장착하면 해제
+        events = []
+        for value in rng.normal(0, 5, 1000):
+            events += monitor.observe("remounted", float(value), rng.uniform(0.6, 0.9))
+        assert ("recovered", "pitch") in {
+            (e["type"], e["signal"]) for e in events if e["scope"] == "device"
+        }
+
+    def test_without_reference_does_nothing(self):
+        monitor = DriftMonitor()
+        assert monitor.observe("a", 10.0, 0.5) == []
+        assert monitor.report()["enabled"] is False
+
+    def test_mismatched_edges_disable_monitoring(self):
+        ref = reference()
+        ref["pitch_edges"] = [0.0, 1.0]
+        assert DriftMonitor(ref).reference is None
+
+    def test_device_count_is_bounded(self):
+        monitor = DriftMonitor(reference(), max_devices=3)
+        for i in range(10):
+            monitor.observe(f"d{i}", 0.0, 0.8)
+        monitor.observe("d7", 0.0, 0.8)
+        assert list(monitor.devices) == ["d8", "d9", "d7"]
+
+
+class TestModelReference:
+    """모델 파일에 저장되는 기준 분포 테스트"""
+
+    def test_reference_round_trips_through_model_file(self, make_classifier, tmp_path):
+        clf = make_classifier()
+        pitches = np.random.default_rng(0).normal(0, 15, 2000)
+        clf.drift_reference = clf.build_drift_reference(pitches)
+        assert clf.drift_reference["samples"] == {"pitch": 2000, "confidence": 256}
+        assert sum(clf.drift_reference["confidence"]) == pytest.approx(1.0)
+
+        model_path = str(tmp_path / "model.pkl")
+        clf.save_model(model_path)
+        loaded = PostureClassifier("unused")
+        assert loaded.load_model(model_path)
+        assert loaded.drift_reference == clf.drift_reference
+
+    def test_server_alerts_on_shifted_device(self, monkeypatch, admin_client):
+        class StubClassifier:
+            model = object()
+
+            def predict_posture(self, timestamp, relative_pitch):
+                return {
+                    "predicted_posture": 0,
+                    "confidence": 0.3,
+                    "all_probabilities": {0: 0.3, 1: 0.7},
+                    "timestamp": timestamp,
+                    "relative_pitch": relative_pitch,
+                }
+
+        monitor = DriftMonitor(reference(), check_every=5, min_samples=20)
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        monkeypatch.setattr(websocket_server, "drift_monitor", monitor)
+        monkeypatch.setattr(websocket_server, "COALESCE_SAMPLES", False)
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws?device_id=desk-7") as websocket:
+            websocket.receive_json()
+            for i in range(30):
+                websocket.send_json({"timestamp": i, "relativePitch": 35.0})
+                websocket.receive_json()
+
+        assert monitor.devices["desk-7"].drifting == {
+            "pitch": True,
+            "confidence": True,
+        }
+        report = admin_client.get("/admin/drift").json()
+        assert report["global"]["drifting"]["pitch"] is True
+        # 기기 하나와 전체에서 한 번씩
+        assert report["alerts"] == {"pitch": 2, "confidence": 2}
@@ -0,0 +1,201 @@
+"""
+메시지 속도 제한 테스트 - 토큰 버킷, drop/coalesce 정책, slow_down 알림
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import websocket_server
+from flood_control import (
+    MAX_HELD,
+    OVERHEAD_BUDGET_US,
+    BucketRegistry,
+    ConnectionLimiter,
+    TokenBucket,
+    measure_overhead,
+)
+from websocket_server import app
+
+
+class TestTokenBucket:
+    """토큰 버킷 테스트"""
+
+    def test_burst_then_refill(self, clock):
+        bucket = TokenBucket(rate=10, burst=3, clock=clock)
+        assert [bucket.take() for _ in range(4)] == [True, True, True, False]
+        assert bucket.wait_s() == pytest.approx(0.1)
+
+        clock.now = 0.1
+        assert bucket.take()
+        assert not bucket.take()
+        # 오래 쉬어도 burst까지만 쌓임
+        clock.now = 100
+        assert sum(bucket.take() for _ in range(10)) == 3
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0, burst=1)
+
+    def test_registry_shares_bucket_until_last_release(self, clock):
+        registry = BucketRegistry(rate=1, burst=1, clock=clock)
+        first = registry.acquire("10.0.0.1")
+        assert registry.acquire("10.0.0.1") is first
+        registry.release("10.0.0.1")
+        assert len(registry) == 1
+        registry.release("10.0.0.1")
+        assert len(registry) == 0
+
+
+class TestConnectionLimiter:
+    """정책별 초과 메시지 처리 테스트"""
+
+    def test_drop_policy(self, clock):
+        limiter = ConnectionLimiter(
+            TokenBucket(1, 2, clock), policy="drop", clock=clock
+        )
+        assert limiter.filter(["a", "b", "c", "d"]) == ["a", "b"]
+        assert (limiter.limited, limiter.dropped) == (2, 2)
+        assert limiter.pending is None
+
+    def test_coalesce_keeps_latest_excess_message(self, clock):
+        limiter = ConnectionLimiter(TokenBucket(1, 2, clock), clock=clock)
+        assert limiter.filter(["a", "b", "c", "d"]) == ["a", "b"]
+        assert limiter.pending == "d"
+        assert (limiter.limited, limiter.dropped) == (2, 1)
+
+        # 토큰이 생기면 보류한 메시지부터 처리
+        clock.now = 1.0
+        assert limiter.filter(["e"]) == ["d"]
+        assert limiter.pending == "e"
+
+    def test_coalesce_queues_control_messages(self, clock):
+        limiter = ConnectionLimiter(TokenBucket(1, 1, clock), clock=clock)
+        correction = '{"type": "correction", "posture": 3}'
+        assert limiter.filter(["s1", correction, "s2", "s3"]) == ["s1"]
+        assert list(limiter.held) == [correction]
+        assert limiter.pending == "s3"
+        assert limiter.backlog
+        assert limiter.wait_s() == pytest.approx(1.0)
+
+        # 보류한 제어 메시지가 샘플보다 먼저, 새 메시지는 그 뒤에
+        clock.now = 1.0
+        assert limiter.filter([]) == [correction]
+        clock.now = 2.0
+        assert limiter.filter(["s4"]) == ["s3"]
+        clock.now = 3.0
+        assert limiter.filter([]) == ["s4"]
+        assert not limiter.backlog
+        assert limiter.dropped == 1
+
+    def test_held_control_messages_are_bounded(self, clock):
+        limiter = ConnectionLimiter(TokenBucket(1, 1, clock), clock=clock)
+        acks = [f'{{"type": "ack", "seq": {i}}}' for i in range(MAX_HELD + 6)]
+        assert limiter.filter(acks) == acks[:1]
+        assert list(limiter.held) == acks[-MAX_HELD:]
+        assert limiter.dropped == 5
+
+    def test_ip_bucket_is_shared_and_refunds(self, clock):
+        shared = TokenBucket(1, 3, clock)
+        first = ConnectionLimiter(TokenBucket(1, 10, clock), shared, clock=clock)
+        second = ConnectionLimiter(TokenBucket(1, 10, clock), shared, clock=clock)
+        assert first.filter(["a", "b"]) == ["a", "b"]
+        assert second.filter(["c", "d"]) == ["c"]
+        assert second.scope == "ip"
+        # IP 버킷에서 거부된 메시지는 연결 버킷 토큰을 쓰지 않음
+        assert second.bucket.tokens == 9
+
+    def test_notice_is_throttled(self, clock):
+        limiter = ConnectionLimiter(
+            TokenBucket(2, 1, clock), policy="drop", notice_interval_s=1.0, clock=clock
+        )
+        assert limiter.notice() is None
+        limiter.filter(["a", "b", "c"])
+        notice = limiter.notice()
+        assert notice["type"] == "slow_down"
+        assert notice["scope"] == "connection"
+        assert notice["limit_per_s"] == 2
+        assert notice["limited"] == 2
+        assert notice["retry_after_ms"] == 500
+
+        limiter.filter(["d"])
+        assert limiter.notice() is None
+        clock.now = 1.0
+        limiter.filter(["e", "f"])
+        assert limiter.notice()["limited"] == 2
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            ConnectionLimiter(TokenBucket(1, 1), policy="queue")
+
+    def test_overhead_within_budget(self):
+        # CI 부하를 감안해 여유를 둠 (정확한 측정은 benchmarks/bench_rate_limit.py)
+        assert measure_overhead(iterations=20000) < OVERHEAD_BUDGET_US * 3
+
+
+class TestRateLimitWebSocket:
+    """웹소켓 속도 제한 테스트"""
+
+    def test_flood_is_limited_and_client_told_to_slow_down(self, monkeypatch):
+        class StubClassifier:
+            model = object()
+
+            def predict_posture(self, timestamp, relative_pitch):
+                return {
+                    "predicted_posture": 0,
+                    "confidence": 0.9,
+                    "all_probabilities": {0: 0.9, 1: 0.1},
+                    "timestamp": timestamp,
+                    "relative_pitch": relative_pitch,
+                }
+
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        monkeypatch.setattr(websocket_server, "COALESCE_SAMPLES", False)
+        monkeypatch.setattr(websocket_server, "MESSAGE_RATE_PER_S", 1)
+        monkeypatch.setattr(websocket_server, "MESSAGE_BURST", 5)
+        monkeypatch.setattr(websocket_server, "FLOOD_POLICY", "drop")
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            for i in range(30):
+                websocket.send_json({"timestamp": i, "relativePitch": -5.0})
+            messages = [websocket.receive_json() for _ in range(6)]
+
+        types = [m["type"] for m in messages]
+        assert types.count("prediction") == 5
+        notice = messages[types.index("slow_down")]
+        assert notice["scope"] == "connection"
+        assert notice["limit_per_s"] == 1
+        assert notice["limited"] >= 1
+
+    def test_held_sample_is_released_without_new_frames(self, monkeypatch):
+        class StubClassifier:
+            model = object()
+
+            def predict_posture(self, timestamp, relative_pitch):
+                return {
+                    "predicted_posture": 0,
+                    "confidence": 0.9,
+                    "all_probabilities": {0: 0.9},
+                    "timestamp": timestamp,
+                    "relative_pitch": relative_pitch,
+                }
+
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        monkeypatch.setattr(websocket_server, "COALESCE_SAMPLES", False)
+        monkeypatch.setattr(websocket_server, "MESSAGE_RATE_PER_S", 20)
+        monkeypatch.setattr(websocket_server, "MESSAGE_BURST", 1)
+        monkeypatch.setattr(websocket_server, "FLOOD_POLICY", "coalesce")
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            for i in range(5):
+                websocket.send_json({"timestamp": i, "relativePitch": -5.0})
+            # 더 보내지 않아도 보류된 마지막 샘플이 토큰이 생기면 처리됨
+            predictions = []
+            while not predictions or predictions[-1] != 4:
+                message = websocket.receive_json()
+                if message["type"] == "prediction":
+                    predictions.append(message["input_timestamp"])
+        assert predictions[0] == 0
@@ -0,0 +1,101 @@
+"""
+병렬 warm_start 포레스트 학습 및 학습 프로파일 테스트
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from posture_classifier import (
+    FIXED_N_ESTIMATORS,
+    MIN_OOB_TRAINING_ROWS,
+    PostureClassifier,
+)
+
+STAGES = ["load_s", "features_s", "scale_s", "fit_s", "evaluate_s", "total_s"]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """사람 3명 × 자세 4개의 잘 분리되는 IMU 기록"""
+    rng = np.random.default_rng(0)
+    for person in ["다혜", "도엽", "준형"]:
+        person_dir = tmp_path / person
+        person_dir.mkdir()
+        for posture in range(4):
+            pitch = posture * 20.0 + rng.normal(0, 0.5, 50)
+            pd.DataFrame(
+                {"timestamp_ms": np.arange(50) * 20, "relative_pitch_deg": pitch}
+            ).to_csv(person_dir / f"{posture}번자세.csv", index=False)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def large_data_dir(tmp_path):
+    """학습 샘플이 MIN_OOB_TRAINING_ROWS를 넘도록 자세마다 짧은 기록 22개씩"""
+    rng = np.random.default_rng(1)
+    for person in ["다혜", "도엽", "준형"]:
+        person_dir = tmp_path / person
+        person_dir.mkdir()
+        for posture in range(4):
+            for take in range(22):
+                pitch = posture * 5.0 + rng.normal(0, 3.0, 20)
+                pd.DataFrame(
+                    {"timestamp_ms": np.arange(20) * 20, "relative_pitch_deg": pitch}
+                ).to_csv(person_dir / f"{posture}번자세_{take}.csv", index=False)
+    return str(tmp_path)
+
+
+class TestForestTraining:
+    """OOB 정체 조기 종료와 단계별 시간 기록 테스트"""
+
+    def test_profile_records_every_stage(self, data_dir):
+        classifier = PostureClassifier(data_dir)
+        profile = classifier.train_model(n_jobs=2, step=10, max_estimators=50)
+
+        for stage in STAGES:
+            assert profile[stage] >= 0
+        assert classifier.training_profile is profile
+        assert 0.0 <= profile["accuracy"] <= 1.0
+        # 예측 경로는 단일 코어
+        assert classifier.model.n_jobs is None
+
+    def test_stops_when_oob_plateaus(self, data_dir):
+        classifier = PostureClassifier(data_dir)
+        profile = classifier.train_model(
+            step=10, max_estimators=200, oob_tolerance=0.01, patience=2, min_oob_rows=0
+        )
+
+        history = profile["oob_history"]
+        sizes = [n for n, _ in history]
+        assert sizes == list(range(10, 10 * (len(history) + 1), 10))
+        assert classifier.model.n_estimators == sizes[-1] < 200
+        assert len(classifier.model.estimators_) == sizes[-1]
+
+    def test_respects_max_estimators(self, data_dir):
+        classifier = PostureClassifier(data_dir)
+        profile = classifier.train_model(
+            step=15, max_estimators=20, patience=100, min_oob_rows=0
+        )
+
+        assert [n for n, _ in profile["oob_history"]] == [15, 20]
+        assert len(classifier.model.estimators_) == 20
+
+    def test_small_training_set_uses_fixed_forest(self, data_dir):
+        classifier = PostureClassifier(data_dir)
+        profile = classifier.train_model(step=10, max_estimators=300, patience=1)
+
+        # 학습 샘플이 적으면 OOB 정체 판단 없이 고정 트리 수
+        assert [n for n, _ in profile["oob_history"]] == [FIXED_N_ESTIMATORS]
+        assert len(classifier.model.estimators_) == FIXED_N_ESTIMATORS
+
+    def test_default_training_stops_early_on_enough_rows(self, large_data_dir):
+        classifier = PostureClassifier(large_data_dir)
+        # 기본 설정 그대로 - 학습 샘플이 충분하면 OOB 정체 조기 종료 경로를 탐
+        profile = classifier.train_model()
+
+        assert int(len(classifier.replay_y) * 0.8) >= MIN_OOB_TRAINING_ROWS
+        sizes = [n for n, _ in profile["oob_history"]]
+        assert len(sizes) >= 3
+        assert sizes == list(range(25, 25 * (len(sizes) + 1), 25))
+        assert classifier.model.n_estimators == sizes[-1] < 300
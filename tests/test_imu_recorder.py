@@ -0,0 +1,96 @@
+"""
+IMU 고속 수집기 테스트
+"""
+
+import io
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from imu_recorder import (
+    ImuRecorder,
+    PitchRingBuffer,
+    SimulatedSerial,
+    StreamingDecimator,
+    parse_imu_line,
+)
+
+
+def fake_clock(rate_hz: float = 50.0):
+    """호출될 때마다 샘플 간격만큼 증가하는 가짜 시계"""
+    counter = itertools.count()
+    return lambda: next(counter) / rate_hz
+
+
+class TestImuRecorder:
+    """링 버퍼 및 데시메이션 수집기 테스트"""
+
+    def test_parse_imu_line(self):
+        assert parse_imu_line(b"1200,-3.5\r\n") == -3.5
+        assert parse_imu_line("abc,1.0") is None
+        assert parse_imu_line(b"MPU6050 ready") is None
+
+    def test_ring_buffer_wraps_in_order(self):
+        buffer = PitchRingBuffer(4)
+        for i in range(6):
+            buffer.append(i * 10, float(i))
+
+        timestamps, values = buffer.since(3)
+        assert timestamps.tolist() == [30, 40, 50]
+        assert values.tolist() == [3.0, 4.0, 5.0]
+        assert buffer.latest(2)[1].tolist() == [4.0, 5.0]
+
+    def test_decimator_is_block_size_independent(self):
+        rng = np.random.default_rng(0)
+        values = rng.normal(size=1000)
+        timestamps = np.arange(1000, dtype=np.int64) * 20
+
+        whole = StreamingDecimator(10).process(timestamps, values)
+
+        chunked = StreamingDecimator(10)
+        parts = [
+            chunked.process(timestamps[i : i + 37], values[i : i + 37])
+            for i in range(0, 1000, 37)
+        ]
+        chunked_values = np.concatenate([p[1] for p in parts])
+
+        assert len(whole[1]) == 100
+        np.testing.assert_allclose(chunked_values, whole[1])
+
+    def test_recorder_writes_full_rate_and_decimated(self):
+        ser = SimulatedSerial.sine(1000, components=[(0.05, 10.0)], offset=5.0)
+        full, decimated = io.StringIO(), io.StringIO()
+        recorder = ImuRecorder(
+            full, decimated, decimation=50, flush_size=128, clock=fake_clock()
+        )
+
+        collected = recorder.run(ser, stop_on_empty=True)
+
+        full_df = pd.read_csv(io.StringIO(full.getvalue()))
+        dec_df = pd.read_csv(io.StringIO(decimated.getvalue()))
+        assert collected == 1000
+        assert len(full_df) == 1000
+        assert len(dec_df) == 20
+        # 최초 pitch 기준 상대 각도
+        assert full_df["relative_pitch_deg"].iloc[0] == 0.0
+        assert full_df["timestamp_ms"].iloc[-1] == 999 * 20
+
+    def test_decimation_suppresses_aliasing(self):
+        # 1.02Hz 성분은 1Hz 단순 추출 시 0.02Hz로 접혀 신호를 왜곡함
+        ser = SimulatedSerial.sine(5000, components=[(0.02, 5.0), (1.02, 8.0)])
+        full, decimated = io.StringIO(), io.StringIO()
+        recorder = ImuRecorder(full, decimated, decimation=50, clock=fake_clock())
+        recorder.run(ser, stop_on_empty=True)
+
+        full_df = pd.read_csv(io.StringIO(full.getvalue()))
+        dec_df = pd.read_csv(io.StringIO(decimated.getvalue()))
+        t = dec_df["timestamp_ms"].to_numpy() / 1000.0
+        expected = 5.0 * np.sin(2 * np.pi * 0.02 * t)
+
+        naive = full_df["relative_pitch_deg"].to_numpy()[::50]
+        naive_error = np.abs(naive - 5.0 * np.sin(2 * np.pi * 0.02 * np.arange(100)))
+        filtered_error = np.abs(dec_df["relative_pitch_deg"].to_numpy() - expected)
+
+        assert filtered_error[5:].max() < 1.0
+        assert naive_error.max() > 5.0
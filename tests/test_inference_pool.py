@@ -0,0 +1,144 @@
+"""
+멀티프로세스 추론 풀 테스트 - 레코드 형식, 워커 예측 일치, 재시작과 fallback, 모델 다시 로드
+"""
+
+import asyncio
+import os
+import signal
+import time
+
+import numpy as np
+import pytest
+
+from inference_pool import RESPONSE, InferencePool, read_response, write_response
+
+PITCHES = [-25.0, -20.0, -5.0, 0.0, 3.0, 18.0, 22.0]
+
+
+def wait_until(condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+@pytest.fixture(scope="module")
+def model(tmp_path_factory, make_classifier):
+    clf = make_classifier()
+    path = str(tmp_path_factory.mktemp("pool") / "model.pkl")
+    clf.save_model(path)
+    return clf, path
+
+
+@pytest.fixture(scope="module")
+def pool(model):
+    clf, path = model
+    pool = InferencePool(
+        1,
+        path,
+        clf.predict_posture,
+        capacity=16,
+        request_timeout_s=2.0,
+        heartbeat_timeout_s=1.0,
+        check_interval_s=0.1,
+    )
+    pool.start()
+    assert pool.wait_ready(60)
+    yield pool
+    pool.close()
+
+
+def predict_all(pool, pitches):
+    async def run():
+        return await asyncio.gather(
+            *[pool.predict(i, pitch) for i, pitch in enumerate(pitches)]
+        )
+
+    return asyncio.run(run())
+
+
+class TestRecords:
+    """고정 크기 결과 레코드 테스트"""
+
+    def test_response_round_trip(self):
+        responses = np.zeros(2, RESPONSE)
+        result = {
+            "predicted_posture": 3,
+            "confidence": 0.7,
+            "all_probabilities": {1: 0.1, 2: 0.2, 3: 0.7},
+        }
+        write_response(responses, 1, 42, result)
+        assert read_response(responses, 1) == (42, (3, 0.7, {1: 0.1, 2: 0.2, 3: 0.7}))
+
+        write_response(responses, 0, 7, {"error": "Model not trained"})
+        assert read_response(responses, 0) == (7, None)
+
+
+class TestInferencePool:
+    """워커 프로세스 추론 테스트"""
+
+    def test_matches_in_process_prediction(self, model, pool):
+        clf, _ = model
+        processed = pool.status()["workers"][0]["processed"]
+        fallbacks = pool.fallbacks
+        results = predict_all(pool, PITCHES)
+
+        for i, (pitch, result) in enumerate(zip(PITCHES, results)):
+            expected = clf.predict_posture(i, pitch)
+            assert result["predicted_posture"] == expected["predicted_posture"]
+            assert result["all_probabilities"] == pytest.approx(
+                expected["all_probabilities"]
+            )
+            assert result["relative_pitch"] == pitch
+        assert pool.fallbacks == fallbacks
+        assert pool.status()["workers"][0]["processed"] - processed == len(PITCHES)
+
+    def test_overflow_falls_back_in_process(self, pool):
+        fallbacks = pool.fallbacks
+        results = predict_all(pool, PITCHES * 5)
+        assert all("error" not in r for r in results)
+        # 링(16개)이 가득 찬 동안의 요청은 서버 프로세스에서 예측
+        assert pool.fallbacks > fallbacks
+
+    def test_killed_worker_is_restarted(self, pool):
+        restarts = pool.restarts
+        old = pool.channels[0]
+        old.process.kill()
+
+        results = predict_all(pool, PITCHES)
+        assert all("error" not in r for r in results)
+        assert wait_until(lambda: pool.restarts == restarts + 1)
+        assert pool.channels[0] is not old
+        assert pool.wait_ready(60)
+
+    def test_hung_worker_is_restarted(self, pool):
+        restarts = pool.restarts
+        pid = pool.channels[0].process.pid
+        os.kill(pid, signal.SIGSTOP)
+        try:
+            assert wait_until(lambda: pool.restarts == restarts + 1)
+        finally:
+            # 감독 스레드가 이미 종료시켰다면 아무 일도 없음
+            try:
+                os.kill(pid, signal.SIGCONT)
+            except ProcessLookupError:
+                pass
+        assert pool.wait_ready(60)
+        assert all("error" not in r for r in predict_all(pool, PITCHES))
+
+    def test_reload_picks_up_new_model(self, model, pool, make_classifier):
+        clf, path = model
+        # 모든 샘플을 1번 자세로 학습한 모델로 교체
+        relabeled = make_classifier()
+        relabeled.model.fit(relabeled.replay_X, np.ones(len(relabeled.replay_y)))
+        relabeled.save_model(path)
+        try:
+            pool.reload()
+            assert wait_until(
+                lambda: predict_all(pool, [20.0])[0]["predicted_posture"] == 1
+            )
+        finally:
+            clf.save_model(path)
+            pool.reload()
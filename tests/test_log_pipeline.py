@@ -0,0 +1,83 @@
+"""
+비동기 로깅 파이프라인 테스트
+"""
+
+import gzip
+import logging
+import queue
+
+import pytest
+
+import log_pipeline
+from log_pipeline import LazyQueueHandler, LogSampler, parse_rules, setup_logging
+
+
+class TestLogSampler:
+    """종류별 샘플링/초당 상한 테스트"""
+
+    def test_every_n(self):
+        sampler = LogSampler(every={"receive": 10})
+        kept = sum(sampler.allow("receive") for _ in range(100))
+
+        assert kept == 10
+        assert sampler.suppressed == {"receive": 90}
+        assert all(sampler.allow("other") for _ in range(5))
+
+    def test_per_second_limit(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("log_pipeline.time.monotonic", lambda: now[0])
+        sampler = LogSampler(per_second={"predict": 3})
+
+        assert sum(sampler.allow("predict") for _ in range(10)) == 3
+        now[0] += 1.0
+        assert sum(sampler.allow("predict") for _ in range(10)) == 3
+
+    def test_parse_rules(self):
+        assert parse_rules("receive:100, predict:5") == {
+            "receive": 100.0,
+            "predict": 5.0,
+        }
+        assert parse_rules("") == {}
+
+
+@pytest.fixture
+def isolated_root(monkeypatch):
+    """서버가 설정한 전역 파이프라인과 루트 로거를 건드리지 않도록 테스트 동안 비워 둠"""
+    root = logging.getLogger()
+    level = root.level
+    monkeypatch.setattr(log_pipeline, "_active_pipeline", None)
+    monkeypatch.setattr(root, "handlers", [])
+    yield
+    root.setLevel(level)
+
+
+class TestLogPipeline:
+    """기록 스레드, 압축 회전, 큐 포화 테스트"""
+
+    def test_writes_and_rotates_compressed(self, tmp_path, isolated_root):
+        log_file = tmp_path / "server.log"
+        pipeline = setup_logging(
+            str(log_file), max_bytes=2000, backup_count=2, console=False
+        )
+        logger = logging.getLogger("test_log_pipeline")
+        try:
+            for i in range(200):
+                logger.info("샘플 %d: %s", i, {"relativePitch": -25.73})
+        finally:
+            pipeline.stop()
+
+        rotated = sorted(tmp_path.glob("server.log.*.gz"))
+        assert len(rotated) == 2
+        with gzip.open(rotated[0], "rt", encoding="utf-8") as f:
+            assert "샘플" in f.read()
+        current = log_file.read_text(encoding="utf-8")
+        assert "샘플 199: {'relativePitch': -25.73}" in current
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = LazyQueueHandler(queue.Queue(maxsize=2))
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "msg", None, None)
+        for _ in range(5):
+            handler.handle(record)
+
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
@@ -0,0 +1,143 @@
+"""
+라벨 교정 기반 점진적 모델 갱신 테스트
+"""
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import websocket_server
+from online_updates import OnlineForestUpdater
+from posture_classifier import PostureClassifier
+from websocket_server import app
+
+
+class TestOnlineForestUpdater:
+    """warm_start 트리 추가 및 모델 교체 테스트"""
+
+    def test_update_adds_trees_and_swaps_model(self, make_classifier, tmp_path):
+        clf = make_classifier()
+        old_model = clf.model
+        model_path = str(tmp_path / "model.pkl")
+        updater = OnlineForestUpdater(
+            clf, batch_size=4, trees_per_update=5, model_path=model_path
+        )
+
+        # 10도 부근은 원래 2번 자세로 예측되지만 사용자는 3번이라고 교정
+        for i in range(40):
+            assert updater.add_correction(i, 10.0 + (i % 5) * 0.1, 3)
+        assert updater.ready()
+
+        result = updater.update()
+        assert result["estimators"] == 25
+        assert clf.model is not old_model
+        assert len(old_model.estimators_) == 20
+        assert clf.model_version == 1
+        assert clf.predict_posture(0, 10.2)["predicted_posture"] == 3
+
+        reloaded = PostureClassifier("unused")
+        assert reloaded.load_model(model_path)
+        assert reloaded.model_version == 1
+        assert len(reloaded.model.estimators_) == 25
+
+    def test_rejects_unknown_posture(self, make_classifier):
+        updater = OnlineForestUpdater(make_classifier())
+        assert not updater.add_correction(0, 5.0, 9)
+        assert updater.pending == 0
+        assert updater.update() is None
+
+    def test_estimator_cap_drops_oldest_added_trees(self, make_classifier):
+        clf = make_classifier()
+        updater = OnlineForestUpdater(
+            clf, batch_size=1, trees_per_update=5, max_estimators=30
+        )
+        base_seeds = [tree.random_state for tree in clf.model.estimators_]
+
+        for step in range(4):
+            updater.add_correction(step, 20.0, 3)
+            updater.update()
+
+        assert len(clf.model.estimators_) == 30
+        seeds = [tree.random_state for tree in clf.model.estimators_]
+        assert seeds[:20] == base_seeds
+        assert updater.stats["updates"] == 4
+
+    def test_missing_postures_defer_without_retrying(self, make_classifier):
+        """재학습 샘플이 없으면 빠진 자세가 들어올 때까지 갱신을 다시 시도하지 않음"""
+        clf = make_classifier()
+        clf.replay_X = clf.replay_y = None
+        updater = OnlineForestUpdater(clf, batch_size=10, max_pending=50)
+
+        for i in range(10):
+            updater.add_correction(i, 20.0, 3)
+        assert updater.ready()
+        assert updater.update() is None
+        assert not updater.ready()
+
+        for i in range(100):
+            updater.add_correction(i, 20.0, 3)
+        assert updater.pending == 50
+        assert updater.stats["discarded"] == 60
+        assert not updater.ready()
+
+        updater.add_correction(0, -20.0, 1)
+        assert not updater.ready()
+        updater.add_correction(0, 0.0, 2)
+        assert updater.ready()
+        assert updater.update()["corrections"] == 50
+
+    def test_replay_keeps_base_rows_of_every_posture(self, make_classifier):
+        clf = make_classifier()
+        base = clf.replay_X.copy()
+        updater = OnlineForestUpdater(
+            clf, batch_size=30, trees_per_update=2, max_replay=60
+        )
+
+        for step in range(3):
+            for i in range(30):
+                updater.add_correction(i, 20.0, 3)
+            assert updater.update() is not None
+
+        replay_y = clf.replay_y
+        assert len(replay_y) <= 60
+        assert set(replay_y.tolist()) == {1, 2, 3}
+        # 자세마다 가장 오래된 (학습 데이터) 샘플이 남음
+        assert np.array_equal(clf.replay_X[0], base[0])
+        assert np.array_equal(clf.replay_X[replay_y == 3][0], base[60])
+
+    def test_replay_set_is_rebuilt_from_training_data(self):
+        clf = PostureClassifier()
+        assert clf.load_model("posture_model.pkl")
+        clf.replay_X = clf.replay_y = None
+        labels = dict(clf.posture_labels)
+
+        assert clf.build_replay_set()
+        assert set(clf.replay_y.tolist()) == set(clf.model.classes_.tolist())
+        assert clf.replay_X.shape == (len(clf.replay_y), len(clf.feature_columns))
+        assert clf.posture_labels == labels
+
+
+class TestCorrectionWebSocket:
+    """교정 메시지 웹소켓 테스트"""
+
+    def test_correction_uses_last_sample(self, make_classifier, monkeypatch):
+        clf = make_classifier()
+        monkeypatch.setattr(websocket_server, "classifier", clf)
+        monkeypatch.setattr(
+            websocket_server,
+            "online_updater",
+            OnlineForestUpdater(clf, batch_size=100),
+        )
+
+        with TestClient(app).websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            websocket.send_json({"type": "correction", "posture": 3})
+            assert websocket.receive_json()["type"] == "error"
+
+            websocket.send_json({"timestamp": 1, "relativePitch": 10.0})
+            assert websocket.receive_json()["type"] == "prediction"
+
+            websocket.send_json({"type": "correction", "posture": 3})
+            ack = websocket.receive_json()
+            assert ack["type"] == "correction_ack"
+            assert ack["accepted"] is True
+            assert ack["pending"] == 1
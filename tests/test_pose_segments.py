@@ -0,0 +1,139 @@
+"""
+자세 구간 인덱스 테스트
+"""
+
+import numpy as np
+import pandas as pd
+
+from pose_segments import build_index, load_index
+from session_store import convert_csv
+
+
+def write_recording(path, poses, interval_ms=200):
+    rows = len(poses)
+    data = {"pose": poses, "timestamp_ms": np.arange(rows) * interval_ms}
+    for i in range(1, 4):
+        data[f"s{i}"] = np.arange(rows) * i
+    pd.DataFrame(data).to_csv(path, index=False)
+
+
+class TestPoseSegments:
+    """자세 구간 인덱스 테스트"""
+
+    def test_segments_span_chunks(self, tmp_path):
+        path = str(tmp_path / "pressure.csv")
+        poses = [0] * 30 + [3] * 70 + [1] * 5 + [3] * 20
+        write_recording(path, poses)
+
+        index = build_index(path, chunk_rows=16)
+
+        assert [(s.pose, s.start_row, s.end_row) for s in index.segments] == [
+            (0, 0, 30),
+            (3, 30, 100),
+            (1, 100, 105),
+            (3, 105, 125),
+        ]
+        first = index.segments[1]
+        assert first.start_ms == 6000
+        assert first.duration_s == 69 * 0.2
+        assert first.mean["s2"] == np.mean(np.arange(30, 100) * 2)
+        assert first.max["s3"] == 99 * 3
+
+    def test_blank_lines_keep_offsets_aligned(self, tmp_path):
+        path = str(tmp_path / "pressure.csv")
+        write_recording(path, [0] * 10 + [3] * 10 + [1] * 10)
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines(keepends=True)
+        # 헤더 뒤 5번째 행 다음과 3번 자세 구간 안에 빈 줄
+        lines.insert(6, "\n")
+        lines.insert(17, "\n")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+
+        index = build_index(path, chunk_rows=8)
+
+        assert [(s.pose, s.rows) for s in index.segments] == [
+            (0, 5),
+            (0, 5),
+            (3, 5),
+            (3, 5),
+            (1, 10),
+        ]
+        frames = [index.read_segment(seg) for seg in index.segments]
+        assert [f["s1"].tolist() for f in frames] == [
+            list(range(0, 5)),
+            list(range(5, 10)),
+            list(range(10, 15)),
+            list(range(15, 20)),
+            list(range(20, 30)),
+        ]
+        assert all(
+            (f["pose"] == seg.pose).all() for f, seg in zip(frames, index.segments)
+        )
+
+    def test_unlabeled_rows_are_skipped(self, tmp_path):
+        path = str(tmp_path / "pressure.csv")
+        write_recording(path, [0] * 10 + [3] * 10 + [3] * 10 + [1] * 10)
+        frame = pd.read_csv(path).astype({"pose": object})
+        # 라벨 누락과 숫자가 아닌 라벨은 구간을 끊고 건너뜀
+        frame.loc[10:11, "pose"] = None
+        frame.loc[20, "pose"] = "x"
+        frame.to_csv(path, index=False)
+
+        index = build_index(path, chunk_rows=16)
+
+        assert [(s.pose, s.start_row, s.end_row) for s in index.segments] == [
+            (0, 0, 10),
+            (3, 12, 20),
+            (3, 21, 30),
+            (1, 30, 40),
+        ]
+        assert index.read_segment(index.segments[2])["s1"].tolist() == list(
+            range(21, 30)
+        )
+
+    def test_query_and_read_segment(self, tmp_path):
+        path = str(tmp_path / "pressure.csv")
+        write_recording(path, [0] * 30 + [3] * 70 + [1] * 5 + [3] * 20)
+        build_index(path)
+
+        # 저장된 인덱스 재사용
+        index = load_index(path)
+        long_pose3 = index.query(pose=3, min_duration_s=10)
+
+        assert len(long_pose3) == 1
+        frame = index.read_segment(long_pose3[0])
+        assert len(frame) == 70
+        assert (frame["pose"] == 3).all()
+        assert index.total_duration_s()[3] == 69 * 0.2 + 19 * 0.2
+
+    def test_read_segment_seeks_byte_range(self, tmp_path):
+        path = str(tmp_path / "pressure.csv")
+        write_recording(path, [0] * 30 + [3] * 70 + [1] * 5)
+        # 마지막 줄바꿈이 없는 파일도 끝 구간을 온전히 읽음
+        with open(path, "rb+") as f:
+            f.truncate(f.seek(0, 2) - 1)
+        expected = pd.read_csv(path)
+
+        index = build_index(path, chunk_rows=16)
+        for seg in index.segments:
+            frame = index.read_segment(seg)
+            pd.testing.assert_frame_equal(
+                frame, expected.iloc[seg.start_row : seg.end_row].reset_index(drop=True)
+            )
+
+        # 오프셋이 없는 예전 인덱스는 행 번호로 읽음
+        old = index.segments[1]
+        old.start_offset = old.end_offset = None
+        assert index.read_segment(old)["s1"].tolist() == list(range(30, 100))
+
+    def test_session_file_index(self, tmp_path):
+        csv_path = str(tmp_path / "pressure.csv")
+        write_recording(csv_path, [2] * 10 + [5] * 10)
+        session_path = convert_csv(csv_path, chunk_rows=7)
+
+        index = build_index(session_path)
+        frames = list(index.iter_frames(pose=5))
+
+        assert len(frames) == 1
+        assert frames[0]["s1"].tolist() == list(range(10, 20))
@@ -0,0 +1,154 @@
+"""
+자세 평활화 및 변경 알림 테스트
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import websocket_server
+from posture_smoothing import (
+    MAX_HEARTBEAT_S,
+    MAX_WINDOW,
+    ChangeNotifier,
+    PostureSmoother,
+)
+from websocket_server import app
+
+
+class TestPostureSmoother:
+    """다수결/지수평활 히스테리시스 테스트"""
+
+    def test_majority_ignores_single_outlier(self):
+        smoother = PostureSmoother(window=5, min_confidence=0.5)
+        changes = [smoother.update(p, 0.9) for p in [1, 1, 1, 2, 1, 1]]
+
+        assert changes.count(True) == 1
+        assert smoother.posture == 1
+
+    def test_majority_switches_after_sustained_change(self):
+        smoother = PostureSmoother(window=5, min_confidence=0.5)
+        for _ in range(5):
+            smoother.update(1, 0.9)
+
+        changes = [smoother.update(2, 0.8) for _ in range(3)]
+        assert changes == [False, False, True]
+        assert smoother.posture == 2
+        assert smoother.confidence == pytest.approx(0.8)
+
+    def test_low_confidence_does_not_switch(self):
+        smoother = PostureSmoother(window=3, min_confidence=0.7)
+        for _ in range(3):
+            smoother.update(1, 0.9)
+        for _ in range(3):
+            assert not smoother.update(2, 0.4)
+        assert smoother.posture == 1
+
+    def test_ema_uses_probabilities(self):
+        smoother = PostureSmoother(method="ema", alpha=0.5, min_confidence=0.6)
+        assert not smoother.update(1, 0.9, {1: 0.9, 2: 0.1})
+        assert smoother.update(1, 0.9, {1: 0.9, 2: 0.1})
+        assert smoother.posture == 1
+
+        for _ in range(5):
+            smoother.update(2, 0.95, {1: 0.05, 2: 0.95})
+        assert smoother.posture == 2
+
+    def test_invalid_method(self):
+        with pytest.raises(ValueError):
+            PostureSmoother(method="median")
+
+    @pytest.mark.parametrize("window", [0, MAX_WINDOW + 1, 99999999999999])
+    def test_window_is_bounded(self, window):
+        with pytest.raises(ValueError):
+            PostureSmoother(window=window)
+
+
+class TestChangeNotifier:
+    """on_change 모드 전송 결정 테스트"""
+
+    def test_every_mode_always_sends(self):
+        notifier = ChangeNotifier(mode="every")
+        assert all(notifier.observe(1, 0.9) == "prediction" for _ in range(10))
+
+    def test_on_change_suppresses_and_heartbeats(self, clock):
+        notifier = ChangeNotifier(
+            PostureSmoother(window=3, min_confidence=0.5),
+            mode="on_change",
+            heartbeat_interval=10,
+            clock=clock,
+        )
+
+        actions = []
+        for _ in range(100):
+            clock.now += 0.05
+            actions.append(notifier.observe(1, 0.9))
+
+        sent = [a for a in actions if a is not None]
+        assert sent == ["posture_change"]
+        assert notifier.sent() == 99
+
+        clock.now += 10
+        assert notifier.observe(1, 0.9) == "heartbeat"
+        assert notifier.observe(1, 0.9) is None
+
+
+class TestOnChangeWebSocket:
+    """on_change 모드 웹소켓 테스트"""
+
+    def test_sends_only_on_change(self, monkeypatch):
+        class StubClassifier:
+            model = object()
+
+            def predict_posture(self, timestamp, relative_pitch):
+                posture = 1 if relative_pitch < 0 else 2
+                return {
+                    "predicted_posture": posture,
+                    "confidence": 0.9,
+                    "all_probabilities": {1: 0.9, 2: 0.1},
+                    "timestamp": timestamp,
+                    "relative_pitch": relative_pitch,
+                }
+
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        # 평활화 동작을 보려면 대기 샘플도 모두 추론해야 함
+        monkeypatch.setattr(websocket_server, "COALESCE_SAMPLES", False)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws?mode=on_change&window=3") as websocket:
+            websocket.receive_json()
+            for i in range(20):
+                websocket.send_json({"timestamp": i, "relativePitch": -10.0})
+            for i in range(20, 40):
+                websocket.send_json({"timestamp": i, "relativePitch": 10.0})
+            websocket.send_json({"type": "config", "mode": "every"})
+
+            first = websocket.receive_json()
+            assert first["type"] == "posture_change"
+            assert first["predicted_posture"] == 1
+            assert first["previous_posture"] is None
+
+            second = websocket.receive_json()
+            assert second["type"] == "posture_change"
+            assert second["predicted_posture"] == 2
+            assert second["previous_posture"] == 1
+            assert second["input_timestamp"] == 21
+            assert second["suppressed"] == 19
+
+            assert websocket.receive_json()["type"] == "config_ack"
+
+    def test_oversized_options_are_rejected(self):
+        client = TestClient(app)
+        with client.websocket_connect("/ws?window=99999999999999") as websocket:
+            connected = websocket.receive_json()
+            assert connected["type"] == "welcome"
+
+            websocket.send_json({"type": "config", "window": MAX_WINDOW + 1})
+            error = websocket.receive_json()
+            assert error["type"] == "error"
+            assert "window" in error["error"]
+
+            websocket.send_json({"type": "config", "heartbeat": MAX_HEARTBEAT_S * 2})
+            assert websocket.receive_json()["type"] == "error"
+
+            websocket.send_json({"type": "config", "window": 3})
+            assert websocket.receive_json()["window"] == 3
@@ -0,0 +1,160 @@
+"""
+자세 타임라인 저장소 테스트 - 구간 묶기, 날짜 분할, 일별 집계, 나쁜 자세 최장 구간
+"""
+
+import time
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+import websocket_server
+from posture_timeline import TimelineStore
+from websocket_server import app
+
+SECOND = 1000
+DAY = 24 * 3600 * SECOND
+
+
+@pytest.fixture
+def store():
+    store = TimelineStore(max_gap_ms=5 * SECOND, poor_postures=(1, 2))
+    yield store
+    store.close()
+
+
+def feed(store, start_ms, postures, interval_ms=SECOND, device_id="d1"):
+    """interval_ms 간격으로 예측을 넣고 다음 시각을 반환"""
+    t = start_ms
+    for posture in postures:
+        store.observe(device_id, t, posture, 0.8)
+        t += interval_ms
+    return t
+
+
+class TestTimelineStore:
+    """구간 기록/조회 테스트"""
+
+    def test_run_length_encodes_samples(self, store):
+        day_start = store.day_start_ms(date(2025, 8, 27))
+        feed(store, day_start, [0] * 60 + [1] * 30 + [0] * 10)
+        store.end("d1")
+
+        intervals = store.intervals("d1", day_start, day_start + 3600 * SECOND)
+        assert [(i.posture, i.samples) for i in intervals] == [
+            (0, 60),
+            (1, 30),
+            (0, 10),
+        ]
+        # 자세가 바뀐 시각까지 이전 자세로 봄
+        assert intervals[0].duration_ms == 60 * SECOND
+        assert intervals[1].mean_confidence == pytest.approx(0.8)
+
+    def test_gap_splits_interval(self, store):
+        t = feed(store, 0, [0] * 5)
+        feed(store, t + 60 * SECOND, [0] * 5)
+        store.end("d1")
+        assert len(store.intervals("d1", 0, 3600 * SECOND)) == 2
+
+    def test_interval_split_at_midnight(self, store):
+        midnight = store.day_start_ms(date(2025, 8, 28))
+        feed(store, midnight - 10 * SECOND, [0] * 20)
+
+        totals = store.daily_totals("d1", date(2025, 8, 27), date(2025, 8, 28))
+        assert totals["2025-08-27"] == {0: 10.0}
+        # 열린 구간도 집계에 포함
+        assert totals["2025-08-28"] == {0: 9.0}
+
+    def test_daily_totals_per_posture(self, store):
+        day_start = store.day_start_ms(date(2025, 8, 27))
+        feed(store, day_start, [0] * 100 + [1] * 50 + [2] * 20 + [0])
+        store.end("d1")
+
+        totals = store.daily_totals("d1", date(2025, 8, 26), date(2025, 8, 27))
+        assert totals["2025-08-26"] == {}
+        assert totals["2025-08-27"] == {0: 100.0, 1: 50.0, 2: 20.0}
+
+    def test_longest_poor_stretch_merges_poor_postures(self, store):
+        day_start = store.day_start_ms(date(2025, 8, 27))
+        feed(store, day_start, [1] * 30 + [0] * 10 + [1] * 20 + [2] * 25 + [0])
+        store.end("d1")
+
+        stretch = store.longest_poor_stretch("d1", day_start, day_start + DAY)
+        assert stretch["duration_s"] == 45.0
+        assert stretch["postures"] == [1, 2]
+        assert stretch["start_ms"] == day_start + 40 * SECOND
+
+    def test_no_poor_posture(self, store):
+        feed(store, 0, [0] * 10)
+        assert store.longest_poor_stretch("d1", 0, DAY) is None
+
+    def test_devices_are_separate(self, store):
+        feed(store, 0, [0] * 10, device_id="a")
+        feed(store, 0, [1] * 10, device_id="b")
+        store.end("a")
+        store.end("b")
+        assert [i.posture for i in store.intervals("a", 0, DAY)] == [0]
+        assert [i.posture for i in store.intervals("b", 0, DAY)] == [1]
+
+    def test_closed_intervals_are_written_in_batches(self, store):
+        day_start = store.day_start_ms(date(2025, 8, 27))
+        feed(store, day_start, [0] * 10 + [1] * 10 + [0] * 10 + [2])
+        store.end("d1")
+
+        # 기록 전에도 조회에 포함되고, flush 후에도 결과가 같음
+        assert store.pending == 3
+        before = store.intervals("d1", day_start, day_start + DAY)
+        totals = store.daily_totals("d1", date(2025, 8, 27), date(2025, 8, 27))
+        assert store.flush() == 3
+        assert store.pending == 0
+        assert store.intervals("d1", day_start, day_start + DAY) == before
+        assert store.daily_totals("d1", date(2025, 8, 27), date(2025, 8, 27)) == totals
+
+    def test_writer_thread_flushes(self):
+        store = TimelineStore(flush_interval_s=0.01)
+        store.start()
+        try:
+            feed(store, 0, [0] * 5 + [1])
+            deadline = time.monotonic() + 5.0
+            while store.pending and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert store.pending == 0
+            rows = store._db.execute("SELECT COUNT(*) FROM posture_intervals")
+            assert rows.fetchone()[0] == 1
+        finally:
+            store.close()
+
+
+class TestTimelineApi:
+    """타임라인 조회 API 테스트"""
+
+    def test_daily_and_longest_poor(self, monkeypatch, store, admin_client):
+        monkeypatch.setattr(websocket_server, "timeline_store", store)
+        day_start = store.day_start_ms(date(2025, 8, 27))
+        feed(store, day_start, [0] * 10 + [1] * 20 + [0])
+
+        client = admin_client
+        daily = client.get(
+            "/timeline/d1/daily", params={"start": "2025-08-27", "end": "2025-08-27"}
+        ).json()
+        assert daily["days"]["2025-08-27"] == {"0": 10.0, "1": 20.0}
+
+        poor = client.get(
+            "/timeline/d1/longest_poor", params={"start": "2025-08-27"}
+        ).json()
+        assert poor["stretch"]["duration_s"] == 20.0
+
+    def test_invalid_date(self, admin_client):
+        response = admin_client.get(
+            "/timeline/d1/daily", params={"start": "27-08-2025"}
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("route", ["daily", "longest_poor", "intervals"])
+    def test_requires_admin_token(self, admin_client, route):
+        client = TestClient(app)
+        assert client.get(f"/timeline/d1/{route}").status_code in (401, 403)
+        response = client.get(
+            f"/timeline/d1/{route}", headers={"X-Admin-Token": "guess"}
+        )
+        assert response.status_code in (401, 403)
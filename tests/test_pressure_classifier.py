@@ -0,0 +1,133 @@
+"""
+압력 프레임 분류기 테스트
+"""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import websocket_server
+from pressure_classifier import PressureClassifier
+from websocket_server import app
+
+
+@pytest.fixture(scope="module")
+def trained_classifier(test_data_dir):
+    classifier = PressureClassifier(str(test_data_dir / "압력"))
+    classifier.train_model(tune=False)
+    return classifier
+
+
+class TestPressureClassifier:
+    """KD-tree 기반 압력 분류기 테스트"""
+
+    def test_load_training_data(self, test_data_dir):
+        X, y = PressureClassifier(str(test_data_dir / "압력")).load_training_data()
+        assert X.shape[1] == 8
+        assert len(X) == len(y)
+        assert set(y.tolist()) == {0, 1, 2, 4}
+
+    def test_fused_model_adds_pitch(self, test_data_dir):
+        fused = PressureClassifier(
+            str(test_data_dir / "압력"), imu_dir=str(test_data_dir / "IMU")
+        )
+        X, y = fused.load_training_data()
+        assert fused.feature_columns == [f"pv{i}" for i in range(1, 9)] + ["pitch"]
+        assert X.shape[1] == 9
+        assert set(y.tolist()) == {0, 1, 2, 4}
+
+        fused.train_model(tune=False)
+        result = fused.predict_frame(list(X[0]))
+        assert result["predicted_posture"] in {0, 1, 2, 4}
+        assert "error" in fused.predict_frame(list(X[0][:8]))
+
+    def test_model_uses_tree_index(self, trained_classifier):
+        assert trained_classifier.model._fit_method == "kd_tree"
+
+    def test_batch_matches_single(self, trained_classifier):
+        X, _ = trained_classifier.load_training_data()
+        batch = trained_classifier.predict_frames(X[:10])
+        singles = [trained_classifier.predict_frame(frame) for frame in X[:10]]
+        assert batch == singles
+        assert 0.0 <= batch[0]["confidence"] <= 1.0
+
+    def test_wrong_sensor_count(self, trained_classifier):
+        result = trained_classifier.predict_frame([1, 2, 3])
+        assert "error" in result
+
+    def test_save_and_load(self, trained_classifier, tmp_path):
+        path = str(tmp_path / "pressure_model.pkl")
+        trained_classifier.save_model(path)
+
+        loaded = PressureClassifier()
+        assert loaded.load_model(path)
+        frame = [561, 694, 707, 769, 568, 639, 711, 809]
+        assert loaded.predict_frame(frame) == trained_classifier.predict_frame(frame)
+
+
+class TestPressureWebSocket:
+    """압력 메시지 웹소켓 테스트"""
+
+    def setup_method(self):
+        self.client = TestClient(app)
+
+    def test_single_and_batch_messages(self, trained_classifier, monkeypatch):
+        monkeypatch.setattr(websocket_server, "pressure_classifier", trained_classifier)
+        frame = [561, 694, 707, 769, 568, 639, 711, 809]
+
+        with self.client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+
+            websocket.send_json({"type": "pressure", "timestamp": 1, "pressure": frame})
+            single = websocket.receive_json()
+            assert single["type"] == "pressure_prediction"
+            assert "predicted_posture" in single
+
+            websocket.send_json({"type": "pressure", "frames": [frame, frame]})
+            batch = websocket.receive_json()
+            assert len(batch["predictions"]) == 2
+            assert (
+                batch["predictions"][0]["predicted_posture"]
+                == single["predicted_posture"]
+            )
+
+    def test_batch_size_is_capped_and_large_batches_leave_the_loop(
+        self, trained_classifier, monkeypatch
+    ):
+        monkeypatch.setattr(websocket_server, "pressure_classifier", trained_classifier)
+        monkeypatch.setattr(websocket_server, "MAX_PRESSURE_FRAMES", 4)
+        monkeypatch.setattr(websocket_server, "PRESSURE_EXECUTOR_FRAMES", 2)
+        threads = []
+        predict_frames = trained_classifier.predict_frames
+
+        def recording_predict(frames):
+            threads.append(threading.current_thread().name)
+            return predict_frames(frames)
+
+        monkeypatch.setattr(trained_classifier, "predict_frames", recording_predict)
+        frame = [561, 694, 707, 769, 568, 639, 711, 809]
+
+        with self.client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+
+            websocket.send_json({"type": "pressure", "frames": [frame] * 5})
+            assert websocket.receive_json()["type"] == "error"
+
+            websocket.send_json({"type": "pressure", "frames": [frame] * 4})
+            assert len(websocket.receive_json()["predictions"]) == 4
+            websocket.send_json({"type": "pressure", "frames": [frame] * 2})
+            assert len(websocket.receive_json()["predictions"]) == 2
+
+        # 큰 배치만 기본 실행기 스레드(asyncio_N)에서 추론
+        assert len(threads) == 2
+        assert threads[0].startswith("asyncio_")
+        assert not threads[1].startswith("asyncio_")
+
+    def test_invalid_pressure_message(self):
+        with self.client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+
+            websocket.send_json({"type": "pressure", "pressure": ["a", "b"]})
+            response = websocket.receive_json()
+            assert response["type"] == "error"
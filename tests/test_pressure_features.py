@@ -0,0 +1,78 @@
+"""
+압력 특징 엔진 테스트
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pressure_features import (
+    FSR_11_LAYOUT,
+    OnlinePressureFeatures,
+    PressureFeatureEngine,
+)
+
+
+class TestPressureFeatures:
+    """벡터화 압력 특징 테스트"""
+
+    def setup_method(self):
+        self.engine = PressureFeatureEngine(window=4)
+        rng = np.random.default_rng(1)
+        self.frames = rng.integers(100, 900, size=(200, 11)).astype(float)
+
+    def test_spatial_features(self):
+        frame = np.zeros((1, 11))
+        frame[0, 3] = 100.0  # s4: 오른쪽 앞
+        features = self.engine.spatial_features(frame)[0]
+
+        assert features[0] == 100.0
+        assert features[1] == pytest.approx(1.0)  # cop_x
+        assert features[2] == pytest.approx(1.0)  # cop_y
+        assert features[3] == pytest.approx(1.0)  # 오른쪽 쏠림
+        assert features[4] == pytest.approx(1.0)  # 앞쪽 쏠림
+
+    def test_empty_frame_is_finite(self):
+        features = self.engine.spatial_features(np.zeros((3, 11)))
+        assert np.isfinite(features).all()
+
+    def test_window_deltas_shape(self):
+        deltas = self.engine.window_deltas(self.frames)
+        assert deltas.shape == (197, 11)
+        window = self.frames[10:14, 2]
+        assert deltas[10, 2] == pytest.approx((window[-1] - window[0]) / window.mean())
+
+    def test_online_matches_batch(self):
+        batch = self.engine.transform(self.frames)
+        online = OnlinePressureFeatures(self.engine)
+        rows = [online.update(frame) for frame in self.frames]
+
+        assert all(r is None for r in rows[:3])
+        np.testing.assert_allclose(np.vstack(rows[3:]), batch)
+
+    def test_transform_dataframe_drops_mixed_windows(self):
+        df = pd.DataFrame(self.frames[:10], columns=list(FSR_11_LAYOUT))
+        df["pose"] = [0] * 5 + [1] * 5
+        features = self.engine.transform_dataframe(df)
+
+        # 윈도우 4: 0번 자세 2개, 1번 자세 2개 (경계를 넘는 3개 제외)
+        assert features["pose"].tolist() == [0, 0, 1, 1]
+        assert list(features.columns[:5]) == [
+            "total_load",
+            "cop_x",
+            "cop_y",
+            "lr_balance",
+            "fb_balance",
+        ]
+
+    def test_online_per_frame_cost(self):
+        online = OnlinePressureFeatures(self.engine)
+        start = time.perf_counter()
+        for frame in self.frames:
+            online.update(frame)
+        per_frame = (time.perf_counter() - start) / len(self.frames)
+
+        # 실시간 경로 프레임당 비용은 1ms 이하여야 함
+        assert per_frame < 0.001, f"프레임당 비용이 너무 큼: {per_frame * 1e6:.1f}µs"
@@ -0,0 +1,152 @@
+"""
+온디맨드 프로파일링 테스트 - 모드별 결과, 종료 조건, 관리자 API
+"""
+
+import marshal
+import time
+
+import pytest
+
+import websocket_server
+from profiling import ProfileSession, ServerProfiler
+
+
+def busy(ms: float) -> int:
+    end = time.perf_counter() + ms / 1000
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+class TestProfileSession:
+    """프로파일 세션 테스트"""
+
+    def test_cpu_profile_has_cumulative_times(self):
+        session = ProfileSession("cpu")
+        session.start()
+        busy(5)
+        session.stop()
+
+        assert "busy" in session.results["text"].decode()
+        stats = marshal.loads(session.results["pstats"])
+        assert any(func[2] == "busy" for func in stats)
+
+    def test_sample_profile_collects_stacks(self):
+        session = ProfileSession("sample", interval_ms=1)
+        session.start()
+        busy(100)
+        session.stop()
+
+        collapsed = session.results["collapsed"].decode()
+        assert "busy (" in collapsed
+        assert "busy" in session.results["text"].decode()
+
+    def test_memory_profile_reports_growth(self):
+        session = ProfileSession("memory")
+        session.start()
+        kept = [bytearray(1024) for _ in range(200)]
+        session.stop()
+
+        assert "test_profiling.py" in session.results["text"].decode()
+        assert len(kept) == 200
+
+    def test_stops_after_max_messages(self):
+        profiler = ServerProfiler()
+        session = profiler.start(ProfileSession("cpu", max_messages=3))
+        for _ in range(3):
+            profiler.message_done()
+        assert profiler.active is None
+        assert profiler.last is session
+        assert session.status()["messages"] == 3
+        assert not session.running
+
+    def test_stops_after_max_seconds(self):
+        now = [0.0]
+        profiler = ServerProfiler()
+        profiler.start(ProfileSession("cpu", max_seconds=10, clock=lambda: now[0]))
+        profiler.message_done()
+        assert profiler.active is not None
+        now[0] = 11
+        profiler.message_done()
+        assert profiler.active is None
+
+    def test_only_one_session_at_a_time(self):
+        profiler = ServerProfiler()
+        profiler.start(ProfileSession("sample"))
+        with pytest.raises(RuntimeError):
+            profiler.start(ProfileSession("cpu"))
+        profiler.stop()
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            ProfileSession("gpu")
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"interval_ms": 0},
+            {"interval_ms": -5},
+            {"interval_ms": float("nan")},
+            {"top": 0},
+            {"max_messages": 0},
+        ],
+    )
+    def test_invalid_options(self, options):
+        with pytest.raises(ValueError):
+            ProfileSession("sample", **options)
+
+
+class TestProfileAdminApi:
+    """관리자 API 테스트"""
+
+    def test_profile_next_messages_and_download(self, monkeypatch, admin_client):
+        class StubClassifier:
+            model = object()
+
+            def predict_posture(self, timestamp, relative_pitch):
+                return {
+                    "predicted_posture": 0,
+                    "confidence": 0.9,
+                    "all_probabilities": {0: 0.9},
+                    "timestamp": timestamp,
+                    "relative_pitch": relative_pitch,
+                }
+
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        monkeypatch.setattr(websocket_server, "COALESCE_SAMPLES", False)
+        monkeypatch.setattr(websocket_server, "profiler", ServerProfiler())
+        client = admin_client
+
+        response = client.post("/admin/profile", json={"mode": "cpu", "messages": 2})
+        assert response.json()["running"] is True
+        assert client.post("/admin/profile", json={"mode": "cpu"}).status_code == 409
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            for i in range(2):
+                websocket.send_json({"timestamp": i, "relativePitch": -5.0})
+                websocket.receive_json()
+
+        status = client.get("/admin/profile").json()
+        assert status["running"] is False
+        assert status["messages"] == 2
+
+        result = client.get("/admin/profile/result")
+        assert "attachment" in result.headers["content-disposition"]
+        # TestClient는 요청마다 이벤트 루프 스레드가 달라 내용 대신 형식만 확인
+        assert "function calls" in result.text
+        assert client.get("/admin/profile/result?format=pstats").status_code == 200
+        assert client.get("/admin/profile/result?format=collapsed").status_code == 400
+
+    def test_invalid_options_are_bad_requests(self, monkeypatch, admin_client):
+        monkeypatch.setattr(websocket_server, "profiler", ServerProfiler())
+        for body in ({"mode": "sample", "interval_ms": 0}, {"top": 0}):
+            assert admin_client.post("/admin/profile", json=body).status_code == 400
+        assert websocket_server.profiler.active is None
+
+    def test_no_result_yet(self, monkeypatch, admin_client):
+        monkeypatch.setattr(websocket_server, "profiler", ServerProfiler())
+        client = admin_client
+        assert client.get("/admin/profile/result").status_code == 404
+        assert client.get("/admin/profile").json() == {"running": False}
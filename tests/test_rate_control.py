@@ -0,0 +1,97 @@
+"""
+적응형 샘플링 주기 제어 테스트
+"""
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import websocket_server
+from posture_classifier import motion_features
+from rate_control import RateController
+from websocket_server import app
+
+
+def feed(controller, clock, pitches, interval_ms=200):
+    """interval_ms 간격으로 샘플을 넣고 받은 권장 메시지 목록을 반환"""
+    advice = []
+    for pitch in pitches:
+        clock.now += interval_ms / 1000
+        result = controller.observe(clock.now * 1000, pitch)
+        if result is not None:
+            advice.append(result)
+    return advice
+
+
+class TestMotionFeatures:
+    """분류기 특징과 같은 정의인지 확인"""
+
+    def test_stability_ratio_and_std_diff(self):
+        features = motion_features(np.array([0.0, 0.5, 0.5, 3.0]))
+        assert features["stability_ratio"] == 2 / 3
+        assert np.isclose(features["std_diff"], np.std([0.5, 0.0, 2.5]))
+
+    def test_single_value_is_stable(self):
+        assert motion_features(np.array([1.0]))["stability_ratio"] == 1.0
+
+
+class TestRateController:
+    """단계 판정과 히스테리시스 테스트"""
+
+    def test_still_signal_recommends_low_rate(self, clock):
+        controller = RateController(window=10, clock=clock)
+        advice = feed(controller, clock, [0.0] * 10)
+        assert [a["level"] for a in advice] == ["stable"]
+        assert advice[0]["sample_rate_hz"] == 5
+
+    def test_transition_raises_immediately_and_lowers_after_hold(self, clock):
+        controller = RateController(window=10, hold_s=5.0, clock=clock)
+        feed(controller, clock, [0.0] * 10)
+
+        advice = feed(controller, clock, np.linspace(0, 30, 10))
+        # 움직이기 시작한 첫 샘플부터 주기를 올림
+        assert advice[0]["level"] != "stable"
+        assert advice[-1]["level"] == "transition"
+        assert advice[-1]["sample_rate_hz"] == 50
+
+        # 다시 가만히 있어도 판정이 hold_s 동안 유지되어야 주기를 내림
+        advice = feed(controller, clock, [30.0] * 12)
+        assert advice == []
+        advice = feed(controller, clock, [30.0] * 30)
+        assert advice[-1]["level"] == "stable"
+
+    def test_dense_samples_do_not_change_decision(self, clock):
+        # 50Hz로 보내도 200ms 간격 샘플만 판정에 사용 - 잡음 크기가 같으면 같은 결과
+        rng = np.random.default_rng(0)
+        controller = RateController(window=10, clock=clock)
+        advice = feed(controller, clock, rng.normal(0, 0.05, 250), interval_ms=20)
+        assert [a["level"] for a in advice] == ["stable"]
+
+
+class TestRateControlWebSocket:
+    """rate_control 메시지 전송 테스트"""
+
+    def test_sends_rate_control_when_enabled(self, monkeypatch):
+        class StubClassifier:
+            model = object()
+
+            def predict_posture(self, timestamp, relative_pitch):
+                return {
+                    "predicted_posture": 1,
+                    "confidence": 0.9,
+                    "all_probabilities": {1: 0.9},
+                    "timestamp": timestamp,
+                    "relative_pitch": relative_pitch,
+                }
+
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        monkeypatch.setattr(websocket_server, "COALESCE_SAMPLES", False)
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws?rate_control=on") as websocket:
+            websocket.receive_json()
+            for i in range(20):
+                websocket.send_json({"timestamp": i * 200, "relativePitch": 0.0})
+
+            types = [websocket.receive_json()["type"] for _ in range(21)]
+            assert types.count("prediction") == 20
+            assert types[-1] == "rate_control"
@@ -0,0 +1,106 @@
+"""
+예측 응답 프로필 테스트 - full/minimal/delta 필드 구성과 템플릿 재사용
+"""
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import websocket_server
+from response_profiles import ResponseEncoder, TimestampCache
+from websocket_server import app
+
+
+def result(probabilities, timestamp=100):
+    posture = max(probabilities, key=probabilities.get)
+    return {
+        "predicted_posture": posture,
+        "confidence": probabilities[posture],
+        "all_probabilities": probabilities,
+        "timestamp": timestamp,
+        "relative_pitch": -3.5,
+    }
+
+
+class TestResponseEncoder:
+    """프로필별 응답 필드 테스트"""
+
+    def test_full_keeps_all_fields(self):
+        response = ResponseEncoder("full").encode(result({0: 0.7, 1: 0.3}))
+        assert set(response) == {
+            "type",
+            "predicted_posture",
+            "confidence",
+            "all_probabilities",
+            "input_timestamp",
+            "input_relative_pitch",
+            "server_timestamp",
+        }
+        assert response["input_relative_pitch"] == -3.5
+        datetime.fromisoformat(response["server_timestamp"])
+
+    def test_minimal_has_posture_and_confidence_only(self):
+        response = ResponseEncoder("minimal").encode(result({0: 0.7, 1: 0.3}))
+        assert response == {
+            "type": "prediction",
+            "predicted_posture": 0,
+            "confidence": 0.7,
+        }
+
+    def test_delta_sends_probabilities_only_when_moved(self):
+        encoder = ResponseEncoder("delta", epsilon=0.05)
+        assert "all_probabilities" in encoder.encode(result({0: 0.7, 1: 0.3}))
+        assert "all_probabilities" not in encoder.encode(result({0: 0.72, 1: 0.28}))
+        # 마지막으로 "보낸" 확률과 비교하므로 작은 변화가 쌓여도 다시 보냄
+        assert "all_probabilities" not in encoder.encode(result({0: 0.74, 1: 0.26}))
+        moved = encoder.encode(result({0: 0.76, 1: 0.24}))
+        assert moved["all_probabilities"] == {0: 0.76, 1: 0.24}
+
+    def test_delta_resends_when_classes_change(self):
+        encoder = ResponseEncoder("delta")
+        encoder.encode(result({0: 0.7, 1: 0.3}))
+        assert "all_probabilities" in encoder.encode(result({0: 0.7, 1: 0.3, 2: 0.0}))
+
+    def test_template_is_reused(self):
+        encoder = ResponseEncoder("minimal")
+        first = encoder.encode(result({0: 0.7, 1: 0.3}))
+        assert encoder.encode(result({0: 0.2, 1: 0.8})) is first
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            ResponseEncoder("compact")
+
+    def test_timestamp_cache_reformats_once_per_millisecond(self):
+        now = [1_700_000_000.0001]
+        cache = TimestampCache(clock=lambda: now[0])
+        first = cache.now()
+        now[0] += 0.0004
+        assert cache.now() is first
+        now[0] += 0.001
+        assert cache.now() != first
+
+
+class TestProfileWebSocket:
+    """연결 시 프로필 협상 테스트"""
+
+    def test_profile_query_parameter(self, monkeypatch):
+        class StubClassifier:
+            model = object()
+
+            def predict_posture(self, timestamp, relative_pitch):
+                return result({0: 0.9, 1: 0.1}, timestamp)
+
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        monkeypatch.setattr(websocket_server, "COALESCE_SAMPLES", False)
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws?profile=delta") as websocket:
+            websocket.receive_json()
+            websocket.send_json({"timestamp": 1, "relativePitch": -5.0})
+            websocket.send_json({"timestamp": 2, "relativePitch": -5.0})
+            first = websocket.receive_json()
+            second = websocket.receive_json()
+            assert first["all_probabilities"] == {"0": 0.9, "1": 0.1}
+            assert "all_probabilities" not in second
+            assert second["seq"] == first["seq"] + 1
@@ -0,0 +1,114 @@
+"""
+처리 지연 시 샘플 병합/폐기 테스트
+"""
+
+import asyncio
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+import websocket_server
+from posture_smoothing import ChangeNotifier
+from session_state import SessionState
+from websocket_server import app, receive_loop
+
+
+class TestSampleCoalescing:
+    """대기 샘플 중 최신 샘플만 추론"""
+
+    def test_only_latest_sample_is_inferred(self, stub, run_batch):
+        state = SessionState("s1", ChangeNotifier())
+        samples = [{"timestamp": t, "relativePitch": -5.0} for t in range(0, 5000, 500)]
+        sent = run_batch(samples, state)
+
+        assert stub.calls == [4500]
+        assert [m["input_timestamp"] for m in sent] == [4500]
+        # 4500ms 기준 1000ms 넘게 오래된 0~3000ms 는 폐기, 3500·4000ms 는 병합
+        assert state.dropped == 7
+        assert state.coalesced == 2
+        assert state.last_sample == (4500, -5.0)
+
+    def test_other_messages_keep_order(self, stub, run_batch):
+        state = SessionState("s1", ChangeNotifier())
+        sent = run_batch(
+            [
+                {"timestamp": 100, "relativePitch": 1.0},
+                "not json",
+                {"timestamp": 200, "relativePitch": 2.0},
+                {"type": "config", "mode": "every"},
+                {"timestamp": "bad", "relativePitch": 3.0},
+                {"timestamp": 300, "relativePitch": 4.0},
+            ],
+            state,
+        )
+
+        assert stub.calls == [300]
+        assert [m["type"] for m in sent] == [
+            "error",
+            "config_ack",
+            "error",
+            "prediction",
+        ]
+        assert state.coalesced == 2
+
+    def test_single_sample_is_always_processed(self, stub, run_batch):
+        state = SessionState("s1", ChangeNotifier())
+        run_batch([{"timestamp": 0, "relativePitch": 1.0}], state)
+        run_batch([{"timestamp": 9000, "relativePitch": 1.0}], state)
+
+        assert stub.calls == [0, 9000]
+        assert state.coalesced == state.dropped == 0
+
+    def test_disabled_processes_every_sample(self, stub, run_batch, monkeypatch):
+        monkeypatch.setattr(websocket_server, "COALESCE_SAMPLES", False)
+        state = SessionState("s1", ChangeNotifier())
+        run_batch([{"timestamp": t, "relativePitch": 1.0} for t in range(3)], state)
+
+        assert stub.calls == [0, 1, 2]
+
+    def test_stale_samples_are_dropped_when_disabled(
+        self, stub, run_batch, monkeypatch
+    ):
+        monkeypatch.setattr(websocket_server, "COALESCE_SAMPLES", False)
+        state = SessionState("s1", ChangeNotifier())
+        samples = [{"timestamp": t, "relativePitch": -5.0} for t in range(0, 5000, 500)]
+        run_batch(samples, state)
+
+        # 예산(1000ms) 안의 샘플만 순서대로 추론
+        assert stub.calls == [3500, 4000, 4500]
+        assert (state.dropped, state.coalesced) == (7, 0)
+
+
+class TestInbox:
+    """연결별 수신 대기열"""
+
+    def test_messages_before_disconnect_are_processed(self, stub, monkeypatch):
+        async def burst(websocket, inbox, heartbeat=None):
+            sample = json.dumps({"timestamp": 100, "relativePitch": 1.0})
+            await inbox.put((time.perf_counter(), sample))
+            await inbox.put(None)
+
+        monkeypatch.setattr(websocket_server, "receive_loop", burst)
+        with TestClient(app).websocket_connect("/ws") as websocket:
+            assert websocket.receive_json()["type"] == "welcome"
+            assert websocket.receive_json()["input_timestamp"] == 100
+
+        assert stub.calls == [100]
+
+    def test_reader_waits_when_inbox_is_full(self):
+        class EndlessWebSocket:
+            async def receive_text(self):
+                return '{"type": "pong"}'
+
+        async def run():
+            inbox = asyncio.Queue(maxsize=3)
+            reader = asyncio.create_task(receive_loop(EndlessWebSocket(), inbox))
+            for _ in range(10):
+                await asyncio.sleep(0)
+            size, done = inbox.qsize(), reader.done()
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+            return size, done
+
+        assert asyncio.run(run()) == (3, False)
@@ -0,0 +1,354 @@
+"""
+시리얼/블루투스 게이트웨이 테스트 - 기기 줄 해석, 오프셋, 묶음 전송, 재연결, 서버의 배열 프레임 처리
+"""
+
+import asyncio
+import json
+import os
+import tty
+
+import pytest
+import websockets
+
+import websocket_server
+from posture_smoothing import ChangeNotifier
+from serial_gateway import (
+    START_COMMAND,
+    Backoff,
+    DeviceLink,
+    DeviceSpec,
+    PitchOffset,
+    SerialGateway,
+    parse_device_spec,
+    parse_sample,
+)
+from session_state import SessionState
+
+
+def fast_backoff():
+    return Backoff(0.01, 0.05)
+
+
+class TestParsing:
+    """기기 설정과 샘플 줄 해석"""
+
+    def test_device_spec(self):
+        spec = parse_device_spec("desk1=/dev/rfcomm0")
+        assert spec == DeviceSpec("desk1", "/dev/rfcomm0")
+
+        spec = parse_device_spec("imu=/dev/ttyUSB0,baud=115200,offset=-3.5,start=0")
+        assert (spec.baud, spec.offset, spec.start) == (115200, -3.5, False)
+        assert parse_device_spec("bt=rfcomm://00:11:22:33:44:55/1").offset is None
+
+    @pytest.mark.parametrize("text", ["nodevice", "=x", "a=/dev/x,speed=1"])
+    def test_invalid_device_spec(self, text):
+        with pytest.raises(ValueError):
+            parse_device_spec(text)
+
+    def test_samples(self):
+        assert parse_sample(b'{"timestamp": 1500, "relativePitch": -12.5}\r\n') == (
+            1500,
+            -12.5,
+            True,
+        )
+        assert parse_sample(b"2000,33.25\n") == (2000, 33.25, False)
+        assert parse_sample(b'{"relativePitch": 4}\n') == (None, 4.0, True)
+
+    @pytest.mark.parametrize(
+        "raw",
+        [b'{"status": "Calibrating..."}\n', b"{broken\n", b"[1, 2]\n", b"hello\n", b""],
+    )
+    def test_non_samples_are_ignored(self, raw):
+        assert parse_sample(raw) is None
+
+    def test_offset(self):
+        auto = PitchOffset()
+        assert [auto.apply(p, relative=False) for p in (30.0, 25.0, 40.0)] == [
+            0.0,
+            -5.0,
+            10.0,
+        ]
+        assert auto.apply(-8.0, relative=True) == -8.0
+
+        fixed = PitchOffset(2.0)
+        assert fixed.apply(30.0, relative=False) == 28.0
+        assert fixed.apply(-8.0, relative=True) == -10.0
+
+    def test_backoff(self):
+        backoff = Backoff(0.5, 4.0, rng=lambda: 1.0)
+        assert [backoff.next() for _ in range(5)] == [0.5, 1.0, 2.0, 4.0, 4.0]
+        backoff.reset()
+        assert backoff.next() == 0.5
+
+        jittered = Backoff(1.0, 10.0, rng=lambda: 0.0)
+        assert jittered.next() == 0.5
+
+
+class TestDeviceLink:
+    """링크 버퍼와 처리량 보고"""
+
+    def test_buffer_overflow_drops_oldest(self):
+        link = DeviceLink(DeviceSpec("d", "/dev/null"), "ws://x/ws", max_buffer=3)
+        for t in range(5):
+            assert link.handle_line(
+                f'{{"timestamp": {t}, "relativePitch": 1}}\n'.encode()
+            )
+        assert not link.handle_line(b'{"status": "ok"}\n')
+
+        assert [s["timestamp"] for s in link.buffer] == [2, 3, 4]
+        assert (link.stats.read, link.stats.dropped) == (5, 2)
+
+    def test_missing_timestamp_uses_clock(self, clock):
+        link = DeviceLink(DeviceSpec("d", "/dev/null"), "ws://x/ws", clock=clock)
+        clock.now = 1.25
+        link.handle_line(b'{"relativePitch": 3}\n')
+        assert link.buffer == [{"timestamp": 1250, "relativePitch": 3.0}]
+
+    def test_slow_down_recovers(self, clock):
+        link = DeviceLink(
+            DeviceSpec("d", "/dev/null"),
+            "ws://x/ws",
+            batch_interval_s=0.2,
+            max_batch_interval_s=1.0,
+            recover_after_s=5.0,
+            clock=clock,
+        )
+        for _ in range(4):
+            link.slow_down()
+        assert link.batch_interval_s == 1.0
+
+        clock.now = 4.0
+        link.relax()
+        assert link.batch_interval_s == 1.0
+        intervals = []
+        for t in (5.0, 10.0, 15.0, 20.0):
+            clock.now = t
+            link.relax()
+            intervals.append(link.batch_interval_s)
+        assert intervals == [0.5, 0.25, 0.2, 0.2]
+
+    @pytest.mark.parametrize("batch_size", [0, 101])
+    def test_batch_size_is_bounded_by_server_limit(self, batch_size):
+        with pytest.raises(ValueError):
+            DeviceLink(
+                DeviceSpec("d", "/dev/null"),
+                "ws://x/ws",
+                batch_size=batch_size,
+                max_frame_samples=100,
+            )
+
+    def test_report(self, clock):
+        gateway = SerialGateway(
+            [DeviceSpec("a", "/dev/null"), DeviceSpec("b", "/dev/null")],
+            "ws://x/ws",
+            clock=clock,
+        )
+        for t in range(20):
+            gateway.links["a"].handle_line(f"{t},10\n".encode())
+        gateway.links["a"].stats.sent = 10
+        gateway.links["b"].handle_line(b"0,10\n")
+        clock.now = 2.0
+
+        report = gateway.report()
+        assert report["devices"]["a"]["read_per_s"] == 10.0
+        assert report["devices"]["a"]["sent_per_s"] == 5.0
+        assert report["devices"]["b"]["buffered"] == 1
+        assert report["aggregate"]["read_per_s"] == 10.5
+        assert report["aggregate"]["read"] == 21
+
+        clock.now = 4.0
+        assert gateway.report()["aggregate"]["read_per_s"] == 0.0
+
+    def test_duplicate_names_are_rejected(self):
+        with pytest.raises(ValueError):
+            SerialGateway([DeviceSpec("a", "/x"), DeviceSpec("a", "/y")], "ws://x/ws")
+
+
+class FakeDevice:
+    """pty로 흉내 낸 시리얼 기기"""
+
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.path = os.ttyname(self.slave)
+
+    async def wait_for_start(self):
+        loop = asyncio.get_running_loop()
+        received = b""
+        while START_COMMAND not in received:
+            received += await loop.run_in_executor(None, os.read, self.master, 1024)
+
+    def write_lines(self, lines):
+        os.write(self.master, "".join(f"{line}\n" for line in lines).encode())
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+
+class FakeServer:
+    """받은 프레임을 기기(device_id)별로 모으는 웹소켓 서버"""
+
+    def __init__(self, drop_first=False):
+        self.frames = {}
+        self.connections = 0
+        self.drop_first = drop_first
+
+    async def handler(self, ws):
+        self.connections += 1
+        device = ws.request.path.split("device_id=")[1]
+        async for message in ws:
+            samples = json.loads(message)
+            self.frames.setdefault(device, []).append(samples)
+            await ws.send(json.dumps({"type": "prediction"}))
+            if self.drop_first and self.connections == 1:
+                await ws.close()
+                return
+
+    def samples(self, device):
+        return [s for frame in self.frames.get(device, []) for s in frame]
+
+
+async def wait_for(condition, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "시간 초과"
+        await asyncio.sleep(0.01)
+
+
+def run_gateway(server, devices, specs, scenario, **options):
+    async def run():
+        async with websockets.serve(server.handler, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            gateway = SerialGateway(
+                specs,
+                f"ws://127.0.0.1:{port}/ws",
+                report_interval_s=0,
+                backoff=fast_backoff,
+                **options,
+            )
+            task = asyncio.create_task(gateway.run())
+            try:
+                await scenario(gateway)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            return gateway
+
+    try:
+        return asyncio.run(run())
+    finally:
+        for device in devices:
+            device.close()
+
+
+class TestGateway:
+    """pty 기기 → 게이트웨이 → 웹소켓 서버"""
+
+    def test_batches_samples_per_device(self):
+        relative, absolute = FakeDevice(), FakeDevice()
+        specs = [
+            DeviceSpec("bt", relative.path, offset=1.0),
+            DeviceSpec("imu", absolute.path),
+        ]
+        server = FakeServer()
+
+        async def scenario(gateway):
+            await asyncio.gather(relative.wait_for_start(), absolute.wait_for_start())
+            relative.write_lines(['{"status": "Measuring"}'])
+            relative.write_lines(
+                json.dumps({"timestamp": t, "relativePitch": -10.0}) for t in range(25)
+            )
+            absolute.write_lines(f"{t},{30 + t % 2}" for t in range(7))
+            await wait_for(
+                lambda: len(server.samples("bt")) == 25
+                and len(server.samples("imu")) == 7
+            )
+
+        gateway = run_gateway(
+            server,
+            [relative, absolute],
+            specs,
+            scenario,
+            batch_size=10,
+            batch_interval_s=0.05,
+        )
+
+        assert all(len(frame) <= 10 for frame in server.frames["bt"])
+        assert len(server.frames["bt"]) < 25
+        assert server.samples("bt")[0] == {"timestamp": 0, "relativePitch": -11.0}
+        assert [s["relativePitch"] for s in server.samples("imu")] == [
+            0.0,
+            1.0,
+        ] * 3 + [0.0]
+        report = gateway.report()
+        assert report["aggregate"]["sent"] == 32
+        assert (
+            report["devices"]["bt"]["predictions"] == report["devices"]["bt"]["frames"]
+        )
+
+    def test_reconnects_without_losing_samples(self):
+        device = FakeDevice()
+        server = FakeServer(drop_first=True)
+
+        async def scenario(gateway):
+            await device.wait_for_start()
+            device.write_lines(f"{t},5" for t in range(5))
+            await wait_for(lambda: server.connections == 1 and server.frames)
+            device.write_lines(f"{t},5" for t in range(5, 12))
+            await wait_for(lambda: len(server.samples("d")) == 12)
+
+        gateway = run_gateway(
+            server,
+            [device],
+            [DeviceSpec("d", device.path)],
+            scenario,
+            batch_size=5,
+            batch_interval_s=0.05,
+        )
+
+        assert server.connections == 2
+        assert [s["timestamp"] for s in server.samples("d")] == list(range(12))
+        assert gateway.links["d"].stats.reconnects == 1
+
+    def test_missing_device_is_retried(self, tmp_path):
+        server = FakeServer()
+        spec = DeviceSpec("gone", str(tmp_path / "missing"))
+
+        async def scenario(gateway):
+            await wait_for(lambda: gateway.links["gone"].stats.device_errors >= 3)
+
+        gateway = run_gateway(server, [], [spec], scenario)
+        assert gateway.links["gone"].stats.connected
+
+
+class TestServerBatchFrames:
+    """서버가 배열 프레임의 샘플을 하나씩 처리"""
+
+    def test_batch_frame_is_expanded(self, stub, run_batch, monkeypatch):
+        monkeypatch.setattr(websocket_server, "COALESCE_SAMPLES", False)
+        state = SessionState("s1", ChangeNotifier())
+        frame = [{"timestamp": t, "relativePitch": -5.0} for t in range(3)]
+        sent = run_batch([frame, {"timestamp": 3, "relativePitch": -5.0}], state)
+
+        assert stub.calls == [0, 1, 2, 3]
+        assert [m["type"] for m in sent] == ["prediction"] * 4
+
+    def test_batch_frame_is_coalesced(self, stub, run_batch):
+        state = SessionState("s1", ChangeNotifier())
+        run_batch([[{"timestamp": t, "relativePitch": -5.0} for t in range(3)]], state)
+
+        assert stub.calls == [2]
+        assert state.coalesced == 2
+
+    def test_oversized_frame_is_rejected(self, stub, run_batch, monkeypatch):
+        monkeypatch.setattr(websocket_server, "MAX_FRAME_SAMPLES", 2)
+        state = SessionState("s1", ChangeNotifier())
+        sent = run_batch(
+            [[{"timestamp": t, "relativePitch": 1.0} for t in range(3)]], state
+        )
+
+        assert stub.calls == []
+        assert sent[0]["type"] == "error"
+        assert "2개" in sent[0]["error"]
@@ -0,0 +1,115 @@
+"""
+Prometheus 메트릭 테스트
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import websocket_server
+from server_metrics import (
+    OVERHEAD_BUDGET_US,
+    PROMETHEUS_AVAILABLE,
+    ServerMetrics,
+    measure_overhead,
+)
+from websocket_server import app
+
+pytestmark = pytest.mark.skipif(
+    not PROMETHEUS_AVAILABLE, reason="prometheus-client not installed"
+)
+
+
+def sample_value(text: str, series: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.split()[-1])
+    raise AssertionError(f"{series} 시계열이 없습니다")
+
+
+class TestServerMetrics:
+    """메트릭 기록 및 오버헤드 예산 테스트"""
+
+    def test_stage_histograms_and_counters(self):
+        metrics = ServerMetrics()
+        t = metrics.observe("parse", 0.0)
+        metrics.observe("validate", t)
+        metrics.message("prediction")
+        metrics.message("unknown-type")
+        metrics.error("json")
+        metrics.gauge("posture_test_gauge", "테스트", lambda: 7)
+
+        body, _ = metrics.render()
+        text = body.decode()
+        assert (
+            sample_value(text, 'posture_stage_latency_seconds_count{stage="parse"}')
+            == 1
+        )
+        assert sample_value(text, 'posture_messages_total{type="other"}') == 1
+        assert sample_value(text, 'posture_errors_total{kind="json"}') == 1
+        assert sample_value(text, "posture_test_gauge") == 7
+
+    def test_disabled_metrics_are_noops(self):
+        metrics = ServerMetrics(enabled=False)
+        metrics.message("prediction")
+        metrics.connection_opened()
+        assert metrics.observe("parse", 0.0) > 0
+        assert metrics.render()[0].startswith(b"#")
+
+    def test_overhead_within_budget(self):
+        # CI 잡음을 고려해 예산의 3배까지 허용 (정확한 값은 benchmarks/bench_metrics.py)
+        assert measure_overhead(iterations=2000) < OVERHEAD_BUDGET_US * 3
+
+    def test_missing_package_warns_and_fails_scrape(self, monkeypatch, caplog):
+        monkeypatch.setattr("server_metrics.PROMETHEUS_AVAILABLE", False)
+        with caplog.at_level("WARNING", logger="server_metrics"):
+            metrics = ServerMetrics()
+        assert metrics.unavailable and not metrics.enabled
+        assert "prometheus-client" in caplog.text
+        # 일부러 끈 경우에는 경고하지 않음
+        assert not ServerMetrics(enabled=False).unavailable
+
+        monkeypatch.setattr(websocket_server, "metrics", metrics)
+        assert TestClient(app).get("/metrics").status_code == 503
+
+
+class TestMetricsEndpoint:
+    """/metrics 엔드포인트 테스트"""
+
+    def test_request_path_is_instrumented(self, monkeypatch):
+        class StubClassifier:
+            model = object()
+            model_version = 3
+
+            def predict_posture(self, timestamp, relative_pitch):
+                return {
+                    "predicted_posture": 1,
+                    "confidence": 0.9,
+                    "all_probabilities": {1: 0.9},
+                    "timestamp": timestamp,
+                    "relative_pitch": relative_pitch,
+                }
+
+        metrics = ServerMetrics()
+        metrics.gauge(
+            "posture_model_version", "자세 모델 버전", lambda: stub.model_version
+        )
+        stub = StubClassifier()
+        monkeypatch.setattr(websocket_server, "metrics", metrics)
+        monkeypatch.setattr(websocket_server, "classifier", stub)
+
+        client = TestClient(app)
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            websocket.send_json({"timestamp": 1, "relativePitch": -3.0})
+            assert websocket.receive_json()["type"] == "prediction"
+            websocket.send_text("not json")
+            assert websocket.receive_json()["type"] == "error"
+
+        text = client.get("/metrics").text
+        for stage in ("receive", "parse", "validate", "serialize", "send"):
+            series = f'posture_stage_latency_seconds_count{{stage="{stage}"}}'
+            assert sample_value(text, series) >= 1
+        assert sample_value(text, 'posture_messages_total{type="prediction"}') == 1
+        assert sample_value(text, 'posture_errors_total{kind="json"}') == 1
+        assert sample_value(text, "posture_connections_total") == 1
+        assert sample_value(text, "posture_model_version") == 3
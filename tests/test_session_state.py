@@ -0,0 +1,279 @@
+"""
+재연결 세션 상태 테스트 - 순번, 미확인 응답 재전송, 직렬화, 저장소 만료
+"""
+
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import websocket_server
+from connection_guard import CLOSE_TRY_AGAIN_LATER
+from posture_smoothing import ChangeNotifier, PostureSmoother
+from session_state import MemorySessionStore, RedisSessionStore, SessionState
+from websocket_server import app
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.current_thread().name)
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.threads.add(threading.current_thread().name)
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class StubClassifier:
+    model = object()
+
+    def predict_posture(self, timestamp, relative_pitch):
+        return {
+            "predicted_posture": 1,
+            "confidence": 0.9,
+            "all_probabilities": {1: 0.9, 2: 0.1},
+            "timestamp": timestamp,
+            "relative_pitch": relative_pitch,
+        }
+
+
+class TestSessionState:
+    """순번/확인 처리 테스트"""
+
+    def test_stamp_and_cumulative_ack(self):
+        state = SessionState("s1", ChangeNotifier())
+        for i in range(5):
+            message = {"n": i}
+            seq = state.stamp(message)
+            assert seq == message["seq"] == i + 1
+            state.retain(seq, json.dumps(message))
+
+        state.ack(3)
+        assert list(state.unacked) == [4, 5]
+        assert [json.loads(m)["n"] for m in state.pending_since(4)] == [4]
+
+    def test_unacked_is_bounded(self):
+        state = SessionState("s1", ChangeNotifier(), max_unacked=3)
+        for i in range(10):
+            state.retain(state.stamp({"n": i}), "{}")
+        assert list(state.unacked) == [8, 9, 10]
+
+    def test_limit_unacked_trims_oldest(self):
+        state = SessionState("s1", ChangeNotifier(), max_unacked=5)
+        for i in range(5):
+            state.retain(state.stamp({"n": i}), "{}")
+        state.limit_unacked(2)
+        assert list(state.unacked) == [4, 5]
+        state.limit_unacked(0)
+        state.retain(state.stamp({}), "{}")
+        assert len(state.unacked) == 0
+
+    def test_duplicate_client_seq_rejected(self):
+        state = SessionState("s1", ChangeNotifier())
+        assert state.accept_client_seq(1)
+        assert state.accept_client_seq(2)
+        assert not state.accept_client_seq(2)
+        assert not state.accept_client_seq(1)
+        # 순번 없는 메시지는 항상 처리
+        assert state.accept_client_seq(None)
+
+    def test_resume_requires_issued_token(self):
+        state = SessionState("s1", ChangeNotifier())
+        other = SessionState("s1", ChangeNotifier())
+        assert state.can_resume(state.resume_token)
+        assert not state.can_resume(other.resume_token)
+        assert not state.can_resume(None)
+        assert not state.can_resume("토큰")
+
+    def test_round_trip_keeps_smoothing_state(self, clock):
+        notifier = ChangeNotifier(
+            PostureSmoother(window=3), mode="on_change", clock=clock
+        )
+        for _ in range(3):
+            notifier.observe(1, 0.9)
+        state = SessionState("s1", notifier)
+        state.last_sample = (10, -5.0)
+        state.accept_client_seq(7)
+        state.retain(state.stamp({}), '{"type": "posture_change", "seq": 1}')
+
+        restored = SessionState.from_dict(json.loads(json.dumps(state.to_dict())))
+        assert restored.session_id == "s1"
+        assert restored.can_resume(state.resume_token)
+        assert restored.last_sample == (10, -5.0)
+        assert restored.last_client_seq == 7
+        assert restored.next_seq == 2
+        assert list(restored.unacked) == [1]
+        assert restored.notifier.mode == "on_change"
+        assert restored.notifier.smoother.posture == 1
+
+        # 평활 이력이 이어지므로 한 번의 다른 예측으로는 자세가 바뀌지 않음
+        assert restored.notifier.observe(2, 0.9) is None
+
+
+class TestSessionStores:
+    """세션 저장소 테스트"""
+
+    def test_memory_store_expires_after_ttl(self, clock):
+        store = MemorySessionStore(ttl_s=10, clock=clock)
+        store.put(SessionState("s1", ChangeNotifier()))
+
+        clock.now = 9
+        assert store.get("s1") is not None
+        clock.now = 11
+        assert store.get("s1") is None
+        assert len(store) == 0
+
+    def test_memory_store_evicts_oldest(self, clock):
+        store = MemorySessionStore(max_sessions=2, clock=clock)
+        for session_id in ("a", "b", "c"):
+            store.put(SessionState(session_id, ChangeNotifier()))
+        assert store.get("a") is None
+        assert store.get("c") is not None
+
+    def test_redis_store_round_trip(self):
+        client = FakeRedis()
+        store = RedisSessionStore(client, ttl_s=60)
+        state = SessionState("s1", ChangeNotifier())
+        state.retain(state.stamp({}), '{"type": "prediction", "seq": 1}')
+        store.put(state)
+
+        assert "session:s1" in client.data
+        assert list(store.get("s1").unacked) == [1]
+        store.delete("s1")
+        assert store.get("s1") is None
+
+    def test_redis_store_ignores_corrupt_state(self):
+        client = FakeRedis()
+        client.data["session:s1"] = "{not json"
+        assert RedisSessionStore(client).get("s1") is None
+
+
+class TestSessionResume:
+    """웹소켓 재연결 테스트"""
+
+    def test_reconnect_replays_unacked_responses(self, monkeypatch):
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        monkeypatch.setattr(websocket_server, "session_store", MemorySessionStore())
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws?ack=1") as websocket:
+            welcome = websocket.receive_json()
+            assert welcome["resumed"] is False
+            assert welcome["max_unacked"] == websocket_server.SESSION_MAX_UNACKED
+            session_id = welcome["session_id"]
+            token = welcome["resume_token"]
+
+            websocket.send_json({"seq": 1, "timestamp": 1, "relativePitch": -5.0})
+            first = websocket.receive_json()
+            assert first["seq"] == 1
+            websocket.send_json({"type": "ack", "seq": 1})
+            websocket.send_json({"seq": 2, "timestamp": 2, "relativePitch": -5.0})
+            assert websocket.receive_json()["seq"] == 2
+
+        # 2번 응답을 받지 못했다고 보고 재연결
+        url = f"/ws?session_id={session_id}&resume_token={token}&last_seq=1&ack=1"
+        with client.websocket_connect(url) as websocket:
+            welcome = websocket.receive_json()
+            assert welcome["resumed"] is True
+            assert welcome["last_client_seq"] == 2
+
+            replayed = websocket.receive_json()
+            assert replayed["seq"] == 2
+            assert replayed["input_timestamp"] == 2
+
+            # 재전송된 클라이언트 메시지는 다시 처리하지 않음
+            websocket.send_json({"seq": 2, "timestamp": 2, "relativePitch": -5.0})
+            websocket.send_json({"seq": 3, "timestamp": 3, "relativePitch": -5.0})
+            response = websocket.receive_json()
+            assert response["seq"] == 3
+            assert response["input_timestamp"] == 3
+
+    def test_responses_not_retained_without_ack(self, monkeypatch):
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        store = MemorySessionStore()
+        monkeypatch.setattr(websocket_server, "session_store", store)
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as websocket:
+            welcome = websocket.receive_json()
+            assert welcome["max_unacked"] == 0
+            websocket.send_json({"seq": 1, "timestamp": 1, "relativePitch": -5.0})
+            assert websocket.receive_json()["seq"] == 1
+
+        state = store.get(welcome["session_id"])
+        assert state.next_seq == 2
+        assert len(state.unacked) == 0
+
+    def test_redis_store_called_off_event_loop(self, monkeypatch):
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        redis_client = FakeRedis()
+        store = RedisSessionStore(redis_client)
+        monkeypatch.setattr(websocket_server, "session_store", store)
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws?ack=1") as websocket:
+            welcome = websocket.receive_json()
+            websocket.send_json({"seq": 1, "timestamp": 1, "relativePitch": -5.0})
+            websocket.receive_json()
+
+        url = (
+            f"/ws?session_id={welcome['session_id']}"
+            f"&resume_token={welcome['resume_token']}&last_seq=0&ack=1"
+        )
+        with client.websocket_connect(url) as websocket:
+            assert websocket.receive_json()["resumed"] is True
+            assert websocket.receive_json()["seq"] == 1
+
+        # 이벤트 루프 스레드가 아닌 기본 실행기 스레드(asyncio_N)에서만 Redis를 호출
+        assert redis_client.threads
+        assert all(name.startswith("asyncio_") for name in redis_client.threads)
+
+    def test_resume_without_token_starts_new_session(self, monkeypatch):
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        monkeypatch.setattr(websocket_server, "session_store", MemorySessionStore())
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as websocket:
+            session_id = websocket.receive_json()["session_id"]
+            websocket.send_json({"seq": 1, "timestamp": 1, "relativePitch": -5.0})
+            websocket.receive_json()
+
+        for query in ("", "&resume_token=guess"):
+            url = f"/ws?session_id={session_id}{query}&last_seq=0"
+            with client.websocket_connect(url) as websocket:
+                welcome = websocket.receive_json()
+                assert welcome["resumed"] is False
+                assert welcome["session_id"] != session_id
+                assert welcome["last_client_seq"] == 0
+
+    def test_live_session_cannot_be_resumed(self, monkeypatch):
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        monkeypatch.setattr(websocket_server, "session_store", MemorySessionStore())
+        client = TestClient(app)
+
+        with client.websocket_connect("/ws") as first:
+            welcome = first.receive_json()
+            url = (
+                f"/ws?session_id={welcome['session_id']}"
+                f"&resume_token={welcome['resume_token']}"
+            )
+            with client.websocket_connect(url) as second:
+                rejected = second.receive_json()
+                assert rejected["type"] == "rejected"
+                assert rejected["reason"] == "session_in_use"
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    second.receive_json()
+                assert closed.value.code == CLOSE_TRY_AGAIN_LATER
+
+            # 처음 연결은 그대로 세션을 사용
+            first.send_json({"seq": 1, "timestamp": 1, "relativePitch": -5.0})
+            assert first.receive_json()["seq"] == 1
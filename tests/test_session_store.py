@@ -0,0 +1,110 @@
+"""
+세션 저장 포맷 테스트
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from session_store import (
+    SessionReader,
+    SessionWriter,
+    convert_csv,
+    read_table,
+    schema_for_columns,
+)
+
+
+def make_pressure_frame(start: int, rows: int) -> pd.DataFrame:
+    data = {
+        "pose": np.full(rows, 2),
+        "timestamp_ms": np.arange(start, start + rows) * 200,
+    }
+    for i in range(1, 12):
+        data[f"s{i}"] = np.arange(rows) + i * 10
+    return pd.DataFrame(data)
+
+
+class TestSessionStore:
+    """청크 컬럼형 세션 파일 테스트"""
+
+    def test_schema_types(self):
+        schema = dict(
+            schema_for_columns(
+                ["pose", "timestamp_ms", "s1", "pv3", "relative_pitch_deg"]
+            )
+        )
+        assert schema["timestamp_ms"] == np.int64
+        assert schema["pose"] == np.int16
+        assert schema["s1"] == np.int16
+        assert schema["pv3"] == np.int16
+        assert schema["relative_pitch_deg"] == np.float32
+
+    def test_append_and_memory_mapped_read(self, tmp_path):
+        path = str(tmp_path / "session.pses")
+        frame = make_pressure_frame(0, 100)
+        with SessionWriter(path, schema_for_columns(frame.columns)) as writer:
+            writer.append(frame.iloc[:60])
+            writer.append(frame.iloc[60:])
+
+        # 기존 파일에 이어서 기록
+        with SessionWriter(path) as writer:
+            writer.append(make_pressure_frame(100, 20))
+
+        reader = SessionReader(path)
+        assert reader.num_chunks == 3
+        assert len(reader) == 120
+
+        # 한 청크 안의 슬라이스는 메모리 맵 뷰
+        view = reader.column("s3", 10, 20)
+        assert isinstance(view.base, np.memmap) or isinstance(view, np.memmap)
+        assert not view.flags.writeable
+        assert view.tolist() == list(range(40, 50))
+
+        # 청크 경계를 넘는 슬라이스
+        ts = reader.column("timestamp_ms", 55, 105)
+        assert ts.tolist() == [i * 200 for i in range(55, 105)]
+
+        window = reader.time_range(20000, 21000)
+        assert window["timestamp_ms"].tolist() == [
+            20000,
+            20200,
+            20400,
+            20600,
+            20800,
+            21000,
+        ]
+
+    def test_recovers_index_without_footer(self, tmp_path):
+        path = tmp_path / "session.pses"
+        frame = make_pressure_frame(0, 50)
+        with SessionWriter(str(path), schema_for_columns(frame.columns)) as writer:
+            writer.append(frame)
+
+        # 기록 중 중단된 파일처럼 꼬리를 잘라냄
+        raw = path.read_bytes()
+        path.write_bytes(raw[:-40])
+
+        reader = SessionReader(str(path))
+        assert reader.num_chunks == 1
+        assert reader.column("s11").tolist() == list(range(110, 160))
+
+    def test_convert_csv_and_read_table(self, tmp_path):
+        csv_path = tmp_path / "0번자세.csv"
+        pd.DataFrame(
+            {"timestamp_ms": [0, 1000, 2000], "relative_pitch_deg": [0.0, -1.5, -2.25]}
+        ).to_csv(csv_path, index=False)
+
+        session_path = convert_csv(str(csv_path), chunk_rows=2)
+        df = read_table(str(csv_path))
+
+        assert session_path.endswith(".pses")
+        assert df["timestamp_ms"].dtype == np.int64
+        assert df["relative_pitch_deg"].dtype == np.float32
+        assert df["relative_pitch_deg"].tolist() == [0.0, -1.5, -2.25]
+
+    def test_convert_rejects_unknown_layout(self, tmp_path):
+        csv_path = tmp_path / "log.csv"
+        csv_path.write_text("✅ 기록됨: 0ms, 보정된 pitch: 0.00\n")
+        with pytest.raises(ValueError):
+            convert_csv(str(csv_path))
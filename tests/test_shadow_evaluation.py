@@ -0,0 +1,161 @@
+"""
+후보 모델 섀도 평가 테스트 - 표본 추출, 일치율/혼동 행렬 집계, 관리자 API
+"""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import websocket_server
+from shadow_evaluation import ShadowEvaluator
+from websocket_server import app
+
+
+class StubCandidate:
+    """피치가 음수면 1번, 아니면 2번 자세로 예측하는 후보 모델"""
+
+    def __init__(self, gate=None):
+        self.gate = gate
+
+    def predict_posture(self, timestamp, relative_pitch):
+        if self.gate is not None:
+            self.gate.wait()
+        return {"predicted_posture": 1 if relative_pitch < 0 else 2, "confidence": 0.9}
+
+
+class TestShadowEvaluator:
+    """섀도 평가 집계 테스트"""
+
+    def test_agreement_and_confusion(self):
+        evaluator = ShadowEvaluator(StubCandidate(), fraction=1.0)
+        evaluator.start()
+        for _ in range(6):
+            evaluator.offer(0, -5.0, 1)
+        for _ in range(4):
+            evaluator.offer(0, 5.0, 1)
+        evaluator.offer(0, 5.0, 2)
+        evaluator.stop()
+
+        report = evaluator.report()
+        assert report["evaluated"] == 11
+        assert report["agreement_rate"] == 7 / 11
+        assert report["confusion"] == {1: {1: 6, 2: 4}, 2: {2: 1}}
+        assert report["per_class_agreement"] == {1: 0.6, 2: 1.0}
+        assert report["latency"]["count"] == 11
+        assert report["latency"]["p99_ms"] >= report["latency"]["p50_ms"]
+
+    def test_sampling_fraction(self):
+        values = iter([0.01, 0.5, 0.09, 0.99])
+        evaluator = ShadowEvaluator(
+            StubCandidate(), fraction=0.1, rng=lambda: next(values)
+        )
+        evaluator.start()
+        offered = [evaluator.offer(0, -5.0, 1) for _ in range(4)]
+        evaluator.stop()
+        assert offered == [True, False, True, False]
+        assert evaluator.report()["evaluated"] == 2
+
+    def test_not_started_does_not_queue(self):
+        evaluator = ShadowEvaluator(StubCandidate(), fraction=1.0)
+        assert not evaluator.offer(0, -5.0, 1)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        gate = threading.Event()
+        evaluator = ShadowEvaluator(StubCandidate(gate), fraction=1.0, queue_size=2)
+        evaluator.start()
+        results = [evaluator.offer(0, -5.0, 1) for _ in range(10)]
+        gate.set()
+        evaluator.stop()
+
+        report = evaluator.report()
+        assert not all(results)
+        assert report["dropped"] == results.count(False)
+        assert report["evaluated"] == results.count(True)
+
+
+class TestShadowAdminApi:
+    """관리자 API 테스트"""
+
+    def test_start_report_and_stop(self, monkeypatch, admin_client):
+        class StubClassifier:
+            model = object()
+
+            def predict_posture(self, timestamp, relative_pitch):
+                return {
+                    "predicted_posture": 0,
+                    "confidence": 0.9,
+                    "all_probabilities": {0: 0.9},
+                    "timestamp": timestamp,
+                    "relative_pitch": relative_pitch,
+                }
+
+        monkeypatch.setattr(websocket_server, "classifier", StubClassifier())
+        monkeypatch.setattr(websocket_server, "shadow", None)
+        client = admin_client
+
+        assert client.get("/admin/shadow").json() == {"running": False}
+        response = client.post(
+            "/admin/shadow", json={"model_path": "posture_model.pkl", "fraction": 1.0}
+        )
+        assert response.status_code == 200
+        assert response.json()["running"] is True
+
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            websocket.send_json({"timestamp": 1, "relativePitch": -20.0})
+            websocket.receive_json()
+
+        report = client.delete("/admin/shadow").json()
+        assert report["running"] is False
+        assert report["offered"] == 1
+        assert report["evaluated"] + report["errors"] == 1
+
+    def test_stop_joins_worker_off_event_loop(self, monkeypatch, admin_client):
+        evaluator = ShadowEvaluator(StubCandidate(), fraction=1.0)
+        evaluator.start()
+        stopped_in = []
+        stop = evaluator.stop
+
+        def recording_stop():
+            stopped_in.append(threading.current_thread().name)
+            stop()
+
+        monkeypatch.setattr(evaluator, "stop", recording_stop)
+        monkeypatch.setattr(websocket_server, "shadow", evaluator)
+
+        assert admin_client.delete("/admin/shadow").json()["running"] is False
+        # 작업 스레드 join은 기본 실행기 스레드(asyncio_N)에서
+        assert len(stopped_in) == 1
+        assert stopped_in[0].startswith("asyncio_")
+
+    def test_requires_token_when_configured(self, monkeypatch):
+        monkeypatch.setattr(websocket_server, "ADMIN_TOKEN", "secret")
+        client = TestClient(app)
+        assert client.get("/admin/shadow").status_code == 401
+        response = client.get("/admin/shadow", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+
+    def test_disabled_without_token(self, monkeypatch):
+        monkeypatch.setattr(websocket_server, "ADMIN_TOKEN", "")
+        client = TestClient(app)
+        assert client.get("/admin/shadow").status_code == 403
+        response = client.post(
+            "/admin/shadow", json={"model_path": "posture_model.pkl"}
+        )
+        assert response.status_code == 403
+
+    def test_rejects_missing_model(self, admin_client):
+        response = admin_client.post(
+            "/admin/shadow", json={"model_path": "missing.pkl"}
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize(
+        "model_path",
+        ["../outside.pkl", "/etc/passwd", "/tmp/candidate.pkl", "README.md"],
+    )
+    def test_model_path_is_confined_to_models_dir(self, admin_client, model_path):
+        response = admin_client.post("/admin/shadow", json={"model_path": model_path})
+        assert response.status_code == 400
+        assert "MODELS_DIR" in response.json()["detail"]
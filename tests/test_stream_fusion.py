@@ -0,0 +1,173 @@
+"""
+IMU·압력 스트림 결합 테스트
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import websocket_server
+from stream_fusion import FusionHub, StreamFusion, align_pitch, fuse_frames
+from websocket_server import app
+
+
+def make_streams(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    imu_ts = np.cumsum(rng.integers(15, 25, 600))  # 약 50Hz, 지터 포함
+    imu_ts = imu_ts[(imu_ts < 4000) | (imu_ts > 6000)]  # 2초 IMU 공백
+    imu_pitch = np.sin(imu_ts / 1000.0) * 10
+    pressure_ts = np.arange(0, int(imu_ts[-1]), 200)  # 5Hz
+    frames = [[int(t) % 97 + i for i in range(8)] for t in pressure_ts]
+    return imu_ts, imu_pitch, pressure_ts, frames
+
+
+def replay(fusion: StreamFusion, imu_ts, imu_pitch, pressure_ts, frames, lag_ms=300):
+    """IMU가 lag_ms 늦게 도착하도록 두 스트림을 도착 시각 순으로 섞어 재생"""
+    events = [(t + lag_ms, 0, i) for i, t in enumerate(imu_ts)]
+    events += [(t, 1, i) for i, t in enumerate(pressure_ts)]
+    fused = []
+    for _, kind, i in sorted(events):
+        if kind == 0:
+            fused += fusion.push_imu(int(imu_ts[i]), float(imu_pitch[i]))
+        else:
+            fused += fusion.push_pressure(int(pressure_ts[i]), frames[i])
+    return fused + fusion.flush()
+
+
+class TestStreamFusion:
+    """타임스탬프 기반 결합 테스트"""
+
+    def test_align_nearest_and_interpolate(self):
+        imu_ts = np.array([0, 1000])
+        imu_pitch = np.array([0.0, 10.0])
+        target = np.array([100, 400, 500, 2000])
+
+        pitch, matched = align_pitch(target, imu_ts, imu_pitch, 500, "nearest")
+        assert matched.tolist() == [True, True, True, False]
+        assert pitch[:3].tolist() == [0.0, 0.0, 0.0]
+
+        pitch, _ = align_pitch(target, imu_ts, imu_pitch, 600, "interpolate")
+        assert pitch[1] == pytest.approx(4.0)
+        assert pitch[0] == 0.0  # 다음 샘플이 허용 오차 밖이면 nearest
+
+    @pytest.mark.parametrize("mode", ["nearest", "interpolate"])
+    def test_streaming_matches_batch(self, mode):
+        imu_ts, imu_pitch, pressure_ts, frames = make_streams()
+        fusion = StreamFusion(tolerance_ms=100, mode=mode, max_wait_ms=10_000)
+        streamed = replay(fusion, imu_ts, imu_pitch, pressure_ts, frames)
+
+        pressure_df = pd.DataFrame({"timestamp_ms": pressure_ts, "pv1": 0})
+        imu_df = pd.DataFrame({"timestamp_ms": imu_ts, "relative_pitch_deg": imu_pitch})
+        batch = fuse_frames(pressure_df, imu_df, tolerance_ms=100, mode=mode)
+
+        assert [f.timestamp for f in streamed] == batch["timestamp_ms"].tolist()
+        np.testing.assert_allclose([f.pitch for f in streamed], batch["pitch"])
+        # IMU 공백 구간의 압력 프레임은 결합되지 않음
+        assert fusion.stats["unmatched"] > 0
+
+    def test_buffers_are_bounded(self):
+        fusion = StreamFusion(imu_buffer_size=32, pressure_buffer_size=16)
+        for t in range(0, 100_000, 20):
+            fusion.push_imu(t, 0.0)
+        for t in range(200_000, 210_000, 200):
+            fusion.push_pressure(t, [0] * 8)
+
+        assert len(fusion._imu) <= 32
+        assert len(fusion._pending) <= 16
+
+    def test_hub_evicts_idle_devices(self):
+        hub = FusionHub(max_devices=2)
+        for device in ["a", "b", "c"]:
+            hub.push_imu(device, 0, 0.0)
+        assert len(hub) == 2
+
+
+class FusedStubClassifier:
+    """결합 프레임을 기록하는 분류기"""
+
+    model = object()
+
+    def __init__(self):
+        self.frames = []
+
+    def predict_frames(self, frames):
+        self.frames += frames
+        return [{"predicted_posture": 1, "confidence": 0.9} for _ in frames]
+
+
+class TestFusionWebSocket:
+    """결합 스트림 웹소켓 테스트"""
+
+    def test_fused_prediction(self, monkeypatch):
+        stub = FusedStubClassifier()
+        hub = FusionHub(tolerance_ms=100)
+        monkeypatch.setattr(websocket_server, "fusion_classifier", stub)
+        monkeypatch.setattr(websocket_server, "fusion_hub", hub)
+
+        with TestClient(app).websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            base = {"type": "fusion", "device_id": "d1"}
+            websocket.send_json(
+                {**base, "stream": "imu", "timestamp": 0, "relativePitch": 1.5}
+            )
+            websocket.send_json(
+                {**base, "stream": "pressure", "timestamp": 50, "pressure": [1] * 8}
+            )
+            websocket.send_json(
+                {**base, "stream": "imu", "timestamp": 200, "relativePitch": 2.5}
+            )
+
+            response = websocket.receive_json()
+            assert response["type"] == "fused_prediction"
+            assert response["predictions"][0]["input_timestamp"] == 50
+            assert response["predictions"][0]["input_relative_pitch"] == 1.5
+
+        # 결합 모델에는 정렬된 pitch까지 넣고, 연결이 끊기면 장치 버퍼를 정리
+        assert stub.frames == [[1] * 8 + [1.5]]
+        assert len(hub) == 0
+
+    def test_connections_do_not_share_device_buffers(self, monkeypatch):
+        stub = FusedStubClassifier()
+        hub = FusionHub(tolerance_ms=100)
+        monkeypatch.setattr(websocket_server, "fusion_classifier", stub)
+        monkeypatch.setattr(websocket_server, "fusion_hub", hub)
+        client = TestClient(app)
+        base = {"type": "fusion", "device_id": "d1"}
+
+        with client.websocket_connect("/ws") as first:
+            first.receive_json()
+            first.send_json(
+                {**base, "stream": "imu", "timestamp": 50, "relativePitch": 1.5}
+            )
+
+            # 같은 device_id를 보내도 다른 연결의 IMU 샘플과는 결합되지 않음
+            with client.websocket_connect("/ws") as second:
+                second.receive_json()
+                for message in (
+                    {"stream": "imu", "timestamp": 40, "relativePitch": 9.0},
+                    {"stream": "pressure", "timestamp": 50, "pressure": [1] * 8},
+                    {"stream": "imu", "timestamp": 200, "relativePitch": 9.0},
+                ):
+                    second.send_json({**base, **message})
+                response = second.receive_json()
+                assert response["predictions"][0]["input_relative_pitch"] == 9.0
+
+            # 다른 연결이 끊겨도 이 연결의 장치 버퍼는 남음
+            first.send_json({"type": "ping"})
+            assert first.receive_json()["type"] == "pong"
+            assert len(hub) == 1
+
+        assert stub.frames == [[1] * 8 + [9.0]]
+        assert len(hub) == 0
+
+    def test_device_count_per_connection_is_capped(self, monkeypatch):
+        monkeypatch.setattr(websocket_server, "fusion_hub", FusionHub())
+        monkeypatch.setattr(websocket_server, "FUSION_MAX_DEVICES_PER_CONNECTION", 1)
+
+        with TestClient(app).websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            message = {"type": "fusion", "stream": "imu", "timestamp": 0}
+            websocket.send_json({**message, "device_id": "a", "relativePitch": 0.0})
+            websocket.send_json({**message, "device_id": "b", "relativePitch": 0.0})
+            assert websocket.receive_json()["type"] == "error"
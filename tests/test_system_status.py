@@ -0,0 +1,162 @@
+"""
+시스템 상태 샘플러 테스트 - 지연 백분위, 상태 판정, 다운샘플링·일괄 기록, 캐시된 /health
+"""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import websocket_server
+from system_status import SystemStatusSampler, SystemStatusWriter
+from websocket_server import app
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+CREATE_TABLE = """
+CREATE TABLE system_status (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    server_status VARCHAR(20),
+    active_connections INTEGER,
+    cpu_usage DECIMAL(5,2),
+    memory_usage DECIMAL(5,2),
+    disk_usage DECIMAL(5,2),
+    response_time_ms INTEGER,
+    error_count INTEGER,
+    timestamp TIMESTAMP
+)
+"""
+
+
+class FailingWriter:
+    def __init__(self):
+        self.calls = 0
+
+    def write(self, rows):
+        self.calls += 1
+        raise ConnectionError("db down")
+
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = SystemStatusWriter(f"sqlite:///{tmp_path / 'status.db'}")
+    with writer.engine.begin() as connection:
+        connection.execute(sqlalchemy.text(CREATE_TABLE))
+    yield writer
+    writer.close()
+
+
+def count_rows(writer):
+    with writer.engine.connect() as connection:
+        return connection.execute(
+            sqlalchemy.text("SELECT COUNT(*) FROM system_status")
+        ).scalar()
+
+
+class TestSystemStatusSampler:
+    """샘플러 단위 테스트"""
+
+    def test_latency_percentiles_and_error_delta(self):
+        errors = [3]
+        sampler = SystemStatusSampler(error_count=lambda: errors[0])
+        assert sampler.sample()["response_time_ms"]["count"] == 0
+
+        for ms in range(1, 101):
+            sampler.record_latency(ms / 1000)
+        errors[0] = 5
+        snapshot = sampler.sample()
+        latency = snapshot["response_time_ms"]
+        assert latency["count"] == 100
+        assert latency["p50"] == pytest.approx(50.5)
+        assert latency["p99"] == pytest.approx(99.01)
+        assert snapshot["error_count"] == 2
+        assert sampler.sample()["error_count"] == 0
+
+    def test_status_judgement(self):
+        sampler = SystemStatusSampler(extra=lambda: {"model_loaded": False})
+        assert sampler.sample()["status"] == "error"
+
+        sampler = SystemStatusSampler(extra=lambda: {"model_loaded": True})
+        sampler.record_latency(2.0)
+        assert sampler.sample()["status"] == "warning"
+
+    def test_history_is_bounded(self):
+        sampler = SystemStatusSampler(history=3)
+        for _ in range(5):
+            sampler.sample()
+        assert len(sampler.history) == 3
+
+    def test_downsampled_rows_are_written_in_batches(self, writer):
+        sampler = SystemStatusSampler(
+            persist_every=3,
+            batch_size=2,
+            writer=writer,
+            extra=lambda: {"active_connections": 4},
+        )
+        for _ in range(5):
+            sampler.sample()
+        # 두 번째 행이 아직 다 모이지 않음
+        assert count_rows(writer) == 0
+        sampler.sample()
+        assert count_rows(writer) == 2
+
+        # 중지할 때 남은 샘플을 한 행으로 기록
+        sampler.sample()
+        sampler.stop()
+        assert count_rows(writer) == 3
+
+        with writer.engine.connect() as connection:
+            row = connection.execute(
+                sqlalchemy.text(
+                    "SELECT server_status, active_connections FROM system_status"
+                )
+            ).first()
+        # 상태는 테스트 호스트의 자원 사용량에 따라 달라짐
+        assert row[0] in ("healthy", "warning")
+        assert row[1] == 4
+
+    def test_failed_writes_are_kept_and_bounded(self):
+        failing = FailingWriter()
+        sampler = SystemStatusSampler(
+            persist_every=1, batch_size=1, writer=failing, max_pending_rows=3
+        )
+        for _ in range(5):
+            sampler.sample()
+        assert failing.calls == 5
+        assert len(sampler._pending) == 3
+
+    def test_background_thread_refreshes_cache(self):
+        sampler = SystemStatusSampler(interval_s=0.02)
+        sampler.start()
+        try:
+            for _ in range(200):
+                if len(sampler.history) >= 2:
+                    break
+                time.sleep(0.01)
+        finally:
+            sampler.stop()
+        assert len(sampler.history) >= 2
+        assert not sampler.running
+
+
+class TestHealthEndpoint:
+    """/health 캐시 테스트"""
+
+    def test_health_returns_cached_snapshot(self, monkeypatch):
+        sampler = SystemStatusSampler(
+            interval_s=60, extra=websocket_server.server_status_fields
+        )
+        monkeypatch.setattr(websocket_server, "status_sampler", sampler)
+        client = TestClient(app)
+
+        first = client.get("/health").json()
+        assert {"status", "timestamp", "active_connections", "model_loaded"} <= set(
+            first
+        )
+        assert "response_time_ms" in first
+        # interval_s 안에서는 다시 수집하지 않음
+        assert client.get("/health").json() == first
+        assert len(sampler.history) == 1
+
+        history = client.get("/health/history?limit=5").json()
+        assert history == [first]
@@ -3,18 +3,55 @@ FastAPI 웹소켓 서버 - 자세 분류 API
 """
 
 import asyncio
+import atexit
+import hmac
 import json
 import logging
 import os
+import time
 import traceback
 from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import Dict, List
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+from fastapi import (
+    Body,
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import HTMLResponse, Response
+from fastapi.websockets import WebSocketState
 
+from connection_guard import (
+    CLOSE_GOING_AWAY,
+    CLOSE_INTERNAL_ERROR,
+    CLOSE_TRY_AGAIN_LATER,
+    HEARTBEAT_TYPES,
+    REAP_REASONS,
+    AdmissionControl,
+    Heartbeat,
+)
+from drift_monitor import SIGNALS, DriftMonitor
+from flood_control import POLICIES, BucketRegistry, ConnectionLimiter, TokenBucket
+from inference_pool import InferencePool
+from log_pipeline import parse_rules, sample, setup_logging
+from online_updates import OnlineForestUpdater
 from posture_classifier import PostureClassifier
+from posture_smoothing import ChangeNotifier, PostureSmoother
+from posture_timeline import TimelineStore
+from pressure_classifier import PressureClassifier
+from profiling import FORMATS, ProfileSession, ServerProfiler
+from rate_control import RateController
+from response_profiles import DEFAULT_EPSILON, ResponseEncoder
+from server_metrics import ServerMetrics
+from session_state import SessionState, create_session_store, new_session_id
+from shadow_evaluation import ShadowEvaluator, load_shadow_evaluator
+from stream_fusion import FusionHub
+from system_status import SystemStatusSampler, create_status_writer
 
 # .env 파일 로드 (있다면)
 try:
@@ -30,13 +67,99 @@ SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
 SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+FUSION_TOLERANCE_MS = float(os.getenv("FUSION_TOLERANCE_MS", "500"))
+FUSION_MODE = os.getenv("FUSION_MODE", "nearest")
+# 압력 + IMU pitch 결합 모델 (fusion 스트림 분류용)
+FUSION_MODEL_PATH = os.getenv("FUSION_MODEL_PATH", "fusion_model.pkl")
+FUSION_MAX_DEVICES_PER_CONNECTION = int(
+    os.getenv("FUSION_MAX_DEVICES_PER_CONNECTION", "16")
+)
+RESPONSE_MODE = os.getenv("RESPONSE_MODE", "every")
+HEARTBEAT_INTERVAL_S = float(os.getenv("HEARTBEAT_INTERVAL_S", "30"))
+SMOOTHING_WINDOW = int(os.getenv("SMOOTHING_WINDOW", "5"))
+SMOOTHING_MIN_CONFIDENCE = float(os.getenv("SMOOTHING_MIN_CONFIDENCE", "0.6"))
+MODEL_PATH = os.getenv("MODEL_PATH", "posture_model.pkl")
+ONLINE_UPDATE_BATCH = int(os.getenv("ONLINE_UPDATE_BATCH", "32"))
+ONLINE_UPDATE_TREES = int(os.getenv("ONLINE_UPDATE_TREES", "10"))
+
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_SAMPLE_EVERY = os.getenv(
+    "LOG_SAMPLE_EVERY", "receive:100,predict:100,respond:100,invalid_json:100"
+)
+LOG_RATE_LIMIT = os.getenv("LOG_RATE_LIMIT", "")
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+COALESCE_SAMPLES = os.getenv("COALESCE_SAMPLES", "true").lower() == "true"
+MAX_FRAME_SAMPLES = int(os.getenv("MAX_FRAME_SAMPLES", "100"))
+MAX_PRESSURE_FRAMES = int(os.getenv("MAX_PRESSURE_FRAMES", "100"))
+PRESSURE_EXECUTOR_FRAMES = int(os.getenv("PRESSURE_EXECUTOR_FRAMES", "16"))
+SAMPLE_AGE_BUDGET_MS = float(os.getenv("SAMPLE_AGE_BUDGET_MS", "1000"))
+# 연결별 수신 대기열 상한 (차면 소켓 읽기를 멈춰 클라이언트 쪽으로 역압)
+INBOX_MAX_MESSAGES = int(os.getenv("INBOX_MAX_MESSAGES", "1000"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+SHADOW_MODEL_PATH = os.getenv("SHADOW_MODEL_PATH", "")
+# 관리자 API로 불러올 수 있는 모델 파일 디렉토리 (기본값: MODEL_PATH가 있는 디렉토리)
+MODELS_DIR = os.getenv("MODELS_DIR") or os.path.dirname(os.path.abspath(MODEL_PATH))
+SHADOW_FRACTION = float(os.getenv("SHADOW_FRACTION", "0.05"))
+RESPONSE_PROFILE = os.getenv("RESPONSE_PROFILE", "full")
+RESPONSE_DELTA_EPSILON = float(
+    os.getenv("RESPONSE_DELTA_EPSILON", str(DEFAULT_EPSILON))
+)
+RATE_CONTROL_ENABLED = os.getenv("RATE_CONTROL_ENABLED", "false").lower() == "true"
+RATE_STABLE_HZ = int(os.getenv("RATE_STABLE_HZ", "5"))
+RATE_NORMAL_HZ = int(os.getenv("RATE_NORMAL_HZ", "20"))
+RATE_TRANSITION_HZ = int(os.getenv("RATE_TRANSITION_HZ", "50"))
+# 모든 연결이 공유하는 단계별 권장 주기
+RATE_CONTROL_RATES_HZ = {
+    "stable": RATE_STABLE_HZ,
+    "normal": RATE_NORMAL_HZ,
+    "transition": RATE_TRANSITION_HZ,
+}
+TIMELINE_DB = os.getenv("TIMELINE_DB", ":memory:")
+TIMELINE_MAX_GAP_MS = int(os.getenv("TIMELINE_MAX_GAP_MS", "5000"))
+TIMELINE_UTC_OFFSET_MIN = int(os.getenv("TIMELINE_UTC_OFFSET_MIN", "540"))
+TIMELINE_FLUSH_INTERVAL_S = float(os.getenv("TIMELINE_FLUSH_INTERVAL_S", "1"))
+POOR_POSTURES = [int(p) for p in os.getenv("POOR_POSTURES", "1,2,3,4,5,6,7").split(",")]
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_S", "300"))
+SESSION_MAX_UNACKED = int(os.getenv("SESSION_MAX_UNACKED", "32"))
+SESSION_SAVE_INTERVAL_S = float(os.getenv("SESSION_SAVE_INTERVAL_S", "1"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+WS_PING_INTERVAL_S = float(os.getenv("WS_PING_INTERVAL_S", "20"))
+WS_READ_TIMEOUT_S = float(os.getenv("WS_READ_TIMEOUT_S", "60"))
+WS_IDLE_TIMEOUT_S = float(os.getenv("WS_IDLE_TIMEOUT_S", "600"))
+MAX_CONNECTIONS = int(os.getenv("MAX_CONNECTIONS", "10000"))
+MAX_CONNECTIONS_PER_IP = int(os.getenv("MAX_CONNECTIONS_PER_IP", "100"))
+CONNECTION_RETRY_AFTER_S = float(os.getenv("CONNECTION_RETRY_AFTER_S", "5"))
+MESSAGE_RATE_PER_S = float(os.getenv("MESSAGE_RATE_PER_S", "100"))
+MESSAGE_BURST = float(os.getenv("MESSAGE_BURST", "200"))
+IP_MESSAGE_RATE_PER_S = float(os.getenv("IP_MESSAGE_RATE_PER_S", "1000"))
+IP_MESSAGE_BURST = float(os.getenv("IP_MESSAGE_BURST", "2000"))
+FLOOD_POLICY = os.getenv("FLOOD_POLICY", "coalesce")
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+INFERENCE_RING_SIZE = int(os.getenv("INFERENCE_RING_SIZE", "1024"))
+INFERENCE_TIMEOUT_S = float(os.getenv("INFERENCE_TIMEOUT_S", "2"))
+DRIFT_HALF_LIFE = float(os.getenv("DRIFT_HALF_LIFE", "500"))
+DRIFT_CHECK_EVERY = int(os.getenv("DRIFT_CHECK_EVERY", "50"))
+DRIFT_MIN_SAMPLES = int(os.getenv("DRIFT_MIN_SAMPLES", "200"))
+DRIFT_THRESHOLD = float(os.getenv("DRIFT_THRESHOLD", "0.25"))
+DRIFT_MAX_DEVICES = int(os.getenv("DRIFT_MAX_DEVICES", "10000"))
+STATUS_SAMPLE_INTERVAL_S = float(os.getenv("STATUS_SAMPLE_INTERVAL_S", "5"))
+STATUS_HISTORY = int(os.getenv("STATUS_HISTORY", "720"))
+STATUS_PERSIST_EVERY = int(os.getenv("STATUS_PERSIST_EVERY", "12"))
+STATUS_PERSIST_BATCH = int(os.getenv("STATUS_PERSIST_BATCH", "5"))
 
-# 로깅 설정
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL.upper()),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("websocket_server.log"), logging.StreamHandler()],
+# 로깅 설정 (요청 경로는 큐에 넣기만 하고 기록 스레드가 포맷·쓰기·압축 회전 처리)
+log_pipeline = setup_logging(
+    "websocket_server.log",
+    level=LOG_LEVEL,
+    max_bytes=LOG_MAX_BYTES,
+    backup_count=LOG_BACKUP_COUNT,
+    every={k: int(v) for k, v in parse_rules(LOG_SAMPLE_EVERY).items()},
+    per_second=parse_rules(LOG_RATE_LIMIT),
 )
+atexit.register(log_pipeline.stop)
 logger = logging.getLogger(__name__)
 
 
@@ -59,9 +182,63 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("기존 모델 로드 완료")
 
+    # 드리프트 감시 기준 분포 (기준 분포가 없는 예전 모델 파일이면 한 번 만들어 저장)
+    if classifier.model is not None and classifier.drift_reference is None:
+        try:
+            classifier.drift_reference = classifier.build_drift_reference()
+            if classifier.drift_reference is not None:
+                classifier.save_model()
+        except Exception as e:
+            logger.error(f"드리프트 기준 분포 생성 실패: {e}")
+    # 점진적 갱신 재학습 샘플 (없으면 교정 샘플만으로 트리를 만들게 되므로 한 번 만들어 저장)
+    if classifier.model is not None and classifier.replay_X is None:
+        try:
+            if classifier.build_replay_set():
+                classifier.save_model()
+        except Exception as e:
+            logger.error(f"재학습 샘플 생성 실패: {e}")
+    drift_monitor.set_reference(classifier.drift_reference)
+    if drift_monitor.reference is None:
+        logger.warning("드리프트 기준 분포가 없어 드리프트 감시를 하지 않습니다.")
+
+    # 압력 모델 (KD-tree 인덱스 포함) 로드 시도
+    if not pressure_classifier.load_model():
+        logger.info("기존 압력 모델이 없습니다. 새로운 압력 모델을 학습합니다.")
+        try:
+            pressure_classifier.train_model()
+            pressure_classifier.save_model()
+            logger.info("압력 모델 학습 및 저장 완료")
+        except Exception as e:
+            logger.error(f"압력 모델 학습 실패: {e}")
+            logger.error(traceback.format_exc())
+    else:
+        logger.info("기존 압력 모델 로드 완료")
+
+    # 압력 + pitch 결합 모델 로드 시도
+    if not fusion_classifier.load_model(FUSION_MODEL_PATH):
+        logger.info("기존 결합 모델이 없습니다. 새로운 결합 모델을 학습합니다.")
+        try:
+            fusion_classifier.train_model()
+            fusion_classifier.save_model(FUSION_MODEL_PATH)
+            logger.info("결합 모델 학습 및 저장 완료")
+        except Exception as e:
+            logger.error(f"결합 모델 학습 실패: {e}")
+            logger.error(traceback.format_exc())
+    else:
+        logger.info("기존 결합 모델 로드 완료")
+
+    if inference_pool is not None:
+        inference_pool.start()
+    status_sampler.start()
+    timeline_store.start()
+
     yield
 
     # 종료 시
+    status_sampler.stop()
+    timeline_store.stop()
+    if inference_pool is not None:
+        inference_pool.close()
     logger.info("자세 분류 웹소켓 서버 종료")
 
 
@@ -69,6 +246,7 @@ app = FastAPI(title="자세 분류 웹소켓 서버", version="1.0.0", lifespan=
 
 # CORS 설정 추가 (프론트엔드 403 에러 해결)
 from fastapi.middleware.cors import CORSMiddleware
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # 모든 도메인 허용
@@ -81,38 +259,129 @@ app.add_middleware(
 class ConnectionManager:
     """웹소켓 연결 관리자"""
 
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, admission: Optional[AdmissionControl] = None):
+        """
+        Args:
+            admission: 동시 연결 수 제한 (기본값: 제한 없음)
+        """
+        # 연결 → 세션 (등록 전에는 None) - 세션이 등록된 연결의 응답에는 순번을 붙이고
+        # 확인될 때까지 보관. 연결 수가 많아도 해제가 O(1)이 되도록 dict 사용
+        self.active_connections: Dict[WebSocket, Optional[SessionState]] = {}
+        # 세션 ID → 그 세션을 쓰고 있는 연결 (한 세션은 한 연결만 사용)
+        self.sessions: Dict[str, WebSocket] = {}
+        self.admission = admission or AdmissionControl(0, 0)
+        # 하트비트로 정리한 연결 수 (사유별)
+        self.reaped: Dict[str, int] = {reason: 0 for reason in REAP_REASONS}
+
+    async def connect(self, websocket: WebSocket) -> bool:
+        """
+        새로운 웹소켓 연결 수락
 
-    async def connect(self, websocket: WebSocket):
-        """새로운 웹소켓 연결 수락"""
+        Returns:
+            수락 여부 - 동시 연결 수 상한이면 재시도 대기 시간을 알려 주고 닫은 뒤 False
+        """
         await websocket.accept()
-        self.active_connections.append(websocket)
         client_host = websocket.client.host if websocket.client else "unknown"
+        reason = self.admission.admit(client_host)
+        if reason is not None:
+            await self.reject(websocket, reason)
+            return False
+        self.active_connections[websocket] = None
+        metrics.connection_opened()
         logger.info(
             f"새로운 클라이언트 연결: {client_host} (총 {len(self.active_connections)}개 연결)"
         )
+        return True
+
+    async def reject(self, websocket: WebSocket, reason: str):
+        """세션을 만들기 전에 연결을 거부합니다 (닫기 코드 1013: 나중에 다시 시도)."""
+        retry_after = self.admission.retry_after()
+        metrics.connection_rejected(reason)
+        logger.warning(
+            f"연결 거부 ({reason}): {websocket.client.host if websocket.client else 'unknown'} "
+            f"(현재 {self.admission.active}개 연결, {retry_after}초 후 재시도 권장)"
+        )
+        message = {
+            "type": "rejected",
+            "reason": reason,
+            "retry_after_s": retry_after,
+            "timestamp": datetime.now().isoformat(),
+        }
+        try:
+            await websocket.send_text(json.dumps(message))
+            await websocket.close(code=CLOSE_TRY_AGAIN_LATER, reason=reason)
+        except Exception as e:
+            logger.error(f"연결 거부 응답 전송 실패: {e}")
+
+    def claim_session(self, session_id: str, websocket: WebSocket) -> bool:
+        """
+        세션을 연결에 묶습니다.
+
+        Returns:
+            다른 살아 있는 연결이 이미 쓰고 있으면 False (거부 사유 session_in_use)
+        """
+        owner = self.sessions.get(session_id)
+        if owner is not None and owner is not websocket:
+            self.admission.rejected["session_in_use"] += 1
+            return False
+        self.sessions[session_id] = websocket
+        return True
+
+    def release_session(self, session_id: str, websocket: WebSocket):
+        """연결이 끝나 세션을 놓습니다."""
+        if self.sessions.get(session_id) is websocket:
+            del self.sessions[session_id]
+
+    async def reap(self, websocket: WebSocket, reason: str):
+        """하트비트로 끊긴 것으로 판단한 연결을 닫습니다."""
+        self.reaped[reason] += 1
+        metrics.connection_reaped(reason)
+        client_host = websocket.client.host if websocket.client else "unknown"
+        logger.info(f"연결 정리 ({reason}): {client_host}")
+        try:
+            await websocket.close(code=CLOSE_GOING_AWAY, reason=reason)
+        except Exception as e:
+            logger.debug(f"정리한 연결 닫기 실패: {e}")
 
     def disconnect(self, websocket: WebSocket):
         """웹소켓 연결 해제"""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
         client_host = websocket.client.host if websocket.client else "unknown"
+        if websocket in self.active_connections:
+            del self.active_connections[websocket]
+            self.admission.release(client_host)
+            metrics.connection_closed()
         logger.info(
             f"클라이언트 연결 해제: {client_host} (남은 연결: {len(self.active_connections)}개)"
         )
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """특정 클라이언트에게 메시지 전송"""
+        session = self.active_connections.get(websocket)
+        seq = session.stamp(message) if session is not None else None
+        start = time.perf_counter()
+        text = json.dumps(message, ensure_ascii=False)
+        metrics.observe("serialize", start)
+        if seq is not None:
+            session.retain(seq, text)
+        await self.send_text(text, websocket)
+
+    async def send_text(self, text: str, websocket: WebSocket):
+        """직렬화된 메시지 전송 (재연결 시 미확인 응답 재전송에도 사용)"""
+        if getattr(websocket, "client_state", None) == WebSocketState.DISCONNECTED:
+            # 클라이언트가 끊은 뒤 남은 메시지의 응답 - 미확인 응답으로만 보관
+            return
         try:
-            await websocket.send_text(json.dumps(message, ensure_ascii=False))
+            start = time.perf_counter()
+            await websocket.send_text(text)
+            metrics.observe("send", start)
         except Exception as e:
+            metrics.error("send")
             logger.error(f"메시지 전송 실패: {e}")
 
     async def broadcast(self, message: dict):
         """모든 연결된 클라이언트에게 메시지 브로드캐스트"""
         disconnected = []
-        for connection in self.active_connections:
+        for connection in list(self.active_connections):
             try:
                 await connection.send_text(json.dumps(message, ensure_ascii=False))
             except Exception as e:
@@ -125,8 +394,127 @@ class ConnectionManager:
 
 
 # 전역 객체들
-manager = ConnectionManager()
+if FLOOD_POLICY not in POLICIES:
+    logger.warning(f"지원하지 않는 FLOOD_POLICY={FLOOD_POLICY}, coalesce 사용")
+    FLOOD_POLICY = "coalesce"
+# 같은 클라이언트 IP의 연결들이 공유하는 메시지 버킷 (IP_MESSAGE_RATE_PER_S가 0이면 사용 안 함)
+ip_buckets = BucketRegistry(IP_MESSAGE_RATE_PER_S, IP_MESSAGE_BURST)
+manager = ConnectionManager(
+    AdmissionControl(MAX_CONNECTIONS, MAX_CONNECTIONS_PER_IP, CONNECTION_RETRY_AFTER_S)
+)
 classifier = PostureClassifier()
+pressure_classifier = PressureClassifier()
+fusion_classifier = PressureClassifier(imu_dir=os.path.join("자세모음", "IMU"))
+fusion_hub = FusionHub(tolerance_ms=FUSION_TOLERANCE_MS, mode=FUSION_MODE)
+session_store = create_session_store(SESSION_STORE, SESSION_TTL_S, REDIS_URL)
+timeline_store = TimelineStore(
+    TIMELINE_DB,
+    TIMELINE_MAX_GAP_MS,
+    TIMELINE_UTC_OFFSET_MIN,
+    POOR_POSTURES,
+    TIMELINE_FLUSH_INTERVAL_S,
+)
+atexit.register(timeline_store.close)
+
+# 후보 모델 섀도 평가 (SHADOW_MODEL_PATH 가 있거나 관리자 API로 시작했을 때만)
+shadow: Optional[ShadowEvaluator] = None
+if SHADOW_MODEL_PATH:
+    shadow = load_shadow_evaluator(SHADOW_MODEL_PATH, SHADOW_FRACTION)
+atexit.register(lambda: shadow is not None and shadow.stop())
+
+# 멀티프로세스 추론 (INFERENCE_WORKERS가 0이면 이벤트 루프에서 바로 예측)
+inference_pool: Optional[InferencePool] = None
+if INFERENCE_WORKERS > 0:
+    inference_pool = InferencePool(
+        INFERENCE_WORKERS,
+        MODEL_PATH,
+        classifier.predict_posture,
+        capacity=INFERENCE_RING_SIZE,
+        request_timeout_s=INFERENCE_TIMEOUT_S,
+    )
+    atexit.register(inference_pool.close)
+
+# 입력 분포·확신도 드리프트 감시 (기준 분포는 lifespan에서 모델과 함께 설정)
+drift_monitor = DriftMonitor(
+    half_life=DRIFT_HALF_LIFE,
+    check_every=DRIFT_CHECK_EVERY,
+    min_samples=DRIFT_MIN_SAMPLES,
+    threshold=DRIFT_THRESHOLD,
+    max_devices=DRIFT_MAX_DEVICES,
+)
+
+# 온디맨드 프로파일러 (관리자 API로 켤 때만 동작)
+profiler = ServerProfiler()
+
+online_updater = OnlineForestUpdater(
+    classifier,
+    batch_size=ONLINE_UPDATE_BATCH,
+    trees_per_update=ONLINE_UPDATE_TREES,
+    model_path=MODEL_PATH,
+)
+
+# 메트릭 (게이지는 스크레이프 시점에 값을 읽음)
+metrics = ServerMetrics(enabled=METRICS_ENABLED)
+metrics.gauge(
+    "posture_model_version", "자세 모델 버전", lambda: classifier.model_version
+)
+metrics.gauge(
+    "posture_log_queue_depth",
+    "기록 대기 중인 로그 수",
+    lambda: log_pipeline.queue_depth,
+)
+metrics.gauge(
+    "posture_log_dropped", "큐 포화로 버린 로그 수", lambda: log_pipeline.dropped
+)
+metrics.gauge(
+    "posture_pending_corrections",
+    "모델 갱신 대기 중인 교정 샘플 수",
+    lambda: online_updater.pending,
+)
+metrics.gauge(
+    "posture_fusion_devices", "결합 상태를 유지 중인 장치 수", lambda: len(fusion_hub)
+)
+metrics.gauge(
+    "posture_shadow_agreement",
+    "섀도 평가 후보 모델과 기존 모델의 예측 일치율 (평가 중이 아니면 NaN)",
+    lambda: (
+        shadow.agreement_rate
+        if shadow is not None and shadow.agreement_rate is not None
+        else float("nan")
+    ),
+)
+for signal in SIGNALS:
+    metrics.gauge(
+        f"posture_drift_psi_{signal}",
+        f"전체 {signal} 분포와 기준 분포의 PSI (계산 전이면 NaN)",
+        lambda signal=signal: drift_monitor.global_psi(signal),
+    )
+if metrics.enabled:
+    classifier.stage_observer = metrics.observe_duration
+
+
+def server_status_fields() -> Dict:
+    """시스템 상태에 덧붙일 서버 정보 (샘플러 스레드에서 호출)"""
+    return {
+        "active_connections": len(manager.active_connections),
+        "reaped_connections": dict(manager.reaped),
+        "rejected_connections": dict(manager.admission.rejected),
+        "model_loaded": classifier.model is not None,
+        "inference": inference_pool.status() if inference_pool is not None else None,
+    }
+
+
+# 시스템 상태 샘플러 (lifespan에서 시작, DATABASE_URL이 있으면 system_status 테이블에 기록)
+status_sampler = SystemStatusSampler(
+    interval_s=STATUS_SAMPLE_INTERVAL_S,
+    history=STATUS_HISTORY,
+    persist_every=STATUS_PERSIST_EVERY,
+    batch_size=STATUS_PERSIST_BATCH,
+    writer=create_status_writer(DATABASE_URL),
+    extra=server_status_fields,
+    error_count=lambda: metrics.error_total,
+)
+atexit.register(status_sampler.stop)
 
 
 @app.get("/")
@@ -252,6 +640,12 @@ async def get():
                 try {
                     const data = JSON.parse(event.data);
                     let message = '';
+
+                    // 서버 하트비트 - 응답하지 않으면 연결이 정리됨
+                    if (data.type === 'ping') {
+                        ws.send(JSON.stringify({type: 'pong'}));
+                        return;
+                    }
                     
                     if (data.error) {
                         message = `❌ 오류: ${data.error}`;
@@ -332,132 +726,1188 @@ async def get():
 
 @app.get("/health")
 async def health_check():
-    """헬스 체크 엔드포인트"""
+    """헬스 체크 엔드포인트 - 상태 샘플러가 미리 직렬화해 둔 최근 상태를 그대로 반환"""
+    return Response(content=status_sampler.health_body(), media_type="application/json")
+
+
+@app.get("/health/history")
+async def health_history(limit: int = 60):
+    """최근 시스템 상태 이력 (오래된 것부터)"""
+    history = list(status_sampler.history)
+    return history[-limit:] if limit > 0 else []
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus 메트릭 엔드포인트"""
+    if metrics.unavailable:
+        # 빈 본문 대신 스크레이프 실패로 드러나도록
+        return Response(
+            content="prometheus-client가 설치되지 않아 메트릭이 없습니다.\n",
+            status_code=503,
+            media_type="text/plain; charset=utf-8",
+        )
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    관리자 API 인증 - X-Admin-Token 헤더가 ADMIN_TOKEN과 일치해야 함
+
+    ADMIN_TOKEN이 없으면 관리자 API를 모두 거부합니다 (모델 파일을 불러오는 API가 있으므로).
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=403, detail="관리자 API가 꺼져 있습니다 (ADMIN_TOKEN 미설정)."
+        )
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="관리자 토큰이 올바르지 않습니다.")
+
+
+def resolve_model_path(model_path: str) -> Optional[str]:
+    """관리자 API가 받은 모델 경로를 MODELS_DIR 안의 .pkl 파일일 때만 절대 경로로 바꿉니다."""
+    root = os.path.realpath(MODELS_DIR)
+    path = os.path.realpath(os.path.join(root, model_path))
+    if os.path.commonpath([root, path]) != root or not path.endswith(".pkl"):
+        return None
+    return path
+
+
+@app.get("/admin/shadow", dependencies=[Depends(require_admin)])
+async def shadow_report():
+    """섀도 평가 결과 - 일치율, 혼동 행렬, 후보 모델 지연 분포"""
+    if shadow is None:
+        return {"running": False}
+    return shadow.report()
+
+
+@app.get("/admin/drift", dependencies=[Depends(require_admin)])
+async def drift_report(limit: int = 20):
+    """드리프트 감시 현황 - 전체 PSI와 PSI가 큰 기기 순 목록"""
+    return drift_monitor.report(limit)
+
+
+@app.post("/admin/shadow", dependencies=[Depends(require_admin)])
+async def shadow_start(
+    model_path: str = Body(..., embed=True),
+    fraction: float = Body(SHADOW_FRACTION, embed=True),
+):
+    """후보 모델로 섀도 평가를 (다시) 시작합니다 - 예) {"model_path": "candidate.pkl", "fraction": 0.1}"""
+    global shadow
+    if not 0 < fraction <= 1:
+        raise HTTPException(
+            status_code=400, detail="fraction은 0보다 크고 1 이하여야 합니다."
+        )
+    # 모델 파일은 임의 코드를 실행할 수 있는 pickle이므로 MODELS_DIR 안에서만
+    path = resolve_model_path(model_path)
+    if path is None:
+        raise HTTPException(
+            status_code=400,
+            detail="model_path는 MODELS_DIR 안의 .pkl 파일이어야 합니다.",
+        )
+    # 모델 파일 읽기는 이벤트 루프 밖에서
+    evaluator = await asyncio.get_running_loop().run_in_executor(
+        None, load_shadow_evaluator, path, fraction
+    )
+    if evaluator is None:
+        raise HTTPException(
+            status_code=400, detail=f"모델을 불러오지 못했습니다: {model_path}"
+        )
+    previous, shadow = shadow, evaluator
+    if previous is not None:
+        # 작업 스레드 join(최대 수 초)은 이벤트 루프 밖에서
+        await asyncio.get_running_loop().run_in_executor(None, previous.stop)
+    return evaluator.report()
+
+
+@app.delete("/admin/shadow", dependencies=[Depends(require_admin)])
+async def shadow_stop():
+    """섀도 평가를 중지하고 최종 결과를 반환합니다."""
+    global shadow
+    if shadow is None:
+        return {"running": False}
+    evaluator, shadow = shadow, None
+    await asyncio.get_running_loop().run_in_executor(None, evaluator.stop)
+    return evaluator.report()
+
+
+@app.post("/admin/profile", dependencies=[Depends(require_admin)])
+async def profile_start(
+    mode: str = Body("cpu", embed=True),
+    messages: Optional[int] = Body(None, embed=True),
+    seconds: float = Body(30.0, embed=True),
+    interval_ms: float = Body(5.0, embed=True),
+    top: int = Body(50, embed=True),
+):
+    """
+    다음 messages개 메시지 또는 seconds초 동안 프로파일링합니다 (먼저 도달하는 쪽에서 종료).
+
+    예) {"mode": "cpu", "messages": 1000, "seconds": 60}
+        mode: cpu (cProfile) | sample (스택 표본 추출) | memory (tracemalloc 차이)
+    """
+    try:
+        session = ProfileSession(mode, messages, seconds, interval_ms, top)
+        profiler.start(session)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    # 메시지가 들어오지 않아도 시간이 지나면 종료
+    asyncio.get_running_loop().call_later(seconds, profiler.stop, session)
+    return session.status()
+
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def profile_status():
+    """실행 중이거나 마지막으로 끝난 프로파일링 상태"""
+    session = profiler.active or profiler.last
+    return session.status() if session is not None else {"running": False}
+
+
+@app.delete("/admin/profile", dependencies=[Depends(require_admin)])
+async def profile_stop():
+    """실행 중인 프로파일링을 바로 끝냅니다."""
+    session = profiler.stop()
+    return session.status() if session is not None else {"running": False}
+
+
+@app.get("/admin/profile/result", dependencies=[Depends(require_admin)])
+async def profile_result(format: Optional[str] = None):
+    """
+    마지막 프로파일링 결과 파일 - text (누적 시간 순 요약), pstats (cpu), collapsed (sample)
+    """
+    session = profiler.last
+    if session is None:
+        raise HTTPException(
+            status_code=404, detail="완료된 프로파일링 결과가 없습니다."
+        )
+    format = format or FORMATS[session.mode][0]
+    if format not in session.results:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{session.mode} 모드의 결과 형식: {', '.join(FORMATS[session.mode])}",
+        )
+    extension = {"text": "txt", "pstats": "prof", "collapsed": "folded"}[format]
+    media_type = "application/octet-stream" if format == "pstats" else "text/plain"
+    return Response(
+        content=session.results[format],
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{session.mode}.{extension}"'
+        },
+    )
+
+
+def timeline_range(start: Optional[str], end: Optional[str], days: int = 7):
+    """조회 기간 파라미터(YYYY-MM-DD) 해석 - 기본값은 오늘까지 최근 days일"""
+    try:
+        end_day = date.fromisoformat(end) if end else None
+        start_day = date.fromisoformat(start) if start else None
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="날짜는 YYYY-MM-DD 형식이어야 합니다."
+        )
+    if end_day is None:
+        end_day = datetime.now(timeline_store.tz).date()
+    if start_day is None:
+        start_day = end_day - timedelta(days=days - 1)
+    if start_day > end_day:
+        raise HTTPException(status_code=400, detail="start가 end보다 늦습니다.")
+    return start_day, end_day
+
+
+# 타임라인 조회는 기기별 자세 이력이므로 관리자 토큰 필요. SQLite 조회가 이벤트 루프를
+# 막지 않도록 일반 함수로 두어 FastAPI 스레드 풀에서 실행 (TimelineStore는 잠금으로 보호)
+@app.get("/timeline/{device_id}/daily", dependencies=[Depends(require_admin)])
+def timeline_daily(
+    device_id: str, start: Optional[str] = None, end: Optional[str] = None
+):
+    """날짜별 자세 유지 시간(초) - 예) /timeline/abc/daily?start=2025-08-20&end=2025-08-27"""
+    start_day, end_day = timeline_range(start, end)
     return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "active_connections": len(manager.active_connections),
-        "model_loaded": classifier.model is not None,
+        "device_id": device_id,
+        "days": timeline_store.daily_totals(device_id, start_day, end_day),
     }
 
 
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """웹소켓 엔드포인트"""
-    await manager.connect(websocket)
+@app.get("/timeline/{device_id}/longest_poor", dependencies=[Depends(require_admin)])
+def timeline_longest_poor(
+    device_id: str, start: Optional[str] = None, end: Optional[str] = None
+):
+    """기간 중 가장 길게 이어진 나쁜 자세 구간 (POOR_POSTURES 기준)"""
+    start_day, end_day = timeline_range(start, end)
+    start_ms = timeline_store.day_start_ms(start_day)
+    end_ms = timeline_store.day_start_ms(end_day + timedelta(days=1))
+    return {
+        "device_id": device_id,
+        "poor_postures": sorted(timeline_store.poor_postures),
+        "stretch": timeline_store.longest_poor_stretch(device_id, start_ms, end_ms),
+    }
 
-    try:
-        # 연결 환영 메시지
-        welcome_message = {
-            "type": "welcome",
-            "message": "자세 분류 웹소켓 서버에 연결되었습니다.",
+
+@app.get("/timeline/{device_id}/intervals", dependencies=[Depends(require_admin)])
+def timeline_intervals(
+    device_id: str, start: Optional[str] = None, end: Optional[str] = None
+):
+    """기간 중 자세 구간 목록"""
+    start_day, end_day = timeline_range(start, end, days=1)
+    start_ms = timeline_store.day_start_ms(start_day)
+    end_ms = timeline_store.day_start_ms(end_day + timedelta(days=1))
+    return {
+        "device_id": device_id,
+        "intervals": [
+            i.to_dict() for i in timeline_store.intervals(device_id, start_ms, end_ms)
+        ],
+    }
+
+
+async def handle_pressure_message(request_data: dict, websocket: WebSocket):
+    """
+    압력 프레임 메시지 처리
+
+    단일: {"type": "pressure", "timestamp": 15420, "pressure": [pv1, ..., pv8]}
+    배치: {"type": "pressure", "timestamp": 15420, "frames": [[pv1, ..., pv8], ...]}
+
+    배치는 MAX_PRESSURE_FRAMES개까지 받고, PRESSURE_EXECUTOR_FRAMES개를 넘으면
+    KNN 추론을 스레드 풀에서 실행해 다른 연결의 처리를 막지 않습니다.
+    """
+    if "frames" in request_data:
+        frames = request_data["frames"]
+        batched = True
+    elif "pressure" in request_data:
+        frames = [request_data["pressure"]]
+        batched = False
+    else:
+        error_response = {
+            "type": "error",
+            "error": "pressure 또는 frames 필드가 필요합니다.",
             "timestamp": datetime.now().isoformat(),
-            "instructions": '다음 형식으로 데이터를 전송해주세요: {"timestamp": 15420, "relativePitch": -25.73}',
         }
-        await manager.send_personal_message(welcome_message, websocket)
+        await manager.send_personal_message(error_response, websocket)
+        return
+
+    if isinstance(frames, list) and len(frames) > MAX_PRESSURE_FRAMES:
+        metrics.error("validation")
+        error_response = {
+            "type": "error",
+            "error": f"한 번에 보낼 수 있는 압력 프레임은 {MAX_PRESSURE_FRAMES}개 이하입니다.",
+            "timestamp": datetime.now().isoformat(),
+        }
+        await manager.send_personal_message(error_response, websocket)
+        return
+
+    if (
+        not isinstance(frames, list)
+        or not frames
+        or not all(
+            isinstance(frame, list)
+            and all(
+                isinstance(v, (int, float)) and not isinstance(v, bool) for v in frame
+            )
+            for frame in frames
+        )
+    ):
+        error_response = {
+            "type": "error",
+            "error": "압력 값은 숫자 배열이어야 합니다.",
+            "timestamp": datetime.now().isoformat(),
+        }
+        await manager.send_personal_message(error_response, websocket)
+        return
+
+    if pressure_classifier.model is None:
+        error_response = {
+            "type": "error",
+            "error": "압력 모델이 로드되지 않았습니다. 서버를 다시 시작해주세요.",
+            "timestamp": datetime.now().isoformat(),
+        }
+        await manager.send_personal_message(error_response, websocket)
+        return
+
+    if len(frames) > PRESSURE_EXECUTOR_FRAMES:
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, pressure_classifier.predict_frames, frames
+        )
+    else:
+        results = pressure_classifier.predict_frames(frames)
+    if "error" in results[0]:
+        error_response = {
+            "type": "error",
+            "error": results[0]["error"],
+            "timestamp": datetime.now().isoformat(),
+        }
+        await manager.send_personal_message(error_response, websocket)
+        return
+
+    response = {
+        "type": "pressure_prediction",
+        "input_timestamp": request_data.get("timestamp"),
+        "server_timestamp": datetime.now().isoformat(),
+    }
+    if batched:
+        response["predictions"] = results
+    else:
+        response.update(results[0])
+    await manager.send_personal_message(response, websocket)
+
+
+async def handle_fusion_message(
+    request_data: dict, websocket: WebSocket, state: SessionState
+):
+    """
+    IMU·압력 결합 스트림 메시지 처리 - 장치별로 타임스탬프 정렬 후 결합된 프레임을
+    압력 + pitch 결합 모델로 분류 (결합 모델이 없으면 압력 모델로 압력만 분류)
+
+    IMU:  {"type": "fusion", "stream": "imu", "device_id": "d1", "timestamp": 15420, "relativePitch": -25.73}
+    압력: {"type": "fusion", "stream": "pressure", "device_id": "d1", "timestamp": 15400, "pressure": [...]}
+
+    결합 버퍼는 세션 ID와 device_id로 구분하므로 다른 연결의 장치 버퍼에는 섞이지 않습니다
+    (device_id는 한 연결이 여러 장치를 중계할 때 구분용, 없으면 연결의 device_id).
+    """
+    stream = request_data.get("stream")
+    timestamp = request_data.get("timestamp")
+    device_id = str(request_data.get("device_id") or state.device_id)
+    key = f"{state.session_id}:{device_id}"
+
+    error = None
+    if stream not in ("imu", "pressure"):
+        error = "stream은 imu 또는 pressure여야 합니다."
+    elif not isinstance(timestamp, (int, float)):
+        error = "timestamp는 숫자여야 합니다."
+    elif stream == "imu" and not isinstance(
+        request_data.get("relativePitch"), (int, float)
+    ):
+        error = "relativePitch는 숫자여야 합니다."
+    elif stream == "pressure" and not (
+        isinstance(request_data.get("pressure"), list)
+        and all(isinstance(v, (int, float)) for v in request_data["pressure"])
+    ):
+        error = "압력 값은 숫자 배열이어야 합니다."
+    elif (
+        key not in state.fusion_devices
+        and len(state.fusion_devices) >= FUSION_MAX_DEVICES_PER_CONNECTION
+    ):
+        error = (
+            f"한 연결의 결합 장치는 {FUSION_MAX_DEVICES_PER_CONNECTION}개까지입니다."
+        )
+
+    if error is not None:
+        error_response = {
+            "type": "error",
+            "error": error,
+            "timestamp": datetime.now().isoformat(),
+        }
+        await manager.send_personal_message(error_response, websocket)
+        return
+
+    state.fusion_devices.add(key)
+    if stream == "imu":
+        fused = fusion_hub.push_imu(
+            key, int(timestamp), float(request_data["relativePitch"])
+        )
+    else:
+        fused = fusion_hub.push_pressure(key, int(timestamp), request_data["pressure"])
+
+    if not fused:
+        return
+    if fusion_classifier.model is not None:
+        results = fusion_classifier.predict_frames(
+            [[*frame.pressure, frame.pitch] for frame in fused]
+        )
+    elif pressure_classifier.model is not None:
+        results = pressure_classifier.predict_frames(
+            [frame.pressure for frame in fused]
+        )
+    else:
+        return
+
+    if "error" in results[0]:
+        error_response = {
+            "type": "error",
+            "error": results[0]["error"],
+            "timestamp": datetime.now().isoformat(),
+        }
+        await manager.send_personal_message(error_response, websocket)
+        return
+
+    response = {
+        "type": "fused_prediction",
+        "device_id": device_id,
+        "predictions": [
+            {
+                **result,
+                "input_timestamp": frame.timestamp,
+                "input_relative_pitch": frame.pitch,
+            }
+            for frame, result in zip(fused, results)
+        ],
+        "server_timestamp": datetime.now().isoformat(),
+    }
+    await manager.send_personal_message(response, websocket)
+
+
+async def handle_correction_message(
+    request_data: dict, websocket: WebSocket, last_sample: Optional[tuple]
+):
+    """
+    라벨 교정 메시지 처리 - 교정 샘플을 모으고 충분히 모이면 백그라운드에서 모델 갱신
+
+    형식: {"type": "correction", "posture": 3, "timestamp": 15420, "relativePitch": -25.73}
+    timestamp/relativePitch가 없으면 이 연결에서 마지막으로 받은 샘플을 사용합니다.
+    """
+    posture = request_data.get("posture")
+    if "relativePitch" in request_data:
+        sample = (request_data.get("timestamp", 0), request_data["relativePitch"])
+    else:
+        sample = last_sample
+
+    if not isinstance(posture, int) or sample is None:
+        error_response = {
+            "type": "error",
+            "error": "교정 메시지에는 정수 posture와 교정할 샘플(relativePitch)이 필요합니다.",
+            "timestamp": datetime.now().isoformat(),
+        }
+        await manager.send_personal_message(error_response, websocket)
+        return
+
+    accepted = online_updater.add_correction(int(sample[0]), float(sample[1]), posture)
+    if online_updater.ready():
+        # 예측 경로를 막지 않도록 스레드 풀에서 트리 추가
+        update = asyncio.get_running_loop().run_in_executor(None, online_updater.update)
+        if inference_pool is not None:
+            update.add_done_callback(reload_inference_workers)
+
+    response = {
+        "type": "correction_ack",
+        "accepted": accepted,
+        "pending": online_updater.pending,
+        "model_version": classifier.model_version,
+        "server_timestamp": datetime.now().isoformat(),
+    }
+    await manager.send_personal_message(response, websocket)
+
+
+def reload_inference_workers(update: asyncio.Future) -> None:
+    """점진적 갱신으로 모델 파일이 바뀌면 추론 워커들도 다시 로드하게 합니다."""
+    if not update.cancelled() and update.exception() is None and update.result():
+        inference_pool.reload()
+
+
+def report_drift(event: Dict) -> None:
+    """드리프트 알림을 메트릭과 로그로 남깁니다."""
+    metrics.drift_event(event["type"], event["signal"], event["scope"])
+    target = event["device_id"] if event["scope"] == "device" else "전체"
+    if event["type"] == "drift":
+        logger.warning(
+            "드리프트 감지 (%s, %s): PSI %.3f", target, event["signal"], event["psi"]
+        )
+    else:
+        logger.info(
+            "드리프트 해제 (%s, %s): PSI %.3f", target, event["signal"], event["psi"]
+        )
+
+
+def create_notifier(options: Dict) -> ChangeNotifier:
+    """
+    연결 쿼리 파라미터 또는 config 메시지로 응답 결정기를 만듭니다.
+
+    예) /ws?mode=on_change&heartbeat=30&window=5&min_confidence=0.6&method=majority
+
+    window와 heartbeat가 범위를 벗어나면 (MAX_WINDOW, MAX_HEARTBEAT_S) ValueError를 냅니다.
+    """
+    smoother = PostureSmoother(
+        window=int(options.get("window", SMOOTHING_WINDOW)),
+        min_confidence=float(options.get("min_confidence", SMOOTHING_MIN_CONFIDENCE)),
+        method=options.get("method", "majority"),
+    )
+    return ChangeNotifier(
+        smoother,
+        mode=options.get("mode", RESPONSE_MODE),
+        heartbeat_interval=float(options.get("heartbeat", HEARTBEAT_INTERVAL_S)),
+    )
+
+
+def create_encoder(options: Dict) -> ResponseEncoder:
+    """
+    연결 쿼리 파라미터로 응답 생성기를 만듭니다.
+
+    예) /ws?profile=delta&epsilon=0.05
+    """
+    try:
+        return ResponseEncoder(
+            options.get("profile", RESPONSE_PROFILE),
+            float(options.get("epsilon", RESPONSE_DELTA_EPSILON)),
+        )
+    except ValueError as e:
+        logger.warning(f"잘못된 응답 프로필 파라미터, 기본값 사용: {e}")
+        return ResponseEncoder(RESPONSE_PROFILE, RESPONSE_DELTA_EPSILON)
+
+
+def create_rate_controller(options: Dict) -> Optional[RateController]:
+    """
+    연결별 샘플링 주기 결정기를 만듭니다 (쿼리 파라미터 rate_control=on|off 로 기본값 변경).
+
+    기기는 재연결하면 기본 주기로 돌아가므로 세션에 저장하지 않고 연결마다 새로 만듭니다.
+    """
+    enabled = options.get("rate_control")
+    if enabled is None:
+        enabled = RATE_CONTROL_ENABLED
+    else:
+        enabled = enabled.lower() in ("on", "true", "1")
+    if not enabled:
+        return None
+    return RateController(RATE_CONTROL_RATES_HZ)
+
+
+def create_limiter(client_host: str) -> Optional[ConnectionLimiter]:
+    """
+    연결별 메시지 속도 제한기를 만듭니다 (MESSAGE_RATE_PER_S가 0이면 제한 없음).
+
+    IP 버킷을 얻었으면 연결이 끝날 때 release_limiter로 돌려줘야 합니다.
+    """
+    if MESSAGE_RATE_PER_S <= 0:
+        return None
+    ip_bucket = None
+    if IP_MESSAGE_RATE_PER_S > 0:
+        ip_bucket = ip_buckets.acquire(client_host)
+    return ConnectionLimiter(
+        TokenBucket(MESSAGE_RATE_PER_S, MESSAGE_BURST), ip_bucket, FLOOD_POLICY
+    )
+
+
+def release_limiter(client_host: str, limiter: Optional[ConnectionLimiter]) -> None:
+    if limiter is not None and limiter.ip_bucket is not None:
+        ip_buckets.release(client_host)
+    if limiter is not None and limiter.limited:
+        logger.info(
+            f"속도 제한: {client_host} 초과 {limiter.limited}개, 버림 {limiter.dropped}개"
+        )
 
+
+def build_filtered_response(
+    action: str, notifier: ChangeNotifier, prediction_result: Dict
+) -> Dict:
+    """on_change 모드의 자세 변경/하트비트 응답 (평활화된 자세 기준)"""
+    smoother = notifier.smoother
+    response = {
+        "type": action,
+        "predicted_posture": smoother.posture,
+        "confidence": smoother.confidence,
+        "input_timestamp": prediction_result["timestamp"],
+        "suppressed": notifier.sent(),
+        "server_timestamp": datetime.now().isoformat(),
+    }
+    if action == "posture_change":
+        response["previous_posture"] = notifier.previous_posture
+    return response
+
+
+def is_sample_message(request_data) -> bool:
+    """추론할 수 있는 {timestamp, relativePitch} 샘플 메시지인지 여부"""
+    return (
+        isinstance(request_data, dict)
+        and "type" not in request_data
+        and isinstance(request_data.get("timestamp"), (int, float))
+        and isinstance(request_data.get("relativePitch"), (int, float))
+    )
+
+
+def is_stale(request_data: dict, latest_timestamp: float) -> bool:
+    """대기 중인 최신 샘플보다 SAMPLE_AGE_BUDGET_MS 넘게 오래된 샘플인지 여부"""
+    return latest_timestamp - request_data["timestamp"] > SAMPLE_AGE_BUDGET_MS
+
+
+def skip_sample(request_data: dict, stale: bool, state: SessionState):
+    """
+    추론하지 않는 샘플을 처리합니다.
+
+    오래된(stale) 샘플은 폐기로, 더 새로운 샘플이 대기 중이라 건너뛴 샘플은 최신
+    샘플에 병합(coalesced)된 것으로 셉니다. 교정 메시지가 참조할 수 있도록 마지막
+    샘플은 갱신합니다.
+    """
+    state.last_sample = (request_data["timestamp"], request_data["relativePitch"])
+    if stale:
+        state.dropped += 1
+        metrics.sample_skipped("stale")
+    else:
+        state.coalesced += 1
+        metrics.sample_skipped("coalesced")
+
+
+async def receive_loop(
+    websocket: WebSocket, inbox: asyncio.Queue, heartbeat: Optional[Heartbeat] = None
+):
+    """
+    소켓에서 메시지를 읽어 도착 시각과 함께 연결별 대기열에 넣습니다.
+
+    처리가 밀리면 대기열에 쌓이고, 대기열이 차면 빈자리가 날 때까지 읽기를 멈춥니다.
+    """
+    try:
         while True:
-            # 클라이언트로부터 데이터 수신
             data = await websocket.receive_text()
+            if heartbeat is not None:
+                heartbeat.frame()
+            await inbox.put((time.perf_counter(), data))
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"웹소켓 수신 중 오류: {e}")
+    # 연결 종료 표시 (취소되었으면 처리 루프가 이미 끝났으므로 넣지 않음)
+    await inbox.put(None)
 
-            try:
-                # JSON 파싱
-                request_data = json.loads(data)
-                logger.info(f"수신된 데이터: {request_data}")
-
-                # 데이터 검증
-                if (
-                    "timestamp" not in request_data
-                    or "relativePitch" not in request_data
-                ):
-                    error_response = {
-                        "type": "error",
-                        "error": "필수 필드가 누락되었습니다. timestamp와 relativePitch가 필요합니다.",
-                        "timestamp": datetime.now().isoformat(),
-                    }
-                    await manager.send_personal_message(error_response, websocket)
-                    continue
-
-                timestamp = request_data["timestamp"]
-                relative_pitch = request_data["relativePitch"]
-
-                # 데이터 타입 검증
-                if not isinstance(timestamp, (int, float)) or not isinstance(
-                    relative_pitch, (int, float)
-                ):
-                    error_response = {
-                        "type": "error",
-                        "error": "timestamp와 relativePitch는 숫자여야 합니다.",
-                        "timestamp": datetime.now().isoformat(),
-                    }
-                    await manager.send_personal_message(error_response, websocket)
-                    continue
-
-                # 자세 예측
-                if classifier.model is None:
-                    error_response = {
-                        "type": "error",
-                        "error": "모델이 로드되지 않았습니다. 서버를 다시 시작해주세요.",
-                        "timestamp": datetime.now().isoformat(),
-                    }
-                    await manager.send_personal_message(error_response, websocket)
-                    continue
 
-                # 예측 수행
-                prediction_result = classifier.predict_posture(
-                    int(timestamp), float(relative_pitch)
-                )
+def wake_inbox(inbox: asyncio.Queue, marker=None) -> None:
+    """
+    처리 루프를 깨우는 표시를 넣습니다.
 
-                if "error" in prediction_result:
-                    error_response = {
-                        "type": "error",
-                        "error": prediction_result["error"],
-                        "timestamp": datetime.now().isoformat(),
-                    }
-                    await manager.send_personal_message(error_response, websocket)
-                else:
-                    # 성공적인 예측 결과 전송
-                    response = {
-                        "type": "prediction",
-                        "predicted_posture": prediction_result["predicted_posture"],
-                        "confidence": prediction_result["confidence"],
-                        "all_probabilities": prediction_result["all_probabilities"],
-                        "input_timestamp": prediction_result["timestamp"],
-                        "input_relative_pitch": prediction_result["relative_pitch"],
-                        "server_timestamp": datetime.now().isoformat(),
-                    }
-                    await manager.send_personal_message(response, websocket)
+    대기열이 차 있으면 처리 루프가 어차피 곧 깨어나므로 넣지 않습니다
+    (연결 종료 사유는 heartbeat.expired 로 따로 확인).
+    """
+    try:
+        inbox.put_nowait(marker)
+    except asyncio.QueueFull:
+        pass
+
+
+# 실행 중인 ping 전송 태스크 (완료 전에 가비지 컬렉션되지 않도록 참조 유지)
+ping_tasks = set()
+
+
+def check_heartbeat(websocket: WebSocket, heartbeat: Heartbeat, inbox: asyncio.Queue):
+    """
+    이벤트 루프 타이머 콜백 - 조용한 연결에 ping을 보내고, 타임아웃이면 처리 루프를 끝냅니다.
+
+    연결마다 태스크를 두지 않고 타이머 하나만 다시 예약하므로 요청 경로 비용은
+    수신 시각 기록뿐입니다.
+    """
+    action = heartbeat.poll()
+    if action == "ping":
+        ping = {"type": "ping", "server_timestamp": datetime.now().isoformat()}
+        task = asyncio.ensure_future(manager.send_text(json.dumps(ping), websocket))
+        ping_tasks.add(task)
+        task.add_done_callback(ping_tasks.discard)
+    elif action is not None:
+        # heartbeat.expired 에 정리 사유가 남음
+        wake_inbox(inbox)
+        return
+    heartbeat.timer = asyncio.get_running_loop().call_later(
+        heartbeat.check_interval_s, check_heartbeat, websocket, heartbeat, inbox
+    )
+
+
+# 속도 제한으로 보류한 메시지를 처리할 차례라는 대기열 표시 (메시지 없이 처리 루프를 깨움)
+RELEASE_HELD = object()
+
+
+def schedule_release(
+    limiter: Optional[ConnectionLimiter],
+    inbox: asyncio.Queue,
+    timer: Optional[asyncio.TimerHandle],
+) -> Optional[asyncio.TimerHandle]:
+    """
+    보류한 메시지가 있으면 토큰이 생길 때 처리 루프를 깨우는 타이머를 다시 예약합니다.
+
+    이 타이머가 없으면 폭주의 마지막 샘플은 다음 프레임이 올 때까지 처리되지 않습니다.
+    """
+    if timer is not None:
+        timer.cancel()
+    if limiter is None or not limiter.backlog:
+        return None
+    return asyncio.get_running_loop().call_later(
+        limiter.wait_s(), wake_inbox, inbox, RELEASE_HELD
+    )
 
-                    logger.info(
-                        f"예측 완료 - 입력: {relative_pitch}도, 결과: {prediction_result['predicted_posture']}번 자세"
-                    )
 
-            except json.JSONDecodeError:
+async def process_batch(batch: List[str], websocket: WebSocket, state: SessionState):
+    """
+    대기열에 쌓인 메시지를 순서대로 처리합니다.
+
+    대기 중인 최신 샘플보다 SAMPLE_AGE_BUDGET_MS 넘게 오래된 샘플은 추론하지 않고
+    폐기하며 샘플링 주기 판단에도 쓰지 않습니다. COALESCE_SAMPLES면 예산 안의 샘플도
+    가장 최신 샘플 하나만 추론합니다. 다른 종류의 메시지는 모두 순서대로 처리합니다.
+    """
+    limiter = state.limiter
+    if limiter is not None:
+        # JSON 파싱 전에 토큰이 없는 메시지를 걸러 냄
+        dropped = limiter.dropped
+        batch = limiter.filter(batch)
+        if limiter.dropped != dropped:
+            metrics.sample_skipped("rate_limited", limiter.dropped - dropped)
+        notice = limiter.notice()
+        if notice is not None:
+            await manager.send_personal_message(notice, websocket)
+            logger.warning(
+                "메시지 속도 제한 (%s): %s개 초과",
+                notice["scope"],
+                notice["limited"],
+            )
+
+    parsed = []
+    heartbeat = state.heartbeat
+    for data in batch:
+        stage_start = time.perf_counter()
+        try:
+            request_data = json.loads(data)
+        except json.JSONDecodeError:
+            request_data = None
+        metrics.observe("parse", stage_start)
+        if heartbeat is not None and not (
+            isinstance(request_data, dict)
+            and request_data.get("type") in HEARTBEAT_TYPES
+        ):
+            heartbeat.activity()
+        if isinstance(request_data, list):
+            # 게이트웨이(serial_gateway.py)가 여러 샘플을 묶어 보낸 프레임
+            if len(request_data) > MAX_FRAME_SAMPLES:
+                metrics.error("validation")
                 error_response = {
                     "type": "error",
-                    "error": "잘못된 JSON 형식입니다.",
+                    "error": f"한 프레임의 샘플은 {MAX_FRAME_SAMPLES}개 이하여야 합니다.",
                     "timestamp": datetime.now().isoformat(),
                 }
                 await manager.send_personal_message(error_response, websocket)
-                logger.warning(f"잘못된 JSON 데이터 수신: {data}")
+                continue
+            items = request_data
+        else:
+            items = (request_data,)
+        for item in items:
+            if isinstance(item, dict) and not state.accept_client_seq(item.get("seq")):
+                # 재연결 후 클라이언트가 다시 보낸, 이미 처리한 메시지
+                metrics.sample_skipped("duplicate")
+                continue
+            parsed.append((data, item))
 
-            except Exception as e:
+    samples = [i for i, (_, r) in enumerate(parsed) if is_sample_message(r)]
+    latest_timestamp = parsed[samples[-1]][1]["timestamp"] if samples else 0
+    stale = {i for i in samples if is_stale(parsed[i][1], latest_timestamp)}
+    skipped = set(samples[:-1]) if COALESCE_SAMPLES else set(stale)
+    sample_indices = set()
+    if state.rate_controller is not None:
+        # 건너뛴 샘플도 기기의 움직임 정보이므로 주기 판단에 사용 (오래된 샘플 제외)
+        sample_indices = set(samples) - stale
+    for i, (data, request_data) in enumerate(parsed):
+        if i in skipped:
+            skip_sample(request_data, i in stale, state)
+        else:
+            handle_start = time.perf_counter()
+            await handle_message(data, request_data, websocket, state)
+            status_sampler.record_latency(time.perf_counter() - handle_start)
+            if profiler.active is not None:
+                profiler.message_done()
+        if i in sample_indices:
+            advice = state.rate_controller.observe(
+                request_data["timestamp"], request_data["relativePitch"]
+            )
+            if advice is not None:
+                await manager.send_personal_message(advice, websocket)
+                logger.info(
+                    "샘플링 주기 권장: %sHz (%s)",
+                    advice["sample_rate_hz"],
+                    advice["level"],
+                )
+
+
+async def handle_message(
+    data: str, request_data, websocket: WebSocket, state: SessionState
+):
+    """메시지 하나를 처리합니다 (request_data가 None이면 JSON 파싱 실패)."""
+    stage_start = time.perf_counter()
+    try:
+        if request_data is None:
+            raise json.JSONDecodeError("invalid JSON", data, 0)
+
+        metrics.message(request_data.get("type", "prediction"))
+        if sample("receive"):
+            logger.info("수신된 데이터: %s", request_data)
+
+        # 압력 프레임 메시지
+        if request_data.get("type") == "pressure":
+            await handle_pressure_message(request_data, websocket)
+            return
+
+        # IMU·압력 결합 스트림 메시지
+        if request_data.get("type") == "fusion":
+            await handle_fusion_message(request_data, websocket, state)
+            return
+
+        # 라벨 교정 메시지
+        if request_data.get("type") == "correction":
+            await handle_correction_message(request_data, websocket, state.last_sample)
+            return
+
+        # 응답 수신 확인 메시지 (응답 없음)
+        if request_data.get("type") == "ack":
+            if isinstance(request_data.get("seq"), int):
+                state.ack(request_data["seq"])
+            return
+
+        # 하트비트 메시지 (수신 시각은 수신 루프에서 기록)
+        if request_data.get("type") == "pong":
+            return
+        if request_data.get("type") == "ping":
+            pong = {"type": "pong", "server_timestamp": datetime.now().isoformat()}
+            await manager.send_text(json.dumps(pong), websocket)
+            return
+
+        # 응답 모드 변경 메시지
+        if request_data.get("type") == "config":
+            try:
+                notifier = create_notifier(request_data)
+            except ValueError as e:
+                metrics.error("validation")
                 error_response = {
                     "type": "error",
-                    "error": f"처리 중 오류 발생: {str(e)}",
+                    "error": f"잘못된 설정 값입니다: {e}",
                     "timestamp": datetime.now().isoformat(),
                 }
                 await manager.send_personal_message(error_response, websocket)
-                logger.error(f"데이터 처리 중 오류: {e}")
-                logger.error(traceback.format_exc())
+                return
+            state.notifier = notifier
+            config_response = {
+                "type": "config_ack",
+                "mode": notifier.mode,
+                "heartbeat": notifier.heartbeat_interval,
+                "window": notifier.smoother.window,
+                "min_confidence": notifier.smoother.min_confidence,
+                "method": notifier.smoother.method,
+                "timestamp": datetime.now().isoformat(),
+            }
+            await manager.send_personal_message(config_response, websocket)
+            return
+
+        # 데이터 검증
+        if "timestamp" not in request_data or "relativePitch" not in request_data:
+            metrics.error("validation")
+            error_response = {
+                "type": "error",
+                "error": "필수 필드가 누락되었습니다. timestamp와 relativePitch가 필요합니다.",
+                "timestamp": datetime.now().isoformat(),
+            }
+            await manager.send_personal_message(error_response, websocket)
+            return
+
+        timestamp = request_data["timestamp"]
+        relative_pitch = request_data["relativePitch"]
+
+        # 데이터 타입 검증
+        if not isinstance(timestamp, (int, float)) or not isinstance(
+            relative_pitch, (int, float)
+        ):
+            metrics.error("validation")
+            error_response = {
+                "type": "error",
+                "error": "timestamp와 relativePitch는 숫자여야 합니다.",
+                "timestamp": datetime.now().isoformat(),
+            }
+            await manager.send_personal_message(error_response, websocket)
+            return
+
+        # 자세 예측
+        if classifier.model is None:
+            metrics.error("model")
+            error_response = {
+                "type": "error",
+                "error": "모델이 로드되지 않았습니다. 서버를 다시 시작해주세요.",
+                "timestamp": datetime.now().isoformat(),
+            }
+            await manager.send_personal_message(error_response, websocket)
+            return
+
+        # 예측 수행 (features/scale/inference는 분류기가 기록)
+        metrics.observe("validate", stage_start)
+        state.last_sample = (timestamp, relative_pitch)
+        if inference_pool is not None:
+            # 워커 프로세스에서 예측 (왕복 시간을 inference 단계로 기록)
+            inference_start = time.perf_counter()
+            prediction_result = await inference_pool.predict(
+                int(timestamp), float(relative_pitch)
+            )
+            metrics.observe("inference", inference_start)
+        else:
+            prediction_result = classifier.predict_posture(
+                int(timestamp), float(relative_pitch)
+            )
+
+        if "error" in prediction_result:
+            metrics.error("prediction")
+            error_response = {
+                "type": "error",
+                "error": prediction_result["error"],
+                "timestamp": datetime.now().isoformat(),
+            }
+            await manager.send_personal_message(error_response, websocket)
+            return
+
+        # 섀도 평가용 복제 (표본 추출 + 큐 삽입만)
+        if shadow is not None:
+            shadow.offer(
+                int(timestamp),
+                float(relative_pitch),
+                prediction_result["predicted_posture"],
+            )
+
+        # 드리프트 감시 (히스토그램 구간 하나 갱신, check_every마다 기준 분포와 비교)
+        for event in drift_monitor.observe(
+            state.device_id, float(relative_pitch), prediction_result["confidence"]
+        ):
+            report_drift(event)
+
+        notifier = state.notifier
+        action = notifier.observe(
+            prediction_result["predicted_posture"],
+            prediction_result["confidence"],
+            prediction_result["all_probabilities"],
+        )
+        # 타임라인은 깜빡임으로 구간이 잘게 나뉘지 않도록 평활화된 자세로 기록
+        if notifier.smoother.posture is not None:
+            timeline_store.observe(
+                state.device_id,
+                int(time.time() * 1000),
+                notifier.smoother.posture,
+                prediction_result["confidence"],
+            )
+        if action is None:
+            # 자세 변화 없음 - 응답 생략
+            return
+
+        if action == "prediction":
+            # 성공적인 예측 결과 전송 (연결별 응답 프로필)
+            response = state.encoder.encode(prediction_result)
+            await manager.send_personal_message(response, websocket)
+
+            if sample("respond"):
+                logger.info(
+                    "예측 완료 - 입력: %s도, 결과: %s번 자세",
+                    relative_pitch,
+                    prediction_result["predicted_posture"],
+                )
+        else:
+            response = build_filtered_response(action, notifier, prediction_result)
+            await manager.send_personal_message(response, websocket)
+            logger.info(
+                "%s 전송 - 평활화 자세: %s번 (생략 %s건)",
+                action,
+                response["predicted_posture"],
+                response["suppressed"],
+            )
+
+    except json.JSONDecodeError:
+        metrics.error("json")
+        error_response = {
+            "type": "error",
+            "error": "잘못된 JSON 형식입니다.",
+            "timestamp": datetime.now().isoformat(),
+        }
+        await manager.send_personal_message(error_response, websocket)
+        if sample("invalid_json"):
+            logger.warning("잘못된 JSON 데이터 수신: %.200s", data)
 
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
-        logger.info("클라이언트가 연결을 끊었습니다.")
+    except Exception as e:
+        metrics.error("internal")
+        error_response = {
+            "type": "error",
+            "error": f"처리 중 오류 발생: {str(e)}",
+            "timestamp": datetime.now().isoformat(),
+        }
+        await manager.send_personal_message(error_response, websocket)
+        logger.error(f"데이터 처리 중 오류: {e}")
+        logger.error(traceback.format_exc())
+
+
+def unacked_limit(options: Dict) -> int:
+    """
+    연결이 보관할 미확인 응답 수 (쿼리 파라미터 ack=1로 요청한 연결만 SESSION_MAX_UNACKED).
+
+    ack 메시지를 보내지 않는 클라이언트의 응답까지 쌓아 두지 않도록 기본은 보관하지 않습니다.
+    """
+    enabled = options.get("ack", "").lower() in ("on", "true", "1")
+    return SESSION_MAX_UNACKED if enabled else 0
+
+
+async def load_session(session_id: str) -> Optional[SessionState]:
+    """세션 상태를 읽습니다 (Redis 같은 원격 저장소는 이벤트 루프를 막지 않도록 스레드에서)."""
+    if not session_store.blocking:
+        return session_store.get(session_id)
+    return await asyncio.get_running_loop().run_in_executor(
+        None, session_store.get, session_id
+    )
+
+
+async def save_session(state: SessionState) -> None:
+    """세션 상태를 저장합니다 (원격 저장소는 루프에서 뜬 스냅숏을 스레드에서 기록)."""
+    if not session_store.blocking:
+        session_store.put(state)
+        return
+    data = state.to_dict()
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            None, session_store.save, state.session_id, data
+        )
+    except Exception as e:
+        logger.error(f"세션 저장 실패: {state.session_id} ({e})")
+
+
+async def open_session(params: Dict, websocket: WebSocket) -> tuple:
+    """
+    연결 쿼리 파라미터로 세션을 이어받거나 새로 만들어 이 연결에 묶습니다.
+
+    예) /ws?session_id=abc&resume_token=...&last_seq=42&ack=1
+        → abc 세션의 43번 이후 응답을 다시 받음 (resume_token은 환영 메시지로 발급)
+
+    resume_token이 맞지 않으면 이어받지 않고 새 ID로 새 세션을 만듭니다.
+    응답 보관(재전송)은 ack=1로 연결해 ack 메시지를 보내는 클라이언트만 사용합니다.
+
+    Returns:
+        (세션 상태, 재전송할 응답 목록) - 새 세션이면 재전송 목록은 None,
+        이어받을 세션을 다른 살아 있는 연결이 쓰고 있으면 (None, None)
+    """
+    session_id = params.get("session_id")
+    state = await load_session(session_id) if session_id else None
+    if state is not None and not state.can_resume(params.get("resume_token")):
+        metrics.error("validation")
+        logger.warning(f"세션 재개 거부 (resume_token 불일치): {session_id}")
+        state = session_id = None
+    if state is not None:
+        if not manager.claim_session(session_id, websocket):
+            logger.warning(f"세션 재개 거부 (다른 연결이 사용 중): {session_id}")
+            return None, None
+        try:
+            last_seq = int(params.get("last_seq", 0))
+        except ValueError:
+            last_seq = 0
+        replay = state.pending_since(last_seq)
+        state.limit_unacked(unacked_limit(params))
+        logger.info(f"세션 재개: {session_id} (재전송 {len(replay)}건)")
+        return state, replay
+
+    # 새 세션 - 연결별 자세 평활화 상태 (기본: 샘플마다 응답)
+    try:
+        notifier = create_notifier(params)
+    except ValueError as e:
+        metrics.error("validation")
+        logger.warning(f"잘못된 응답 모드 파라미터, 기본값 사용: {e}")
+        notifier = create_notifier({})
+    if not session_id or session_id in manager.sessions:
+        session_id = new_session_id()
+    state = SessionState(session_id, notifier, unacked_limit(params))
+    manager.claim_session(session_id, websocket)
+    await save_session(state)
+    return state, None
+
+
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket):
+    """웹소켓 엔드포인트"""
+    if not await manager.connect(websocket):
+        return
+    # 입장 슬롯을 얻은 뒤에는 무엇이 실패하든 finally에서 돌려줘야 하므로 준비 과정도 try 안에서
+    client_host = websocket.client.host if websocket.client else "unknown"
+    state = None
+    limiter = None
+    heartbeat = None
+    reader = None
+    release_timer = None
+    try:
+        params = dict(websocket.query_params)
+        state, replay = await open_session(params, websocket)
+        if state is None:
+            # 살아 있는 연결이 쓰는 세션 - 그 연결이 끝나거나 정리된 뒤 다시 시도
+            await manager.reject(websocket, "session_in_use")
+            return
+        state.encoder = create_encoder(params)
+        state.rate_controller = create_rate_controller(params)
+        state.device_id = params.get("device_id", state.session_id)
+        heartbeat = state.heartbeat = Heartbeat(
+            WS_PING_INTERVAL_S, WS_READ_TIMEOUT_S, WS_IDLE_TIMEOUT_S
+        )
+        limiter = state.limiter = create_limiter(client_host)
+
+        # 수신은 별도 태스크에서 - 처리가 밀리면 쌓인 메시지를 한 번에 가져와 오래된 샘플을 건너뜀
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=INBOX_MAX_MESSAGES)
+        reader = asyncio.create_task(receive_loop(websocket, inbox, heartbeat))
+        heartbeat.timer = asyncio.get_running_loop().call_later(
+            heartbeat.check_interval_s, check_heartbeat, websocket, heartbeat, inbox
+        )
+
+        # 연결 환영 메시지
+        welcome_message = {
+            "type": "welcome",
+            "message": "자세 분류 웹소켓 서버에 연결되었습니다.",
+            "timestamp": datetime.now().isoformat(),
+            "instructions": '다음 형식으로 데이터를 전송해주세요: {"timestamp": 15420, "relativePitch": -25.73}',
+            "session_id": state.session_id,
+            "resume_token": state.resume_token,
+            "resumed": replay is not None,
+            "max_unacked": state.max_unacked,
+            "last_client_seq": state.last_client_seq,
+        }
+        await manager.send_personal_message(welcome_message, websocket)
+
+        # 이후 응답에는 순번을 붙임 - 재연결이면 클라이언트가 못 받은 응답부터 다시 전송
+        manager.active_connections[websocket] = state
+        for text in replay or []:
+            await manager.send_text(text, websocket)
+
+        last_saved = time.monotonic()
+        while True:
+            batch = [await inbox.get()]
+            while not inbox.empty():
+                batch.append(inbox.get_nowait())
+            closing = None in batch
+            if closing:
+                # 연결 종료 표시 앞의 메시지까지는 처리 - 교정·ack·타임라인이 반영되고
+                # 보내지 못한 응답은 미확인 응답으로 남아 재연결 때 다시 전송됨
+                batch = batch[: batch.index(None)]
+            # receive 단계 = 프레임 도착부터 처리 루프가 꺼낼 때까지 대기열에서 기다린 시간
+            # (클라이언트가 다음 메시지를 보내기까지의 유휴 시간은 포함하지 않음)
+            now = time.perf_counter()
+            messages = []
+            for item in batch:
+                if item is not RELEASE_HELD:
+                    arrived, data = item
+                    metrics.observe_duration("receive", now - arrived)
+                    messages.append(data)
+            await process_batch(messages, websocket, state)
+            if closing or heartbeat.expired is not None:
+                break
+            release_timer = schedule_release(limiter, inbox, release_timer)
+
+            if time.monotonic() - last_saved >= SESSION_SAVE_INTERVAL_S:
+                await save_session(state)
+                last_saved = time.monotonic()
+
+        if heartbeat.expired is not None:
+            await manager.reap(websocket, heartbeat.expired)
+        else:
+            logger.info("클라이언트가 연결을 끊었습니다.")
     except Exception as e:
         logger.error(f"웹소켓 처리 중 예상치 못한 오류: {e}")
         logger.error(traceback.format_exc())
+        try:
+            await websocket.close(code=CLOSE_INTERNAL_ERROR)
+        except Exception:
+            pass
+    finally:
+        # 준비 도중 실패했으면 만들어진 것만 정리
+        if reader is not None:
+            reader.cancel()
+        if heartbeat is not None and heartbeat.timer is not None:
+            heartbeat.timer.cancel()
+        if release_timer is not None:
+            release_timer.cancel()
+        release_limiter(client_host, limiter)
         manager.disconnect(websocket)
+        if state is not None:
+            manager.release_session(state.session_id, websocket)
+            await save_session(state)
+            timeline_store.end(state.device_id)
+            for key in state.fusion_devices:
+                fusion_hub.remove(key)
+            if state.coalesced or state.dropped:
+                logger.info(
+                    f"건너뛴 샘플 - 병합 {state.coalesced}개, 폐기 {state.dropped}개"
+                )
 
 
 if __name__ == "__main__":
@@ -469,4 +1919,7 @@ if __name__ == "__main__":
         host="0.0.0.0",  # 모든 인터페이스에서 접근 가능
         port=SERVER_PORT,
         log_level=LOG_LEVEL.lower(),
+        # 프로토콜 수준 ping도 같은 주기로 (응용 수준 ping/pong과 별개로 TCP 연결 확인)
+        ws_ping_interval=WS_PING_INTERVAL_S,
+        ws_ping_timeout=WS_READ_TIMEOUT_S,
     )
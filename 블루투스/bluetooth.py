@@ -0,0 +1,67 @@
+"""
+블루투스/시리얼 센서 기기 여러 대를 서버로 중계하는 게이트웨이 실행 스크립트
+
+사용법:
+    python 블루투스/bluetooth.py --server ws://localhost:8000/ws \
+        --device desk1=/dev/rfcomm0 \
+        --device desk2=rfcomm://00:11:22:33:44:55/1 \
+        --device imu=/dev/ttyUSB0,baud=115200,offset=auto,start=0
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# 프로젝트 루트의 serial_gateway 모듈 사용
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from serial_gateway import (  # noqa: E402
+    MAX_FRAME_SAMPLES,
+    SerialGateway,
+    parse_device_spec,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="센서 기기 → 서버 게이트웨이")
+    parser.add_argument("--server", default="ws://localhost:8000/ws")
+    parser.add_argument(
+        "--device",
+        action="append",
+        required=True,
+        type=parse_device_spec,
+        help="이름=경로[,baud=9600][,offset=auto|각도][,start=1|0] (여러 번 지정)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help=f"한 프레임의 최대 샘플 수 (서버 MAX_FRAME_SAMPLES={MAX_FRAME_SAMPLES} 이하)",
+    )
+    parser.add_argument("--batch-interval", type=float, default=0.2)
+    parser.add_argument("--report-interval", type=float, default=10.0)
+    args = parser.parse_args()
+    if not 1 <= args.batch_size <= MAX_FRAME_SAMPLES:
+        parser.error(
+            f"--batch-size는 1 이상 서버 MAX_FRAME_SAMPLES({MAX_FRAME_SAMPLES}) 이하여야 합니다."
+        )
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    gateway = SerialGateway(
+        args.device,
+        args.server,
+        report_interval_s=args.report_interval,
+        batch_size=args.batch_size,
+        batch_interval_s=args.batch_interval,
+    )
+    try:
+        asyncio.run(gateway.run())
+    except KeyboardInterrupt:
+        print("🛑 게이트웨이 종료")
+
+
+if __name__ == "__main__":
+    main()
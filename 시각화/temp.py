@@ -1,10 +1,17 @@
 import os
+import sys
+from pathlib import Path
 
 import pandas as pd
 from sklearn.metrics import accuracy_score, classification_report
 from sklearn.model_selection import GridSearchCV, train_test_split
 from sklearn.neighbors import KNeighborsClassifier
 
+# 프로젝트 루트의 session_store 모듈 사용
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from session_store import read_table  # noqa: E402
+from stream_fusion import fuse_frames  # noqa: E402
+
 # 데이터 폴더 및 라벨
 pressure_dir = "./압력"
 imu_dir = "./IMU"
@@ -17,10 +24,16 @@ for posture in posture_labels:
     pressure_path = os.path.join(pressure_dir, f"{posture}.csv")
     imu_path = os.path.join(imu_dir, f"{posture}.csv")
 
-    pressure_df = pd.read_csv(pressure_path)
-    imu_df = pd.read_csv(imu_path)
+    # 같은 이름의 세션 파일(.pses)이 있으면 CSV 대신 읽음
+    pressure_df = read_table(pressure_path)
+    imu_df = read_table(imu_path)
 
-    pressure_df["pitch"] = imu_df["relative_pitch_deg"]
+    if "timestamp_ms" in pressure_df.columns:
+        # 타임스탬프 기준 결합 (실시간 서버와 같은 규칙)
+        pressure_df = fuse_frames(pressure_df, imu_df).drop(columns=["timestamp_ms"])
+    else:
+        # 타임스탬프가 없는 기존 pv 기록은 행 순서로 결합
+        pressure_df["pitch"] = imu_df["relative_pitch_deg"]
     pressure_df["label"] = label
 
     data_list.append(pressure_df)